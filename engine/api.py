@@ -4,12 +4,18 @@ HTTP API wrapper for Inspiration engine scripts.
 
 This Flask app wraps the existing CLI scripts (generate.py, seek.py, sync_messages.py)
 to enable HTTP access from the Next.js frontend deployed on Vercel.
+
+By default runs execute in-process on a warm engine runtime (engine_runtime.py):
+LLM/Supabase clients and embedding caches are loaded once and reused. Set
+ENGINE_EXECUTION_MODE=subprocess to fall back to spawning the CLI scripts.
 """
 
 import os
 import sys
 import json
 import subprocess
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 from flask import Flask, request, jsonify
 from flask_cors import CORS
@@ -19,6 +25,42 @@ CORS(app)  # Allow requests from Vercel frontend
 
 ENGINE_DIR = Path(__file__).parent
 
+# "inprocess" (default) or "subprocess"
+EXECUTION_MODE = os.environ.get('ENGINE_EXECUTION_MODE', 'inprocess').lower()
+
+GENERATE_TIMEOUT = 600  # 10 minutes
+SEEK_TIMEOUT = 300      # 5 minutes
+SYNC_TIMEOUT = 300      # 5 minutes
+
+
+CLOUD_SYNC_ERROR = (
+    'Cannot sync from cloud environment. The app cannot access your local Cursor database '
+    'when running on Vercel. Please run the app locally to sync.'
+)
+
+
+def is_database_not_found(error_msg: str) -> bool:
+    """Whether a sync error means the local Cursor database isn't reachable."""
+    return 'Database not found' in error_msg or 'not found at' in error_msg
+
+
+def use_inprocess() -> bool:
+    """Whether requests run on the warm in-process runtime."""
+    return EXECUTION_MODE != 'subprocess'
+
+
+def run_inprocess(fn, data: dict, timeout: int):
+    """
+    Run an engine_runtime function on the worker pool and wait for it.
+
+    Raises:
+        concurrent.futures.TimeoutError: If the run exceeds timeout. The run
+            itself keeps going in the background (threads can't be killed).
+    """
+    import engine_runtime
+    future = engine_runtime.submit(fn, data)
+    return future.result(timeout=timeout)
+
 
 @app.route('/health', methods=['GET'])
 def health():
@@ -51,9 +93,6 @@ def generate():
     try:
         data = request.json or {}
         
-        # Build command args
-        args = ['python3', str(ENGINE_DIR / 'generate.py')]
-        
         # Mode is required
         mode = data.get('mode')
         if not mode:
@@ -61,6 +100,13 @@ def generate():
                 'success': False,
                 'error': 'mode is required (insights or ideas)'
             }), 400
+        
+        if use_inprocess():
+            import engine_runtime
+            return jsonify(run_inprocess(engine_runtime.run_generate, data, GENERATE_TIMEOUT))
+        
+        # Build command args
+        args = ['python3', str(ENGINE_DIR / 'generate.py')]
         args.extend(['--mode', mode])
         
         # Preset mode or custom
@@ -102,7 +148,7 @@ def generate():
             capture_output=True,
             text=True,
             env={**os.environ, 'PYTHONUNBUFFERED': '1'},
-            timeout=600  # 10 minute timeout
+            timeout=GENERATE_TIMEOUT
         )
         
         # Parse output to find generated file
@@ -156,7 +202,7 @@ def generate():
             'stats': stats
         })
         
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, FutureTimeoutError):
         return jsonify({
             'success': False,
             'error': 'Generation timed out after 10 minutes'
@@ -195,6 +241,11 @@ def seek():
                 'error': 'query is required'
             }), 400
         
+        if use_inprocess():
+            import engine_runtime
+            # Like the subprocess branch: seek's own errors are reported in the body
+            return jsonify(run_inprocess(engine_runtime.run_seek, data, SEEK_TIMEOUT))
+        
         # Build command args
         args = ['python3', str(ENGINE_DIR / 'seek.py')]
         args.extend(['--query', query])
@@ -221,7 +272,7 @@ def seek():
             capture_output=True,
             text=True,
             env={**os.environ, 'PYTHONUNBUFFERED': '1'},
-            timeout=300  # 5 minute timeout
+            timeout=SEEK_TIMEOUT
         )
         
         if result.returncode != 0:
@@ -263,7 +314,7 @@ def seek():
                 }
             }), 500
             
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, FutureTimeoutError):
         return jsonify({
             'success': False,
             'query': data.get('query', ''),
@@ -295,6 +346,17 @@ def sync():
     Note: This requires access to local Cursor database, so it will fail on cloud deployments.
     """
     try:
+        if use_inprocess():
+            import engine_runtime
+            try:
+                return jsonify(run_inprocess(engine_runtime.run_sync, request.get_json(silent=True) or {}, SYNC_TIMEOUT))
+            except FutureTimeoutError:
+                raise
+            except Exception as e:
+                if is_database_not_found(str(e)):
+                    return jsonify({'success': False, 'error': CLOUD_SYNC_ERROR}), 400
+                raise
+        
         args = ['python3', str(ENGINE_DIR / 'scripts' / 'sync_messages.py')]
         
         result = subprocess.run(
@@ -303,16 +365,16 @@ def sync():
             capture_output=True,
             text=True,
             env={**os.environ, 'PYTHONUNBUFFERED': '1'},
-            timeout=300  # 5 minute timeout
+            timeout=SYNC_TIMEOUT
         )
         
         if result.returncode != 0:
             # Check for database not found error
             error_msg = result.stderr or result.stdout or 'Unknown error'
-            if 'Database not found' in error_msg or 'not found at' in error_msg:
+            if is_database_not_found(error_msg):
                 return jsonify({
                     'success': False,
-                    'error': 'Cannot sync from cloud environment. The app cannot access your local Cursor database when running on Vercel. Please run the app locally to sync.'
+                    'error': CLOUD_SYNC_ERROR
                 }), 400
             
             return jsonify({
@@ -347,7 +409,7 @@ def sync():
                 'stats': {'indexed': indexed, 'skipped': skipped, 'failed': failed}
             })
             
-    except subprocess.TimeoutExpired:
+    except (subprocess.TimeoutExpired, FutureTimeoutError):
         return jsonify({
             'success': False,
             'error': 'Sync timed out after 5 minutes'
@@ -392,6 +454,11 @@ def parse_generate_stats(stdout: str) -> dict:
 
 
 if __name__ == '__main__':
+    if use_inprocess():
+        # Warm caches in the background so /health answers immediately
+        import engine_runtime
+        threading.Thread(target=engine_runtime.warm_up, daemon=True).start()
+    
     port = int(os.environ.get('PORT', 5000))
     app.run(host='0.0.0.0', port=port, debug=False)
 
@@ -0,0 +1,238 @@
+"""
+Clustering — Vectorized greedy clustering over embedding matrices.
+
+Leader clustering (leader_cluster / cluster_embeddings) is used by the Theme
+Explorer tabs (counter_intuitive, unexplored_territory). The algorithm
+matches the original per-pair loops exactly:
+
+- Items are visited in order.
+- Each item joins the cluster whose representative (first member) is most
+  similar, if that similarity is >= threshold (and > 0); ties go to the
+  earlier cluster.
+- Otherwise the item starts a new cluster and becomes its representative.
+
+Instead of one cosine_similarity() call per (item, cluster) pair, rows are
+L2-normalized once into an (n, dim) float32 matrix and scored in blocks:
+one matmul against the representatives that existed before the block, plus
+a (block, block) matmul for representatives created inside it.
+
+Seed clustering (seed_cluster / seed_cluster_embeddings) is used by Socratic
+pattern aggregation: each unassigned item in order seeds a cluster and takes
+every later unassigned item with similarity >= threshold to the seed. Scores
+are computed in blocks of seed rows over the same normalized matrix; scores
+within SEED_EXACT_MARGIN of the threshold are rechecked with
+cosine_similarity, so the output matches the pairwise loop exactly.
+"""
+
+from typing import Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .semantic_search import cosine_similarity
+
+
+DEFAULT_BLOCK_SIZE = 1024
+SEED_BLOCK_SIZE = 512       # Seed rows per similarity matrix block
+SEED_EXACT_MARGIN = 1e-4    # float32 scores this close to the threshold are recomputed exactly
+
+
+def embeddings_to_matrix(embeddings: Sequence[Sequence[float]]):
+    """
+    Stack embeddings into an L2-normalized (n, dim) float32 matrix.
+
+    Zero vectors stay zero (similarity 0 to everything, like cosine_similarity).
+
+    Raises:
+        ValueError: If embeddings have different dimensions
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy not available. Install with: pip install numpy")
+    if len(embeddings) == 0:
+        return np.zeros((0, 0), dtype=np.float32)
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.ndim != 2:
+        raise ValueError("Embeddings must all have the same dimension")
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+def leader_cluster(matrix, threshold: float = 0.75, block_size: int = DEFAULT_BLOCK_SIZE) -> list:
+    """
+    Greedy leader clustering of a normalized embedding matrix.
+
+    Args:
+        matrix: (n, dim) L2-normalized float32 matrix (see embeddings_to_matrix)
+        threshold: Minimum similarity to join an existing cluster
+        block_size: Rows scored per matmul
+
+    Returns:
+        List of int64 index arrays (row numbers into matrix), one per cluster,
+        in cluster creation order; members in row order
+    """
+    n = matrix.shape[0]
+    if n == 0:
+        return []
+
+    rep_rows = np.empty(n, dtype=np.int64)  # Row of each cluster's representative
+    n_reps = 0
+    labels = np.empty(n, dtype=np.int64)
+
+    for start in range(0, n, block_size):
+        block = matrix[start:start + block_size]
+        b = block.shape[0]
+
+        # Representatives from earlier blocks: one matmul, first-max wins ties
+        prior = n_reps
+        if prior:
+            prior_sims = block @ matrix[rep_rows[:prior]].T
+            prior_best = prior_sims.argmax(axis=1)
+            prior_best_sim = prior_sims[np.arange(b), prior_best]
+        # Representatives created inside this block are scored from block @ block.T
+        intra_sims = block @ block.T
+
+        block_rep_offsets: list[int] = []
+        for j in range(b):
+            best_idx = None
+            best_sim = 0.0
+            if prior:
+                sim = float(prior_best_sim[j])
+                if sim >= threshold and sim > best_sim:
+                    best_sim = sim
+                    best_idx = int(prior_best[j])
+            if block_rep_offsets:
+                offsets = np.asarray(block_rep_offsets)
+                sims = intra_sims[j, offsets]
+                k = int(sims.argmax())
+                sim = float(sims[k])
+                if sim >= threshold and sim > best_sim:
+                    best_sim = sim
+                    best_idx = prior + k
+
+            if best_idx is None:
+                rep_rows[n_reps] = start + j
+                labels[start + j] = n_reps
+                n_reps += 1
+                block_rep_offsets.append(j)
+            else:
+                labels[start + j] = best_idx
+
+    # Stable sort keeps members in row order within each cluster
+    order = np.argsort(labels, kind="stable")
+    boundaries = np.flatnonzero(np.diff(labels[order])) + 1
+    return np.split(order, boundaries)
+
+
+def cluster_embeddings(embeddings: Sequence[Sequence[float]], threshold: float = 0.75) -> list:
+    """
+    Cluster raw embeddings, falling back to pure Python without numpy.
+
+    Args:
+        embeddings: One embedding per item (same dimension)
+        threshold: Minimum similarity to join an existing cluster
+
+    Returns:
+        List of cluster index arrays (lists of ints without numpy)
+    """
+    if NUMPY_AVAILABLE:
+        return leader_cluster(embeddings_to_matrix(embeddings), threshold)
+
+    clusters: list[list[int]] = []
+    for i, embedding in enumerate(embeddings):
+        best_cluster_idx = None
+        best_similarity = 0
+        for idx, cluster in enumerate(clusters):
+            similarity = cosine_similarity(embedding, embeddings[cluster[0]])
+            if similarity >= threshold and similarity > best_similarity:
+                best_similarity = similarity
+                best_cluster_idx = idx
+        if best_cluster_idx is not None:
+            clusters[best_cluster_idx].append(i)
+        else:
+            clusters.append([i])
+    return clusters
+
+
+def seed_cluster(
+    matrix,
+    embeddings: Sequence[Sequence[float]],
+    threshold: float,
+    block_size: int = SEED_BLOCK_SIZE,
+) -> list[list[int]]:
+    """
+    Greedy seed clustering of a normalized embedding matrix.
+
+    Args:
+        matrix: (n, dim) L2-normalized float32 matrix (see embeddings_to_matrix)
+        embeddings: The raw embeddings matrix was built from (for exact rechecks)
+        threshold: Minimum similarity to join a seed's cluster
+        block_size: Seed rows scored per matmul
+
+    Returns:
+        Clusters as lists of item indices (seed first, then ascending),
+        in seed order, including singletons
+    """
+    n = matrix.shape[0]
+    used = np.zeros(n, dtype=bool)
+    clusters: list[list[int]] = []
+
+    for start in range(0, n, block_size):
+        rows = np.flatnonzero(~used[start:start + block_size]) + start
+        if not len(rows):
+            continue
+        cols = np.flatnonzero(~used[start:]) + start
+        scores = matrix[rows] @ matrix[cols].T
+        likely = scores >= threshold - SEED_EXACT_MARGIN
+        certain = scores >= threshold + SEED_EXACT_MARGIN
+
+        for r, i in enumerate(rows):
+            if used[i]:
+                continue  # Taken by an earlier seed in this block
+            used[i] = True
+            candidates = likely[r] & ~used[cols] & (cols > i)
+            members = []
+            for c in np.flatnonzero(candidates):
+                j = cols[c]
+                if certain[r, c] or cosine_similarity(embeddings[i], embeddings[j]) >= threshold:
+                    members.append(int(j))
+            used[members] = True
+            clusters.append([int(i)] + members)
+
+    return clusters
+
+
+def seed_cluster_embeddings(embeddings: Sequence[Sequence[float]], threshold: float) -> list[list[int]]:
+    """
+    Seed-cluster raw embeddings, falling back to pure Python without numpy
+    (or when embeddings have different dimensions).
+
+    Args:
+        embeddings: One embedding per item
+        threshold: Minimum similarity to join a seed's cluster
+
+    Returns:
+        Clusters as lists of item indices (see seed_cluster)
+    """
+    if NUMPY_AVAILABLE and len({len(e) for e in embeddings}) <= 1:
+        return seed_cluster(embeddings_to_matrix(embeddings), embeddings, threshold)
+
+    clusters: list[list[int]] = []
+    used: set[int] = set()
+    for i in range(len(embeddings)):
+        if i in used:
+            continue
+        cluster = [i]
+        used.add(i)
+        for j in range(len(embeddings)):
+            if j in used:
+                continue
+            if cosine_similarity(embeddings[i], embeddings[j]) >= threshold:
+                cluster.append(j)
+                used.add(j)
+        clusters.append(cluster)
+    return clusters
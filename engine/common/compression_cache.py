@@ -0,0 +1,83 @@
+"""
+Compression Cache — Durable raw-text → compressed-text cache for sync.
+
+Long messages are LLM-compressed before embedding. Caching the result by
+SHA-256 of the raw text (plus target length) means re-syncing an
+overlapping window never pays for compression twice, and the same raw
+message always maps to the same compressed text.
+
+Stored as append-only JSONL (data/compression_cache.jsonl): one
+{"hash", "max_chars", "text"} record per line. Later records win.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .config import get_data_dir
+
+
+def get_compression_cache_path() -> Path:
+    """Get path to the compression cache file."""
+    return get_data_dir() / "compression_cache.jsonl"
+
+
+def raw_text_hash(text: str) -> str:
+    """SHA-256 hex digest of the raw message text."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CompressionCache:
+    """Append-only, JSONL-backed compressed-text cache."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or get_compression_cache_path())
+        self._entries: dict[tuple[str, int], str] = {}
+        self._lock = threading.Lock()
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._entries[(record["hash"], record["max_chars"])] = record["text"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue  # Torn last line from an interrupted write
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, raw_text: str, max_chars: int) -> Optional[str]:
+        """Get cached compressed text for raw_text, or None."""
+        return self._entries.get((raw_text_hash(raw_text), max_chars))
+
+    def put(self, raw_text: str, max_chars: int, compressed_text: str) -> None:
+        """Record compressed text for raw_text (appended to disk immediately)."""
+        key = (raw_text_hash(raw_text), max_chars)
+        with self._lock:
+            if self._entries.get(key) == compressed_text:
+                return
+            self._entries[key] = compressed_text
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"hash": key[0], "max_chars": max_chars, "text": compressed_text}) + "\n")
+            except IOError as e:
+                print(f"⚠️  Failed to persist compression cache entry: {e}", file=sys.stderr)
+
+
+_compression_cache: Optional[CompressionCache] = None
+
+
+def get_compression_cache() -> CompressionCache:
+    """Get the process-wide compression cache (loaded once)."""
+    global _compression_cache
+    if _compression_cache is None:
+        _compression_cache = CompressionCache()
+    return _compression_cache
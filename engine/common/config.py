@@ -125,6 +125,10 @@ DEFAULT_CONFIG = {
         "includeContext": True,  # Include surrounding context for each message
         "contextMessages": 1,  # Number of messages before/after to include as context
     },
+    # Vector DB - Where message embeddings are stored and searched
+    "vectorDb": {
+        "backend": "supabase",  # Options: "supabase" (pgvector), "local" (embedded, data/local_vector_db)
+    },
     # Lenny Podcast Archive - Expert knowledge integration
     "lennyArchive": {
         "enabled": True,  # Whether to include expert perspectives in Theme Explorer
@@ -574,6 +578,22 @@ def get_smart_sampling_min_similarity() -> float:
     return get_smart_sampling_config().get("minSimilarity", 0.25)
 
 
+def get_vector_db_backend() -> str:
+    """
+    Get the message vector DB backend.
+    
+    VECTOR_DB_BACKEND in the environment overrides config.json.
+    
+    Returns:
+        "supabase" (pgvector via Supabase) or "local" (embedded store)
+    """
+    load_env_file()
+    backend = os.environ.get("VECTOR_DB_BACKEND")
+    if not backend:
+        backend = load_config().get("vectorDb", {}).get("backend", "supabase")
+    return "local" if str(backend).lower() == "local" else "supabase"
+
+
 def is_setup_complete() -> bool:
     """Check if initial setup has been completed."""
     config = load_config()
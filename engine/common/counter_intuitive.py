@@ -38,7 +38,7 @@ except ImportError:
     Client = None
 
 from common.config import load_env_file, get_data_dir
-from common.semantic_search import cosine_similarity
+from common.clustering import cluster_embeddings
 from common.llm import create_llm
 
 
@@ -198,29 +198,9 @@ def cluster_library_items(
     if not items:
         return []
     
-    # Cluster by similarity
-    clusters: list[list[dict]] = []
-    
-    for item in items:
-        embedding = item.get("embedding")
-        if not embedding:
-            continue
-        
-        best_cluster_idx = None
-        best_similarity = 0
-        
-        for idx, cluster in enumerate(clusters):
-            rep_embedding = cluster[0].get("embedding")
-            if rep_embedding:
-                similarity = cosine_similarity(embedding, rep_embedding)
-                if similarity >= threshold and similarity > best_similarity:
-                    best_similarity = similarity
-                    best_cluster_idx = idx
-        
-        if best_cluster_idx is not None:
-            clusters[best_cluster_idx].append(item)
-        else:
-            clusters.append([item])
+    # Cluster by similarity (vectorized - one matmul per block of items)
+    index_clusters = cluster_embeddings([item["embedding"] for item in items], threshold)
+    clusters: list[list[dict]] = [[items[i] for i in indices] for indices in index_clusters]
     
     # P2: Cache the results
     if use_cache:
@@ -3,16 +3,65 @@ Cross-KG Semantic Matcher — Find semantically similar entities across User ↔
 
 Part of Cross-KG Semantic Matching (P4): Uses embedding similarity to find related
 entities across sources when string matching finds 0 overlaps.
+
+Similarities are computed as blocked matrix products of two normalized
+float32 matrices, with argpartition top-k per user entity, so memory stays
+bounded by one block of scores (MAX_BLOCK_SCORES) plus the kept matches.
 """
 
+import json
 import numpy as np
-from typing import Any, Optional
+from typing import Any, Iterator, Optional
 from dataclasses import dataclass
 
+from .clustering import embeddings_to_matrix
 from .semantic_search import get_embedding
 from .config import load_env_file
 
 
+# Max user x Lenny scores held at once (float32: 4 bytes each)
+MAX_BLOCK_SCORES = 8_000_000
+
+
+def _parse_embedding(value) -> Optional[list[float]]:
+    """pgvector columns come back as "[0.1,0.2,...]" strings."""
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return None
+    return value if isinstance(value, list) and value else None
+
+
+def _embedding_matrix(entities: list[dict], dim: Optional[int] = None) -> tuple[np.ndarray, list[int]]:
+    """
+    Stack entity embeddings into a row-normalized float32 matrix.
+
+    Args:
+        entities: Entity dicts with an "embedding" field
+        dim: Required dimension (default: that of the first embedding)
+
+    Returns:
+        (matrix, indices into entities of its rows); entities without a
+        usable embedding of the right dimension are skipped
+    """
+    vectors = []
+    indices = []
+    for i, entity in enumerate(entities):
+        vector = _parse_embedding(entity.get("embedding"))
+        if not vector:
+            continue
+        dim = dim or len(vector)
+        if len(vector) != dim:
+            continue
+        vectors.append(vector)
+        indices.append(i)
+
+    if not vectors:
+        return np.zeros((0, dim or 0), dtype=np.float32), []
+    return embeddings_to_matrix(vectors), indices
+
+
 @dataclass
 class CrossKGMatch:
     """A semantic match between entities from different KGs."""
@@ -135,45 +184,74 @@ class CrossKGMatcher:
         
         print(f"Comparing {len(user_entities)} user entities with {len(lenny_entities)} Lenny entities")
         
-        matches = []
+        matches = list(self.iter_semantic_matches(user_entities, lenny_entities, similarity_threshold, top_k))
         
-        # Compare each user entity with all Lenny entities
-        for user_entity in user_entities:
-            user_embedding = user_entity.get("embedding")
-            if not user_embedding:
-                continue
-            
-            entity_matches = []
+        # Sort all matches by similarity
+        matches.sort(key=lambda m: m.similarity, reverse=True)
+        
+        print(f"Found {len(matches)} semantic matches above threshold {similarity_threshold}")
+        
+        return matches
+    
+    def iter_semantic_matches(
+        self,
+        user_entities: list[dict],
+        lenny_entities: list[dict],
+        similarity_threshold: float = 0.75,
+        top_k: int = 10,
+    ) -> Iterator[CrossKGMatch]:
+        """
+        Stream matches block by block, without a global sort.
+        
+        Args:
+            user_entities: User entities with embeddings
+            lenny_entities: Lenny entities with embeddings
+            similarity_threshold: Minimum similarity score (0.0-1.0)
+            top_k: Maximum matches per user entity
+        
+        Yields:
+            CrossKGMatch objects, grouped by user entity (in input order),
+            highest similarity first within each group
+        """
+        lenny_matrix, lenny_indices = _embedding_matrix(lenny_entities)
+        if not lenny_indices or top_k <= 0:
+            return
+        user_matrix, user_indices = _embedding_matrix(user_entities, dim=lenny_matrix.shape[1])
+        if not user_indices:
+            return
+        
+        n_lenny = len(lenny_indices)
+        k = min(top_k, n_lenny)
+        block_size = max(1, MAX_BLOCK_SCORES // n_lenny)
+        
+        for start in range(0, len(user_indices), block_size):
+            scores = user_matrix[start:start + block_size] @ lenny_matrix.T
+            if k < n_lenny:
+                top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            else:
+                top = np.broadcast_to(np.arange(n_lenny), scores.shape)
+            top_scores = np.take_along_axis(scores, top, axis=1)
             
-            for lenny_entity in lenny_entities:
-                lenny_embedding = lenny_entity.get("embedding")
-                if not lenny_embedding:
+            for row in range(scores.shape[0]):
+                keep = top_scores[row] >= similarity_threshold
+                if not keep.any():
                     continue
-                
-                similarity = self.cosine_similarity(user_embedding, lenny_embedding)
-                
-                if similarity >= similarity_threshold:
-                    match = CrossKGMatch(
+                cols = top[row][keep]
+                sims = top_scores[row][keep]
+                # Highest first; ties keep Lenny input order
+                order = np.lexsort((cols, -sims))
+                user_entity = user_entities[user_indices[start + row]]
+                for c in order:
+                    lenny_entity = lenny_entities[lenny_indices[cols[c]]]
+                    yield CrossKGMatch(
                         user_entity_id=user_entity["id"],
                         user_entity_name=user_entity["canonical_name"],
                         lenny_entity_id=lenny_entity["id"],
                         lenny_entity_name=lenny_entity["canonical_name"],
-                        similarity=similarity,
+                        similarity=float(sims[c]),
                         user_entity_type=user_entity.get("entity_type", "unknown"),
                         lenny_entity_type=lenny_entity.get("entity_type", "unknown")
                     )
-                    entity_matches.append(match)
-            
-            # Sort by similarity and take top K
-            entity_matches.sort(key=lambda m: m.similarity, reverse=True)
-            matches.extend(entity_matches[:top_k])
-        
-        # Sort all matches by similarity
-        matches.sort(key=lambda m: m.similarity, reverse=True)
-        
-        print(f"Found {len(matches)} semantic matches above threshold {similarity_threshold}")
-        
-        return matches
     
     def find_matches_for_entity(
         self,
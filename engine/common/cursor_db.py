@@ -12,6 +12,7 @@ import sqlite3
 import sys
 from datetime import datetime, timedelta
 from pathlib import Path
+from typing import Iterable, Iterator
 from urllib.parse import unquote
 
 
@@ -131,22 +132,115 @@ def extract_text_from_richtext(richtext_json: str) -> str:
         return ""
 
 
+BUBBLE_KEY_PREFIX = "bubbleId:"
+
+# Below this many composers, per-composer range scans beat one pass over every bubble
+BULK_BUBBLE_SCAN_MIN_COMPOSERS = 50
+
+
+def _key_prefix_range(prefix: str) -> tuple[str, str]:
+    """Get [low, high) key bounds matching a prefix (index-friendly, unlike LIKE)."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def load_composer_bubbles(conn: sqlite3.Connection, composer_id: str) -> dict[str, bytes | str]:
+    """
+    Load all bubbles for one composer with a single key-range scan.
+    
+    Args:
+        conn: Open connection to the Cursor database
+        composer_id: Composer UUID
+    
+    Returns:
+        Dict of bubble_id -> raw value (JSON, not yet decoded)
+    """
+    low, high = _key_prefix_range(f"{BUBBLE_KEY_PREFIX}{composer_id}:")
+    rows = conn.execute(
+        "SELECT key, value FROM cursorDiskKV WHERE key >= ? AND key < ?",
+        (low, high),
+    )
+    return {key[len(low):]: value for key, value in rows}
+
+
+def iter_composer_bubbles(
+    conn: sqlite3.Connection,
+    composer_ids: Iterable[str],
+) -> Iterator[tuple[str, dict[str, bytes | str]]]:
+    """
+    Prefetch bubbles for many composers, yielding one composer at a time.
+    
+    For large composer sets this is a single ordered pass over the bubbleId
+    key range: keys sort as bubbleId:{composer}:{bubble}, so each composer's
+    bubbles are contiguous and memory stays bounded by the largest composer.
+    Small sets use one range scan per composer instead.
+    
+    Every requested composer is yielded exactly once (with an empty dict if
+    it has no bubbles). Order is by composer ID.
+    
+    Args:
+        conn: Open connection to the Cursor database
+        composer_ids: Composer UUIDs to load
+    
+    Yields:
+        (composer_id, {bubble_id: raw value})
+    """
+    wanted = set(composer_ids)
+    if len(wanted) < BULK_BUBBLE_SCAN_MIN_COMPOSERS:
+        for composer_id in sorted(wanted):
+            yield composer_id, load_composer_bubbles(conn, composer_id)
+        return
+    
+    low, high = _key_prefix_range(BUBBLE_KEY_PREFIX)
+    rows = conn.execute(
+        "SELECT key, value FROM cursorDiskKV WHERE key >= ? AND key < ? ORDER BY key",
+        (low, high),
+    )
+    
+    current_id: str | None = None
+    current: dict[str, bytes | str] = {}
+    for key, value in rows:
+        composer_id, _, bubble_id = key[len(low):].partition(":")
+        if composer_id != current_id:
+            if current_id in wanted:
+                wanted.discard(current_id)
+                yield current_id, current
+            current_id, current = composer_id, {}
+        if composer_id in wanted:
+            current[bubble_id] = value
+    
+    if current_id in wanted:
+        wanted.discard(current_id)
+        yield current_id, current
+    
+    # Composers with no bubble rows at all
+    for composer_id in sorted(wanted):
+        yield composer_id, {}
+
+
 def extract_messages_from_chat_data(
     data: dict,
     start_ts: int,
     end_ts: int,
     composer_id: str | None = None,
     db_path: Path | None = None,
+    conn: sqlite3.Connection | None = None,
+    bubbles: dict[str, bytes | str] | None = None,
 ) -> list[dict]:
     """
     Extract messages from chat data (supports both Composer and regular chat formats).
     
+    Bubble lookup order for fullConversationHeadersOnly composers:
+    prefetched `bubbles` → one range scan on `conn` → one range scan on a
+    new read-only connection to `db_path`.
+    
     Args:
         data: Parsed JSON data from database
         start_ts: Start timestamp (milliseconds)
         end_ts: End timestamp (milliseconds)
         composer_id: Optional composer ID for bubble-based extraction
         db_path: Optional database path for bubble lookups
+        conn: Optional open connection to reuse for bubble lookups
+        bubbles: Optional prefetched {bubble_id: raw value} for this composer
     
     Returns:
         List of message dicts with type, text, timestamp
@@ -181,81 +275,83 @@ def extract_messages_from_chat_data(
             composer_created_at = data.get("createdAt", 0)
             composer_last_updated = data.get("lastUpdatedAt", composer_created_at)
             
-            # Try bubble-based extraction if we have composer_id and db_path
-            if composer_id and db_path and db_path.exists():
+            # Bubble-based extraction: all of this composer's bubbles come from
+            # one prefetch / range scan, not one point query per header
+            if bubbles is None and composer_id:
                 try:
-                    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
-                    cursor = conn.cursor()
+                    if conn is not None:
+                        bubbles = load_composer_bubbles(conn, composer_id)
+                    elif db_path and db_path.exists():
+                        own_conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+                        try:
+                            bubbles = load_composer_bubbles(own_conn, composer_id)
+                        finally:
+                            own_conn.close()
+                except sqlite3.Error:
+                    bubbles = None
+            
+            if bubbles:
+                # Extract messages from bubbles
+                for i, header in enumerate(full_headers):
+                    if not isinstance(header, dict):
+                        continue
                     
-                    # Extract messages from bubbles
-                    for i, header in enumerate(full_headers):
-                        if not isinstance(header, dict):
-                            continue
-                        
-                        bubble_id = header.get("bubbleId")
-                        if not bubble_id:
-                            continue
-                        
-                        # Determine message type from header
-                        msg_type_num = header.get("type", 1)  # 1=user, 2=assistant
-                        msg_type = "user" if msg_type_num == 1 else "assistant"
+                    bubble_id = header.get("bubbleId")
+                    if not bubble_id:
+                        continue
+                    
+                    # Determine message type from header
+                    msg_type_num = header.get("type", 1)  # 1=user, 2=assistant
+                    
+                    bubble_value = bubbles.get(bubble_id)
+                    if not bubble_value:
+                        continue
+                    
+                    try:
+                        if isinstance(bubble_value, bytes):
+                            bubble_value_str = bubble_value.decode('utf-8')
+                        else:
+                            bubble_value_str = bubble_value
+                        bubble_data = json.loads(bubble_value_str)
                         
-                        # Look up bubble
-                        bubble_key = f"bubbleId:{composer_id}:{bubble_id}"
-                        cursor.execute("SELECT value FROM cursorDiskKV WHERE key = ?", (bubble_key,))
-                        bubble_row = cursor.fetchone()
+                        # Extract text from bubble
+                        text = ""
+                        if "text" in bubble_data:
+                            text = bubble_data["text"]
+                        elif "richText" in bubble_data:
+                            text = extract_text_from_richtext(json.dumps(bubble_data["richText"]))
                         
-                        if bubble_row:
-                            try:
-                                bubble_value = bubble_row[0]
-                                if isinstance(bubble_value, bytes):
-                                    bubble_value_str = bubble_value.decode('utf-8')
+                        if text and text.strip():
+                            # Estimate timestamp: distribute messages evenly between created and last updated
+                            # Or use bubble's own timestamp if available
+                            ts = bubble_data.get("timestamp", 0)
+                            if not ts or ts == 0:
+                                # Estimate based on message order
+                                if len(full_headers) > 1:
+                                    # Distribute timestamps evenly across the time span
+                                    time_span = composer_last_updated - composer_created_at
+                                    if time_span > 0:
+                                        ts = composer_created_at + int((time_span * i) / (len(full_headers) - 1))
+                                    else:
+                                        ts = composer_created_at
                                 else:
-                                    bubble_value_str = bubble_value
-                                bubble_data = json.loads(bubble_value_str)
-                                
-                                # Extract text from bubble
-                                text = ""
-                                if "text" in bubble_data:
-                                    text = bubble_data["text"]
-                                elif "richText" in bubble_data:
-                                    text = extract_text_from_richtext(json.dumps(bubble_data["richText"]))
-                                
-                                if text and text.strip():
-                                    # Estimate timestamp: distribute messages evenly between created and last updated
-                                    # Or use bubble's own timestamp if available
-                                    ts = bubble_data.get("timestamp", 0)
-                                    if not ts or ts == 0:
-                                        # Estimate based on message order
-                                        if len(full_headers) > 1:
-                                            # Distribute timestamps evenly across the time span
-                                            time_span = composer_last_updated - composer_created_at
-                                            if time_span > 0:
-                                                ts = composer_created_at + int((time_span * i) / (len(full_headers) - 1))
-                                            else:
-                                                ts = composer_created_at
-                                        else:
-                                            ts = composer_created_at
-                                    
-                                    # Convert to int if string
-                                    if isinstance(ts, str):
-                                        try:
-                                            ts = int(ts)
-                                        except ValueError:
-                                            ts = 0
-                                    
-                                    if ts > 0:
-                                        messages_raw.append({
-                                            "text": text.strip(),
-                                            "timestamp": ts,
-                                            "type": msg_type_num,
-                                        })
-                            except (json.JSONDecodeError, UnicodeDecodeError, KeyError):
-                                continue
-                    
-                    conn.close()
-                except sqlite3.Error:
-                    pass
+                                    ts = composer_created_at
+                            
+                            # Convert to int if string
+                            if isinstance(ts, str):
+                                try:
+                                    ts = int(ts)
+                                except ValueError:
+                                    ts = 0
+                            
+                            if ts > 0:
+                                messages_raw.append({
+                                    "text": text.strip(),
+                                    "timestamp": ts,
+                                    "type": msg_type_num,
+                                })
+                    except (json.JSONDecodeError, UnicodeDecodeError, KeyError):
+                        continue
             
             # Fallback: Check if headers have richText/text directly (old format)
             if not messages_raw:
@@ -422,10 +518,9 @@ def get_conversations_for_date(
     
     Requires Vector DB to be set up and synced.
     """
-    from .vector_db import get_supabase_client, get_conversations_from_vector_db
+    from .vector_db import is_vector_db_configured, get_conversations_from_vector_db
     
-    client = get_supabase_client()
-    if not client:
+    if not is_vector_db_configured():
         raise RuntimeError(
             "Vector DB not configured. Please set SUPABASE_URL and SUPABASE_ANON_KEY in your .env file.\n"
             "See engine/scripts/init_vector_db.sql for setup instructions."
@@ -489,6 +584,137 @@ def _get_conversations_for_date_sqlite(
                 # Cache corrupted or missing key, continue to fetch
                 pass
     
+    # Date range for filtering (full day in local time)
+    start_of_day = datetime.combine(target_date, datetime.min.time())
+    end_of_day = datetime.combine(target_date + timedelta(days=1), datetime.min.time())
+    
+    # Convert to millisecond timestamps
+    start_ts = int(start_of_day.timestamp() * 1000)
+    end_ts = int(end_of_day.timestamp() * 1000)
+    
+    conversations = _scan_conversations_sqlite(start_ts, end_ts, workspace_paths)
+    
+    # Save to cache
+    if use_cache:
+        try:
+            cache_key = get_conversation_cache_key(target_date, workspace_paths)
+            cache_path = get_conversation_cache_path()
+            
+            cache = {}
+            if cache_path.exists():
+                try:
+                    with open(cache_path) as f:
+                        cache = json.load(f)
+                except (json.JSONDecodeError, IOError):
+                    cache = {}
+            
+            cache[cache_key] = {
+                "date": target_date.isoformat(),
+                "workspace_paths": workspace_paths,
+                "conversations": conversations,
+                "cached_at": datetime.now().isoformat(),
+            }
+            
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "w") as f:
+                json.dump(cache, f, indent=2)
+        except (IOError, OSError):
+            # Cache write failed, but conversations are still valid
+            pass
+    
+    return conversations
+
+
+def _resolve_chat_location(
+    key: str,
+    data: dict,
+    workspace_mapping: dict[str, str],
+) -> tuple[str, str, str, str | None]:
+    """
+    Determine chat type, chat ID and workspace for a composer/chat row.
+    
+    Args:
+        key: Row key (cursorDiskKV or ItemTable format)
+        data: Parsed row value
+        workspace_mapping: Workspace hash -> folder path
+    
+    Returns:
+        Tuple of (chat_type, chat_id, workspace_path, workspace_hash)
+    """
+    chat_type = "composer"
+    chat_id = "unknown"
+    workspace_path = "Unknown"
+    workspace_hash: str | None = None
+    
+    # Handle different key formats
+    if key.startswith("composerData:") or key.startswith("chatData:"):
+        # cursorDiskKV format: composerData:{uuid} or chatData:{uuid}
+        chat_type = "composer" if key.startswith("composerData:") else "chat"
+        chat_id = key.split(":", 1)[1] if ":" in key else "unknown"
+        
+        # Extract workspace from conversation data
+        if isinstance(data, dict):
+            workspace_hash = (
+                data.get("workspaceHash") or 
+                data.get("workspace") or 
+                data.get("workspaceId")
+            )
+            if not workspace_hash and "context" in data:
+                context = data["context"]
+                if isinstance(context, dict):
+                    workspace_hash = context.get("workspaceHash") or context.get("workspace")
+            if workspace_hash and workspace_hash in workspace_mapping:
+                workspace_path = workspace_mapping[workspace_hash]
+    elif key.startswith("composer.composerData") or key.startswith("workbench.panel.aichat.view.aichat.chatdata"):
+        # ItemTable format: composer.composerData.{workspace_hash}.{id} or workbench.panel.aichat.view.aichat.chatdata.{workspace_hash}.{id}
+        chat_type = "composer" if key.startswith("composer.composerData") else "chat"
+        parts = key.split(".")
+        if chat_type == "composer" and len(parts) >= 3:
+            workspace_hash = parts[2]
+            workspace_path = workspace_mapping.get(workspace_hash, "Unknown")
+            chat_id = parts[-1] if len(parts) >= 4 else "unknown"
+        elif chat_type == "chat" and len(parts) >= 6:
+            workspace_hash = parts[5]
+            workspace_path = workspace_mapping.get(workspace_hash, "Unknown")
+            chat_id = parts[-1] if len(parts) >= 7 else "unknown"
+    
+    return chat_type, chat_id, workspace_path, workspace_hash
+
+
+def _needs_bubbles(data: dict) -> bool:
+    """Check if composer data only has bubble headers (messages live in bubbleId rows)."""
+    if not isinstance(data, dict):
+        return False
+    conversation_map = data.get("conversationMap")
+    if isinstance(conversation_map, dict) and conversation_map:
+        return False
+    conversation = data.get("conversation")
+    if isinstance(conversation, dict) and conversation.get("messages"):
+        return False
+    headers = data.get("fullConversationHeadersOnly")
+    return isinstance(headers, list) and len(headers) > 0
+
+
+def _scan_conversations_sqlite(
+    start_ts: int,
+    end_ts: int,
+    workspace_paths: list[str] | None = None,
+) -> list[dict]:
+    """
+    Scan the local Cursor database once and extract messages in [start_ts, end_ts).
+    
+    Each composer/chat row is read and JSON-decoded exactly once, regardless of
+    how many days the range spans. Messages are sorted by timestamp within each
+    conversation.
+    
+    Args:
+        start_ts: Start timestamp in milliseconds (inclusive)
+        end_ts: End timestamp in milliseconds (exclusive)
+        workspace_paths: Optional list of workspace paths to filter by
+    
+    Returns:
+        List of conversation dicts (same format as _get_conversations_for_date_sqlite)
+    """
     workspace_mapping = get_workspace_mapping()
     
     print(f"🗺️  [DEBUG] Workspace mapping has {len(workspace_mapping)} entries:", file=sys.stderr)
@@ -504,14 +730,6 @@ def _get_conversations_for_date_sqlite(
         normalized_workspaces = None
         print(f"🔍 [DEBUG] No workspace filter - searching all workspaces", file=sys.stderr)
     
-    # Date range for filtering (full day in local time)
-    start_of_day = datetime.combine(target_date, datetime.min.time())
-    end_of_day = datetime.combine(target_date + timedelta(days=1), datetime.min.time())
-    
-    # Convert to millisecond timestamps
-    start_ts = int(start_of_day.timestamp() * 1000)
-    end_ts = int(end_of_day.timestamp() * 1000)
-    
     conversations = []
     
     # Chat data can be stored in multiple places:
@@ -559,67 +777,11 @@ def _get_conversations_for_date_sqlite(
         
         print(f"📊 [DEBUG] Total entries to process: {len(all_rows)}", file=sys.stderr)
         
-        for key, value in all_rows:
-            if not value:
-                continue
-            
-            try:
-                # Handle both cursorDiskKV (BLOB) and ItemTable (text) formats
-                if isinstance(value, bytes):
-                    value_str = value.decode('utf-8')
-                else:
-                    value_str = value
-                data = json.loads(value_str)
-            except (json.JSONDecodeError, UnicodeDecodeError):
-                continue
-            
-            # Determine chat type and extract ID based on key format
-            chat_type = "composer"
-            chat_id = "unknown"
-            workspace_path = "Unknown"
-            workspace_hash: str | None = None
-            
-            # Handle different key formats
-            if key.startswith("composerData:") or key.startswith("chatData:"):
-                # cursorDiskKV format: composerData:{uuid} or chatData:{uuid}
-                chat_type = "composer" if key.startswith("composerData:") else "chat"
-                chat_id = key.split(":", 1)[1] if ":" in key else "unknown"
-                
-                # Extract workspace from conversation data
-                if isinstance(data, dict):
-                    workspace_hash = (
-                        data.get("workspaceHash") or 
-                        data.get("workspace") or 
-                        data.get("workspaceId")
-                    )
-                    if not workspace_hash and "context" in data:
-                        context = data["context"]
-                        if isinstance(context, dict):
-                            workspace_hash = context.get("workspaceHash") or context.get("workspace")
-                    if workspace_hash and workspace_hash in workspace_mapping:
-                        workspace_path = workspace_mapping[workspace_hash]
-            elif key.startswith("composer.composerData") or key.startswith("workbench.panel.aichat.view.aichat.chatdata"):
-                # ItemTable format: composer.composerData.{workspace_hash}.{id} or workbench.panel.aichat.view.aichat.chatdata.{workspace_hash}.{id}
-                chat_type = "composer" if key.startswith("composer.composerData") else "chat"
-                parts = key.split(".")
-                if chat_type == "composer" and len(parts) >= 3:
-                    workspace_hash = parts[2]
-                    workspace_path = workspace_mapping.get(workspace_hash, "Unknown")
-                    chat_id = parts[-1] if len(parts) >= 4 else "unknown"
-                elif chat_type == "chat" and len(parts) >= 6:
-                    workspace_hash = parts[5]
-                    workspace_path = workspace_mapping.get(workspace_hash, "Unknown")
-                    chat_id = parts[-1] if len(parts) >= 7 else "unknown"
-            
-            # MVP: Search ALL workspaces regardless of filter (non-negotiable)
-            # Only filter if workspace_paths is explicitly provided AND we have a valid workspace_hash
-            if normalized_workspaces and workspace_hash:
-                norm_workspace = os.path.normpath(workspace_path)
-                if norm_workspace not in normalized_workspaces:
-                    continue
+        def process_row(key: str, data: dict, location: tuple, bubbles: dict | None = None) -> None:
+            chat_type, chat_id, workspace_path, _ = location
             
             # Extract messages using unified function
-            # Pass composer_id and db_path for bubble-based extraction
+            # Pass composer_id and the shared connection for bubble-based extraction
             composer_id_for_extraction = None
             if key.startswith("composerData:"):
                 composer_id_for_extraction = key.split(":", 1)[1] if ":" in key else None
@@ -629,7 +791,9 @@ def _get_conversations_for_date_sqlite(
                 start_ts, 
                 end_ts,
                 composer_id=composer_id_for_extraction,
-                db_path=db_path
+                db_path=db_path,
+                conn=conn,
+                bubbles=bubbles,
             )
             
             # Check if any messages are in the date range (with valid timestamps)
@@ -647,6 +811,7 @@ def _get_conversations_for_date_sqlite(
                     and start_ts <= msg["timestamp"] < end_ts  # Within range
                 ]
                 if filtered_messages:
+                    filtered_messages.sort(key=lambda m: m["timestamp"])
                     conversations.append({
                         "chat_id": chat_id,
                         "chat_type": chat_type,
@@ -654,42 +819,79 @@ def _get_conversations_for_date_sqlite(
                         "messages": filtered_messages,  # Only include filtered messages
                     })
         
+        # Bubble-format composers are deferred so all their bubbles can be
+        # prefetched in one pass instead of one query per composer/bubble
+        pending_bubbles: dict[str, tuple[str, dict, tuple]] = {}
+        
+        for key, value in all_rows:
+            if not value:
+                continue
+            
+            try:
+                # Handle both cursorDiskKV (BLOB) and ItemTable (text) formats
+                if isinstance(value, bytes):
+                    value_str = value.decode('utf-8')
+                else:
+                    value_str = value
+                data = json.loads(value_str)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue
+            
+            location = _resolve_chat_location(key, data, workspace_mapping)
+            chat_type, chat_id, workspace_path, workspace_hash = location
+            
+            # MVP: Search ALL workspaces regardless of filter (non-negotiable)
+            # Only filter if workspace_paths is explicitly provided AND we have a valid workspace_hash
+            if normalized_workspaces and workspace_hash:
+                norm_workspace = os.path.normpath(workspace_path)
+                if norm_workspace not in normalized_workspaces:
+                    continue
+            
+            if key.startswith("composerData:") and _needs_bubbles(data):
+                pending_bubbles[chat_id] = (key, data, location)
+            else:
+                process_row(key, data, location)
+        
+        if pending_bubbles:
+            print(f"📊 [DEBUG] Prefetching bubbles for {len(pending_bubbles)} composers", file=sys.stderr)
+            for composer_id, bubbles in iter_composer_bubbles(conn, pending_bubbles.keys()):
+                key, data, location = pending_bubbles.pop(composer_id)
+                process_row(key, data, location, bubbles=bubbles)
+        
         conn.close()
     
     except sqlite3.Error as e:
         print(f"⚠️  [DEBUG] Error reading database: {e}", file=sys.stderr)
     
-    # Save to cache
-    if use_cache:
-        try:
-            cache_key = get_conversation_cache_key(target_date, workspace_paths)
-            cache_path = get_conversation_cache_path()
-            
-            cache = {}
-            if cache_path.exists():
-                try:
-                    with open(cache_path) as f:
-                        cache = json.load(f)
-                except (json.JSONDecodeError, IOError):
-                    cache = {}
-            
-            cache[cache_key] = {
-                "date": target_date.isoformat(),
-                "workspace_paths": workspace_paths,
-                "conversations": conversations,
-                "cached_at": datetime.now().isoformat(),
-            }
-            
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(cache_path, "w") as f:
-                json.dump(cache, f, indent=2)
-        except (IOError, OSError):
-            # Cache write failed, but conversations are still valid
-            pass
-    
     return conversations
 
 
+def get_cursor_conversations_since(
+    since_ts: int,
+    until_ts: int | None = None,
+    workspace_paths: list[str] | None = None,
+) -> list[dict]:
+    """
+    Get all local Cursor messages newer than a cutoff, in a single database scan.
+    
+    Range-aware replacement for calling _get_conversations_for_date_sqlite once
+    per day: a 30-day catch-up costs one scan instead of 30, and conversations
+    that span several days come back whole instead of split per day.
+    
+    Args:
+        since_ts: Cutoff timestamp in milliseconds (exclusive - messages must be newer)
+        until_ts: Optional upper bound in milliseconds (exclusive, defaults to no limit)
+        workspace_paths: Optional list of workspace paths to filter by
+    
+    Returns:
+        List of conversation dicts with messages sorted by timestamp
+    """
+    # +1: extraction filters with start <= ts, sync semantics are ts > cutoff
+    start_ts = max(since_ts + 1, 1)
+    end_ts = until_ts if until_ts is not None else 2 ** 63 - 1
+    return _scan_conversations_sqlite(start_ts, end_ts, workspace_paths)
+
+
 def get_conversations_for_range(
     start_date: datetime.date,
     end_date: datetime.date,
@@ -710,10 +912,9 @@ def get_conversations_for_range(
         Note: Conversations are deduplicated by chat_id+workspace, and messages
         from all days in the range are included (not filtered to specific days).
     """
-    from .vector_db import get_supabase_client, get_conversations_from_vector_db
+    from .vector_db import is_vector_db_configured, get_conversations_from_vector_db
     
-    client = get_supabase_client()
-    if not client:
+    if not is_vector_db_configured():
         raise RuntimeError(
             "Vector DB not configured. Please set SUPABASE_URL and SUPABASE_ANON_KEY in your .env file.\n"
             "See engine/scripts/init_vector_db.sql for setup instructions."
@@ -1177,7 +1378,8 @@ def get_high_signal_conversations_sqlite_fast(
                 start_ts if not max_size_mb else 0,  # No time filter if size-based
                 end_ts if not max_size_mb else int(datetime.now().timestamp() * 1000),  # Current time if size-based
                 composer_id=composer_id,
-                db_path=db_path
+                db_path=db_path,
+                conn=conn,  # Reuse this connection (also covers the locked-DB copy)
             )
             
             if not messages:
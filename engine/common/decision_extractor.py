@@ -161,35 +161,40 @@ def _parse_decision_response(response: str) -> list[Decision]:
     
     try:
         data = json.loads(json_str)
-        if not isinstance(data, list):
-            return []
-        
-        decisions = []
-        for item in data:
-            if not isinstance(item, dict):
-                continue
-            
-            if "decision_text" not in item:
-                continue
-            
-            decision = Decision(
-                decision_text=item["decision_text"].strip(),
-                decision_type=item.get("decision_type", "DECISION"),
-                confidence=item.get("confidence", 1.0),
-                context_snippet=item.get("context_snippet"),
-                alternatives_considered=item.get("alternatives_considered", []),
-                rationale=item.get("rationale"),
-            )
-            
-            if decision.decision_text:
-                decisions.append(decision)
-        
-        return decisions
-        
     except json.JSONDecodeError as e:
         print(f"⚠️ Failed to parse decision extraction response as JSON: {e}")
         print(f"Response: {response[:200]}...")
         return []
+    
+    return _decisions_from_items(data)
+
+
+def _decisions_from_items(data) -> list[Decision]:
+    """Convert parsed JSON decision items into Decision objects."""
+    if not isinstance(data, list):
+        return []
+    
+    decisions = []
+    for item in data:
+        if not isinstance(item, dict):
+            continue
+        
+        if not isinstance(item.get("decision_text"), str):
+            continue
+        
+        decision = Decision(
+            decision_text=item["decision_text"].strip(),
+            decision_type=item.get("decision_type", "DECISION"),
+            confidence=item.get("confidence", 1.0),
+            context_snippet=item.get("context_snippet"),
+            alternatives_considered=item.get("alternatives_considered", []),
+            rationale=item.get("rationale"),
+        )
+        
+        if decision.decision_text:
+            decisions.append(decision)
+    
+    return decisions
 
 
 def extract_trace_ids(text: str) -> list[str]:
@@ -0,0 +1,298 @@
+"""
+Embedding Store — Append-only, memory-mapped embedding cache.
+
+Replaces the monolithic embedding_cache.json (~295MB) with two files:
+- embedding_cache.f32: raw float32 matrix, one EMBEDDING_DIM row per text
+- embedding_cache.idx: 32-byte SHA-256 digests, one per row (same order)
+
+New vectors are appended to both files; nothing is ever rewritten.
+Lookups go through an in-memory digest→row dict and an mmap of the matrix,
+so loading the cache costs one small index read instead of a full JSON parse.
+
+Works without numpy (uses array/mmap); `as_matrix()` needs numpy.
+"""
+
+import json
+import mmap
+import os
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-writer assumption
+    fcntl = None
+
+from .config import get_data_dir
+
+
+DIGEST_SIZE = 32  # SHA-256
+FLOAT_SIZE = 4    # float32
+
+
+def get_embedding_store_paths() -> tuple[Path, Path]:
+    """Get paths to the embedding matrix and index files."""
+    data_dir = get_data_dir()
+    return data_dir / "embedding_cache.f32", data_dir / "embedding_cache.idx"
+
+
+class EmbeddingStore:
+    """
+    Append-only embedding cache keyed by SHA-256 hex digest.
+
+    Supports the dict-style operations the old JSON cache was used with
+    (`key in store`, `store[key]`, `store.get(key)`, `len(store)`), plus
+    `put_many()` for batched appends.
+    """
+
+    def __init__(self, matrix_path: Path, index_path: Path, dim: int):
+        self.matrix_path = Path(matrix_path)
+        self.index_path = Path(index_path)
+        self.dim = dim
+        self.row_bytes = dim * FLOAT_SIZE
+        self._rows: dict[bytes, int] = {}
+        self._mmap: Optional[mmap.mmap] = None
+        self._mapped_rows = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    # ------------------------------------------------------------------
+    # Loading
+    # ------------------------------------------------------------------
+
+    def _load(self) -> None:
+        """Read the digest index and mmap the matrix."""
+        if not self.index_path.exists() or not self.matrix_path.exists():
+            return
+
+        raw_index = self.index_path.read_bytes()
+        matrix_rows = self.matrix_path.stat().st_size // self.row_bytes
+        # A crash between the two writes can leave one file a row ahead; the
+        # shorter file is authoritative and the next append overwrites the tail.
+        n_rows = min(len(raw_index) // DIGEST_SIZE, matrix_rows)
+
+        rows = {}
+        for row in range(n_rows):
+            offset = row * DIGEST_SIZE
+            rows[raw_index[offset:offset + DIGEST_SIZE]] = row
+        self._rows = rows
+        self._remap(n_rows)
+
+    def _remap(self, n_rows: int) -> None:
+        """
+        (Re)map the first n_rows of the matrix file.
+
+        The new mapping is swapped in without closing the old one: readers in
+        other threads may still be slicing it through a local reference, and
+        it is released once the last of them drops it.
+        """
+        if n_rows == 0:
+            self._mapped_rows = 0
+            self._mmap = None
+            return
+        with open(self.matrix_path, "rb") as f:
+            new_mmap = mmap.mmap(f.fileno(), n_rows * self.row_bytes, access=mmap.ACCESS_READ)
+        # Publish the mapping before the row count so a reader that sees the
+        # new count also sees a mapping large enough for it
+        self._mmap = new_mmap
+        self._mapped_rows = n_rows
+
+    def close(self) -> None:
+        """Release the matrix mapping."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        self._mapped_rows = 0
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, key: str) -> bool:
+        try:
+            return bytes.fromhex(key) in self._rows
+        except ValueError:
+            return False
+
+    def __getitem__(self, key: str) -> list[float]:
+        vector = self.get(key)
+        if vector is None:
+            raise KeyError(key)
+        return vector
+
+    def get(self, key: str) -> Optional[list[float]]:
+        """Get a cached embedding by hex digest, or None."""
+        try:
+            digest = bytes.fromhex(key)
+        except ValueError:
+            return None
+        row = self._rows.get(digest)
+        if row is None:
+            return None
+        if row >= self._mapped_rows:
+            # Appended since the last mapping - extend the view to cover it
+            with self._lock:
+                if row >= self._mapped_rows:
+                    self._remap(self.matrix_path.stat().st_size // self.row_bytes)
+            if row >= self._mapped_rows:
+                return None
+        mapping = self._mmap  # Local reference - a concurrent _remap swaps self._mmap
+        if mapping is None:
+            return None
+        start = row * self.row_bytes
+        return array("f", mapping[start:start + self.row_bytes]).tolist()
+
+    def as_matrix(self):
+        """
+        Get the mapped portion of the cache as a read-only (n, dim) float32 array.
+
+        Rows appended after the last mapping are not included.
+        """
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy not available. Install with: pip install numpy")
+        if self._mapped_rows == 0:
+            return np.zeros((0, self.dim), dtype=np.float32)
+        return np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(self._mapped_rows, self.dim))
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def put(self, key: str, vector: list[float]) -> None:
+        """Append a single embedding."""
+        self.put_many([(key, vector)])
+
+    def put_many(self, items: Iterable[tuple[str, list[float]]]) -> int:
+        """
+        Append embeddings to the store.
+
+        Keys already present are skipped. Writes happen under an exclusive
+        file lock so concurrent processes (e.g. mp.Pool workers) cannot
+        interleave rows.
+
+        Returns:
+            Number of rows appended
+        """
+        pending: list[tuple[bytes, list[float]]] = []
+        seen: set[bytes] = set()
+        for key, vector in items:
+            digest = bytes.fromhex(key)
+            if digest in self._rows or digest in seen:
+                continue
+            if len(vector) != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vector, got {len(vector)}")
+            seen.add(digest)
+            pending.append((digest, vector))
+
+        if not pending:
+            return 0
+
+        with self._lock:
+            self.matrix_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.index_path, "a+b") as idx_f, open(self.matrix_path, "a+b") as mat_f:
+                if fcntl is not None:
+                    fcntl.flock(idx_f.fileno(), fcntl.LOCK_EX)
+                try:
+                    # Row number comes from the files, not our in-memory view,
+                    # since another process may have appended since we loaded.
+                    idx_size = os.fstat(idx_f.fileno()).st_size
+                    mat_size = os.fstat(mat_f.fileno()).st_size
+                    start_row = min(idx_size // DIGEST_SIZE, mat_size // self.row_bytes)
+
+                    matrix_bytes = bytearray()
+                    index_bytes = bytearray()
+                    for digest, vector in pending:
+                        matrix_bytes += array("f", vector).tobytes()
+                        index_bytes += digest
+
+                    # Truncate any partial tail left by a crashed writer, then append
+                    mat_f.truncate(start_row * self.row_bytes)
+                    mat_f.seek(0, os.SEEK_END)
+                    mat_f.write(matrix_bytes)
+                    mat_f.flush()
+                    idx_f.truncate(start_row * DIGEST_SIZE)
+                    idx_f.seek(0, os.SEEK_END)
+                    idx_f.write(index_bytes)
+                    idx_f.flush()
+                finally:
+                    if fcntl is not None:
+                        fcntl.flock(idx_f.fileno(), fcntl.LOCK_UN)
+
+            for offset, (digest, _) in enumerate(pending):
+                self._rows[digest] = start_row + offset
+
+        return len(pending)
+
+
+# ----------------------------------------------------------------------
+# Migration from the legacy JSON cache
+# ----------------------------------------------------------------------
+
+def migrate_json_cache(json_path: Path, store: EmbeddingStore, batch_size: int = 5000) -> int:
+    """
+    One-shot migration of a legacy {hash: vector} JSON cache into the store.
+
+    Args:
+        json_path: Path to embedding_cache.json
+        store: Destination store
+        batch_size: Rows appended per write
+
+    Returns:
+        Number of embeddings migrated (existing keys are skipped)
+    """
+    with open(json_path) as f:
+        legacy = json.load(f)
+
+    migrated = 0
+    batch: list[tuple[str, list[float]]] = []
+    for key, vector in legacy.items():
+        if not isinstance(vector, list) or len(vector) != store.dim:
+            continue
+        batch.append((key, vector))
+        if len(batch) >= batch_size:
+            migrated += store.put_many(batch)
+            batch = []
+    if batch:
+        migrated += store.put_many(batch)
+    return migrated
+
+
+def open_embedding_store(dim: int, legacy_json_path: Optional[Path] = None) -> EmbeddingStore:
+    """
+    Open the default embedding store, migrating the legacy JSON cache on first use.
+
+    Args:
+        dim: Embedding dimension
+        legacy_json_path: Path to embedding_cache.json (migrated if the store is empty)
+
+    Returns:
+        EmbeddingStore
+    """
+    matrix_path, index_path = get_embedding_store_paths()
+    store = EmbeddingStore(matrix_path, index_path, dim)
+
+    if len(store) == 0 and legacy_json_path and legacy_json_path.exists():
+        try:
+            print(f"[Cache] Migrating {legacy_json_path.name} to binary embedding store...", file=sys.stderr)
+            migrated = migrate_json_cache(legacy_json_path, store)
+            print(f"[Cache] Migrated {migrated:,} embeddings", file=sys.stderr)
+            # Reopen so migrated rows are served from the mmap
+            store.close()
+            store = EmbeddingStore(matrix_path, index_path, dim)
+        except (json.JSONDecodeError, IOError, ValueError) as e:
+            print(f"[Cache] ⚠️  Migration failed, starting with empty store: {e}", file=sys.stderr)
+
+    return store
@@ -219,6 +219,8 @@ class EntityCanonicalizer:
                 .eq("id", source_entity_id)\
                 .execute()
             
+            self.deduplicator.record_merge(source_entity_id, target_entity_id, list(target_aliases))
+            
             print(f"✅ Merged {source_name} → {target_entity_id} ({reason})")
             return True
             
@@ -5,19 +5,166 @@ Deduplication strategy:
 1. Exact match (lowercase canonical_name)
 2. Alias match (check if name matches existing alias)
 3. Embedding similarity (cosine > 0.85 → merge as alias)
+
+Stages 1-2 are served from an in-memory name/alias index (EntityNameIndex),
+loaded once per process without embeddings and kept current as this process
+inserts entities and adds aliases. Before creating an entity on a full miss,
+kg_entities is re-checked by name and type so parallel workers don't insert
+a second row for a name another worker has just created.
+
+Stage 3 uses the local EntityVectorIndex when one is active in the process
+(bulk indexing runs), otherwise the search_kg_entities RPC.
+
+With a KGWriteBuffer, mention stat updates for existing entities are queued
+and applied in bulk when the buffer is flushed.
 """
 
+import os
+import threading
 import uuid
 from datetime import datetime, timezone
 from typing import Optional
 
 from .knowledge_graph import EntityType, Entity
-from .semantic_search import get_embedding, cosine_similarity
+from .semantic_search import get_embedding, batch_get_embeddings, cosine_similarity
+from .entity_vector_index import EntityVectorIndex, get_active_entity_vector_index
+from .kg_write_buffer import KGWriteBuffer
 
 
 # Similarity threshold for considering entities as duplicates
 EMBEDDING_SIMILARITY_THRESHOLD = 0.85
 
+# Columns loaded into the name index (everything except the embedding)
+NAME_INDEX_COLUMNS = "id, canonical_name, entity_type, aliases, mention_count, first_seen, last_seen, confidence, source"
+NAME_INDEX_PAGE_SIZE = 1000
+
+
+class EntityNameIndex:
+    """
+    Compact lowercase name/alias → entity index over kg_entities.
+    
+    Loaded once (paged, no embeddings); afterwards lookups are dict hits with
+    no network calls. Entities created by other processes after loading are
+    not visible until reload(). The embedding stage only sees them through the
+    search_kg_entities RPC - a local EntityVectorIndex is a snapshot too - so
+    EntityDeduplicator re-checks the database by name and type before insert.
+    kg_entities has no unique constraint on names: two workers that miss at
+    the same moment can still both insert.
+    """
+    
+    def __init__(self):
+        self._by_name: dict[str, str] = {}   # canonical_name.lower() -> entity_id
+        self._by_alias: dict[str, str] = {}  # alias.lower() -> entity_id
+        self._rows: dict[str, dict] = {}     # entity_id -> compact row
+        self._lock = threading.Lock()
+        self.loaded = False
+    
+    def __len__(self) -> int:
+        return len(self._rows)
+    
+    def load(self, supabase) -> None:
+        """Load all entities (without embeddings) from Supabase."""
+        rows: list[dict] = []
+        offset = 0
+        while True:
+            result = (
+                supabase.table("kg_entities")
+                .select(NAME_INDEX_COLUMNS)
+                .order("id")
+                .range(offset, offset + NAME_INDEX_PAGE_SIZE - 1)
+                .execute()
+            )
+            batch = result.data or []
+            rows.extend(batch)
+            if len(batch) < NAME_INDEX_PAGE_SIZE:
+                break
+            offset += NAME_INDEX_PAGE_SIZE
+        
+        with self._lock:
+            self._by_name.clear()
+            self._by_alias.clear()
+            self._rows.clear()
+            for row in rows:
+                self._add_row(row)
+            self.loaded = True
+    
+    def reload(self, supabase) -> None:
+        """Reload from Supabase (picks up entities created by other processes)."""
+        self.load(supabase)
+    
+    def _add_row(self, row: dict) -> None:
+        entity_id = row["id"]
+        self._rows[entity_id] = row
+        # First entity wins on duplicate names, like the old LIMIT 1 queries
+        self._by_name.setdefault(row["canonical_name"].lower(), entity_id)
+        for alias in row.get("aliases") or []:
+            self._by_alias.setdefault(alias.lower(), entity_id)
+    
+    def add_entity(self, row: dict) -> None:
+        """Record a newly inserted entity."""
+        with self._lock:
+            self._add_row({k: v for k, v in row.items() if k != "embedding"})
+    
+    def add_alias(self, entity_id: str, alias: str) -> None:
+        """Record an alias added to an existing entity."""
+        with self._lock:
+            row = self._rows.get(entity_id)
+            if row is not None:
+                aliases = list(row.get("aliases") or [])
+                if alias.lower() not in [a.lower() for a in aliases]:
+                    aliases.append(alias)
+                row["aliases"] = aliases
+            self._by_alias.setdefault(alias.lower(), entity_id)
+    
+    def remove_entity(self, entity_id: str, merged_into: Optional[str] = None) -> None:
+        """Drop a deleted entity, re-pointing its names to merged_into if given."""
+        with self._lock:
+            self._rows.pop(entity_id, None)
+            for mapping in (self._by_name, self._by_alias):
+                for key in [k for k, v in mapping.items() if v == entity_id]:
+                    if merged_into and merged_into in self._rows:
+                        mapping[key] = merged_into
+                    else:
+                        del mapping[key]
+    
+    def get_row(self, entity_id: str) -> Optional[dict]:
+        """Get an indexed entity row by ID."""
+        return self._rows.get(entity_id)
+    
+    def find_by_name(self, name_lower: str) -> Optional[dict]:
+        """Get the row whose canonical name matches (case-insensitive)."""
+        entity_id = self._by_name.get(name_lower)
+        return self._rows.get(entity_id) if entity_id else None
+    
+    def find_by_alias(self, name_lower: str) -> Optional[dict]:
+        """Get the row with a matching alias (case-insensitive)."""
+        entity_id = self._by_alias.get(name_lower)
+        return self._rows.get(entity_id) if entity_id else None
+
+
+# One index per process - workers create a deduplicator per conversation,
+# so the index must outlive individual deduplicator instances
+_shared_name_index: Optional[EntityNameIndex] = None
+_shared_name_index_pid: Optional[int] = None
+_shared_name_index_lock = threading.Lock()
+
+
+def get_shared_name_index(supabase) -> EntityNameIndex:
+    """
+    Get this process's name index, loading it on first use.
+    
+    Forked workers (mp.Pool) load their own copy rather than reusing a
+    snapshot inherited from the parent.
+    """
+    global _shared_name_index, _shared_name_index_pid
+    with _shared_name_index_lock:
+        if _shared_name_index is None or _shared_name_index_pid != os.getpid():
+            index = EntityNameIndex()
+            index.load(supabase)
+            _shared_name_index = index
+            _shared_name_index_pid = os.getpid()
+        return _shared_name_index
+
 
 class EntityDeduplicator:
     """
@@ -29,15 +176,42 @@ class EntityDeduplicator:
     3. Embedding similarity match (cosine > threshold)
     """
     
-    def __init__(self, supabase_client):
+    def __init__(
+        self,
+        supabase_client,
+        name_index: Optional[EntityNameIndex] = None,
+        vector_index: Optional[EntityVectorIndex] = None,
+        write_buffer: Optional[KGWriteBuffer] = None,
+    ):
         """
         Initialize deduplicator with Supabase client.
         
         Args:
             supabase_client: Initialized Supabase client
+            name_index: Name/alias index (default: this process's shared index,
+                loaded on first lookup)
+            vector_index: Local embedding index (default: the one activated in
+                this process, if any; None → search_kg_entities RPC)
+            write_buffer: Queue entity stat updates here instead of writing
+                each one immediately (caller flushes)
         """
         self.supabase = supabase_client
+        self.write_buffer = write_buffer
+        self._name_index = name_index
+        self.vector_index = vector_index if vector_index is not None else get_active_entity_vector_index()
         self._cache: dict[str, Entity] = {}  # name_lower -> Entity (for session caching)
+        # (name_lower, entity_type) -> (embedding, base-index match) from
+        # prefetch_embedding_matches(); matches are type-filtered, so the type is part of the key
+        self._prefetched: dict[tuple[str, EntityType], tuple[list[float], Optional[tuple[str, float]]]] = {}
+    
+    @property
+    def name_index(self) -> EntityNameIndex:
+        """Name/alias index, loaded lazily."""
+        if self._name_index is None:
+            self._name_index = get_shared_name_index(self.supabase)
+        elif not self._name_index.loaded:
+            self._name_index.load(self.supabase)
+        return self._name_index
     
     def find_or_create_entity(
         self,
@@ -86,12 +260,16 @@ class EntityDeduplicator:
             return existing.id, False
         
         # 4. Generate embedding if not provided
+        prefetched = self._prefetched.pop((name_lower, entity_type), None)
         if embedding is None:
-            embedding = get_embedding(name)
+            embedding = prefetched[0] if prefetched else get_embedding(name)
         
         # 5. Embedding similarity match (only for same entity type)
         if embedding:
-            similar = self._find_by_embedding_similarity(embedding, entity_type)
+            if prefetched and self.vector_index is not None:
+                similar = self._find_by_embedding_similarity_local(embedding, entity_type, base_match=prefetched[1])
+            else:
+                similar = self._find_by_embedding_similarity(embedding, entity_type)
             if similar:
                 # Add as alias to existing entity
                 self._add_alias(similar.id, name)
@@ -99,7 +277,14 @@ class EntityDeduplicator:
                 self._update_entity_stats(similar.id, message_timestamp, source_type)
                 return similar.id, False
         
-        # 6. No match found — create new entity
+        # 6. Another worker may have created it since our indexes were loaded
+        existing = self._find_in_db_by_name(name, entity_type)
+        if existing:
+            self._cache[name_lower] = existing
+            self._update_entity_stats(existing.id, message_timestamp, source_type)
+            return existing.id, False
+        
+        # 7. No match found — create new entity
         new_id = str(uuid.uuid4())
         now = datetime.now(timezone.utc)
         
@@ -130,6 +315,9 @@ class EntityDeduplicator:
         
         try:
             self.supabase.table("kg_entities").insert(entity_data).execute()
+            self.name_index.add_entity(entity_data)
+            if self.vector_index is not None and embedding:
+                self.vector_index.add(new_id, entity_type.value, embedding)
             
             # Cache the new entity
             new_entity = Entity(
@@ -152,18 +340,8 @@ class EntityDeduplicator:
     def _find_by_canonical_name(self, name_lower: str) -> Optional[Entity]:
         """Find entity by canonical name (case-insensitive)."""
         try:
-            result = (
-                self.supabase.table("kg_entities")
-                .select("*")
-                .ilike("canonical_name", name_lower)
-                .limit(1)
-                .execute()
-            )
-            
-            if result.data:
-                return self._row_to_entity(result.data[0])
-            return None
-            
+            row = self.name_index.find_by_name(name_lower)
+            return self._row_to_entity(row) if row else None
         except Exception as e:
             print(f"⚠️ Error finding entity by name: {e}")
             return None
@@ -171,23 +349,38 @@ class EntityDeduplicator:
     def _find_by_alias(self, name_lower: str) -> Optional[Entity]:
         """Find entity where name matches an alias."""
         try:
-            # PostgreSQL array contains check (case-insensitive via ILIKE workaround)
+            row = self.name_index.find_by_alias(name_lower)
+            return self._row_to_entity(row) if row else None
+        except Exception as e:
+            print(f"⚠️ Error finding entity by alias: {e}")
+            return None
+    
+    def _find_in_db_by_name(self, name: str, entity_type: EntityType) -> Optional[Entity]:
+        """
+        Find a same-type entity by canonical name (case-insensitive) in kg_entities.
+        
+        Catches entities inserted by other processes after the name index was
+        loaded; a hit is added to the index so later lookups stay local.
+        """
+        # Escape LIKE wildcards so the name matches literally
+        pattern = name.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        try:
             result = (
                 self.supabase.table("kg_entities")
-                .select("*")
+                .select(NAME_INDEX_COLUMNS)
+                .ilike("canonical_name", pattern)
+                .eq("entity_type", entity_type.value)
+                .order("first_seen")
+                .limit(1)
                 .execute()
             )
-            
-            # Filter in Python for case-insensitive alias matching
-            for row in result.data:
-                aliases = row.get("aliases", []) or []
-                if any(alias.lower() == name_lower for alias in aliases):
-                    return self._row_to_entity(row)
-            
-            return None
-            
+            if not result.data:
+                return None
+            row = result.data[0]
+            self.name_index.add_entity(row)
+            return self._row_to_entity(row)
         except Exception as e:
-            print(f"⚠️ Error finding entity by alias: {e}")
+            print(f"⚠️ Error re-checking entity name: {e}")
             return None
     
     def _find_by_embedding_similarity(
@@ -196,6 +389,9 @@ class EntityDeduplicator:
         entity_type: EntityType,
     ) -> Optional[Entity]:
         """Find entity with similar embedding (same type only)."""
+        if self.vector_index is not None:
+            return self._find_by_embedding_similarity_local(embedding, entity_type)
+        
         try:
             # Use RPC function for efficient vector search
             result = self.supabase.rpc(
@@ -228,6 +424,100 @@ class EntityDeduplicator:
             print(f"⚠️ RPC search failed, using fallback: {e}")
             return self._find_by_embedding_similarity_fallback(embedding, entity_type)
     
+    def _find_by_embedding_similarity_local(
+        self,
+        embedding: list[float],
+        entity_type: EntityType,
+        base_match: Optional[tuple[str, float]] = None,
+    ) -> Optional[Entity]:
+        """
+        Find similar entity in the local vector index (no network calls).
+        
+        Args:
+            base_match: Precomputed base-matrix result from prefetch; only the
+                entities added during this run are searched again
+        """
+        try:
+            if base_match is None or self.vector_index.is_discarded(base_match[0]):
+                match = self.vector_index.search([embedding], [entity_type.value], EMBEDDING_SIMILARITY_THRESHOLD)[0]
+            else:
+                # Base matrix is read-only; only entities added since prefetch can beat it
+                delta = self.vector_index.search(
+                    [embedding], [entity_type.value], EMBEDDING_SIMILARITY_THRESHOLD, include_base=False,
+                )[0]
+                match = delta if delta and delta[1] > base_match[1] else base_match
+            if not match:
+                return None
+            
+            row = self.name_index.get_row(match[0])
+            if row is None:
+                result = (
+                    self.supabase.table("kg_entities")
+                    .select(NAME_INDEX_COLUMNS)
+                    .eq("id", match[0])
+                    .limit(1)
+                    .execute()
+                )
+                if not result.data:
+                    return None
+                row = result.data[0]
+            return self._row_to_entity(row)
+            
+        except Exception as e:
+            print(f"⚠️ Local similarity search failed: {e}")
+            return None
+    
+    def prefetch_embedding_matches(self, entities: list[tuple[str, EntityType]]) -> None:
+        """
+        Embed a conversation's entity names in one batch and, when a local
+        vector index is active, match them all with one matrix query.
+        
+        Names already resolvable by cache, canonical name or alias are skipped.
+        find_or_create_entity() then uses the prefetched results.
+        
+        Args:
+            entities: (name, entity_type) pairs
+        """
+        pending: dict[tuple[str, EntityType], str] = {}  # (name_lower, type) -> name
+        for name, entity_type in entities:
+            name = name.strip()
+            name_lower = name.lower()
+            key = (name_lower, entity_type)
+            if (
+                not name_lower
+                or name_lower in self._cache
+                or key in self._prefetched
+                or key in pending
+                or self.name_index.find_by_name(name_lower)
+                or self.name_index.find_by_alias(name_lower)
+            ):
+                continue
+            pending[key] = name
+        
+        if not pending:
+            return
+        
+        keys = list(pending)
+        try:
+            # Same text find_or_create_entity() would embed, so cache keys match
+            embeddings = batch_get_embeddings([pending[k] for k in keys])
+        except Exception as e:
+            print(f"⚠️ Batch embedding failed, falling back to per-entity: {e}")
+            return
+        
+        base_matches: list[Optional[tuple[str, float]]] = [None] * len(keys)
+        if self.vector_index is not None:
+            base_matches = self.vector_index.search(
+                embeddings,
+                [entity_type.value for _, entity_type in keys],
+                EMBEDDING_SIMILARITY_THRESHOLD,
+                include_delta=False,
+            )
+        
+        for key, embedding, match in zip(keys, embeddings, base_matches):
+            if embedding:
+                self._prefetched[key] = (embedding, match)
+    
     def _find_by_embedding_similarity_fallback(
         self,
         embedding: list[float],
@@ -267,7 +557,8 @@ class EntityDeduplicator:
     def _add_alias(self, entity_id: str, alias: str) -> None:
         """Add alias to existing entity."""
         try:
-            # Fetch current aliases
+            # Fetch current aliases (not from the index - other workers may
+            # have added aliases since it was loaded)
             result = (
                 self.supabase.table("kg_entities")
                 .select("aliases")
@@ -286,10 +577,30 @@ class EntityDeduplicator:
                     self.supabase.table("kg_entities").update({
                         "aliases": current_aliases
                     }).eq("id", entity_id).execute()
+                
+                self.name_index.add_alias(entity_id, alias)
                     
         except Exception as e:
             print(f"⚠️ Failed to add alias '{alias}' to entity {entity_id}: {e}")
     
+    def record_merge(self, source_entity_id: str, target_entity_id: str, target_aliases: list[str]) -> None:
+        """
+        Reflect an entity merge (source deleted, target gained aliases) in the
+        local indexes, so later lookups don't return the deleted entity.
+        """
+        if self.vector_index is not None:
+            self.vector_index.discard(source_entity_id)
+        if self.write_buffer is not None:
+            self.write_buffer.remap_entity(source_entity_id, target_entity_id)
+        if self._name_index is None or not self._name_index.loaded:
+            return  # Not loaded yet - will be read fresh from the database
+        self._name_index.remove_entity(source_entity_id, merged_into=target_entity_id)
+        for alias in target_aliases:
+            self._name_index.add_alias(target_entity_id, alias)
+        # Session cache may still point at the deleted entity
+        for key in [k for k, v in self._cache.items() if v.id == source_entity_id]:
+            del self._cache[key]
+    
     def _update_entity_stats(self, entity_id: str, message_timestamp: Optional[int], source_type: str = "user") -> None:
         """
         Update mention_count, last_seen, and source_breakdown for existing entity.
@@ -299,6 +610,10 @@ class EntityDeduplicator:
             message_timestamp: Source message timestamp
             source_type: Source of the mention ('user' | 'expert')
         """
+        if self.write_buffer is not None:
+            self.write_buffer.add_entity_stat(entity_id, message_timestamp, source_type)
+            return
+        
         try:
             update_data = {}
             
@@ -369,7 +684,7 @@ class EntityDeduplicator:
         self._cache.clear()
 
 
-def create_deduplicator() -> EntityDeduplicator:
+def create_deduplicator(write_buffer: Optional[KGWriteBuffer] = None) -> EntityDeduplicator:
     """Create EntityDeduplicator with configured Supabase client."""
     from .vector_db import get_supabase_client
     
@@ -377,4 +692,4 @@ def create_deduplicator() -> EntityDeduplicator:
     if not client:
         raise RuntimeError("Supabase client not configured. Run setup first.")
     
-    return EntityDeduplicator(client)
+    return EntityDeduplicator(client, write_buffer=write_buffer)
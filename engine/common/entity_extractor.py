@@ -188,7 +188,11 @@ def _parse_extraction_response(response: str) -> list[ExtractedEntity]:
         except json.JSONDecodeError:
             return []
     
-    # Process entities from the parsed data
+    return _entities_from_items(data)
+
+
+def _entities_from_items(data) -> list[ExtractedEntity]:
+    """Convert parsed JSON entity items into ExtractedEntity objects."""
     if not isinstance(data, list):
         return []
     
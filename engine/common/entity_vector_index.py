@@ -0,0 +1,312 @@
+"""
+Entity Vector Index — Local per-type ANN index over kg_entities embeddings.
+
+Replaces the per-entity `search_kg_entities` RPC (plus full-row fetch) in
+EntityDeduplicator during bulk KG indexing runs:
+
+1. The parent process builds the index once per run (paged fetch of
+   id/entity_type/embedding) and writes it to disk:
+   - entity_index.f32: L2-normalized float32 matrix, rows grouped by type
+   - entity_index.json: {dim, ids, type_ranges: {type: [start, end]}}
+2. Pool workers call activate_entity_vector_index(path) via the pool
+   initializer; the matrix is np.memmap'ed read-only, so all workers share
+   the same page cache instead of holding private copies.
+3. Lookups are batched top-1 matmuls against the type's row range.
+   Entities created by this process during the run go into a small
+   in-memory delta that is searched alongside the base matrix.
+
+Entities created by *other* workers during the run are not visible; like
+the name index, duplicates across workers are left to canonicalization.
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Optional, Sequence
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .config import get_data_dir
+
+
+INDEX_PAGE_SIZE = 500
+
+
+def get_entity_vector_index_path() -> Path:
+    """Get base path of the local entity index (without extension)."""
+    return get_data_dir() / "entity_index"
+
+
+def _parse_vector(value) -> Optional[list[float]]:
+    """pgvector columns come back as "[0.1,0.2,...]" strings."""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except json.JSONDecodeError:
+            return None
+    return value if isinstance(value, list) and value else None
+
+
+def _normalize_rows(matrix):
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EntityVectorIndex:
+    """
+    Read-only base matrix (memmap) plus an in-process delta of new entities.
+    """
+
+    def __init__(self, matrix, ids: list[str], type_ranges: dict[str, tuple[int, int]]):
+        self.matrix = matrix
+        self.ids = ids
+        self.type_ranges = type_ranges
+        self.dim = matrix.shape[1] if matrix.ndim == 2 else 0
+        self._dead_rows: set[int] = set()
+        self._row_by_id = {entity_id: row for row, entity_id in enumerate(ids)}
+        self._delta_ids: dict[str, list[str]] = {}
+        self._delta_vecs: dict[str, list] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids) - len(self._dead_rows) + sum(len(v) for v in self._delta_ids.values())
+
+    # ------------------------------------------------------------------
+    # Updates (this process only)
+    # ------------------------------------------------------------------
+
+    def add(self, entity_id: str, entity_type: str, embedding: Sequence[float]) -> None:
+        """Make an entity created during this run searchable."""
+        vec = np.asarray(embedding, dtype=np.float32)
+        if vec.shape != (self.dim,):
+            return
+        norm = np.linalg.norm(vec)
+        if norm == 0:
+            return
+        with self._lock:
+            self._delta_ids.setdefault(entity_type, []).append(entity_id)
+            self._delta_vecs.setdefault(entity_type, []).append(vec / norm)
+
+    def discard(self, entity_id: str) -> None:
+        """Exclude a deleted (merged) entity from results."""
+        with self._lock:
+            row = self._row_by_id.get(entity_id)
+            if row is not None:
+                self._dead_rows.add(row)
+            for entity_type, ids in self._delta_ids.items():
+                if entity_id in ids:
+                    i = ids.index(entity_id)
+                    del ids[i]
+                    del self._delta_vecs[entity_type][i]
+
+    def is_discarded(self, entity_id: str) -> bool:
+        """Whether an entity was discarded since the index was built."""
+        row = self._row_by_id.get(entity_id)
+        return row is not None and row in self._dead_rows
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def search(
+        self,
+        embeddings: Sequence[Sequence[float]],
+        entity_types: Sequence[str],
+        threshold: float,
+        include_base: bool = True,
+        include_delta: bool = True,
+    ) -> list[Optional[tuple[str, float]]]:
+        """
+        Batched top-1 search, restricted to each query's entity type.
+
+        Args:
+            embeddings: Query vectors
+            entity_types: Entity type value per query
+            threshold: Matches must have similarity > threshold
+            include_base: Search the memory-mapped base matrix
+            include_delta: Search entities added during this run
+
+        Returns:
+            (entity_id, similarity) or None per query
+        """
+        results: list[Optional[tuple[str, float]]] = [None] * len(embeddings)
+        if len(embeddings) == 0:
+            return results
+
+        queries = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+
+        by_type: dict[str, list[int]] = {}
+        for i, entity_type in enumerate(entity_types):
+            by_type.setdefault(entity_type, []).append(i)
+
+        for entity_type, positions in by_type.items():
+            q = queries[positions]
+            best_sim = np.full(len(positions), -np.inf, dtype=np.float32)
+            best_id: list[Optional[str]] = [None] * len(positions)
+
+            start, end = self.type_ranges.get(entity_type, (0, 0))
+            if include_base and end > start:
+                sims = q @ np.asarray(self.matrix[start:end]).T
+                dead = [row - start for row in self._dead_rows if start <= row < end]
+                if dead:
+                    sims[:, dead] = -np.inf
+                top = sims.argmax(axis=1)
+                best_sim = sims[np.arange(len(positions)), top]
+                best_id = [self.ids[start + int(t)] for t in top]
+
+            if include_delta and self._delta_vecs.get(entity_type):
+                with self._lock:
+                    delta_ids = list(self._delta_ids[entity_type])
+                    delta = np.stack(self._delta_vecs[entity_type])
+                sims = q @ delta.T
+                top = sims.argmax(axis=1)
+                top_sim = sims[np.arange(len(positions)), top]
+                for j in np.flatnonzero(top_sim > best_sim):
+                    best_sim[j] = top_sim[j]
+                    best_id[j] = delta_ids[int(top[j])]
+
+            for j, pos in enumerate(positions):
+                if best_id[j] is not None and best_sim[j] > threshold:
+                    results[pos] = (best_id[j], float(best_sim[j]))
+
+        return results
+
+
+# ----------------------------------------------------------------------
+# Build / load
+# ----------------------------------------------------------------------
+
+def build_entity_vector_index(supabase, base_path: Optional[Path] = None) -> Path:
+    """
+    Fetch all entity embeddings and write the on-disk index.
+
+    Args:
+        supabase: Supabase client
+        base_path: Output path without extension (default: data/entity_index)
+
+    Returns:
+        base_path of the written index
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy not available. Install with: pip install numpy")
+
+    base_path = Path(base_path or get_entity_vector_index_path())
+    base_path.parent.mkdir(parents=True, exist_ok=True)
+
+    rows_by_type: dict[str, list[tuple[str, list[float]]]] = {}
+    dim = 0
+    last_id = ""
+    while True:
+        # Keyset pagination - stable while other writers insert
+        result = (
+            supabase.table("kg_entities")
+            .select("id, entity_type, embedding")
+            .gt("id", last_id)
+            .order("id")
+            .limit(INDEX_PAGE_SIZE)
+            .execute()
+        )
+        batch = result.data or []
+        for row in batch:
+            vector = _parse_vector(row.get("embedding"))
+            if not vector:
+                continue
+            dim = dim or len(vector)
+            if len(vector) != dim:
+                continue
+            rows_by_type.setdefault(row["entity_type"], []).append((row["id"], vector))
+        if len(batch) < INDEX_PAGE_SIZE:
+            break
+        last_id = batch[-1]["id"]
+
+    ids: list[str] = []
+    type_ranges: dict[str, list[int]] = {}
+    total = sum(len(rows) for rows in rows_by_type.values())
+    matrix_path = base_path.with_suffix(".f32")
+    tmp_matrix_path = matrix_path.with_suffix(".f32.tmp")
+
+    if total:
+        out = np.memmap(tmp_matrix_path, dtype=np.float32, mode="w+", shape=(total, dim))
+        row = 0
+        for entity_type in sorted(rows_by_type):
+            rows = rows_by_type[entity_type]
+            block = _normalize_rows(np.asarray([v for _, v in rows], dtype=np.float32))
+            out[row:row + len(rows)] = block
+            ids.extend(entity_id for entity_id, _ in rows)
+            type_ranges[entity_type] = [row, row + len(rows)]
+            row += len(rows)
+        out.flush()
+        del out
+    else:
+        tmp_matrix_path.write_bytes(b"")
+
+    meta_path = base_path.with_suffix(".json")
+    tmp_meta_path = meta_path.with_suffix(".json.tmp")
+    with open(tmp_meta_path, "w") as f:
+        json.dump({"dim": dim, "ids": ids, "type_ranges": type_ranges}, f)
+
+    os.replace(tmp_matrix_path, matrix_path)
+    os.replace(tmp_meta_path, meta_path)
+
+    print(f"🧭 Built local entity index: {total:,} entities across {len(type_ranges)} types", file=sys.stderr)
+    return base_path
+
+
+def load_entity_vector_index(base_path: Optional[Path] = None) -> Optional[EntityVectorIndex]:
+    """
+    Memory-map an index written by build_entity_vector_index().
+
+    Returns:
+        EntityVectorIndex, or None if missing or numpy unavailable
+    """
+    if not NUMPY_AVAILABLE:
+        return None
+    base_path = Path(base_path or get_entity_vector_index_path())
+    meta_path = base_path.with_suffix(".json")
+    matrix_path = base_path.with_suffix(".f32")
+    if not meta_path.exists() or not matrix_path.exists():
+        return None
+
+    with open(meta_path) as f:
+        meta = json.load(f)
+    ids = meta["ids"]
+    dim = meta["dim"]
+    if ids:
+        matrix = np.memmap(matrix_path, dtype=np.float32, mode="r", shape=(len(ids), dim))
+    else:
+        matrix = np.zeros((0, dim), dtype=np.float32)
+    type_ranges = {t: (r[0], r[1]) for t, r in meta["type_ranges"].items()}
+    return EntityVectorIndex(matrix, ids, type_ranges)
+
+
+# ----------------------------------------------------------------------
+# Per-process activation (mp.Pool initializer)
+# ----------------------------------------------------------------------
+
+_active_index: Optional[EntityVectorIndex] = None
+
+
+def activate_entity_vector_index(base_path: Optional[str] = None) -> None:
+    """
+    Load the index for this process; deduplicators created afterwards use it.
+
+    Intended as an mp.Pool initializer: initializer=activate_entity_vector_index,
+    initargs=(str(path),).
+    """
+    global _active_index
+    _active_index = load_entity_vector_index(Path(base_path) if base_path else None)
+
+
+def get_active_entity_vector_index() -> Optional[EntityVectorIndex]:
+    """Get the index activated in this process, if any."""
+    return _active_index
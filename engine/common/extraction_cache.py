@@ -0,0 +1,268 @@
+"""
+Extraction Cache — Content-addressed cache of parsed LLM extraction results.
+
+KG indexing re-runs (after a crash, a schema change or a KG reset) used to
+re-extract every chunk. Results are now cached on disk keyed by
+SHA-256(text, extractor, model, prompt version), so re-indexing replays
+earlier extractions and only calls the model for new or changed chunks.
+
+- The prompt version is a hash of the extractor's prompt template(s), so
+  editing a prompt invalidates its entries automatically.
+- Stored as append-only JSONL (data/extraction_cache.jsonl), one
+  {"key", "extractor", "result"} record per line. Appends take an
+  exclusive file lock so mp.Pool workers can share the file.
+- Empty results are not cached: the extractors also return [] on transient
+  API errors, and those must be retried next run.
+
+Disable with KG_EXTRACTION_CACHE=0 (the indexers' --no-extraction-cache).
+"""
+
+import hashlib
+import json
+import os
+import sys
+import threading
+from dataclasses import asdict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows - single-writer assumption
+    fcntl = None
+
+from .config import get_data_dir
+from .decision_extractor import DECISION_EXTRACTION_PROMPT, Decision
+from .entity_extractor import ENTITY_EXTRACTION_PROMPT
+from .fused_extractor import (
+    DECISIONS_FORMAT,
+    DECISIONS_SECTION,
+    FUSED_EXTRACTION_PROMPT,
+    RELATIONS_FORMAT,
+    RELATIONS_SECTION,
+    FusedExtraction,
+)
+from .knowledge_graph import EntityType, ExtractedEntity, ExtractedRelation, RelationType
+from .relation_extractor import RELATION_EXTRACTION_PROMPT
+from .triple_extractor import TRIPLE_EXTRACTION_PROMPT, Triple
+
+
+def get_extraction_cache_path() -> Path:
+    """Get path to the extraction cache file."""
+    return get_data_dir() / "extraction_cache.jsonl"
+
+
+def _prompt_version(*templates: str) -> str:
+    return hashlib.sha256("\x00".join(templates).encode("utf-8")).hexdigest()[:12]
+
+
+# ----------------------------------------------------------------------
+# Codecs: parsed result <-> JSON
+# ----------------------------------------------------------------------
+
+def _encode_entities(entities: list[ExtractedEntity]) -> list[dict]:
+    return [e.to_dict() for e in entities]
+
+
+def _decode_entities(items: list[dict]) -> list[ExtractedEntity]:
+    return [
+        ExtractedEntity(
+            name=item["name"],
+            entity_type=EntityType(item["entity_type"]),
+            aliases=item.get("aliases", []),
+            confidence=item.get("confidence", 1.0),
+        )
+        for item in items
+    ]
+
+
+def _encode_relations(relations: list[ExtractedRelation]) -> list[dict]:
+    return [r.to_dict() for r in relations]
+
+
+def _decode_relations(items: list[dict]) -> list[ExtractedRelation]:
+    return [
+        ExtractedRelation(
+            source_name=item["source_name"],
+            target_name=item["target_name"],
+            relation_type=RelationType(item["relation_type"]),
+            evidence_snippet=item.get("evidence_snippet"),
+            confidence=item.get("confidence", 1.0),
+        )
+        for item in items
+    ]
+
+
+def _encode_fused(result: FusedExtraction) -> dict:
+    return {
+        "entities": _encode_entities(result.entities),
+        "relations": _encode_relations(result.relations),
+        "decisions": [asdict(d) for d in result.decisions],
+    }
+
+
+def _decode_fused(data: dict) -> FusedExtraction:
+    return FusedExtraction(
+        entities=_decode_entities(data["entities"]),
+        relations=_decode_relations(data["relations"]),
+        decisions=[Decision(**d) for d in data["decisions"]],
+    )
+
+
+# extractor name -> (prompt version, encode, decode, is_empty)
+EXTRACTORS: dict[str, tuple[str, Callable, Callable, Callable]] = {
+    "entities": (_prompt_version(ENTITY_EXTRACTION_PROMPT), _encode_entities, _decode_entities, lambda r: not r),
+    "relations": (_prompt_version(RELATION_EXTRACTION_PROMPT), _encode_relations, _decode_relations, lambda r: not r),
+    "decisions": (
+        _prompt_version(DECISION_EXTRACTION_PROMPT),
+        lambda r: [asdict(d) for d in r],
+        lambda items: [Decision(**d) for d in items],
+        lambda r: not r,
+    ),
+    "triples": (
+        _prompt_version(TRIPLE_EXTRACTION_PROMPT),
+        lambda r: [t.to_dict() for t in r],
+        lambda items: [Triple(**t) for t in items],
+        lambda r: not r,
+    ),
+    "fused": (
+        _prompt_version(FUSED_EXTRACTION_PROMPT, RELATIONS_SECTION, RELATIONS_FORMAT, DECISIONS_SECTION, DECISIONS_FORMAT),
+        _encode_fused,
+        _decode_fused,
+        lambda r: not (r.entities or r.relations or r.decisions),
+    ),
+}
+
+
+def extraction_cache_key(text: str, extractor: str, model: str, prompt_version: str, variant: str = "") -> str:
+    """
+    Content-addressed cache key.
+
+    Args:
+        text: Exact text sent to the extractor
+        extractor: Extractor name (see EXTRACTORS)
+        model: "provider/model" used for extraction
+        prompt_version: Hash of the extractor's prompt template(s)
+        variant: Anything else that changes the prompt (e.g. known entity hints)
+    """
+    h = hashlib.sha256()
+    for part in (extractor, model, prompt_version, variant, text):
+        h.update(part.encode("utf-8"))
+        h.update(b"\x00")
+    return h.hexdigest()
+
+
+# ----------------------------------------------------------------------
+# Store
+# ----------------------------------------------------------------------
+
+class ExtractionCache:
+    """Append-only, JSONL-backed extraction result cache."""
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or get_extraction_cache_path())
+        self._entries: dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def _load(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    self._entries[record["key"]] = record["result"]
+                except (json.JSONDecodeError, KeyError, TypeError):
+                    continue  # Torn line from an interrupted write
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        """Get a cached (encoded) result, or None."""
+        return self._entries.get(key)
+
+    def put(self, key: str, extractor: str, result: Any) -> None:
+        """Record an encoded result (appended to disk immediately)."""
+        line = json.dumps({"key": key, "extractor": extractor, "result": result}) + "\n"
+        with self._lock:
+            self._entries[key] = result
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.path, "a", encoding="utf-8") as f:
+                    if fcntl is not None:
+                        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                    try:
+                        f.write(line)
+                        f.flush()
+                    finally:
+                        if fcntl is not None:
+                            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            except IOError as e:
+                print(f"⚠️  Failed to persist extraction cache entry: {e}", file=sys.stderr)
+
+
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_pid: Optional[int] = None
+
+
+def extraction_cache_enabled() -> bool:
+    """Whether the cache is enabled (KG_EXTRACTION_CACHE, default on)."""
+    return os.environ.get("KG_EXTRACTION_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """Get this process's extraction cache, or None if disabled."""
+    global _extraction_cache, _extraction_cache_pid
+    if not extraction_cache_enabled():
+        return None
+    # Reload after fork so pool workers see entries written before they started
+    if _extraction_cache is None or _extraction_cache_pid != os.getpid():
+        _extraction_cache = ExtractionCache()
+        _extraction_cache_pid = os.getpid()
+    return _extraction_cache
+
+
+def cached_extraction(
+    extractor: str,
+    text: str,
+    model: str,
+    compute: Callable[[], Any],
+    variant: str = "",
+) -> Any:
+    """
+    Return a cached extraction result, or compute and cache it.
+
+    Args:
+        extractor: Extractor name (see EXTRACTORS)
+        text: Text being extracted from (part of the key)
+        model: "provider/model" used for extraction
+        compute: Zero-arg callable running the real extraction on a miss
+        variant: Extra prompt inputs that change the result
+
+    Returns:
+        The parsed result (same type compute() returns)
+    """
+    cache = get_extraction_cache()
+    if cache is None:
+        return compute()
+
+    prompt_version, encode, decode, is_empty = EXTRACTORS[extractor]
+    key = extraction_cache_key(text, extractor, model, prompt_version, variant)
+    cached = cache.get(key)
+    if cached is not None:
+        try:
+            result = decode(cached)
+            cache.hits += 1
+            return result
+        except (KeyError, TypeError, ValueError):
+            pass  # Stale record shape - recompute
+
+    cache.misses += 1
+    result = compute()
+    if isinstance(result, (list, FusedExtraction)) and not is_empty(result):
+        cache.put(key, extractor, encode(result))
+    return result
@@ -0,0 +1,221 @@
+"""
+Fused KG Extractor — Entities, relations and decisions from one LLM call.
+
+The per-conversation indexing pipeline used to send the same text through
+up to four prompts (triples, entities, relations, decisions). This asks
+for all three result kinds in a single structured JSON response and parses
+each section with the existing parsers, so callers get the same
+ExtractedEntity / ExtractedRelation / Decision objects.
+"""
+
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from .decision_extractor import Decision, _decisions_from_items
+from .entity_extractor import _entities_from_items
+from .knowledge_graph import ExtractedEntity, ExtractedRelation
+from .llm import call_llm, is_permanent_failure, PermanentAPIFailure, get_fallback_chain
+from .relation_extractor import parse_relation_item
+
+
+FUSED_EXTRACTION_PROMPT = """Analyze this software development conversation and extract knowledge graph data.
+
+## 1. entities
+Notable entities, one of these types:
+- tool: Technologies, frameworks, libraries, services (React, Supabase, Prisma, AWS, Cursor)
+- pattern: Design patterns, architectural approaches (caching, retry logic, error boundaries, pub/sub)
+- problem: Issues, bugs, challenges, pain points (auth timeout, race condition, N+1 query, memory leak)
+- concept: Abstract principles, mental models (DRY, composition, idempotency, eventual consistency)
+- person: People mentioned by name (Lenny Rachitsky, Dan Abramov, specific team members)
+- project: Specific projects, codebases, repos mentioned (not generic terms)
+- workflow: Processes, methodologies (TDD, code review, pair programming, standup)
+
+Rules: only SPECIFIC, NAMED, high-signal entities (if in doubt, skip); no companies, events or
+products unless they are tools used in development; prefer proper capitalization; include aliases
+if the text refers to the same entity differently; skip generic terms (JavaScript, Python, API,
+function) unless they are the central topic.
+{relations_section}{decisions_section}
+Conversation:
+{text}
+
+Respond with a single JSON object (use empty arrays when nothing qualifies):
+{{
+  "entities": [
+    {{"name": "Entity Name", "type": "tool|pattern|problem|concept|person|project|workflow", "aliases": ["alias1"], "confidence": 0.9}}
+  ]{relations_format}{decisions_format}
+}}
+
+Only output the JSON object, no other text."""
+
+RELATIONS_SECTION = """
+## 2. relations
+Relationships between the entities above. Source and target must be names from "entities".
+Use ONLY these types: SOLVES, CAUSES, ENABLES, PART_OF, USED_WITH, ALTERNATIVE_TO, REQUIRES, IMPLEMENTS.
+Only EXPLICIT or STRONGLY IMPLIED relationships, at most 5, each with a brief evidence quote or paraphrase.
+"""
+
+RELATIONS_FORMAT = """,
+  "relations": [
+    {"source": "Entity Name", "target": "Entity Name", "relation": "SOLVES", "evidence": "Brief quote", "confidence": 0.9}
+  ]"""
+
+DECISIONS_SECTION = """
+## 3. decisions
+Explicit decision points and assumptions (technology choices, architecture decisions, dependency
+choices, stated assumptions). Include alternatives and rationale if mentioned; at most 5.
+decision_type is one of TECHNOLOGY_CHOICE, ARCHITECTURE, DEPENDENCY, ASSUMPTION.
+"""
+
+DECISIONS_FORMAT = """,
+  "decisions": [
+    {"decision_text": "Use Postgres instead of MongoDB", "decision_type": "TECHNOLOGY_CHOICE", "confidence": 0.9, "context_snippet": "Brief quote", "alternatives_considered": ["MongoDB"], "rationale": "Better JSON support"}
+  ]"""
+
+
+@dataclass
+class FusedExtraction:
+    """Result of a fused extraction call."""
+
+    entities: list[ExtractedEntity] = field(default_factory=list)
+    relations: list[ExtractedRelation] = field(default_factory=list)
+    decisions: list[Decision] = field(default_factory=list)
+
+
+def extract_kg_fused(
+    text: str,
+    model: str = "gpt-4o-mini",
+    provider: str = "openai",
+    context: str = "user",
+    with_relations: bool = True,
+    with_decisions: bool = True,
+    max_entities: int = 20,
+    max_relations: int = 5,
+    max_decisions: int = 5,
+) -> FusedExtraction:
+    """
+    Extract entities, relations and decisions with one LLM call.
+
+    Args:
+        text: Conversation text to analyze
+        model: LLM model to use
+        provider: LLM provider
+        context: "baseline" or "user" (selects the fallback chain)
+        with_relations: Ask for relations between the extracted entities
+        with_decisions: Ask for decision points
+        max_entities: Maximum entities to keep
+        max_relations: Maximum relations to keep
+        max_decisions: Maximum decisions to keep
+
+    Returns:
+        FusedExtraction (empty lists for sections not requested)
+
+    Raises:
+        PermanentAPIFailure: If API quota/budget exhausted on all providers
+    """
+    if not text or len(text.strip()) < 20:
+        return FusedExtraction()
+
+    # Truncate very long text to avoid token limits (same budget as the single-purpose extractors)
+    max_chars = 8000
+    if len(text) > max_chars:
+        text = text[:max_chars] + "... [truncated]"
+
+    prompt = FUSED_EXTRACTION_PROMPT.format(
+        text=text,
+        relations_section=RELATIONS_SECTION if with_relations else "",
+        decisions_section=DECISIONS_SECTION if with_decisions else "",
+        relations_format=RELATIONS_FORMAT if with_relations else "",
+        decisions_format=DECISIONS_FORMAT if with_decisions else "",
+    )
+    limits = (max_entities, max_relations, max_decisions)
+
+    try:
+        response = call_llm(
+            prompt=prompt,
+            model=model,
+            provider=provider,
+            temperature=0.1,
+            max_tokens=3000,
+        )
+        return _parse_fused_response(response, *limits)
+
+    except Exception as primary_error:
+        if not is_permanent_failure(primary_error):
+            print(f"⚠️ Fused extraction failed (transient): {primary_error}")
+            return FusedExtraction()
+
+        print(f"❌ {provider} quota exhausted (permanent failure)")
+        last_error = primary_error
+        for fallback_provider, fallback_model in get_fallback_chain(context):
+            if fallback_provider == provider and fallback_model == model:
+                continue
+            try:
+                print(f"   Trying fallback: {fallback_provider}/{fallback_model}")
+                response = call_llm(
+                    prompt=prompt,
+                    model=fallback_model,
+                    provider=fallback_provider,
+                    temperature=0.1,
+                    max_tokens=3000,
+                )
+                print(f"   ✅ Fallback successful: {fallback_provider}/{fallback_model}")
+                return _parse_fused_response(response, *limits)
+            except Exception as fallback_error:
+                last_error = fallback_error
+                continue
+
+        raise PermanentAPIFailure(f"All fallback providers exhausted: {last_error}") from last_error
+
+
+def _parse_fused_response(
+    response: str,
+    max_entities: int = 20,
+    max_relations: int = 5,
+    max_decisions: int = 5,
+) -> FusedExtraction:
+    """Parse the fused JSON object into typed extraction results."""
+    data = _extract_json_object(response)
+    if data is None:
+        print(f"⚠️ Failed to parse fused extraction response: {(response or '')[:200]}...")
+        return FusedExtraction()
+
+    entities = _entities_from_items(data.get("entities"))[:max_entities]
+
+    relations = []
+    relations_data = data.get("relations")
+    if isinstance(relations_data, list):
+        for item in relations_data:
+            if isinstance(item, dict):
+                relation = parse_relation_item(item)
+                if relation:
+                    relations.append(relation)
+
+    decisions = _decisions_from_items(data.get("decisions"))[:max_decisions]
+
+    return FusedExtraction(
+        entities=entities,
+        relations=relations[:max_relations],
+        decisions=decisions,
+    )
+
+
+def _extract_json_object(text: str) -> Optional[dict]:
+    """Extract a JSON object from text, handling markdown code blocks."""
+    if not text:
+        return None
+
+    code_block_match = re.search(r"```(?:json)?\s*(\{[\s\S]*\})\s*```", text)
+    candidate = code_block_match.group(1) if code_block_match else None
+    if candidate is None:
+        object_match = re.search(r"\{[\s\S]*\}", text)
+        candidate = object_match.group(0) if object_match else None
+    if candidate is None:
+        return None
+
+    try:
+        data = json.loads(candidate)
+    except json.JSONDecodeError:
+        return None
+    return data if isinstance(data, dict) else None
@@ -9,6 +9,8 @@ OPTIMIZATIONS (H-1, H-2):
 - Parallel processing with ThreadPoolExecutor
 """
 
+import json
+import sys
 import uuid
 import time
 from datetime import datetime
@@ -17,7 +19,7 @@ from collections import defaultdict
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from .vector_db import get_supabase_client
-from .semantic_search import get_embedding, cosine_similarity
+from .semantic_search import get_embedding, cosine_similarity, find_duplicate_indices
 
 T = TypeVar('T')
 
@@ -325,9 +327,16 @@ class ItemsBankSupabase:
         item_id: str,
         source_start_date: Optional[str],
         source_end_date: Optional[str],
+        occurrences: int = 1,
     ) -> bool:
         """
         Update existing item when deduplicating: increment occurrence and expand date range.
+        
+        Args:
+            item_id: Existing library item id
+            source_start_date: Coverage tracking start date
+            source_end_date: Coverage tracking end date
+            occurrences: How many new sightings to add (in-batch duplicates collapse into one call)
         """
         # Fetch current item (with retry)
         def fetch_item():
@@ -353,7 +362,7 @@ class ItemsBankSupabase:
         
         # Build update data
         update_data = {
-            "occurrence": current_occurrence + 1,
+            "occurrence": current_occurrence + occurrences,
             "last_seen": datetime.now().strftime("%Y-%m"),
             "last_seen_date": datetime.now().strftime("%Y-%m-%d"),  # Day-level precision
         }
@@ -611,8 +620,11 @@ class ItemsBankSupabase:
         """
         Batch add items with parallel deduplication.
         
-        OPTIMIZATION: Uses ThreadPoolExecutor for parallel similarity searches,
-        then batches inserts/updates for efficiency.
+        OPTIMIZATION: Near-identical items within the batch are collapsed first
+        (one pairwise-similarity pass), so only one representative per group is
+        searched against the Library and inserted/updated; the group's size
+        becomes its occurrence count. Uses ThreadPoolExecutor for parallel
+        similarity searches, then batches inserts/updates for efficiency.
         
         Args:
             items: List of item dicts with keys: title, description, tags, embedding, first_seen_date, quality
@@ -633,14 +645,24 @@ class ItemsBankSupabase:
         # Extract embeddings (already pre-computed)
         embeddings = [item.get("embedding") for item in items]
         
+        # PHASE 0: Collapse near-identical items within the batch (earlier item wins)
+        duplicate_of = find_duplicate_indices(embeddings, threshold)
+        representatives = [i for i, duplicate in enumerate(duplicate_of) if duplicate is None]
+        group_sizes = defaultdict(int)
+        for i, duplicate in enumerate(duplicate_of):
+            group_sizes[i if duplicate is None else duplicate] += 1
+        batch_duplicates = len(items) - len(representatives)
+        if batch_duplicates:
+            print(f"   🔁 Collapsed {batch_duplicates} in-batch duplicate(s)", file=sys.stderr)
+        
         # PHASE 1: Parallel similarity search using ThreadPoolExecutor
-        print(f"   ⚡ Parallel dedup check for {len(items)} items (workers={max_workers})...", file=sys.stderr)
+        print(f"   ⚡ Parallel dedup check for {len(representatives)} items (workers={max_workers})...", file=sys.stderr)
         # Emit progress marker to stdout for frontend (dedup phase)
-        print(f"[PROGRESS:current=0,total={len(items)},label=deduplicating]", flush=True)
+        print(f"[PROGRESS:current=0,total={len(representatives)},label=deduplicating]", flush=True)
         
         try:
             similar_matches = self._batch_find_similar_parallel(
-                embeddings=embeddings,
+                embeddings=[embeddings[i] for i in representatives],
                 item_type=item_type,
                 threshold=threshold,
                 max_workers=max_workers,
@@ -656,14 +678,15 @@ class ItemsBankSupabase:
         items_to_insert = []
         items_to_update = []
         
-        for i, item in enumerate(items):
-            match_id = similar_matches[i]
+        for i, match_id in zip(representatives, similar_matches):
+            item = items[i]
             if match_id:
                 # Existing item found - prepare update
                 items_to_update.append({
                     "existing_id": match_id,
                     "source_start_date": source_start_date,
                     "source_end_date": source_end_date,
+                    "occurrences": group_sizes[i],
                 })
             else:
                 # New item - prepare insert (simplified schema v2)
@@ -683,7 +706,7 @@ class ItemsBankSupabase:
                     "title": item.get("title", ""),
                     "description": item.get("description", ""),
                     "status": "active",
-                    "occurrence": 1,
+                    "occurrence": group_sizes[i],
                     "first_seen": first_seen_month,  # YYYY-MM format
                     "last_seen": datetime.now().strftime("%Y-%m"),
                     # Day-level precision dates for analytics
@@ -698,7 +721,7 @@ class ItemsBankSupabase:
         
         # Emit dedup complete marker
         print(f"[STAT:dedupNew={len(items_to_insert)}]", flush=True)
-        print(f"[STAT:dedupDuplicates={len(items_to_update)}]", flush=True)
+        print(f"[STAT:dedupDuplicates={len(items_to_update) + batch_duplicates}]", flush=True)
         
         # PHASE 3: Batch insert new items
         added = 0
@@ -751,6 +774,7 @@ class ItemsBankSupabase:
                         update["existing_id"],
                         update["source_start_date"],
                         update["source_end_date"],
+                        update["occurrences"],
                     ): update["existing_id"]
                     for update in items_to_update
                 }
@@ -780,6 +804,7 @@ class ItemsBankSupabase:
             "updated": updated,
             "total": len(items),
             "dedup_matches": len(items_to_update),
+            "batch_duplicates": batch_duplicates,
             "errors": all_errors,
         }
     
@@ -837,4 +862,52 @@ class ItemsBankSupabase:
                 idx, match_id = future.result()
                 results[idx] = match_id
         
-        return results
\ No newline at end of file
+        return results
+
+
+LIBRARY_SNAPSHOT_COLUMNS = "id, title, description, item_type, status, embedding, first_seen, last_seen"
+LIBRARY_SNAPSHOT_PAGE_SIZE = 1000
+
+
+def get_all_items(client, columns: str = LIBRARY_SNAPSHOT_COLUMNS) -> list[dict]:
+    """
+    Fetch every non-archived Library item (paginated).
+
+    Embeddings returned by pgvector as JSON strings are parsed into lists.
+
+    Args:
+        client: Supabase client
+        columns: Columns to select
+
+    Returns:
+        List of item dicts (empty on error)
+    """
+    items = []
+    offset = 0
+    try:
+        while True:
+            result = (
+                client.table("library_items")
+                .select(columns)
+                .neq("status", "archived")
+                .order("id")
+                .range(offset, offset + LIBRARY_SNAPSHOT_PAGE_SIZE - 1)
+                .execute()
+            )
+            batch = result.data or []
+            items.extend(batch)
+            if len(batch) < LIBRARY_SNAPSHOT_PAGE_SIZE:
+                break
+            offset += LIBRARY_SNAPSHOT_PAGE_SIZE
+    except Exception as e:
+        print(f"⚠️  Failed to fetch Library items: {e}", file=sys.stderr)
+        return []
+
+    for item in items:
+        embedding = item.get("embedding")
+        if isinstance(embedding, str):
+            try:
+                item["embedding"] = json.loads(embedding)
+            except (json.JSONDecodeError, TypeError):
+                item["embedding"] = None
+    return items
@@ -0,0 +1,377 @@
+"""
+KG Export I/O — Streaming readers/writers and keyset-paginated table scans
+for Lenny KG export/import.
+
+- iter_table_pages() / iter_table_rows() page a Supabase table by primary
+  key (`id > last_id ORDER BY id LIMIT n`) instead of .range() offsets,
+  which stays fast at any depth and gives a resumable cursor (last id).
+- ExportWriter appends pages of records to an export file as a JSON array
+  (the release format) or newline-delimited JSON, optionally gzipped. Each
+  page is flushed as a self-contained unit (its own gzip member), so the
+  file can be truncated back to any page boundary and appended to again.
+- Embeddings can be written as base64 little-endian float32/float16
+  instead of "[0.1, ...]" text (encode_embedding / decode_embedding).
+- iter_export_records() streams any of those formats back, one record at a
+  time, decoding binary embeddings.
+"""
+
+import base64
+import gzip
+import json
+import os
+import struct
+from pathlib import Path
+from typing import Any, Callable, Iterator, Optional, TextIO
+
+
+READ_CHUNK_SIZE = 1 << 20  # 1 MB
+TABLE_PAGE_SIZE = 1000     # PostgREST default max rows per request
+
+EXPORT_FORMATS = ("json", "jsonl")
+EMBEDDING_ENCODINGS = ("text", "f32", "f16")
+
+_WHITESPACE = " \t\n\r"
+_STRUCT_CODES = {"f32": "f", "f16": "e"}
+
+
+# ----------------------------------------------------------------------
+# Embedding encoding
+# ----------------------------------------------------------------------
+
+def _parse_vector(value: Any) -> Optional[list[float]]:
+    if isinstance(value, list):
+        return [float(v) for v in value]
+    if isinstance(value, str) and value.startswith("["):
+        return [float(v) for v in json.loads(value)]
+    return None
+
+
+def encode_embedding(value: Any, encoding: str) -> Any:
+    """
+    Encode a pgvector value for export.
+
+    Args:
+        value: Embedding as returned by PostgREST ("[0.1,...]" text or list)
+        encoding: "text" (unchanged), "f32" or "f16"
+
+    Returns:
+        The value unchanged for "text"/unparseable input, otherwise
+        {"encoding": ..., "dim": n, "data": base64 little-endian floats}
+    """
+    if encoding == "text":
+        return value
+    vector = _parse_vector(value)
+    if vector is None:
+        return value
+    data = struct.pack(f"<{len(vector)}{_STRUCT_CODES[encoding]}", *vector)
+    return {"encoding": encoding, "dim": len(vector), "data": base64.b64encode(data).decode("ascii")}
+
+
+def decode_embedding(value: Any) -> Any:
+    """Inverse of encode_embedding: returns pgvector text for encoded values."""
+    if not isinstance(value, dict) or value.get("encoding") not in _STRUCT_CODES:
+        return value
+    code = _STRUCT_CODES[value["encoding"]]
+    vector = struct.unpack(f"<{value['dim']}{code}", base64.b64decode(value["data"]))
+    return "[" + ",".join(repr(v) for v in vector) + "]"
+
+
+# ----------------------------------------------------------------------
+# Reading
+# ----------------------------------------------------------------------
+
+def iter_json_array(path: Path, chunk_size: int = READ_CHUNK_SIZE, allow_truncated: bool = False) -> Iterator[dict]:
+    """
+    Stream the elements of a file containing one top-level JSON array.
+
+    Args:
+        path: File to read (gzip if it ends in .gz)
+        chunk_size: Characters read per chunk
+        allow_truncated: Stop quietly at EOF if the closing "]" is missing
+            (an unfinished export being resumed)
+
+    Yields:
+        Each array element, in file order
+
+    Raises:
+        ValueError: If the file is not a JSON array
+    """
+    with _open_text(path) as f:
+        yield from _iter_json_array_stream(f, str(path), chunk_size, allow_truncated)
+
+
+def _open_text(path: Path) -> TextIO:
+    if str(path).endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _iter_json_array_stream(f: TextIO, name: str, chunk_size: int, allow_truncated: bool) -> Iterator[dict]:
+    decoder = json.JSONDecoder()
+    buf = ""
+    pos = 0
+    eof = False
+
+    def fill() -> bool:
+        nonlocal buf, pos, eof
+        if eof:
+            return False
+        chunk = f.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buf = buf[pos:] + chunk
+        pos = 0
+        return True
+
+    def skip_whitespace() -> Optional[str]:
+        """Advance past whitespace; return the next char (None at EOF)."""
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in _WHITESPACE:
+                pos += 1
+            if pos < len(buf):
+                return buf[pos]
+            if not fill():
+                return None
+
+    first = skip_whitespace()
+    if first is None and allow_truncated:
+        return
+    if first != "[":
+        raise ValueError(f"{name}: expected a JSON array")
+    pos += 1
+
+    if skip_whitespace() == "]":
+        return
+
+    while True:
+        if skip_whitespace() is None:
+            if allow_truncated:
+                return
+            raise ValueError(f"{name}: unterminated JSON array")
+        # Decode the next element, reading more until it is complete
+        while True:
+            try:
+                item, end = decoder.raw_decode(buf, pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(buf) or eof:
+                    break
+                if not fill():
+                    item, end = decoder.raw_decode(buf, pos)
+                    break
+            except json.JSONDecodeError:
+                if not fill():
+                    raise
+        pos = end
+        yield item
+
+        sep = skip_whitespace()
+        if sep == ",":
+            pos += 1
+        elif sep == "]" or (sep is None and allow_truncated):
+            return
+        else:
+            raise ValueError(f"{name}: expected ',' or ']' in JSON array")
+
+
+def iter_export_records(path: Path, allow_truncated: bool = False) -> Iterator[dict]:
+    """
+    Stream records from an export file (.json / .jsonl, optionally .gz).
+
+    Binary-encoded embeddings are decoded back to pgvector text.
+
+    Args:
+        path: Export file
+        allow_truncated: Tolerate an unfinished JSON array (see iter_json_array)
+
+    Yields:
+        Record dicts in file order
+    """
+    name = str(path).removesuffix(".gz")
+    if name.endswith(".jsonl"):
+        def records():
+            with _open_text(path) as f:
+                for line in f:
+                    if line.strip():
+                        yield json.loads(line)
+    else:
+        def records():
+            return iter_json_array(path, allow_truncated=allow_truncated)
+
+    for record in records():
+        if isinstance(record, dict) and isinstance(record.get("embedding"), dict):
+            record["embedding"] = decode_embedding(record["embedding"])
+        yield record
+
+
+def find_export_file(data_dir: Path, filename: str) -> Optional[Path]:
+    """
+    Locate an export file in any supported format.
+
+    Args:
+        data_dir: Export directory
+        filename: Release file name, e.g. "lenny_kg_entities.json"
+
+    Returns:
+        The first of name.json, name.jsonl, name.jsonl.gz, name.json.gz that
+        exists, or None
+    """
+    stem = filename.removesuffix(".json")
+    for suffix in (".json", ".jsonl", ".jsonl.gz", ".json.gz"):
+        path = data_dir / f"{stem}{suffix}"
+        if path.exists():
+            return path
+    return None
+
+
+# ----------------------------------------------------------------------
+# Writing
+# ----------------------------------------------------------------------
+
+def export_filename(stem: str, fmt: str = "json", compress: bool = False) -> str:
+    """File name for an export table, e.g. lenny_kg_entities.jsonl.gz."""
+    return f"{stem}.{fmt}" + (".gz" if compress else "")
+
+
+class ExportWriter:
+    """
+    Appends pages of records to one export file.
+
+    state() is a resume point ({"offset", "count"}) valid after any
+    write_page(); passing it back as resume_state truncates the file to that
+    page boundary and continues appending.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fmt: str = "json",
+        compress: bool = False,
+        embedding_encoding: str = "text",
+        resume_state: Optional[dict] = None,
+    ):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {fmt}")
+        if embedding_encoding not in EMBEDDING_ENCODINGS:
+            raise ValueError(f"Unknown embedding encoding: {embedding_encoding}")
+        self.path = Path(path)
+        self.fmt = fmt
+        self.compress = compress
+        self.embedding_encoding = embedding_encoding
+
+        if resume_state and self.path.exists():
+            self.count = resume_state["count"]
+            self.offset = resume_state["offset"]
+            self._file = open(self.path, "r+b")
+            self._file.truncate(self.offset)
+            self._file.seek(self.offset)
+        else:
+            self.count = 0
+            self.offset = 0
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "wb")
+            if fmt == "json":
+                self._append("[")
+
+    def _append(self, text: str) -> None:
+        data = text.encode("utf-8")
+        if self.compress:
+            data = gzip.compress(data)  # One member per page: truncatable
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.offset += len(data)
+
+    def _encode(self, record: dict) -> str:
+        if self.embedding_encoding != "text" and record.get("embedding") is not None:
+            record = {**record, "embedding": encode_embedding(record["embedding"], self.embedding_encoding)}
+        if self.fmt == "jsonl":
+            return json.dumps(record, ensure_ascii=False, default=str)
+        return json.dumps(record, indent=2, ensure_ascii=False, default=str)
+
+    def write_page(self, records: list[dict]) -> None:
+        """Append records and flush them to disk."""
+        if not records:
+            return
+        if self.fmt == "jsonl":
+            text = "".join(self._encode(r) + "\n" for r in records)
+        else:
+            text = ("," if self.count else "") + "\n" + ",\n".join(self._encode(r) for r in records)
+        self._append(text)
+        self.count += len(records)
+
+    def state(self) -> dict:
+        """Resume point after the last written page."""
+        return {"offset": self.offset, "count": self.count}
+
+    def close(self) -> None:
+        """Finish the file (closes the JSON array)."""
+        if self.fmt == "json":
+            self._append("\n]\n" if self.count else "]\n")
+        self._file.close()
+
+
+# ----------------------------------------------------------------------
+# Table scans
+# ----------------------------------------------------------------------
+
+
+def iter_table_pages(
+    supabase,
+    table: str,
+    columns: str,
+    page_size: int = TABLE_PAGE_SIZE,
+    apply_filters: Optional[Callable] = None,
+    after_id: str = "",
+) -> Iterator[list[dict]]:
+    """
+    Yield pages of a table using keyset pagination on id.
+
+    Args:
+        supabase: Supabase client
+        table: Table name
+        columns: Columns to select (must include id)
+        page_size: Rows per request
+        apply_filters: Optional callable(query) -> query adding filters
+        after_id: Start after this id (resume cursor; last id of a page)
+
+    Yields:
+        Non-empty lists of row dicts, in id order
+    """
+    last_id = after_id
+    while True:
+        query = supabase.table(table).select(columns).gt("id", last_id)
+        if apply_filters:
+            query = apply_filters(query)
+        result = query.order("id").limit(page_size).execute()
+        batch = result.data or []
+        if batch:
+            yield batch
+        if len(batch) < page_size:
+            break
+        last_id = batch[-1]["id"]
+
+
+def iter_table_rows(
+    supabase,
+    table: str,
+    columns: str,
+    page_size: int = TABLE_PAGE_SIZE,
+    apply_filters: Optional[Callable] = None,
+) -> Iterator[dict]:
+    """
+    Yield every row of a table using keyset pagination on id.
+
+    Args:
+        supabase: Supabase client
+        table: Table name
+        columns: Columns to select (must include id)
+        page_size: Rows per request
+        apply_filters: Optional callable(query) -> query adding filters
+
+    Yields:
+        Row dicts in id order
+    """
+    for page in iter_table_pages(supabase, table, columns, page_size, apply_filters):
+        yield from page
@@ -0,0 +1,225 @@
+"""
+KG Write Buffer — Batched Supabase writes for KG indexing workers.
+
+Per-mention writes used to cost three requests each (mention insert, stats
+read, stats update) plus one per relation. A worker now accumulates them
+and flush() sends at most:
+
+- one bulk upsert of kg_relations (on the existing
+  source/target/type/source_message_id unique constraint)
+- one apply_entity_stat_deltas RPC with the summed mention_count /
+  source_breakdown / first_seen / last_seen deltas per entity
+  (migration 008; falls back to one read-then-update per entity)
+- one bulk upsert of kg_entity_mentions (deterministic ids, so re-sends
+  and races between workers are no-ops: on_conflict="id", ignore duplicates)
+
+Each section is cleared only after it is written, so flush() can be retried.
+"""
+
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+
+# Namespace for deterministic mention ids (entity_id + message_id)
+MENTION_ID_NAMESPACE = uuid.UUID("6f1c9a52-3f0e-4d7b-9c65-2b8a4e1d7c30")
+
+RELATION_CONFLICT_COLUMNS = "source_entity_id,target_entity_id,relation_type,source_message_id"
+UPSERT_CHUNK_SIZE = 500
+MAX_SNIPPET_LENGTH = 500
+
+
+def mention_id(entity_id: str, message_id: str) -> str:
+    """Deterministic kg_entity_mentions id for an (entity, message) pair."""
+    return str(uuid.uuid5(MENTION_ID_NAMESPACE, f"{entity_id}:{message_id}"))
+
+
+def _timestamp_to_iso(message_timestamp: Optional[int]) -> Optional[str]:
+    if not message_timestamp:
+        return None
+    return datetime.fromtimestamp(message_timestamp / 1000, tz=timezone.utc).isoformat()
+
+
+class KGWriteBuffer:
+    """Accumulates mentions, relations and entity stat deltas for one worker."""
+
+    def __init__(self, supabase_client):
+        self.supabase = supabase_client
+        self._mentions: dict[str, dict] = {}   # mention id -> row
+        self._relations: dict[tuple, dict] = {}  # conflict key -> row
+        self._stats: dict[str, dict] = {}      # entity_id -> delta
+
+    def __len__(self) -> int:
+        return len(self._mentions) + len(self._relations) + len(self._stats)
+
+    # ------------------------------------------------------------------
+    # Accumulate
+    # ------------------------------------------------------------------
+
+    def add_mention(self, entity_id: str, message_id: str, context_snippet: str, message_timestamp: int) -> None:
+        """Queue a kg_entity_mentions row (one per entity per message)."""
+        row_id = mention_id(entity_id, message_id)
+        self._mentions[row_id] = {
+            "id": row_id,
+            "entity_id": entity_id,
+            "message_id": message_id,
+            "context_snippet": context_snippet[:MAX_SNIPPET_LENGTH],
+            "message_timestamp": message_timestamp,
+        }
+
+    def add_relation(
+        self,
+        source_entity_id: str,
+        target_entity_id: str,
+        relation_type: str,
+        evidence_snippet: str,
+        message_id: str,
+    ) -> None:
+        """Queue a kg_relations row (first evidence wins per unique key)."""
+        key = (source_entity_id, target_entity_id, relation_type, message_id)
+        if key in self._relations:
+            return
+        self._relations[key] = {
+            "id": str(uuid.uuid4()),
+            "source_entity_id": source_entity_id,
+            "target_entity_id": target_entity_id,
+            "relation_type": relation_type,
+            "evidence_snippet": (evidence_snippet or "")[:MAX_SNIPPET_LENGTH],
+            "source_message_id": message_id,
+        }
+
+    def add_entity_stat(self, entity_id: str, message_timestamp: Optional[int], source_type: str = "user") -> None:
+        """Queue one mention_count/source_breakdown/seen-range increment."""
+        delta = self._stats.setdefault(
+            entity_id, {"id": entity_id, "user": 0, "lenny": 0, "first_seen": None, "last_seen": None}
+        )
+        delta["lenny" if source_type == "expert" else "user"] += 1
+        seen = _timestamp_to_iso(message_timestamp)
+        if seen:
+            # ISO strings in the same timezone compare chronologically
+            if delta["first_seen"] is None or seen < delta["first_seen"]:
+                delta["first_seen"] = seen
+            if delta["last_seen"] is None or seen > delta["last_seen"]:
+                delta["last_seen"] = seen
+
+    def remap_entity(self, source_entity_id: str, target_entity_id: str) -> None:
+        """Point queued writes for a merged (deleted) entity at its merge target."""
+        for row in list(self._mentions.values()):
+            if row["entity_id"] == source_entity_id:
+                del self._mentions[row["id"]]
+                self.add_mention(target_entity_id, row["message_id"], row["context_snippet"], row["message_timestamp"])
+
+        for key, row in list(self._relations.items()):
+            if source_entity_id in (row["source_entity_id"], row["target_entity_id"]):
+                del self._relations[key]
+                source = target_entity_id if row["source_entity_id"] == source_entity_id else row["source_entity_id"]
+                target = target_entity_id if row["target_entity_id"] == source_entity_id else row["target_entity_id"]
+                if source != target:
+                    self.add_relation(source, target, row["relation_type"], row["evidence_snippet"], row["source_message_id"])
+
+        delta = self._stats.pop(source_entity_id, None)
+        if delta:
+            target = self._stats.setdefault(
+                target_entity_id, {"id": target_entity_id, "user": 0, "lenny": 0, "first_seen": None, "last_seen": None}
+            )
+            target["user"] += delta["user"]
+            target["lenny"] += delta["lenny"]
+            for field, pick in (("first_seen", min), ("last_seen", max)):
+                values = [v for v in (target[field], delta[field]) if v]
+                target[field] = pick(values) if values else None
+
+    # ------------------------------------------------------------------
+    # Flush
+    # ------------------------------------------------------------------
+
+    def flush(self) -> dict:
+        """
+        Write everything queued.
+
+        Returns:
+            {"mentions": n, "relations": n, "entity_stats": n} written by this call
+        """
+        written = {"mentions": 0, "relations": 0, "entity_stats": 0}
+
+        if self._relations:
+            rows = list(self._relations.values())
+            self._upsert("kg_relations", rows, on_conflict=RELATION_CONFLICT_COLUMNS)
+            written["relations"] = len(rows)
+            self._relations.clear()
+
+        if self._stats:
+            deltas = list(self._stats.values())
+            self._apply_stat_deltas(deltas)
+            written["entity_stats"] = len(deltas)
+            self._stats.clear()
+
+        # Mentions last: indexers treat a message with mentions as already indexed
+        if self._mentions:
+            rows = list(self._mentions.values())
+            self._upsert("kg_entity_mentions", rows, on_conflict="id")
+            written["mentions"] = len(rows)
+            self._mentions.clear()
+
+        return written
+
+    def _upsert(self, table: str, rows: list[dict], on_conflict: str) -> None:
+        for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+            (
+                self.supabase.table(table)
+                .upsert(rows[start:start + UPSERT_CHUNK_SIZE], on_conflict=on_conflict, ignore_duplicates=True)
+                .execute()
+            )
+
+    def _apply_stat_deltas(self, deltas: list[dict]) -> None:
+        try:
+            self.supabase.rpc("apply_entity_stat_deltas", {"p_deltas": deltas}).execute()
+            return
+        except Exception as e:
+            # RPC not available until migration 008 is run
+            if "apply_entity_stat_deltas" not in str(e):
+                raise
+
+        for delta in deltas:
+            _apply_stat_delta_client_side(self.supabase, delta)
+
+
+def _apply_stat_delta_client_side(supabase, delta: dict) -> None:
+    """Read-then-update fallback for one entity's summed delta."""
+    result = (
+        supabase.table("kg_entities")
+        .select("mention_count, first_seen, last_seen, source_breakdown")
+        .eq("id", delta["id"])
+        .limit(1)
+        .execute()
+    )
+    if not result.data:
+        return
+    row = result.data[0]
+
+    source_breakdown = row.get("source_breakdown") or {"user": 0, "lenny": 0}
+    source_breakdown["user"] = source_breakdown.get("user", 0) + delta["user"]
+    source_breakdown["lenny"] = source_breakdown.get("lenny", 0) + delta["lenny"]
+    if source_breakdown["user"] > 0 and source_breakdown["lenny"] > 0:
+        source_type = "both"
+    elif source_breakdown["lenny"] > 0:
+        source_type = "expert"
+    else:
+        source_type = "user"
+
+    update_data = {
+        "mention_count": (row.get("mention_count") or 0) + delta["user"] + delta["lenny"],
+        "source_breakdown": source_breakdown,
+        "source_type": source_type,
+    }
+    for field, later in (("first_seen", False), ("last_seen", True)):
+        if not delta[field]:
+            continue
+        current = row.get(field)
+        new = datetime.fromisoformat(delta[field])
+        if current:
+            current_dt = datetime.fromisoformat(current.replace("Z", "+00:00"))
+            if (new > current_dt) != later:
+                continue
+        update_data[field] = delta[field]
+
+    supabase.table("kg_entities").update(update_data).eq("id", delta["id"]).execute()
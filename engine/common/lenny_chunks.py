@@ -0,0 +1,148 @@
+"""
+Lenny Chunks — Compact binary chunk-metadata sidecar (lenny_chunks.bin).
+
+Replaces parsing the ~28MB lenny_metadata.json (or every shard's JSON) in
+each new process. The file is memory-mapped and chunks are decoded lazily,
+so opening it costs a header parse regardless of archive size.
+
+Layout (little-endian):
+- MAGIC (8 bytes) + uint64 header length + JSON header
+  {"version", "count", "episodes", "speakers", "stats"}
+- int32 episode_index[count]  (into header episodes)
+- int32 speaker_index[count]  (into header speakers)
+- int32 word_count[count]
+- int64 offsets[2 * count + 1] into the string blob
+- UTF-8 blob: content_0, timestamp_0, content_1, timestamp_1, ...
+"""
+
+import json
+import os
+import struct
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Iterable, Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+
+MAGIC = b"LNYCHNK1"
+CHUNKS_VERSION = 1
+
+
+def _pad8(n: int) -> int:
+    return (8 - n % 8) % 8
+
+
+def write_chunk_table(
+    path: Path,
+    episodes: list[dict],
+    chunks: Iterable[dict],
+    stats: Optional[dict] = None,
+) -> Path:
+    """
+    Write the binary chunk sidecar.
+
+    Args:
+        path: Output path
+        episodes: Episode entries (chunk_start_idx / chunk_count included)
+        chunks: Chunk dicts in matrix row order (episode_id, speaker,
+            timestamp, content, word_count)
+        stats: Archive stats copied into the header
+
+    Returns:
+        Path written
+    """
+    path = Path(path)
+    episode_positions = {ep["id"]: i for i, ep in enumerate(episodes)}
+    speaker_positions: dict[str, int] = {}
+    episode_index, speaker_index, word_counts = [], [], []
+    offsets = [0]
+    blob = bytearray()
+
+    for chunk in chunks:
+        episode_index.append(episode_positions.get(chunk.get("episode_id"), -1))
+        speaker = chunk.get("speaker", "")
+        speaker_index.append(speaker_positions.setdefault(speaker, len(speaker_positions)))
+        word_counts.append(chunk.get("word_count", 0))
+        for text in (chunk.get("content", ""), chunk.get("timestamp", "")):
+            blob += text.encode("utf-8")
+            offsets.append(len(blob))
+
+    header = json.dumps({
+        "version": CHUNKS_VERSION,
+        "count": len(episode_index),
+        "episodes": episodes,
+        "speakers": list(speaker_positions),
+        "stats": stats or {},
+    }).encode("utf-8")
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<Q", len(header)))
+        f.write(header)
+        f.write(b"\0" * _pad8(len(MAGIC) + 8 + len(header)))
+        for column in (episode_index, speaker_index, word_counts):
+            data = np.asarray(column, dtype="<i4").tobytes()
+            f.write(data)
+            f.write(b"\0" * _pad8(len(data)))
+        f.write(np.asarray(offsets, dtype="<i8").tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+    return path
+
+
+class ChunkTable(Sequence):
+    """Read-only, memory-mapped view of lenny_chunks.bin; items are chunk dicts."""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self._buf = np.memmap(self.path, dtype=np.uint8, mode="r")
+        if bytes(self._buf[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"Not a Lenny chunk table: {self.path}")
+        (header_len,) = struct.unpack("<Q", bytes(self._buf[len(MAGIC):len(MAGIC) + 8]))
+        pos = len(MAGIC) + 8
+        header = json.loads(bytes(self._buf[pos:pos + header_len]))
+        pos += header_len + _pad8(pos + header_len)
+
+        self.count = header["count"]
+        self.episodes: list[dict] = header["episodes"]
+        self.speakers: list[str] = header["speakers"]
+        self.stats: dict = header.get("stats", {})
+
+        columns = []
+        for _ in range(3):
+            columns.append(np.frombuffer(self._buf, dtype="<i4", count=self.count, offset=pos))
+            pos += 4 * self.count + _pad8(4 * self.count)
+        self.episode_index, self.speaker_index, self.word_counts = columns
+        self._offsets = np.frombuffer(self._buf, dtype="<i8", count=2 * self.count + 1, offset=pos)
+        self._blob_start = pos + 8 * (2 * self.count + 1)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _text(self, i: int) -> str:
+        start, end = self._offsets[i], self._offsets[i + 1]
+        return bytes(self._buf[self._blob_start + start:self._blob_start + end]).decode("utf-8")
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(self.count))]
+        if idx < 0:
+            idx += self.count
+        if not 0 <= idx < self.count:
+            raise IndexError(idx)
+        episode = self.episode_index[idx]
+        return {
+            "idx": idx,
+            "episode_id": self.episodes[episode]["id"] if episode >= 0 else "",
+            "speaker": self.speakers[self.speaker_index[idx]],
+            "timestamp": self._text(2 * idx + 1),
+            "content": self._text(2 * idx),
+            "word_count": int(self.word_counts[idx]),
+        }
@@ -5,10 +5,22 @@ Uses numpy for fast cosine similarity search over ~12K chunks.
 Embeddings stored in .npz file (no cloud database needed).
 
 v2: Supports rich metadata (title, youtube_url) from GitHub format.
+v3: Searches a pre-normalized matrix (lenny_embeddings.npy, float32 or
+    float16) loaded with mmap_mode, derived from the .npz on first load if
+    the indexer didn't write it. Queries are one matvec + argpartition;
+    guest filters use a precomputed guest/speaker → rows index.
+v4: Locally indexed archives are stored as per-episode shards
+    (see lenny_shards.py); the search matrix is assembled from them and
+    lenny_metadata.json keeps only stats + episodes.
+v5: Chunk metadata is read from a memory-mapped binary sidecar
+    (lenny_chunks.bin, see lenny_chunks.py) built once from the shards or
+    the metadata JSON, so a cold process never parses the big JSON.
 """
 
 import json
+import os
 from dataclasses import dataclass
+from collections.abc import Sequence
 from pathlib import Path
 from typing import Optional
 
@@ -20,7 +32,9 @@ except ImportError:
     NUMPY_AVAILABLE = False
 
 from .config import get_data_dir
-from .semantic_search import get_embedding, EMBEDDING_DIM
+from .lenny_chunks import ChunkTable, write_chunk_table
+from .lenny_shards import LennyShardStore
+from .semantic_search import get_embedding, batch_get_embeddings, EMBEDDING_DIM
 
 
 @dataclass
@@ -43,6 +57,9 @@ class LennySearchResult:
 # Cache for loaded embeddings (avoid reloading on every search)
 _embeddings_cache: dict = {}
 
+# float16 matrices are upcast in row blocks (numpy has no float16 BLAS)
+MATVEC_BLOCK_ROWS = 4096
+
 
 def get_lenny_data_paths() -> tuple[Path, Path]:
     """Get paths to Lenny embeddings and metadata files."""
@@ -52,10 +69,28 @@ def get_lenny_data_paths() -> tuple[Path, Path]:
     return embeddings_path, metadata_path
 
 
+def _use_lenny_shards() -> bool:
+    """
+    Whether to load the per-episode shards rather than the .npz.
+    
+    A downloaded .npz newer than the shard manifest takes precedence.
+    """
+    store = LennyShardStore()
+    if not store.exists():
+        return False
+    embeddings_path, _ = get_lenny_data_paths()
+    return (
+        not embeddings_path.exists()
+        or store.manifest_path.stat().st_mtime >= embeddings_path.stat().st_mtime
+    )
+
+
 def is_lenny_indexed() -> bool:
     """Check if Lenny archive has been indexed."""
     embeddings_path, metadata_path = get_lenny_data_paths()
-    return embeddings_path.exists() and metadata_path.exists()
+    if not metadata_path.exists():
+        return False
+    return embeddings_path.exists() or LennyShardStore().exists()
 
 
 def get_lenny_stats() -> Optional[dict]:
@@ -82,12 +117,216 @@ def get_lenny_stats() -> Optional[dict]:
         return None
 
 
-def load_lenny_embeddings() -> tuple[np.ndarray, list[dict]]:
+def get_lenny_matrix_path() -> Path:
+    """Get path to the pre-normalized, memory-mappable embeddings matrix."""
+    return get_data_dir() / "lenny_embeddings.npy"
+
+
+def write_lenny_matrix(embeddings: np.ndarray, matrix_path: Optional[Path] = None, dtype: str = "float32") -> Path:
+    """
+    Save L2-normalized embeddings as a raw .npy for mmap loading.
+    
+    Args:
+        embeddings: (n, dim) embeddings
+        matrix_path: Output path (default: data/lenny_embeddings.npy)
+        dtype: "float32" or "float16" (half the size, ~1e-3 score error)
+    
+    Returns:
+        Path written
+    """
+    matrix_path = Path(matrix_path or get_lenny_matrix_path())
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1  # Avoid division by zero
+    normalized = (matrix / norms).astype(dtype)
+    
+    tmp_path = matrix_path.with_name(matrix_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.save(f, normalized)
+    os.replace(tmp_path, matrix_path)
+    return matrix_path
+
+
+def _load_normalized_matrix(embeddings_path: Path) -> np.ndarray:
+    """
+    Memory-map the normalized matrix, (re)building it from the .npz when it
+    is missing or older than the .npz (e.g. after downloading a new archive).
+    """
+    matrix_path = get_lenny_matrix_path()
+    if matrix_path.exists() and matrix_path.stat().st_mtime >= embeddings_path.stat().st_mtime:
+        return np.load(matrix_path, mmap_mode="r")
+    
+    embeddings = np.load(embeddings_path)["embeddings"]
+    try:
+        write_lenny_matrix(embeddings, matrix_path)
+        return np.load(matrix_path, mmap_mode="r")
+    except OSError:
+        # Read-only data dir - keep a normalized copy in memory instead
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        return (embeddings / norms).astype(np.float32)
+
+
+def get_lenny_chunks_path() -> Path:
+    """Get path to the binary chunk-metadata sidecar."""
+    return get_data_dir() / "lenny_chunks.bin"
+
+
+def _load_chunk_table(use_shards: bool) -> tuple[list[dict], Sequence]:
+    """
+    Memory-map the chunk sidecar, (re)building it when it is missing or older
+    than its source (shard manifest or lenny_metadata.json).
+    
+    Returns:
+        (episodes, chunks) — chunks is a ChunkTable, or a plain list if the
+        sidecar can't be written (read-only data dir)
+    """
+    chunks_path = get_lenny_chunks_path()
+    if use_shards:
+        store = LennyShardStore()
+        source_path = store.manifest_path
+    else:
+        _, source_path = get_lenny_data_paths()
+    
+    if chunks_path.exists() and chunks_path.stat().st_mtime >= source_path.stat().st_mtime:
+        try:
+            table = ChunkTable(chunks_path)
+            return table.episodes, table
+        except (ValueError, OSError):
+            pass  # Corrupt or truncated - rebuild below
+    
+    if use_shards:
+        episode_list, chunks = store.load_metadata()
+        stats = {}
+    else:
+        with open(source_path) as f:
+            metadata = json.load(f)
+        episode_list, chunks = metadata.get("episodes", []), metadata.get("chunks", [])
+        stats = metadata.get("stats", {})
+    try:
+        write_chunk_table(chunks_path, episode_list, chunks, stats)
+        table = ChunkTable(chunks_path)
+        return table.episodes, table
+    except OSError:
+        return episode_list, chunks
+
+
+def _build_guest_index(chunks: Sequence, episodes: dict) -> tuple[dict, dict]:
+    """
+    Build lowercase guest name → row ranges and speaker → rows lookups.
+    
+    Chunks of an episode are stored contiguously, so guests map to a few
+    (start, end) runs rather than per-row masks.
+    """
+    if isinstance(chunks, ChunkTable):
+        return _build_guest_index_from_table(chunks)
+    
+    guest_ranges: dict[str, list[tuple[int, int]]] = {}
+    speaker_rows: dict[str, list[int]] = {}
+    
+    run_start = 0
+    run_episode = None
+    for i, chunk in enumerate(chunks):
+        episode_id = chunk.get("episode_id", "")
+        if episode_id != run_episode:
+            if run_episode is not None:
+                guest = episodes.get(run_episode, {}).get("guest_name", "").lower()
+                guest_ranges.setdefault(guest, []).append((run_start, i))
+            run_start, run_episode = i, episode_id
+        speaker_rows.setdefault(chunk.get("speaker", "").lower(), []).append(i)
+    if run_episode is not None:
+        guest = episodes.get(run_episode, {}).get("guest_name", "").lower()
+        guest_ranges.setdefault(guest, []).append((run_start, len(chunks)))
+    
+    return guest_ranges, {k: np.asarray(v, dtype=np.int64) for k, v in speaker_rows.items()}
+
+
+def _build_guest_index_from_table(table: ChunkTable) -> tuple[dict, dict]:
+    """_build_guest_index from the sidecar's integer columns (no chunk decoding)."""
+    guest_ranges: dict[str, list[tuple[int, int]]] = {}
+    episode_index = table.episode_index
+    if len(episode_index):
+        starts = np.flatnonzero(np.diff(episode_index)) + 1
+        bounds = np.concatenate(([0], starts, [len(episode_index)]))
+        for start, end in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            episode = episode_index[start]
+            guest = table.episodes[episode].get("guest_name", "").lower() if episode >= 0 else ""
+            guest_ranges.setdefault(guest, []).append((start, end))
+    
+    # Group rows by speaker with one stable sort, merging case variants
+    order = np.argsort(table.speaker_index, kind="stable")
+    sorted_speakers = table.speaker_index[order]
+    splits = np.flatnonzero(np.diff(sorted_speakers)) + 1
+    speaker_parts: dict[str, list[np.ndarray]] = {}
+    for rows in np.split(order, splits) if len(order) else []:
+        speaker = table.speakers[table.speaker_index[rows[0]]].lower()
+        speaker_parts.setdefault(speaker, []).append(rows)
+    speaker_rows = {
+        speaker: np.sort(np.concatenate(parts)).astype(np.int64)
+        for speaker, parts in speaker_parts.items()
+    }
+    return guest_ranges, speaker_rows
+
+
+def _rows_for_guest(guest_filter: str) -> np.ndarray:
+    """Rows whose speaker or episode guest contains guest_filter (case-insensitive)."""
+    guest_filter_lower = guest_filter.lower()
+    cache = _embeddings_cache.setdefault("guest_filter_rows", {})
+    if guest_filter_lower in cache:
+        return cache[guest_filter_lower]
+    
+    parts = [
+        np.arange(start, end)
+        for guest, ranges in _embeddings_cache["guest_ranges"].items()
+        if guest_filter_lower in guest
+        for start, end in ranges
+    ]
+    parts.extend(
+        rows for speaker, rows in _embeddings_cache["speaker_rows"].items()
+        if guest_filter_lower in speaker
+    )
+    rows = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int64)
+    cache[guest_filter_lower] = rows
+    return rows
+
+
+def _matvec(matrix: np.ndarray, query_vecs: np.ndarray) -> np.ndarray:
+    """
+    Score query vector(s) against every row in float32.
+    
+    Args:
+        matrix: (n, dim) normalized matrix (float32 or float16)
+        query_vecs: (dim,) vector or (m, dim) matrix of normalized queries
+    
+    Returns:
+        (n,) scores for one query, (m, n) for several
+    """
+    if matrix.dtype == np.float32:
+        return query_vecs @ matrix.T if query_vecs.ndim == 2 else matrix @ query_vecs
+    # float16: upcast one row block at a time
+    out = np.empty(query_vecs.shape[:-1] + (matrix.shape[0],), dtype=np.float32)
+    for start in range(0, matrix.shape[0], MATVEC_BLOCK_ROWS):
+        block = np.asarray(matrix[start:start + MATVEC_BLOCK_ROWS], dtype=np.float32)
+        out[..., start:start + len(block)] = query_vecs @ block.T
+    return out
+
+
+def _top_k_rows(similarities: np.ndarray, top_k: int, min_similarity: float) -> np.ndarray:
+    """Indices of the top_k scores >= min_similarity, highest first."""
+    candidates = np.flatnonzero(similarities >= min_similarity)
+    if len(candidates) > top_k:
+        part = np.argpartition(similarities[candidates], -top_k)[-top_k:]
+        candidates = candidates[part]
+    return candidates[np.argsort(-similarities[candidates], kind="stable")]
+
+
+def load_lenny_embeddings() -> tuple[np.ndarray, Sequence]:
     """
     Load Lenny embeddings and metadata from disk.
     
     Returns:
-        Tuple of (embeddings array, chunks metadata list)
+        Tuple of (L2-normalized embeddings matrix (memory-mapped), chunk dicts
+        by row (memory-mapped ChunkTable, decoded on access))
         
     Raises:
         RuntimeError: If embeddings not indexed or numpy not available
@@ -106,17 +345,18 @@ def load_lenny_embeddings() -> tuple[np.ndarray, list[dict]]:
     if "embeddings" in _embeddings_cache and "chunks" in _embeddings_cache:
         return _embeddings_cache["embeddings"], _embeddings_cache["chunks"]
     
-    embeddings_path, metadata_path = get_lenny_data_paths()
-    
-    # Load embeddings
-    npz_data = np.load(embeddings_path)
-    embeddings = npz_data["embeddings"]
+    embeddings_path, _ = get_lenny_data_paths()
+    use_shards = _use_lenny_shards()
     
-    # Load metadata
-    with open(metadata_path) as f:
-        metadata = json.load(f)
+    if use_shards:
+        # Assemble from per-episode shards (re-assembled only when they change)
+        embeddings = LennyShardStore().load_matrix(get_lenny_matrix_path())
+    else:
+        # Load pre-normalized embeddings (mmap)
+        embeddings = _load_normalized_matrix(embeddings_path)
     
-    chunks = metadata.get("chunks", [])
+    # Load chunk metadata (mmap'd sidecar)
+    episode_list, chunks = _load_chunk_table(use_shards)
     
     # Validate shapes match
     if len(embeddings) != len(chunks):
@@ -127,7 +367,10 @@ def load_lenny_embeddings() -> tuple[np.ndarray, list[dict]]:
     # Cache for future calls
     _embeddings_cache["embeddings"] = embeddings
     _embeddings_cache["chunks"] = chunks
-    _embeddings_cache["episodes"] = {ep["id"]: ep for ep in metadata.get("episodes", [])}
+    _embeddings_cache["episodes"] = {ep["id"]: ep for ep in episode_list}
+    guest_ranges, speaker_rows = _build_guest_index(chunks, _embeddings_cache["episodes"])
+    _embeddings_cache["guest_ranges"] = guest_ranges
+    _embeddings_cache["speaker_rows"] = speaker_rows
     
     return embeddings, chunks
 
@@ -165,68 +408,98 @@ def search_lenny_archive(
     
     # Embed query
     query_embedding = get_embedding(query, allow_fallback=False)
-    query_vec = np.array(query_embedding)
+    query_vec = np.asarray(query_embedding, dtype=np.float32)
     
-    # Normalize query vector
+    # Normalize query vector (matrix rows are stored normalized)
     query_norm = np.linalg.norm(query_vec)
     if query_norm == 0:
         return []
     query_vec = query_vec / query_norm
     
-    # Compute cosine similarities (embeddings should already be normalized)
-    # If not normalized, normalize them
-    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
-    norms[norms == 0] = 1  # Avoid division by zero
-    normalized_embeddings = embeddings / norms
-    
-    similarities = np.dot(normalized_embeddings, query_vec)
-    
-    # Apply guest filter if provided
+    # Guest filter: score only that guest's rows
     if guest_filter:
-        guest_filter_lower = guest_filter.lower()
-        mask = np.array([
-            guest_filter_lower in chunks[i].get("speaker", "").lower() or
-            guest_filter_lower in episodes.get(chunks[i].get("episode_id", ""), {}).get("guest_name", "").lower()
-            for i in range(len(chunks))
-        ])
-        similarities = np.where(mask, similarities, -1)
+        rows = _rows_for_guest(guest_filter)
+        if len(rows) == 0:
+            return []
+        row_similarities = np.asarray(embeddings[rows], dtype=np.float32) @ query_vec
+        top = _top_k_rows(row_similarities, top_k, min_similarity)
+        top_indices = rows[top]
+        top_scores = row_similarities[top]
+    else:
+        similarities = _matvec(embeddings, query_vec)
+        top_indices = _top_k_rows(similarities, top_k, min_similarity)
+        top_scores = similarities[top_indices]
+    
+    return [_to_search_result(idx, score, chunks, episodes) for idx, score in zip(top_indices, top_scores)]
+
+
+def search_lenny_archive_batch(
+    queries: list[str],
+    top_k: int = 5,
+    min_similarity: float = 0.3,
+) -> list[list[LennySearchResult]]:
+    """
+    Search the Lenny archive for several queries at once.
     
-    # Apply minimum similarity threshold
-    valid_mask = similarities >= min_similarity
-    if not np.any(valid_mask):
-        return []
+    All queries are embedded in one batch_get_embeddings call and scored with
+    one matrix-matrix product.
     
-    # Get top-k indices
-    # Set invalid ones to -inf so they're not selected
-    similarities_masked = np.where(valid_mask, similarities, -np.inf)
-    top_indices = np.argsort(similarities_masked)[-top_k:][::-1]
+    Args:
+        queries: Search queries
+        top_k: Maximum number of results per query
+        min_similarity: Minimum cosine similarity threshold (0-1)
+        
+    Returns:
+        One result list per query (same order), each sorted by similarity
+    """
+    if not NUMPY_AVAILABLE:
+        raise RuntimeError("numpy not available. Install with: pip install numpy")
+    if not queries:
+        return []
     
-    # Filter out any that didn't meet threshold
-    top_indices = [i for i in top_indices if similarities[i] >= min_similarity]
+    embeddings, chunks = load_lenny_embeddings()
+    episodes = _embeddings_cache.get("episodes", {})
     
-    # Build results
-    results = []
-    for idx in top_indices:
-        chunk = chunks[idx]
-        episode_id = chunk.get("episode_id", "")
-        episode = episodes.get(episode_id, {})
-        
-        results.append(LennySearchResult(
-            guest_name=episode.get("guest_name", "Unknown"),
-            speaker=chunk.get("speaker", "Unknown"),
-            timestamp=chunk.get("timestamp", "00:00:00"),
-            content=chunk.get("content", ""),
-            similarity=float(similarities[idx]),
-            episode_filename=episode.get("filename", ""),
-            chunk_index=chunk.get("idx", 0),
-            # Rich metadata (v2)
-            episode_title=episode.get("title"),
-            youtube_url=episode.get("youtube_url"),
-            video_id=episode.get("video_id"),
-            duration=episode.get("duration"),
-        ))
-    
-    return results
+    query_vecs = np.asarray(batch_get_embeddings(queries, allow_fallback=False), dtype=np.float32)
+    norms = np.linalg.norm(query_vecs, axis=1, keepdims=True)
+    valid = norms[:, 0] > 0
+    norms[~valid] = 1
+    query_vecs = query_vecs / norms
+    
+    similarities = _matvec(embeddings, query_vecs)  # (m, n)
+    
+    all_results = []
+    for q, row_scores in enumerate(similarities):
+        if not valid[q]:
+            all_results.append([])
+            continue
+        top_indices = _top_k_rows(row_scores, top_k, min_similarity)
+        all_results.append([
+            _to_search_result(idx, row_scores[idx], chunks, episodes) for idx in top_indices
+        ])
+    return all_results
+
+
+def _to_search_result(idx: int, score: float, chunks: list[dict], episodes: dict) -> LennySearchResult:
+    """Build a LennySearchResult for a matrix row."""
+    chunk = chunks[idx]
+    episode_id = chunk.get("episode_id", "")
+    episode = episodes.get(episode_id, {})
+    
+    return LennySearchResult(
+        guest_name=episode.get("guest_name", "Unknown"),
+        speaker=chunk.get("speaker", "Unknown"),
+        timestamp=chunk.get("timestamp", "00:00:00"),
+        content=chunk.get("content", ""),
+        similarity=float(score),
+        episode_filename=episode.get("filename", ""),
+        chunk_index=chunk.get("idx", 0),
+        # Rich metadata (v2)
+        episode_title=episode.get("title"),
+        youtube_url=episode.get("youtube_url"),
+        video_id=episode.get("video_id"),
+        duration=episode.get("duration"),
+    )
 
 
 def get_episode_context(
@@ -258,11 +531,16 @@ def get_episode_context(
     if not episode_id:
         return {"before": [], "after": []}
     
-    # Find all chunks for this episode
-    episode_chunks = [
-        (i, c) for i, c in enumerate(chunks) 
-        if c.get("episode_id") == episode_id
-    ]
+    # Find all chunks for this episode (stored contiguously)
+    episode = episodes[episode_id]
+    if "chunk_start_idx" in episode and "chunk_count" in episode:
+        start = episode["chunk_start_idx"]
+        episode_chunks = [(i, chunks[i]) for i in range(start, start + episode["chunk_count"])]
+    else:
+        episode_chunks = [
+            (i, c) for i, c in enumerate(chunks) 
+            if c.get("episode_id") == episode_id
+        ]
     episode_chunks.sort(key=lambda x: x[1].get("idx", 0))
     
     # Find position of target chunk
@@ -0,0 +1,197 @@
+"""
+Lenny Shards — Per-episode embedding shards for incremental archive indexing.
+
+Layout (data/lenny_shards/):
+- manifest.json — episode order, file hashes and row counts (small)
+- <episode_id>.npy — raw float32 embeddings for that episode's chunks
+- <episode_id>.json — episode metadata + its chunks (lossless content)
+
+Re-indexing writes shards only for new/changed episodes and deletes shards
+of removed ones; unchanged episodes are not read or rewritten. The search
+matrix (lenny_embeddings.npy, L2-normalized) is assembled from memory-mapped
+shards by assemble_matrix() when the manifest is newer than it — a plain
+row copy, no decompression or re-embedding.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .config import get_data_dir
+
+
+MANIFEST_FILE = "manifest.json"
+SHARD_VERSION = 1
+
+
+def get_lenny_shards_dir() -> Path:
+    """Get directory of per-episode Lenny shards."""
+    return get_data_dir() / "lenny_shards"
+
+
+def _atomic_write_json(path: Path, data) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+class LennyShardStore:
+    """Per-episode embeddings + chunk metadata with a small ordering manifest."""
+
+    def __init__(self, shards_dir: Optional[Path] = None):
+        self.dir = Path(shards_dir or get_lenny_shards_dir())
+        self.manifest_path = self.dir / MANIFEST_FILE
+        self.manifest = self._load_manifest()
+
+    def _load_manifest(self) -> dict:
+        if not self.manifest_path.exists():
+            return {"version": SHARD_VERSION, "episodes": []}
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (json.JSONDecodeError, IOError):
+            return {"version": SHARD_VERSION, "episodes": []}
+
+    def exists(self) -> bool:
+        return self.manifest_path.exists()
+
+    def _paths(self, episode_id: str) -> tuple[Path, Path]:
+        return self.dir / f"{episode_id}.npy", self.dir / f"{episode_id}.json"
+
+    def has_episode(self, episode_id: str, file_hash: str) -> bool:
+        """Whether a complete shard for this exact file version exists."""
+        for entry in self.manifest["episodes"]:
+            if entry["id"] == episode_id:
+                npy_path, json_path = self._paths(episode_id)
+                return entry.get("file_hash") == file_hash and npy_path.exists() and json_path.exists()
+        # Written but not yet in the manifest (interrupted run)
+        npy_path, json_path = self._paths(episode_id)
+        if not (npy_path.exists() and json_path.exists()):
+            return False
+        try:
+            with open(json_path) as f:
+                return json.load(f)["episode"].get("file_hash") == file_hash
+        except (json.JSONDecodeError, IOError, KeyError):
+            return False
+
+    def write_episode(self, episode: dict, chunks: list[dict], embeddings) -> None:
+        """
+        Write one episode's shard (embeddings first, metadata last).
+
+        Args:
+            episode: Episode metadata entry (must include id and file_hash)
+            chunks: Chunk dicts in order (content, speaker, timestamp, ...)
+            embeddings: (len(chunks), dim) raw embeddings
+        """
+        matrix = np.asarray(embeddings, dtype=np.float32)
+        if matrix.shape[0] != len(chunks):
+            raise ValueError(
+                f"Shard {episode['id']}: {matrix.shape[0]} embeddings for {len(chunks)} chunks"
+            )
+        self.dir.mkdir(parents=True, exist_ok=True)
+        npy_path, json_path = self._paths(episode["id"])
+        tmp_path = npy_path.with_name(npy_path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, matrix)
+        os.replace(tmp_path, npy_path)
+        _atomic_write_json(json_path, {"episode": episode, "chunks": chunks})
+
+    def remove_episode(self, episode_id: str) -> None:
+        for path in self._paths(episode_id):
+            path.unlink(missing_ok=True)
+
+    def save_manifest(self, episodes: list[dict], dim: int, extra: Optional[dict] = None) -> None:
+        """
+        Record the episode order; shards not listed are deleted.
+
+        Args:
+            episodes: [{"id", "file_hash", "chunk_count"}] in search-matrix order
+            dim: Embedding dimension
+            extra: Additional manifest fields (format, stats, ...)
+        """
+        keep = {e["id"] for e in episodes}
+        for entry in self.manifest["episodes"]:
+            if entry["id"] not in keep:
+                self.remove_episode(entry["id"])
+        self.manifest = {"version": SHARD_VERSION, "dim": dim, **(extra or {}), "episodes": episodes}
+        self.dir.mkdir(parents=True, exist_ok=True)
+        _atomic_write_json(self.manifest_path, self.manifest)
+
+    @property
+    def total_rows(self) -> int:
+        return sum(e["chunk_count"] for e in self.manifest["episodes"])
+
+    def load_embeddings(self, episode_id: str):
+        """Memory-map one episode's raw embeddings."""
+        return np.load(self._paths(episode_id)[0], mmap_mode="r")
+
+    def load_metadata(self) -> tuple[list[dict], list[dict]]:
+        """
+        Load chunk metadata for all episodes in manifest order.
+
+        Returns:
+            (episodes, chunks) with global chunk idx / chunk_start_idx assigned
+        """
+        episodes, chunks = [], []
+        for entry in self.manifest["episodes"]:
+            with open(self._paths(entry["id"])[1]) as f:
+                shard = json.load(f)
+            episode = dict(shard["episode"], chunk_start_idx=len(chunks), chunk_count=len(shard["chunks"]))
+            episodes.append(episode)
+            for chunk in shard["chunks"]:
+                chunks.append(dict(chunk, idx=len(chunks), episode_id=entry["id"]))
+        return episodes, chunks
+
+    def assemble_matrix(self, matrix_path: Path, dtype: str = "float32") -> Path:
+        """
+        Write the L2-normalized search matrix by copying shard rows in order.
+
+        Args:
+            matrix_path: Output .npy
+            dtype: "float32" or "float16"
+
+        Returns:
+            Path written
+        """
+        matrix_path = Path(matrix_path)
+        tmp_path = matrix_path.with_name(matrix_path.name + ".tmp")
+        out = np.lib.format.open_memmap(
+            tmp_path, mode="w+", dtype=dtype, shape=(self.total_rows, self.manifest["dim"])
+        )
+        row = 0
+        for entry in self.manifest["episodes"]:
+            block = np.asarray(self.load_embeddings(entry["id"]), dtype=np.float32)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1  # Avoid division by zero
+            out[row:row + len(block)] = block / norms
+            row += len(block)
+        out.flush()
+        del out
+        os.replace(tmp_path, matrix_path)
+        return matrix_path
+
+    def load_matrix(self, matrix_path: Path):
+        """
+        Memory-map the search matrix, re-assembling it if the shards changed.
+
+        Args:
+            matrix_path: Search matrix .npy (see assemble_matrix)
+        """
+        matrix_path = Path(matrix_path)
+        dtype = self.manifest.get("matrix_dtype", "float32")
+        if not matrix_path.exists() or matrix_path.stat().st_mtime < self.manifest_path.stat().st_mtime:
+            self.assemble_matrix(matrix_path, dtype)
+        matrix = np.load(matrix_path, mmap_mode="r")
+        if len(matrix) != self.total_rows:
+            self.assemble_matrix(matrix_path, dtype)
+            matrix = np.load(matrix_path, mmap_mode="r")
+        return matrix
@@ -0,0 +1,509 @@
+"""
+Local Vector DB — Embedded replacement for the Supabase cursor_messages store.
+
+Selected with config "vectorDb": {"backend": "local"} (or VECTOR_DB_BACKEND=local);
+vector_db.py then routes indexing and retrieval here instead of over HTTP.
+
+Files (data/local_vector_db/):
+- messages.sqlite — message rows; `row` is the message's row in the matrix
+- embeddings.f32 — raw float32 matrix of L2-normalized embeddings, one
+  EMBEDDING_DIM row per message; new messages are appended, re-indexed
+  messages overwrite their row in place
+- ivf.npz — IVF coarse index (k-means centroids + row → list assignments)
+
+Search filters rows by timestamp/workspace from in-memory columns, then
+scores candidates exactly with one matmul. Only when more than
+IVF_MIN_ROWS candidates remain does it score the nprobe closest IVF lists
+instead. Result rows match the search_cursor_messages RPC columns.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+from .config import get_data_dir
+from .semantic_search import EMBEDDING_DIM
+
+
+FLOAT_SIZE = 4  # float32
+
+# Exact scoring below this many candidate rows (~10ms at 1536 dims)
+IVF_MIN_ROWS = 50_000
+# Retrain the IVF index once the store has grown this much since training
+IVF_RETRAIN_GROWTH = 2.0
+IVF_TRAIN_ITERATIONS = 10
+IVF_TRAIN_SAMPLE_PER_LIST = 64
+
+# SQLite bound-parameter limit is 999 on older builds
+SQL_CHUNK_SIZE = 500
+
+MESSAGE_COLUMNS = "message_id, text, timestamp, workspace, chat_id, chat_type, message_type"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    row INTEGER PRIMARY KEY,
+    message_id TEXT UNIQUE NOT NULL,
+    text TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    workspace TEXT,
+    chat_id TEXT,
+    chat_type TEXT,
+    message_type TEXT,
+    source TEXT,
+    source_detail TEXT,
+    indexed_at TEXT,
+    has_embedding INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_messages_timestamp ON messages(timestamp);
+CREATE INDEX IF NOT EXISTS idx_messages_chat ON messages(workspace, chat_id, timestamp);
+"""
+
+
+def get_local_vector_db_dir() -> Path:
+    """Get directory of the local vector DB."""
+    return get_data_dir() / "local_vector_db"
+
+
+def _normalize_rows(vectors, dim: int) -> "np.ndarray":
+    matrix = np.asarray(vectors, dtype=np.float32).reshape(-1, dim)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1  # Avoid division by zero
+    return matrix / norms
+
+
+def _top_k(scores: "np.ndarray", top_k: int, min_similarity: float) -> "np.ndarray":
+    """Positions of the top_k scores >= min_similarity, highest first."""
+    candidates = np.flatnonzero(scores >= min_similarity)
+    if len(candidates) > top_k:
+        candidates = candidates[np.argpartition(scores[candidates], -top_k)[-top_k:]]
+    return candidates[np.argsort(-scores[candidates], kind="stable")]
+
+
+class LocalVectorDB:
+    """SQLite message rows + memory-mapped embedding matrix with an IVF index."""
+
+    def __init__(self, db_dir: Optional[Path] = None, dim: int = EMBEDDING_DIM):
+        if not NUMPY_AVAILABLE:
+            raise RuntimeError("numpy not available. Install with: pip install numpy")
+        self.dir = Path(db_dir or get_local_vector_db_dir())
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.dim = dim
+        self.row_bytes = dim * FLOAT_SIZE
+        self.matrix_path = self.dir / "embeddings.f32"
+        self.ivf_path = self.dir / "ivf.npz"
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(
+            self.dir / "messages.sqlite", check_same_thread=False, isolation_level=None, timeout=30
+        )
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(SCHEMA)
+
+        self._data_version = None
+        self._matrix = None
+        self._timestamps = None
+        self._workspace_codes = None
+        self._workspaces: dict[str, int] = {}
+        self._valid = None
+        self._ivf = None
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def upsert_messages(self, messages: list[dict]) -> tuple[int, int]:
+        """
+        Insert or update messages (index_messages_batch row format).
+
+        Args:
+            messages: Dicts with message_id, text, timestamp, workspace,
+                chat_id, chat_type, message_type, embedding and optionally
+                source, source_detail, indexed_at
+
+        Returns:
+            Tuple of (successful_count, failed_count)
+        """
+        rows: dict[str, dict] = {}
+        for msg in messages:
+            if msg.get("message_id") and msg.get("text", "").strip():
+                rows[msg["message_id"]] = msg
+        failed = len(messages) - len(rows)
+        if not rows:
+            return 0, failed
+
+        indexed_at = datetime.now().isoformat()
+        with self._lock:
+            # IMMEDIATE: row numbers are allocated under SQLite's write lock,
+            # so concurrent writer processes cannot claim the same rows
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                existing = self._rows_for_ids(list(rows))
+                next_row = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM messages").fetchone()[0]
+                assignments = []
+                for message_id, msg in rows.items():
+                    row = existing.get(message_id)
+                    if row is None:
+                        row, next_row = next_row, next_row + 1
+                    assignments.append((row, msg))
+
+                self._write_vectors(assignments)
+                self._conn.executemany(
+                    """INSERT OR REPLACE INTO messages
+                       (row, message_id, text, timestamp, workspace, chat_id, chat_type,
+                        message_type, source, source_detail, indexed_at, has_embedding)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                    [
+                        (
+                            row, msg["message_id"], msg["text"], int(msg.get("timestamp", 0)),
+                            msg.get("workspace"), msg.get("chat_id"), msg.get("chat_type"),
+                            msg.get("message_type"), msg.get("source", "cursor"),
+                            json.dumps(msg["source_detail"]) if msg.get("source_detail") is not None else None,
+                            msg.get("indexed_at", indexed_at), int(bool(msg.get("embedding"))),
+                        )
+                        for row, msg in assignments
+                    ],
+                )
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._data_version = None  # Reload columns on next search
+        return len(rows), failed
+
+    def _write_vectors(self, assignments: list[tuple[int, dict]]) -> None:
+        """Write normalized embeddings at their rows (zero rows for missing ones)."""
+        vectors = _normalize_rows([
+            msg.get("embedding") or [0.0] * self.dim for _, msg in assignments
+        ], self.dim)
+        fd = os.open(self.matrix_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with os.fdopen(fd, "r+b") as f:
+            for (row, _), vector in zip(assignments, vectors):
+                f.seek(row * self.row_bytes)
+                f.write(vector.tobytes())
+            f.flush()
+            os.fsync(f.fileno())
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    def _rows_for_ids(self, message_ids: list[str]) -> dict[str, int]:
+        found = {}
+        for i in range(0, len(message_ids), SQL_CHUNK_SIZE):
+            chunk = message_ids[i:i + SQL_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            for r in self._conn.execute(
+                f"SELECT message_id, row FROM messages WHERE message_id IN ({placeholders})", chunk
+            ):
+                found[r["message_id"]] = r["row"]
+        return found
+
+    def existing_message_ids(self, message_ids: list[str]) -> set[str]:
+        """Subset of message_ids already stored."""
+        with self._lock:
+            return set(self._rows_for_ids(message_ids))
+
+    def count(self) -> int:
+        """Number of stored messages."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM messages").fetchone()[0]
+
+    def fetch_messages(
+        self,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+        workspace_paths: Optional[list[str]] = None,
+        chat_ids: Optional[list[tuple[str, str]]] = None,
+    ) -> list[dict]:
+        """
+        Message rows (cursor_messages columns, no embedding) ordered by timestamp.
+
+        Args:
+            start_ts: Inclusive start timestamp (milliseconds)
+            end_ts: Exclusive end timestamp (milliseconds)
+            workspace_paths: Optional workspace filter
+            chat_ids: Optional (workspace, chat_id) filter
+        """
+        clauses, params = [], []
+        if start_ts is not None:
+            clauses.append("timestamp >= ?")
+            params.append(start_ts)
+        if end_ts is not None:
+            clauses.append("timestamp < ?")
+            params.append(end_ts)
+        if workspace_paths:
+            clauses.append(f"workspace IN ({','.join('?' * len(workspace_paths))})")
+            params.extend(workspace_paths)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        with self._lock:
+            if not chat_ids:
+                return [dict(r) for r in self._conn.execute(
+                    f"SELECT {MESSAGE_COLUMNS} FROM messages {where} ORDER BY timestamp", params
+                )]
+            rows = []
+            chat_clause = "workspace = ? AND chat_id = ?"
+            for workspace, chat_id in sorted(set(chat_ids)):
+                sql_where = f"{where} AND {chat_clause}" if where else f"WHERE {chat_clause}"
+                rows.extend(dict(r) for r in self._conn.execute(
+                    f"SELECT {MESSAGE_COLUMNS} FROM messages {sql_where} ORDER BY timestamp",
+                    params + [workspace, chat_id],
+                ))
+            return rows
+
+    def neighbors(self, anchors: list[dict], context_count: int) -> list[dict]:
+        """
+        Same rows as the get_cursor_message_neighbors RPC.
+
+        Args:
+            anchors: [{"workspace", "chat_id", "timestamp"}, ...]
+            context_count: Messages before/after each anchor
+        """
+        rows = []
+        with self._lock:
+            for anchor_index, anchor in enumerate(anchors):
+                key = (anchor["workspace"], anchor["chat_id"], anchor["timestamp"], context_count)
+                before = self._conn.execute(
+                    """SELECT text, timestamp, message_type FROM messages
+                       WHERE workspace = ? AND chat_id = ? AND timestamp < ?
+                       ORDER BY timestamp DESC LIMIT ?""", key,
+                ).fetchall()
+                after = self._conn.execute(
+                    """SELECT text, timestamp, message_type FROM messages
+                       WHERE workspace = ? AND chat_id = ? AND timestamp > ?
+                       ORDER BY timestamp ASC LIMIT ?""", key,
+                ).fetchall()
+                rows.extend({"anchor_index": anchor_index, "position": "before", **dict(r)} for r in reversed(before))
+                rows.extend({"anchor_index": anchor_index, "position": "after", **dict(r)} for r in after)
+        return rows
+
+    def sample_high_signal_chats(self, min_ts: int, max_conversations: int) -> list[dict]:
+        """
+        Local equivalent of the sample_high_signal_conversations RPC scoring.
+
+        Returns:
+            [{"workspace", "chat_id", "chat_type", "message_count", "user_effort_score"}]
+            best first
+        """
+        chats: dict[tuple[str, str, str], dict] = {}
+        for msg in self.fetch_messages(start_ts=min_ts):
+            key = (msg["workspace"], msg["chat_id"], msg["chat_type"])
+            stats = chats.setdefault(key, {"count": 0, "user": 0, "user_chars": 0, "structured": False})
+            text = msg["text"] or ""
+            stats["count"] += 1
+            if msg["message_type"] == "user":
+                stats["user"] += 1
+                stats["user_chars"] += len(text)
+            if "```" in text or re.match(r"(- |\d+\. |# )", text):
+                stats["structured"] = True
+
+        scored = []
+        for (workspace, chat_id, chat_type), stats in chats.items():
+            if stats["count"] < 2:
+                continue
+            user_ratio = stats["user"] / stats["count"]
+            score = min(100.0, np.log10(max(1, stats["user_chars"])) * 10)
+            score += 20 if stats["structured"] else 0
+            score -= 50 if stats["count"] < 4 else 0
+            score -= 20 if user_ratio < 0.1 or user_ratio > 0.9 else 0
+            scored.append({
+                "workspace": workspace, "chat_id": chat_id, "chat_type": chat_type,
+                "message_count": stats["count"], "user_effort_score": float(score),
+            })
+        scored.sort(key=lambda c: c["user_effort_score"], reverse=True)
+        return scored[:max_conversations]
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _refresh(self) -> None:
+        """Reload filter columns and the matrix mapping if the DB changed."""
+        data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if self._matrix is not None and data_version == self._data_version:
+            return
+
+        n_rows = self._conn.execute("SELECT COALESCE(MAX(row) + 1, 0) FROM messages").fetchone()[0]
+        timestamps = np.full(n_rows, -1, dtype=np.int64)
+        workspace_codes = np.full(n_rows, -1, dtype=np.int32)
+        valid = np.zeros(n_rows, dtype=bool)
+        workspaces: dict[str, int] = {}
+        for row, timestamp, workspace, has_embedding in self._conn.execute(
+            "SELECT row, timestamp, workspace, has_embedding FROM messages"
+        ):
+            timestamps[row] = timestamp
+            workspace_codes[row] = workspaces.setdefault(workspace, len(workspaces))
+            valid[row] = bool(has_embedding)
+
+        matrix_rows = self.matrix_path.stat().st_size // self.row_bytes if self.matrix_path.exists() else 0
+        if matrix_rows < n_rows:
+            raise RuntimeError(f"Local vector DB matrix has {matrix_rows} rows for {n_rows} messages")
+        self._matrix = (
+            np.memmap(self.matrix_path, dtype=np.float32, mode="r", shape=(n_rows, self.dim))
+            if n_rows else np.zeros((0, self.dim), dtype=np.float32)
+        )
+        self._timestamps, self._workspace_codes, self._valid = timestamps, workspace_codes, valid
+        self._workspaces = workspaces
+        self._data_version = data_version
+        self._ivf = self._load_ivf(n_rows) if valid.sum() > IVF_MIN_ROWS else None
+
+    def _candidate_rows(self, start_ts, end_ts, workspace_paths) -> "np.ndarray":
+        mask = self._valid.copy()
+        if start_ts is not None:
+            mask &= self._timestamps >= start_ts
+        if end_ts is not None:
+            mask &= self._timestamps < end_ts
+        if workspace_paths:
+            codes = [self._workspaces[w] for w in workspace_paths if w in self._workspaces]
+            mask &= np.isin(self._workspace_codes, codes)
+        return np.flatnonzero(mask)
+
+    def search(
+        self,
+        query_embeddings: list[list[float]],
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+        workspace_paths: Optional[list[str]] = None,
+        top_k: int = 10,
+        min_similarity: float = 0.0,
+    ) -> list[list[dict]]:
+        """
+        Cosine search for one or more query embeddings.
+
+        Args:
+            query_embeddings: Query vectors
+            start_ts: Inclusive start timestamp (milliseconds)
+            end_ts: Exclusive end timestamp (milliseconds)
+            workspace_paths: Optional workspace filter
+            top_k: Maximum results per query
+            min_similarity: Minimum cosine similarity
+
+        Returns:
+            Per query, rows with search_cursor_messages RPC columns + similarity
+        """
+        if not query_embeddings:
+            return []
+        queries = _normalize_rows(query_embeddings, self.dim)
+        with self._lock:
+            self._refresh()
+            candidates = self._candidate_rows(start_ts, end_ts, workspace_paths)
+            hits: list[list[tuple[int, float]]] = []
+            if len(candidates) <= IVF_MIN_ROWS or self._ivf is None:
+                # Exact: one matmul for all queries over the filtered rows
+                scores = queries @ np.asarray(self._matrix[candidates]).T if len(candidates) else np.zeros((len(queries), 0))
+                for query_scores in scores:
+                    top = _top_k(query_scores, top_k, min_similarity)
+                    hits.append([(int(candidates[i]), float(query_scores[i])) for i in top])
+            else:
+                in_filter = np.zeros(len(self._matrix), dtype=bool)
+                in_filter[candidates] = True
+                for query in queries:
+                    rows = self._ivf_rows(query)
+                    rows = rows[in_filter[rows]]
+                    query_scores = np.asarray(self._matrix[rows]) @ query
+                    top = _top_k(query_scores, top_k, min_similarity)
+                    hits.append([(int(rows[i]), float(query_scores[i])) for i in top])
+            return self._hydrate(hits)
+
+    def _hydrate(self, hits: list[list[tuple[int, float]]]) -> list[list[dict]]:
+        wanted = sorted({row for query_hits in hits for row, _ in query_hits})
+        records = {}
+        for i in range(0, len(wanted), SQL_CHUNK_SIZE):
+            chunk = wanted[i:i + SQL_CHUNK_SIZE]
+            for r in self._conn.execute(
+                f"SELECT row, {MESSAGE_COLUMNS} FROM messages WHERE row IN ({','.join('?' * len(chunk))})", chunk
+            ):
+                records[r["row"]] = dict(r)
+        return [
+            [{**records[row], "similarity": score} for row, score in query_hits if row in records]
+            for query_hits in hits
+        ]
+
+    # ------------------------------------------------------------------
+    # IVF index
+    # ------------------------------------------------------------------
+
+    def _load_ivf(self, n_rows: int) -> Optional[dict]:
+        ivf = None
+        if self.ivf_path.exists():
+            try:
+                with np.load(self.ivf_path) as data:
+                    ivf = {"centroids": data["centroids"], "assignments": data["assignments"]}
+            except (OSError, ValueError, KeyError):
+                ivf = None
+        if ivf is None or n_rows > IVF_RETRAIN_GROWTH * len(ivf["assignments"]):
+            ivf = self._train_ivf(n_rows)
+
+        # Rows appended since training join their closest list
+        assignments = ivf["assignments"][:n_rows]
+        if len(assignments) < n_rows:
+            extra = self._assign(ivf["centroids"], len(assignments), n_rows)
+            assignments = np.concatenate([assignments, extra])
+        order = np.argsort(assignments, kind="stable")
+        bounds = np.searchsorted(assignments[order], np.arange(len(ivf["centroids"]) + 1))
+        return {"centroids": ivf["centroids"], "order": order, "bounds": bounds,
+                "nprobe": max(8, len(ivf["centroids"]) // 16)}
+
+    def _assign(self, centroids: "np.ndarray", start: int, end: int, block: int = 16384) -> "np.ndarray":
+        parts = []
+        for i in range(start, end, block):
+            parts.append(np.argmax(np.asarray(self._matrix[i:min(i + block, end)]) @ centroids.T, axis=1))
+        return np.concatenate(parts).astype(np.int32) if parts else np.zeros(0, dtype=np.int32)
+
+    def _train_ivf(self, n_rows: int) -> dict:
+        """Spherical k-means over a sample of rows; persisted to ivf.npz."""
+        valid_rows = np.flatnonzero(self._valid)
+        n_lists = int(min(1024, max(16, np.sqrt(len(valid_rows)))))
+        rng = np.random.default_rng(0)
+        sample_size = min(len(valid_rows), n_lists * IVF_TRAIN_SAMPLE_PER_LIST)
+        sample = np.asarray(self._matrix[np.sort(rng.choice(valid_rows, sample_size, replace=False))])
+        centroids = sample[rng.choice(len(sample), n_lists, replace=False)].copy()
+        for _ in range(IVF_TRAIN_ITERATIONS):
+            labels = np.argmax(sample @ centroids.T, axis=1)
+            for c in range(n_lists):
+                members = sample[labels == c]
+                if len(members):
+                    centroids[c] = members.sum(axis=0)
+            centroids = _normalize_rows(centroids, self.dim)
+
+        assignments = self._assign(centroids, 0, n_rows)
+        try:
+            tmp_path = self.ivf_path.with_name("ivf.tmp.npz")
+            np.savez(tmp_path, centroids=centroids, assignments=assignments)
+            os.replace(tmp_path, self.ivf_path)
+        except OSError as e:
+            print(f"⚠️  Could not save IVF index: {e}", file=sys.stderr)
+        return {"centroids": centroids, "assignments": assignments}
+
+    def _ivf_rows(self, query: "np.ndarray") -> "np.ndarray":
+        ivf = self._ivf
+        probe = np.argsort(-(ivf["centroids"] @ query))[:ivf["nprobe"]]
+        return np.sort(np.concatenate([
+            ivf["order"][ivf["bounds"][c]:ivf["bounds"][c + 1]] for c in probe
+        ]))
+
+
+# Module-level store to avoid reopening the DB on every call
+_LOCAL_VECTOR_DB: Optional[LocalVectorDB] = None
+
+
+def get_local_vector_db() -> LocalVectorDB:
+    """Open the local vector DB once and reuse it."""
+    global _LOCAL_VECTOR_DB
+    if _LOCAL_VECTOR_DB is None:
+        _LOCAL_VECTOR_DB = LocalVectorDB()
+    return _LOCAL_VECTOR_DB
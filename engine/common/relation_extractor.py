@@ -57,6 +57,88 @@ If no clear relationships exist, return an empty array: []
 """
 
 
+_SKIP_LIST = {s.lower() for s in KG_SKIP_LIST}
+_VALID_RELATION_TYPES = {rt.value for rt in RelationType}
+
+
+def parse_relation_item(data: dict, skip_list: Optional[set[str]] = None) -> Optional[ExtractedRelation]:
+    """
+    Parse a single relation item from an LLM JSON response.
+    
+    Args:
+        data: Relation dict ({"source", "target", "relation", "evidence", "confidence"})
+        skip_list: Lowercased entity names to reject (default: KG_SKIP_LIST)
+        
+    Returns:
+        ExtractedRelation, or None if invalid
+    """
+    if skip_list is None:
+        skip_list = _SKIP_LIST
+
+    try:
+        source = data.get("source", "").strip()
+        target = data.get("target", "").strip()
+        relation = data.get("relation", "").upper().strip()
+        evidence = data.get("evidence", "").strip()
+        confidence = float(data.get("confidence", 0.8))
+
+        # Validate required fields
+        if not source or not target or not relation:
+            return None
+
+        # Skip if source or target is in skip list
+        if source.lower() in skip_list or target.lower() in skip_list:
+            return None
+
+        # Skip self-referential relations
+        if source.lower() == target.lower():
+            return None
+
+        # Validate relation type
+        if relation not in _VALID_RELATION_TYPES:
+            # Try to map common variations
+            relation_map = {
+                "USES": "USED_WITH",
+                "DEPENDS_ON": "REQUIRES",
+                "FIXES": "SOLVES",
+                "RESOLVES": "SOLVES",
+                "LEADS_TO": "CAUSES",
+                "TRIGGERS": "CAUSES",
+                "SUPPORTS": "ENABLES",
+                "ALLOWS": "ENABLES",
+                "IS_PART_OF": "PART_OF",
+                "BELONGS_TO": "PART_OF",
+                "REPLACES": "ALTERNATIVE_TO",
+                "SIMILAR_TO": "ALTERNATIVE_TO",
+                "NEEDS": "REQUIRES",
+                "REALIZES": "IMPLEMENTS",
+            }
+            relation = relation_map.get(relation, None)
+            if not relation:
+                return None
+
+        # Parse relation type
+        try:
+            relation_type = RelationType(relation)
+        except ValueError:
+            return None
+
+        # Clamp confidence
+        confidence = max(0.0, min(1.0, confidence))
+
+        return ExtractedRelation(
+            source_name=source,
+            target_name=target,
+            relation_type=relation_type,
+            evidence_snippet=evidence[:500] if evidence else None,
+            confidence=confidence,
+        )
+
+    except Exception as e:
+        print(f"[RelationExtractor] Parse error: {e}")
+        return None
+
+
 class RelationExtractor:
     """Extracts relationships between entities using LLM."""
 
@@ -199,68 +281,7 @@ class RelationExtractor:
 
     def _parse_relation(self, data: dict) -> Optional[ExtractedRelation]:
         """Parse a single relation from the LLM response."""
-        try:
-            source = data.get("source", "").strip()
-            target = data.get("target", "").strip()
-            relation = data.get("relation", "").upper().strip()
-            evidence = data.get("evidence", "").strip()
-            confidence = float(data.get("confidence", 0.8))
-
-            # Validate required fields
-            if not source or not target or not relation:
-                return None
-
-            # Skip if source or target is in skip list
-            if source.lower() in self.skip_list or target.lower() in self.skip_list:
-                return None
-
-            # Skip self-referential relations
-            if source.lower() == target.lower():
-                return None
-
-            # Validate relation type
-            if relation not in self.valid_relation_types:
-                # Try to map common variations
-                relation_map = {
-                    "USES": "USED_WITH",
-                    "DEPENDS_ON": "REQUIRES",
-                    "FIXES": "SOLVES",
-                    "RESOLVES": "SOLVES",
-                    "LEADS_TO": "CAUSES",
-                    "TRIGGERS": "CAUSES",
-                    "SUPPORTS": "ENABLES",
-                    "ALLOWS": "ENABLES",
-                    "IS_PART_OF": "PART_OF",
-                    "BELONGS_TO": "PART_OF",
-                    "REPLACES": "ALTERNATIVE_TO",
-                    "SIMILAR_TO": "ALTERNATIVE_TO",
-                    "NEEDS": "REQUIRES",
-                    "REALIZES": "IMPLEMENTS",
-                }
-                relation = relation_map.get(relation, None)
-                if not relation:
-                    return None
-
-            # Parse relation type
-            try:
-                relation_type = RelationType(relation)
-            except ValueError:
-                return None
-
-            # Clamp confidence
-            confidence = max(0.0, min(1.0, confidence))
-
-            return ExtractedRelation(
-                source_name=source,
-                target_name=target,
-                relation_type=relation_type,
-                evidence_snippet=evidence[:500] if evidence else None,
-                confidence=confidence,
-            )
-
-        except Exception as e:
-            print(f"[RelationExtractor] Parse error: {e}")
-            return None
+        return parse_relation_item(data, self.skip_list)
 
 
 # Module-level instance for convenience
@@ -4,7 +4,6 @@ Semantic Search — Embedding-based similarity search for chat history.
 Uses OpenAI text-embedding-3-small for embeddings and cosine similarity for matching.
 """
 
-import json
 import os
 import hashlib
 from pathlib import Path
@@ -25,6 +24,7 @@ except ImportError:
     OPENAI_AVAILABLE = False
 
 from .config import get_data_dir, load_env_file
+from .embedding_store import EmbeddingStore, open_embedding_store
 
 
 # Embedding model
@@ -33,7 +33,7 @@ EMBEDDING_DIM = 1536  # Dimension for text-embedding-3-small
 
 
 def get_embedding_cache_path() -> Path:
-    """Get path to embedding cache file."""
+    """Get path to the legacy JSON embedding cache (migrated into embedding_store)."""
     data_dir = get_data_dir()
     return data_dir / "embedding_cache.json"
 
@@ -97,18 +97,13 @@ def get_embedding(text: str, use_cache: bool = True, allow_fallback: bool = True
                 "Add your OpenAI API key to enable deduplication, search, and sync."
             )
     
-    cache_path = get_embedding_cache_path()
     cache_key = get_text_hash(text)
     
     # Try cache first
-    if use_cache and cache_path.exists():
-        try:
-            with open(cache_path) as f:
-                cache = json.load(f)
-                if cache_key in cache:
-                    return cache[cache_key]
-        except (json.JSONDecodeError, IOError):
-            pass
+    if use_cache:
+        cached = _get_embedding_cache().get(cache_key)
+        if cached is not None:
+            return cached
     
     # Generate embedding
     try:
@@ -127,18 +122,11 @@ def get_embedding(text: str, use_cache: bool = True, allow_fallback: bool = True
             ) from e
         raise
     
-    # Save to cache
+    # Save to cache (appends one row - no full-file rewrite)
     if use_cache:
         try:
-            cache = {}
-            if cache_path.exists():
-                with open(cache_path) as f:
-                    cache = json.load(f)
-            cache[cache_key] = embedding
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(cache_path, "w") as f:
-                json.dump(cache, f)
-        except (IOError, TypeError, ValueError):
+            _get_embedding_cache().put(cache_key, embedding)
+        except (IOError, OSError, ValueError):
             pass  # Cache write failed, but embedding is still valid
     
     return embedding
@@ -179,6 +167,53 @@ def cosine_similarity(vec1: list[float], vec2: list[float]) -> float:
         return dot_product / (norm1 * norm2)
 
 
+def find_duplicate_indices(embeddings: list[list[float] | None], threshold: float) -> list[int | None]:
+    """
+    Greedy in-batch dedup: each embedding is a duplicate of the first earlier
+    kept embedding with cosine similarity >= threshold.
+    
+    Computes all pairwise similarities with one matrix multiply instead of a
+    cosine_similarity call per pair. Missing, zero, or wrong-length
+    embeddings are always kept and never match.
+    
+    Args:
+        embeddings: Embeddings in priority order (earlier wins)
+        threshold: Similarity at or above which two items are duplicates
+    
+    Returns:
+        For each position, the index of the kept item it duplicates, or None if kept
+    """
+    duplicate_of: list[int | None] = [None] * len(embeddings)
+    dim = next((len(e) for e in embeddings if e), 0)
+    valid = [i for i, e in enumerate(embeddings) if e and len(e) == dim and any(e)]
+    if len(valid) <= 1:
+        return duplicate_of
+    
+    if not NUMPY_AVAILABLE:
+        kept: list[int] = []
+        for i in valid:
+            for j in kept:
+                if cosine_similarity(embeddings[i], embeddings[j]) >= threshold:
+                    duplicate_of[i] = j
+                    break
+            else:
+                kept.append(i)
+        return duplicate_of
+    
+    matrix = np.asarray([embeddings[i] for i in valid], dtype=np.float32)
+    matrix /= np.linalg.norm(matrix, axis=1, keepdims=True)
+    similar = (matrix @ matrix.T) >= threshold
+    
+    kept_mask = np.zeros(len(valid), dtype=bool)
+    for row in range(len(valid)):
+        matches = np.flatnonzero(similar[row, :row] & kept_mask[:row])
+        if len(matches):
+            duplicate_of[valid[row]] = valid[matches[0]]
+        else:
+            kept_mask[row] = True
+    return duplicate_of
+
+
 def search_messages(
     query: str,
     messages: list[dict],
@@ -234,6 +269,11 @@ def search_messages(
                 min_similarity=min_similarity,
             )
             
+            if vector_matches and not messages and context_messages > 0:
+                # No local messages to slice - fetch neighbors server-side in one query
+                from .vector_db import fetch_message_context
+                return fetch_message_context(vector_matches, context_messages)
+            
             if vector_matches:
                 # Add context from original messages list if available
                 for match in vector_matches:
@@ -321,28 +361,113 @@ def search_messages(
     return matches
 
 
-# Module-level cache to avoid reloading 295MB JSON on every batch
-_EMBEDDING_CACHE: dict | None = None
-_EMBEDDING_CACHE_LOADED = False
+def search_messages_multi(
+    queries: list[str],
+    top_k: int = 10,
+    min_similarity: float = 0.0,
+    start_timestamp: int | None = None,
+    end_timestamp: int | None = None,
+    workspace_paths: list[str] | None = None,
+) -> dict:
+    """
+    Run several vector DB searches with one embedding call and one RPC.
+    
+    Args:
+        queries: Search queries
+        top_k: Maximum number of results per query
+        min_similarity: Minimum similarity score threshold (0-1)
+        start_timestamp: Start timestamp filter (milliseconds)
+        end_timestamp: End timestamp filter (milliseconds)
+        workspace_paths: Workspace filter
+    
+    Returns:
+        {
+            "per_query": [[match, ...], ...],  # Aligned with queries (search_messages format)
+            "chats": [  # Hits merged by chat, best chat first
+                {
+                    "workspace": ..., "chat_id": ..., "chat_type": ...,
+                    "similarity": 0.85,  # Best match in the chat
+                    "query_indices": [0, 2],  # Queries that hit the chat
+                    "matches": [...],  # Unique messages, best first
+                },
+                ...
+            ],
+        }
+    """
+    try:
+        from .vector_db import search_messages_multi_vector_db
+        
+        per_query = search_messages_multi_vector_db(
+            queries,
+            start_timestamp=start_timestamp,
+            end_timestamp=end_timestamp,
+            workspace_paths=workspace_paths,
+            top_k=top_k,
+            min_similarity=min_similarity,
+        )
+    except Exception as e:
+        import sys
+        print(f"⚠️  Multi-query vector DB search failed: {e}", file=sys.stderr)
+        per_query = [[] for _ in queries]
+    
+    for matches in per_query:
+        for match in matches:
+            match.setdefault("context", {"before": [], "after": []})
+    
+    return {"per_query": per_query, "chats": _merge_matches_by_chat(per_query)}
+
+
+def _merge_matches_by_chat(per_query: list[list[dict]]) -> list[dict]:
+    """Group per-query matches by chat, keeping each message's best score."""
+    chats: dict[tuple[str, str, str], dict] = {}
+    for query_index, matches in enumerate(per_query):
+        for match in matches:
+            key = (
+                match.get("workspace", "Unknown"),
+                match.get("chat_id", "unknown"),
+                match.get("chat_type", "unknown"),
+            )
+            chat = chats.setdefault(key, {
+                "workspace": key[0],
+                "chat_id": key[1],
+                "chat_type": key[2],
+                "similarity": 0.0,
+                "query_indices": [],
+                "_messages": {},
+            })
+            if query_index not in chat["query_indices"]:
+                chat["query_indices"].append(query_index)
+            message = match.get("message", {})
+            message_key = (message.get("text"), message.get("timestamp"))
+            best = chat["_messages"].get(message_key)
+            if best is None or match["similarity"] > best["similarity"]:
+                chat["_messages"][message_key] = match
+            chat["similarity"] = max(chat["similarity"], match["similarity"])
+    
+    merged = []
+    for chat in chats.values():
+        chat["matches"] = sorted(chat.pop("_messages").values(), key=lambda m: m["similarity"], reverse=True)
+        merged.append(chat)
+    merged.sort(key=lambda c: c["similarity"], reverse=True)
+    return merged
+
+
+# Module-level store to avoid reopening the cache on every call
+_EMBEDDING_CACHE: EmbeddingStore | None = None
 
 
-def _get_embedding_cache() -> dict:
-    """Load embedding cache once and reuse (avoids 295MB JSON parse per batch)."""
-    global _EMBEDDING_CACHE, _EMBEDDING_CACHE_LOADED
-    if _EMBEDDING_CACHE_LOADED:
-        return _EMBEDDING_CACHE or {}
+def _get_embedding_cache() -> EmbeddingStore:
+    """
+    Open the embedding store once and reuse it.
     
-    cache_path = get_embedding_cache_path()
-    if cache_path.exists():
-        try:
-            with open(cache_path) as f:
-                _EMBEDDING_CACHE = json.load(f)
+    The store is an append-only float32 matrix + digest index (see embedding_store).
+    On first use, the legacy embedding_cache.json is migrated into it.
+    """
+    global _EMBEDDING_CACHE
+    if _EMBEDDING_CACHE is None:
+        _EMBEDDING_CACHE = open_embedding_store(EMBEDDING_DIM, legacy_json_path=get_embedding_cache_path())
+        if len(_EMBEDDING_CACHE):
             print(f"[Cache] Loaded {len(_EMBEDDING_CACHE):,} embeddings from cache", file=__import__('sys').stderr)
-        except (json.JSONDecodeError, IOError):
-            _EMBEDDING_CACHE = {}
-    else:
-        _EMBEDDING_CACHE = {}
-    _EMBEDDING_CACHE_LOADED = True
     return _EMBEDDING_CACHE
 
 
@@ -377,8 +502,8 @@ def batch_get_embeddings(texts: list[str], use_cache: bool = True, allow_fallbac
     if not non_empty_texts:
         return [[0.0] * EMBEDDING_DIM] * len(texts)
     
-    # Use module-level cache (loaded once, not per batch)
-    cache = _get_embedding_cache() if use_cache else {}
+    # Use module-level store (opened once, not per batch)
+    cache = _get_embedding_cache() if use_cache else None
     
     # Check cache for each text
     indices_to_fetch = []
@@ -386,9 +511,9 @@ def batch_get_embeddings(texts: list[str], use_cache: bool = True, allow_fallbac
     embeddings_result = [None] * len(texts)
     
     for i, text in non_empty_texts:
-        cache_key = get_text_hash(text)
-        if use_cache and cache_key in cache:
-            embeddings_result[i] = cache[cache_key]
+        cached = cache.get(get_text_hash(text)) if use_cache else None
+        if cached is not None:
+            embeddings_result[i] = cached
         else:
             indices_to_fetch.append(i)
             texts_to_fetch.append(text)
@@ -405,25 +530,19 @@ def batch_get_embeddings(texts: list[str], use_cache: bool = True, allow_fallbac
                     input=texts_to_fetch,
                 )
                 
-                # Update cache and results
-                for idx, embedding_data in zip(indices_to_fetch, response.data):
+                # Update results
+                new_entries = []
+                for idx, text, embedding_data in zip(indices_to_fetch, texts_to_fetch, response.data):
                     embedding = embedding_data.embedding
                     embeddings_result[idx] = embedding
-                    
-                    # Update cache
                     if use_cache:
-                        text = texts_to_fetch[indices_to_fetch.index(idx)]
-                        cache_key = get_text_hash(text)
-                        cache[cache_key] = embedding
+                        new_entries.append((get_text_hash(text), embedding))
                 
-                # Save updated cache
-                if use_cache:
+                # Append new vectors to the store (no full-cache rewrite)
+                if new_entries:
                     try:
-                        cache_path = get_embedding_cache_path()
-                        cache_path.parent.mkdir(parents=True, exist_ok=True)
-                        with open(cache_path, "w") as f:
-                            json.dump(cache, f)
-                    except (IOError, TypeError, ValueError):
+                        cache.put_many(new_entries)
+                    except (IOError, OSError, ValueError):
                         pass
                 
                 # Success - break out of retry loop
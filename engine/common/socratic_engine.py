@@ -10,25 +10,38 @@ Aggregates data from:
 
 Then generates 8-12 probing questions via LLM that challenge the user's
 patterns, surface blind spots, and prompt genuine self-reflection.
+
+The Library is fetched once per aggregation (a shared snapshot) and the
+independent aggregators run concurrently, so building the context costs
+about as much as its slowest component.
 """
 
 import json
 import sys
 import hashlib
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional
 
+from .clustering import seed_cluster_embeddings
 from .config import get_data_dir, load_config
 from .llm import call_llm
 from .vector_db import get_supabase_client
-from .lenny_search import search_lenny_archive
+from .lenny_search import search_lenny_archive_batch
 
 
 # Cache settings
 CACHE_TTL_HOURS = 24
 CACHE_FILE = "socratic_cache.json"
 
+# Concurrent aggregators (patterns, unexplored, counter-intuitive, stats, experts, shifts)
+AGGREGATOR_WORKERS = 6
+
+# Pattern clustering
+PATTERN_SIMILARITY_THRESHOLD = 0.70
+
 
 def get_cache_path() -> Path:
     """Get path to Socratic question cache."""
@@ -69,17 +82,20 @@ def save_to_cache(questions: list[dict]) -> None:
     tmp_path.rename(cache_path)
 
 
-def aggregate_patterns(client) -> list[dict]:
+def aggregate_patterns(client, items: Optional[list[dict]] = None) -> list[dict]:
     """
     Get Library item clusters (same logic as Theme Explorer Patterns tab).
     
+    Args:
+        client: Supabase client (used only when items is None)
+        items: Library snapshot from get_all_items
+    
     Returns top clusters with names, sizes, and sample items.
     """
     from .items_bank_supabase import get_all_items
-    from .semantic_search import batch_get_embeddings
-    import numpy as np
     
-    items = get_all_items(client)
+    if items is None:
+        items = get_all_items(client)
     if not items or len(items) < 5:
         return []
     
@@ -95,28 +111,11 @@ def aggregate_patterns(client) -> list[dict]:
     
     # Simple clustering by similarity (reuse Theme Explorer logic)
     # Group items by cosine similarity > threshold
-    threshold = 0.70
-    clusters = []
-    used = set()
-    
     embeddings = [item["embedding"] for item in items_with_embeddings]
+    clusters = []
     
-    for i, item_a in enumerate(items_with_embeddings):
-        if i in used:
-            continue
-        
-        cluster = [item_a]
-        used.add(i)
-        
-        for j, item_b in enumerate(items_with_embeddings):
-            if j in used:
-                continue
-            
-            # Cosine similarity
-            sim = _cosine_similarity(embeddings[i], embeddings[j])
-            if sim >= threshold:
-                cluster.append(item_b)
-                used.add(j)
+    for indices in seed_cluster_embeddings(embeddings, PATTERN_SIMILARITY_THRESHOLD):
+        cluster = [items_with_embeddings[i] for i in indices]
         
         if len(cluster) >= 2:
             # Generate cluster name from titles
@@ -188,13 +187,18 @@ def aggregate_counter_intuitive() -> dict:
     return {"saved": saved[:5], "dismissed": dismissed[:5]}
 
 
-def aggregate_library_stats(client) -> dict:
+def aggregate_library_stats(client, items: Optional[list[dict]] = None) -> dict:
     """
     Get Library statistics for temporal and type analysis.
+    
+    Args:
+        client: Supabase client (used only when items is None)
+        items: Library snapshot from get_all_items
     """
     from .items_bank_supabase import get_all_items
     
-    items = get_all_items(client)
+    if items is None:
+        items = get_all_items(client)
     if not items:
         return {"totalItems": 0, "byType": {}, "oldestItemDate": None, "newestItemDate": None}
     
@@ -224,41 +228,50 @@ def aggregate_expert_matches(patterns: list[dict]) -> list[dict]:
     For top patterns, find matching expert perspectives from Lenny's archive.
     """
     matches = []
+    top_patterns = patterns[:5]  # Top 5 patterns
+    if not top_patterns:
+        return matches
     
-    for pattern in patterns[:5]:  # Top 5 patterns
-        try:
-            results = search_lenny_archive(
-                query=pattern["name"],
-                top_k=1,
-                min_similarity=0.4,
-            )
-            
-            if results:
-                best = results[0]
-                matches.append({
-                    "theme": pattern["name"],
-                    "expertQuote": best.text[:200],
-                    "guestName": best.guest_name,
-                    "episodeTitle": best.episode_title or best.episode_filename,
-                    "similarity": round(best.similarity, 2),
-                })
-        except Exception as e:
-            # Lenny search might not be available
-            print(f"  ⚠️  Expert match failed for '{pattern['name']}': {e}", file=sys.stderr)
-            continue
+    try:
+        # One embedding request + one matrix product for all patterns
+        batch_results = search_lenny_archive_batch(
+            [pattern["name"] for pattern in top_patterns],
+            top_k=1,
+            min_similarity=0.4,
+        )
+    except Exception as e:
+        # Lenny search might not be available
+        print(f"  ⚠️  Expert matching failed: {e}", file=sys.stderr)
+        return matches
+    
+    for pattern, results in zip(top_patterns, batch_results):
+        if results:
+            best = results[0]
+            matches.append({
+                "theme": pattern["name"],
+                "expertQuote": best.content[:200],
+                "guestName": best.guest_name,
+                "episodeTitle": best.episode_title or best.episode_filename,
+                "similarity": round(best.similarity, 2),
+            })
     
     return matches
 
 
-def aggregate_temporal_shifts(client) -> list[dict]:
+def aggregate_temporal_shifts(client, items: Optional[list[dict]] = None) -> list[dict]:
     """
     Detect themes that have appeared, disappeared, or shifted over time.
     
     Compares recent Library items (last 30 days) vs older items to find shifts.
+    
+    Args:
+        client: Supabase client (used only when items is None)
+        items: Library snapshot from get_all_items
     """
     from .items_bank_supabase import get_all_items
     
-    items = get_all_items(client)
+    if items is None:
+        items = get_all_items(client)
     if not items or len(items) < 10:
         return []
     
@@ -324,32 +337,47 @@ def aggregate_socratic_context(use_cache: bool = True) -> dict:
         print("⚠️  Supabase not available. Socratic mode requires Full Setup.", file=sys.stderr)
         return {}
     
-    print("📊 Aggregating Socratic context...", flush=True)
-    
-    # Aggregate all sources
-    print("  → Patterns (Library clusters)...", flush=True)
-    patterns = aggregate_patterns(client)
-    print(f"    ✓ {len(patterns)} pattern clusters", flush=True)
-    
-    print("  → Unexplored areas (Memory gaps)...", flush=True)
-    unexplored = aggregate_unexplored(client)
-    print(f"    ✓ {len(unexplored)} unexplored topics", flush=True)
-    
-    print("  → Counter-intuitive perspectives...", flush=True)
-    counter_intuitive = aggregate_counter_intuitive()
-    print(f"    ✓ {len(counter_intuitive.get('saved', []))} saved, {len(counter_intuitive.get('dismissed', []))} dismissed", flush=True)
-    
-    print("  → Library stats...", flush=True)
-    library_stats = aggregate_library_stats(client)
-    print(f"    ✓ {library_stats['totalItems']} items", flush=True)
+    from .items_bank_supabase import get_all_items
     
-    print("  → Expert matches (Lenny's archive)...", flush=True)
-    expert_matches = aggregate_expert_matches(patterns)
-    print(f"    ✓ {len(expert_matches)} expert matches", flush=True)
+    print("📊 Aggregating Socratic context...", flush=True)
+    start = time.time()
     
-    print("  → Temporal shifts...", flush=True)
-    temporal_shifts = aggregate_temporal_shifts(client)
-    print(f"    ✓ {len(temporal_shifts)} shifts detected", flush=True)
+    # One Library snapshot shared by patterns, stats and temporal shifts
+    print("  → Library snapshot...", flush=True)
+    items = get_all_items(client)
+    print(f"    ✓ {len(items)} items ({time.time() - start:.2f}s)", flush=True)
+    
+    def timed(fn, *args):
+        fn_start = time.time()
+        return fn(*args), time.time() - fn_start
+    
+    with ThreadPoolExecutor(max_workers=AGGREGATOR_WORKERS) as executor:
+        futures = {
+            "patterns": executor.submit(timed, aggregate_patterns, client, items),
+            "unexplored": executor.submit(timed, aggregate_unexplored, client),
+            "counter_intuitive": executor.submit(timed, aggregate_counter_intuitive),
+            "library_stats": executor.submit(timed, aggregate_library_stats, client, items),
+            "temporal_shifts": executor.submit(timed, aggregate_temporal_shifts, client, items),
+        }
+        # Expert matching needs the pattern names; it starts as soon as they are ready
+        futures["expert_matches"] = executor.submit(
+            lambda: timed(aggregate_expert_matches, futures["patterns"].result()[0])
+        )
+        results = {name: future.result() for name, future in futures.items()}
+    
+    patterns, t = results["patterns"]
+    print(f"  ✓ Patterns (Library clusters): {len(patterns)} pattern clusters ({t:.2f}s)", flush=True)
+    unexplored, t = results["unexplored"]
+    print(f"  ✓ Unexplored areas (Memory gaps): {len(unexplored)} unexplored topics ({t:.2f}s)", flush=True)
+    counter_intuitive, t = results["counter_intuitive"]
+    print(f"  ✓ Counter-intuitive perspectives: {len(counter_intuitive.get('saved', []))} saved, {len(counter_intuitive.get('dismissed', []))} dismissed ({t:.2f}s)", flush=True)
+    library_stats, t = results["library_stats"]
+    print(f"  ✓ Library stats: {library_stats['totalItems']} items ({t:.2f}s)", flush=True)
+    expert_matches, t = results["expert_matches"]
+    print(f"  ✓ Expert matches (Lenny's archive): {len(expert_matches)} expert matches ({t:.2f}s)", flush=True)
+    temporal_shifts, t = results["temporal_shifts"]
+    print(f"  ✓ Temporal shifts: {len(temporal_shifts)} shifts detected ({t:.2f}s)", flush=True)
+    print(f"  ⏱️  Context built in {time.time() - start:.2f}s", flush=True)
     
     context = {
         "patterns": patterns,
@@ -499,17 +527,6 @@ def mark_resonated(question_id: str) -> bool:
 
 # --- Helper functions ---
 
-def _cosine_similarity(a: list[float], b: list[float]) -> float:
-    """Compute cosine similarity between two vectors."""
-    import math
-    dot = sum(x * y for x, y in zip(a, b))
-    norm_a = math.sqrt(sum(x * x for x in a))
-    norm_b = math.sqrt(sum(x * x for x in b))
-    if norm_a == 0 or norm_b == 0:
-        return 0.0
-    return dot / (norm_a * norm_b)
-
-
 def _generate_cluster_name(titles: list[str]) -> str:
     """Generate a readable cluster name from item titles."""
     # Simple word frequency approach
@@ -33,6 +33,7 @@ except ImportError:
     Client = None
 
 from common.config import load_env_file
+from common.clustering import NUMPY_AVAILABLE, cluster_embeddings, embeddings_to_matrix
 from common.semantic_search import cosine_similarity
 
 
@@ -107,33 +108,16 @@ def cluster_by_similarity(
     Returns:
         List of clusters (each cluster is a list of items)
     """
-    clusters: list[list[dict]] = []
-    
-    for item in items:
-        embedding = item.get(embedding_key)
-        if not embedding or not isinstance(embedding, list):
-            continue
-        
-        best_cluster_idx = None
-        best_similarity = 0
-        
-        # Find best matching cluster
-        for idx, cluster in enumerate(clusters):
-            representative = cluster[0]
-            rep_embedding = representative.get(embedding_key)
-            if rep_embedding:
-                similarity = cosine_similarity(embedding, rep_embedding)
-                if similarity >= threshold and similarity > best_similarity:
-                    best_similarity = similarity
-                    best_cluster_idx = idx
-        
-        if best_cluster_idx is not None:
-            clusters[best_cluster_idx].append(item)
-        else:
-            # Create new cluster
-            clusters.append([item])
+    items = [
+        item for item in items
+        if item.get(embedding_key) and isinstance(item.get(embedding_key), list)
+    ]
+    if not items:
+        return []
     
-    return clusters
+    # Vectorized greedy clustering (same threshold semantics as pairwise loop)
+    index_clusters = cluster_embeddings([item[embedding_key] for item in items], threshold)
+    return [[items[i] for i in indices] for indices in index_clusters]
 
 
 def parse_embedding(embedding_data) -> Optional[list[float]]:
@@ -361,6 +345,11 @@ def detect_memory_library_mismatch(
     # Step 3: Check coverage
     unexplored_areas: list[UnexploredArea] = []
     
+    # Library representatives as one normalized matrix (one matvec per topic)
+    lib_rep_matrix = None
+    if NUMPY_AVAILABLE and library_clusters:
+        lib_rep_matrix = embeddings_to_matrix([c[0]["embedding"] for c in library_clusters])
+    
     for idx, conv_cluster in enumerate(conversation_clusters):
         if len(conv_cluster) < min_conversations:
             continue
@@ -374,13 +363,20 @@ def detect_memory_library_mismatch(
         best_library_coverage = 0
         library_items_covering = 0
         
-        for lib_cluster in library_clusters:
-            lib_rep_embedding = lib_cluster[0].get("embedding")
-            if lib_rep_embedding:
-                similarity = cosine_similarity(rep_embedding, lib_rep_embedding)
-                if similarity > best_library_coverage:
-                    best_library_coverage = similarity
-                    library_items_covering = len(lib_cluster)
+        if lib_rep_matrix is not None:
+            sims = lib_rep_matrix @ embeddings_to_matrix([rep_embedding])[0]
+            best = int(sims.argmax())
+            if sims[best] > 0:
+                best_library_coverage = float(sims[best])
+                library_items_covering = len(library_clusters[best])
+        else:
+            for lib_cluster in library_clusters:
+                lib_rep_embedding = lib_cluster[0].get("embedding")
+                if lib_rep_embedding:
+                    similarity = cosine_similarity(rep_embedding, lib_rep_embedding)
+                    if similarity > best_library_coverage:
+                        best_library_coverage = similarity
+                        library_items_covering = len(lib_cluster)
         
         # Determine if this is unexplored
         is_covered = best_library_coverage >= coverage_threshold and library_items_covering >= 2
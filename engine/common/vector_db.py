@@ -2,12 +2,15 @@
 Vector Database — Supabase pgvector integration for efficient semantic search.
 
 Pre-indexes all Cursor chat messages with embeddings for fast similarity search.
+
+With config "vectorDb": {"backend": "local"} the same functions read and
+write the embedded store in local_vector_db.py instead of Supabase.
 """
 
 import os
 import json
 from datetime import datetime, timedelta
-from typing import Any, Optional
+from typing import Any, Callable, Iterable, Iterator, Optional
 from pathlib import Path
 
 try:
@@ -17,8 +20,13 @@ except ImportError:
     SUPABASE_AVAILABLE = False
     Client = None
 
-from .config import get_data_dir, load_env_file
-from .semantic_search import get_embedding, EMBEDDING_DIM, get_openai_client
+from .config import get_data_dir, load_env_file, get_vector_db_backend
+from .semantic_search import get_embedding, batch_get_embeddings, EMBEDDING_DIM, get_openai_client
+
+
+# Reuse one client per (url, key) - long-lived processes (API server) would
+# otherwise build a new HTTP client for every call
+_supabase_clients: dict[tuple[str, str], Client] = {}
 
 
 def get_supabase_client() -> Optional[Client]:
@@ -33,7 +41,30 @@ def get_supabase_client() -> Optional[Client]:
     if not supabase_url or not supabase_key:
         return None
     
-    return create_client(supabase_url, supabase_key)
+    cache_key = (supabase_url, supabase_key)
+    client = _supabase_clients.get(cache_key)
+    if client is None:
+        client = create_client(supabase_url, supabase_key)
+        _supabase_clients[cache_key] = client
+    return client
+
+
+def is_local_vector_db() -> bool:
+    """Whether messages live in the embedded local store instead of Supabase."""
+    return get_vector_db_backend() == "local"
+
+
+def is_vector_db_configured() -> bool:
+    """Whether the configured vector DB backend is usable."""
+    if is_local_vector_db():
+        from .local_vector_db import NUMPY_AVAILABLE
+        return NUMPY_AVAILABLE
+    return get_supabase_client() is not None
+
+
+def _local_db():
+    from .local_vector_db import get_local_vector_db
+    return get_local_vector_db()
 
 
 def get_sync_state_path() -> Path:
@@ -183,23 +214,29 @@ def index_message(
         except Exception:
             return False
 
+    row = {
+        "message_id": message_id,
+        "text": text,
+        "embedding": embedding,
+        "timestamp": timestamp,  # Chat timestamp (when message was sent/received)
+        "workspace": workspace,
+        "chat_id": chat_id,
+        "chat_type": chat_type,
+        "message_type": message_type,
+        "source": source,
+        "source_detail": source_detail,
+        "indexed_at": datetime.now().isoformat(),  # DB entry timestamp (when indexed)
+    }
+
     try:
+        if is_local_vector_db():
+            successful, _ = _local_db().upsert_messages([row])
+            return successful > 0
+
         # Insert or update message in vector DB
         # timestamp = chat message timestamp (when chat occurred)
         # indexed_at = when we indexed it (now)
-        result = client.table("cursor_messages").upsert({
-            "message_id": message_id,
-            "text": text,
-            "embedding": embedding,
-            "timestamp": timestamp,  # Chat timestamp (when message was sent/received)
-            "workspace": workspace,
-            "chat_id": chat_id,
-            "chat_type": chat_type,
-            "message_type": message_type,
-            "source": source,
-            "source_detail": source_detail,
-            "indexed_at": datetime.now().isoformat(),  # DB entry timestamp (when indexed)
-        }).execute()
+        result = client.table("cursor_messages").upsert(row).execute()
 
         return len(result.data) > 0
     except Exception:
@@ -269,9 +306,16 @@ def index_messages_batch(
     if not batch_data:
         return 0, 0
     
+    import sys
+    if is_local_vector_db():
+        try:
+            return _local_db().upsert_messages(batch_data)
+        except Exception as e:
+            print(f"⚠️  Local vector DB upsert failed: {e}", file=sys.stderr)
+            return 0, len(batch_data)
+    
     # Upsert in sub-batches of 50 to stay within Supabase statement timeout.
     # Each row carries a 1536-dim embedding (~12KB), so 50 rows ≈ 600KB per call.
-    import sys
     upsert_chunk_size = 50
     total_successful = 0
     total_failed = 0
@@ -290,6 +334,21 @@ def index_messages_batch(
     return total_successful, total_failed
 
 
+def _row_to_match(row: dict) -> dict:
+    """Convert a search RPC row to the match format used by search_messages."""
+    return {
+        "message": {
+            "text": row.get("text", ""),
+            "timestamp": row.get("timestamp", 0),
+            "type": row.get("message_type", "user"),
+        },
+        "similarity": float(row.get("similarity", 0.0)),
+        "workspace": row.get("workspace", "Unknown"),
+        "chat_id": row.get("chat_id", "unknown"),
+        "chat_type": row.get("chat_type", "unknown"),
+    }
+
+
 def search_messages_vector_db(
     query: str,
     start_timestamp: Optional[int] = None,
@@ -297,6 +356,7 @@ def search_messages_vector_db(
     workspace_paths: Optional[list[str]] = None,
     top_k: int = 10,
     min_similarity: float = 0.0,
+    query_embedding: Optional[list[float]] = None,
 ) -> list[dict]:
     """
     Search messages using vector similarity in Supabase.
@@ -308,19 +368,33 @@ def search_messages_vector_db(
         workspace_paths: Optional workspace filter
         top_k: Maximum number of results
         min_similarity: Minimum similarity threshold
+        query_embedding: Pre-computed embedding of query (skips the API call)
     
     Returns:
         List of matching messages with similarity scores
     """
-    client = get_supabase_client()
-    if not client:
+    local = is_local_vector_db()
+    client = None if local else get_supabase_client()
+    if not client and not local:
         return []
     
     # Get query embedding
-    try:
-        query_embedding = get_embedding(query)
-    except Exception:
-        return []
+    if query_embedding is None:
+        try:
+            query_embedding = get_embedding(query)
+        except Exception:
+            return []
+    
+    if local:
+        rows = _local_db().search(
+            [query_embedding],
+            start_ts=start_timestamp,
+            end_ts=end_timestamp,
+            workspace_paths=workspace_paths,
+            top_k=top_k,
+            min_similarity=min_similarity,
+        )[0]
+        return [_row_to_match(row) for row in rows]
     
     # Use pgvector RPC function for optimized similarity search
     # This uses the HNSW index and runs on the database server (much faster)
@@ -344,21 +418,7 @@ def search_messages_vector_db(
         result = client.rpc("search_cursor_messages", rpc_params).execute()
         
         # Transform results to match expected format
-        matches = []
-        for row in result.data:
-            matches.append({
-                "message": {
-                    "text": row.get("text", ""),
-                    "timestamp": row.get("timestamp", 0),
-                    "type": row.get("message_type", "user"),
-                },
-                "similarity": float(row.get("similarity", 0.0)),
-                "workspace": row.get("workspace", "Unknown"),
-                "chat_id": row.get("chat_id", "unknown"),
-                "chat_type": row.get("chat_type", "unknown"),
-            })
-        
-        return matches
+        return [_row_to_match(row) for row in result.data]
         
     except Exception as e:
         # Fallback to client-side search if RPC fails (for debugging)
@@ -458,8 +518,202 @@ def search_messages_vector_db(
         return result_matches
 
 
+def search_messages_multi_vector_db(
+    queries: list[str],
+    start_timestamp: Optional[int] = None,
+    end_timestamp: Optional[int] = None,
+    workspace_paths: Optional[list[str]] = None,
+    top_k: int = 10,
+    min_similarity: float = 0.0,
+) -> list[list[dict]]:
+    """
+    Run several vector searches with one embedding call and one RPC.
+    
+    Uses search_cursor_messages_multi (migration 009); if that function is
+    missing, falls back to one search_cursor_messages call per query with the
+    already-computed embeddings.
+    
+    Args:
+        queries: Search query texts
+        start_timestamp: Start timestamp filter (milliseconds)
+        end_timestamp: End timestamp filter (milliseconds)
+        workspace_paths: Optional workspace filter
+        top_k: Maximum number of results per query
+        min_similarity: Minimum similarity threshold
+    
+    Returns:
+        One list of matches (search_messages_vector_db format) per query
+    """
+    local = is_local_vector_db()
+    client = None if local else get_supabase_client()
+    if (not client and not local) or not queries:
+        return [[] for _ in queries]
+    
+    # One batched embedding call for all queries
+    try:
+        query_embeddings = batch_get_embeddings(queries, allow_fallback=False)
+    except Exception:
+        return [[] for _ in queries]
+    
+    if local:
+        per_query_rows = _local_db().search(
+            query_embeddings,
+            start_ts=start_timestamp,
+            end_ts=end_timestamp,
+            workspace_paths=workspace_paths,
+            top_k=top_k,
+            min_similarity=min_similarity,
+        )
+        return [[_row_to_match(row) for row in rows] for rows in per_query_rows]
+    
+    rpc_params = {
+        "query_embeddings": query_embeddings,
+        "match_threshold": min_similarity,
+        "match_count": top_k,
+    }
+    if start_timestamp is not None:
+        rpc_params["start_ts"] = start_timestamp
+    if end_timestamp is not None:
+        rpc_params["end_ts"] = end_timestamp
+    if workspace_paths:
+        rpc_params["workspace_filter"] = workspace_paths
+    
+    try:
+        result = client.rpc("search_cursor_messages_multi", rpc_params).execute()
+    except Exception as e:
+        import sys
+        print(f"⚠️  Multi-query RPC failed, running {len(queries)} single-query searches: {e}", file=sys.stderr)
+        if "does not exist" in str(e).lower() or "PGRST202" in str(e):
+            print(f"   To fix: Run engine/scripts/migrations/009_search_cursor_messages_multi.sql", file=sys.stderr)
+        return [
+            search_messages_vector_db(
+                query,
+                start_timestamp=start_timestamp,
+                end_timestamp=end_timestamp,
+                workspace_paths=workspace_paths,
+                top_k=top_k,
+                min_similarity=min_similarity,
+                query_embedding=embedding,
+            )
+            for query, embedding in zip(queries, query_embeddings)
+        ]
+    
+    per_query: list[list[dict]] = [[] for _ in queries]
+    for row in result.data or []:
+        query_index = row.get("query_index")
+        if query_index is not None and 0 <= query_index < len(queries):
+            per_query[query_index].append(_row_to_match(row))
+    return per_query
+
+
+def fetch_message_context(matches: list[dict], context_messages: int = 2) -> list[dict]:
+    """
+    Attach the messages before/after each search hit (same chat, by timestamp).
+    
+    Uses one get_cursor_message_neighbors RPC for all hits (migration 010);
+    if that function is missing, reads the hit chats with one query per
+    workspace and slices neighbors locally.
+    
+    Args:
+        matches: Search matches (search_messages_vector_db format)
+        context_messages: Number of messages before/after each hit
+    
+    Returns:
+        matches, each with "context": {"before": [...], "after": [...]}
+    """
+    for match in matches:
+        match["context"] = {"before": [], "after": []}
+    
+    local = is_local_vector_db()
+    client = None if local else get_supabase_client()
+    if (not client and not local) or not matches or context_messages <= 0:
+        return matches
+    
+    anchors = [
+        {
+            "workspace": match.get("workspace", "Unknown"),
+            "chat_id": match.get("chat_id", "unknown"),
+            "timestamp": match.get("message", {}).get("timestamp", 0),
+        }
+        for match in matches
+    ]
+    
+    try:
+        if local:
+            rows = _local_db().neighbors(anchors, context_messages)
+        else:
+            result = client.rpc("get_cursor_message_neighbors", {
+                "anchors": anchors,
+                "context_count": context_messages,
+            }).execute()
+            rows = result.data or []
+    except Exception as e:
+        if local:
+            raise
+        import sys
+        print(f"⚠️  Neighbor RPC failed, reading hit chats instead: {e}", file=sys.stderr)
+        if "does not exist" in str(e).lower() or "PGRST202" in str(e):
+            print(f"   To fix: Run engine/scripts/migrations/010_cursor_message_neighbors.sql", file=sys.stderr)
+        rows = _neighbor_rows_from_chats(client, anchors, context_messages)
+    
+    for row in rows:
+        anchor_index = row.get("anchor_index")
+        position = row.get("position")
+        if anchor_index is None or not 0 <= anchor_index < len(matches) or position not in ("before", "after"):
+            continue
+        matches[anchor_index]["context"][position].append({
+            "type": row.get("message_type", "user"),
+            "text": row.get("text", ""),
+            "timestamp": row.get("timestamp", 0),
+        })
+    return matches
+
+
+def _neighbor_rows_from_chats(client: Client, anchors: list[dict], context_count: int) -> list[dict]:
+    """Fallback for get_cursor_message_neighbors: same rows, computed client-side."""
+    from bisect import bisect_left, bisect_right
+    
+    chat_ids_by_workspace: dict[str, set[str]] = {}
+    for anchor in anchors:
+        chat_ids_by_workspace.setdefault(anchor["workspace"], set()).add(anchor["chat_id"])
+    
+    chats: dict[tuple[str, str], list[dict]] = {}
+    for workspace, chat_ids in chat_ids_by_workspace.items():
+        result = (
+            client.table("cursor_messages")
+            .select("chat_id,text,timestamp,message_type")
+            .eq("workspace", workspace)
+            .in_("chat_id", sorted(chat_ids))
+            .execute()
+        )
+        for row in result.data or []:
+            chats.setdefault((workspace, row.get("chat_id")), []).append(row)
+    
+    for chat_messages in chats.values():
+        chat_messages.sort(key=lambda m: m.get("timestamp", 0))
+    
+    rows = []
+    for anchor_index, anchor in enumerate(anchors):
+        chat_messages = chats.get((anchor["workspace"], anchor["chat_id"]), [])
+        timestamps = [m.get("timestamp", 0) for m in chat_messages]
+        lo = bisect_left(timestamps, anchor["timestamp"])
+        hi = bisect_right(timestamps, anchor["timestamp"])
+        for position, window in (
+            ("before", chat_messages[max(0, lo - context_count):lo]),
+            ("after", chat_messages[hi:hi + context_count]),
+        ):
+            rows.extend({"anchor_index": anchor_index, "position": position, **m} for m in window)
+    return rows
+
+
 def get_message_count(client: Optional[Client] = None) -> int:
     """Get total number of indexed messages."""
+    if is_local_vector_db():
+        try:
+            return _local_db().count()
+        except Exception:
+            return 0
+    
     if client is None:
         client = get_supabase_client()
     
@@ -484,6 +738,14 @@ def get_existing_message_ids(message_ids: list[str], client: Optional[Client] =
     Returns:
         Set of message IDs that already exist
     """
+    if is_local_vector_db():
+        try:
+            return _local_db().existing_message_ids(message_ids)
+        except Exception as e:
+            import sys
+            print(f"⚠️  Warning: Could not check existing messages: {e}", file=sys.stderr)
+            return set()
+    
     if client is None:
         client = get_supabase_client()
     
@@ -515,6 +777,185 @@ def get_existing_message_ids(message_ids: list[str], client: Optional[Client] =
         return set()
 
 
+# Columns needed to rebuild conversations - skips the 1536-dim embedding
+# (~12KB per row) that select("*") would transfer
+CONVERSATION_COLUMNS = "id,text,timestamp,workspace,chat_id,chat_type,message_type"
+CONVERSATION_PAGE_SIZE = 1000  # PostgREST default max rows per response
+CONVERSATION_FETCH_WORKERS = 4
+# Keeps in_("chat_id", ...) well under the PostgREST URL limit
+CHAT_ID_FILTER_CHUNK = 100
+
+
+def _iter_message_rows(
+    client: Client,
+    start_ts: int,
+    end_ts: int,
+    workspace: Optional[str] = None,
+    chat_ids: Optional[list[str]] = None,
+) -> Iterator[dict]:
+    """
+    Yield cursor_messages rows (CONVERSATION_COLUMNS) using keyset pagination on id.
+    
+    Args:
+        client: Supabase client
+        start_ts: Inclusive start timestamp (milliseconds)
+        end_ts: Exclusive end timestamp (milliseconds)
+        workspace: Optional workspace filter
+        chat_ids: Optional chat_id filter
+    """
+    last_id = 0
+    while True:
+        query = (
+            client.table("cursor_messages")
+            .select(CONVERSATION_COLUMNS)
+            .gte("timestamp", start_ts)
+            .lt("timestamp", end_ts)
+            .gt("id", last_id)
+        )
+        if workspace is not None:
+            query = query.eq("workspace", workspace)
+        if chat_ids:
+            query = query.in_("chat_id", chat_ids)
+        result = query.order("id").limit(CONVERSATION_PAGE_SIZE).execute()
+        batch = result.data or []
+        yield from batch
+        if len(batch) < CONVERSATION_PAGE_SIZE:
+            break
+        last_id = batch[-1]["id"]
+
+
+def _group_conversations(
+    messages: Iterable[dict],
+    chat_filter: Optional[set[tuple[str, str, str]]] = None,
+) -> list[dict]:
+    """
+    Group message rows into conversations (messages sorted by timestamp).
+    
+    Args:
+        messages: cursor_messages rows
+        chat_filter: Optional set of (workspace, chat_id, chat_type) to keep
+    """
+    conversations_dict: dict[str, dict] = {}
+    
+    for msg in messages:
+        chat_id = msg.get("chat_id", "unknown")
+        workspace = msg.get("workspace", "Unknown")
+        chat_type = msg.get("chat_type", "unknown")
+        
+        # Only include if in our target set
+        if chat_filter is not None and (workspace, chat_id, chat_type) not in chat_filter:
+            continue
+        
+        # Create unique key for conversation
+        conv_key = f"{workspace}:{chat_id}"
+        
+        if conv_key not in conversations_dict:
+            conversations_dict[conv_key] = {
+                "chat_id": chat_id,
+                "chat_type": chat_type,
+                "workspace": workspace,
+                "messages": [],
+            }
+        
+        # Add message to conversation
+        conversations_dict[conv_key]["messages"].append({
+            "type": msg.get("message_type", "user"),
+            "text": msg.get("text", ""),
+            "timestamp": msg.get("timestamp", 0),
+        })
+    
+    # Sort messages within each conversation by timestamp
+    conversations = list(conversations_dict.values())
+    for conv in conversations:
+        conv["messages"].sort(key=lambda m: m.get("timestamp", 0))
+    
+    return conversations
+
+
+def _stream_conversation_groups(fetch_group: Callable[[Any], list[dict]], groups: list) -> Iterator[dict]:
+    """
+    Run fetch_group for each group concurrently and yield each group's results
+    as soon as that group completes (in completion order).
+    """
+    if len(groups) <= 1:
+        for group in groups:
+            yield from fetch_group(group)
+        return
+    
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+    
+    executor = ThreadPoolExecutor(max_workers=min(CONVERSATION_FETCH_WORKERS, len(groups)))
+    try:
+        futures = [executor.submit(fetch_group, group) for group in groups]
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        # Caller stopped early or a group failed - drop groups not started yet
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _split_timestamp_range(start_ts: int, end_ts: int, parts: int) -> list[tuple[int, int]]:
+    """Split [start_ts, end_ts) into up to `parts` contiguous sub-ranges."""
+    parts = max(1, min(parts, end_ts - start_ts))
+    bounds = [start_ts + (end_ts - start_ts) * i // parts for i in range(parts + 1)]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def _date_range_to_timestamps(start_date: datetime.date, end_date: datetime.date) -> tuple[int, int]:
+    start_datetime = datetime.combine(start_date, datetime.min.time())
+    end_datetime = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
+    return int(start_datetime.timestamp() * 1000), int(end_datetime.timestamp() * 1000)
+
+
+def iter_conversations_from_vector_db(
+    start_date: datetime.date,
+    end_date: datetime.date,
+    workspace_paths: Optional[list[str]] = None,
+) -> Iterator[dict]:
+    """
+    Stream conversations from Vector DB by date range.
+    
+    Fetches only text/metadata columns and pages with keyset pagination.
+    With workspace_paths, workspaces are queried concurrently and each
+    workspace's conversations are yielded as soon as its messages are in.
+    Without a filter, the range is split into CONVERSATION_FETCH_WORKERS
+    timestamp sub-ranges fetched concurrently; a chat can span sub-ranges, so
+    conversations are yielded once all of them are in.
+    
+    Args:
+        start_date: Start date (inclusive)
+        end_date: End date (inclusive)
+        workspace_paths: Optional list of workspace paths to filter by
+    
+    Yields:
+        Conversation dicts (get_conversations_from_vector_db format)
+    """
+    local = is_local_vector_db()
+    client = None if local else get_supabase_client()
+    if not client and not local:
+        return
+    
+    start_ts, end_ts = _date_range_to_timestamps(start_date, end_date)
+    
+    if local:
+        yield from _group_conversations(
+            _local_db().fetch_messages(start_ts, end_ts, workspace_paths=workspace_paths)
+        )
+        return
+    
+    if workspace_paths:
+        yield from _stream_conversation_groups(
+            lambda workspace: _group_conversations(_iter_message_rows(client, start_ts, end_ts, workspace=workspace)),
+            sorted(set(workspace_paths)),
+        )
+        return
+    
+    yield from _group_conversations(_stream_conversation_groups(
+        lambda ts_range: list(_iter_message_rows(client, ts_range[0], ts_range[1])),
+        _split_timestamp_range(start_ts, end_ts, CONVERSATION_FETCH_WORKERS),
+    ))
+
+
 def get_conversations_from_vector_db(
     start_date: datetime.date,
     end_date: datetime.date,
@@ -545,64 +986,8 @@ def get_conversations_from_vector_db(
             ...
         ]
     """
-    client = get_supabase_client()
-    if not client:
-        return []
-    
-    # Calculate timestamp range
-    start_datetime = datetime.combine(start_date, datetime.min.time())
-    end_datetime = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
-    start_ts = int(start_datetime.timestamp() * 1000)
-    end_ts = int(end_datetime.timestamp() * 1000)
-    
     try:
-        # Query messages in date range
-        query_builder = client.table("cursor_messages").select("*")
-        
-        # Apply timestamp filters
-        query_builder = query_builder.gte("timestamp", start_ts)
-        query_builder = query_builder.lt("timestamp", end_ts)
-        
-        # Apply workspace filter if provided
-        if workspace_paths:
-            query_builder = query_builder.in_("workspace", workspace_paths)
-        
-        # Fetch all messages (no limit - we want all conversations)
-        result = query_builder.execute()
-        messages = result.data if result.data else []
-        
-        # Group messages by chat_id and workspace
-        conversations_dict: dict[str, dict] = {}
-        
-        for msg in messages:
-            chat_id = msg.get("chat_id", "unknown")
-            workspace = msg.get("workspace", "Unknown")
-            chat_type = msg.get("chat_type", "unknown")
-            
-            # Create unique key for conversation
-            conv_key = f"{workspace}:{chat_id}"
-            
-            if conv_key not in conversations_dict:
-                conversations_dict[conv_key] = {
-                    "chat_id": chat_id,
-                    "chat_type": chat_type,
-                    "workspace": workspace,
-                    "messages": [],
-                }
-            
-            # Add message to conversation
-            conversations_dict[conv_key]["messages"].append({
-                "type": msg.get("message_type", "user"),
-                "text": msg.get("text", ""),
-                "timestamp": msg.get("timestamp", 0),
-            })
-        
-        # Sort messages within each conversation by timestamp
-        conversations = list(conversations_dict.values())
-        for conv in conversations:
-            conv["messages"].sort(key=lambda m: m.get("timestamp", 0))
-        
-        return conversations
+        return list(iter_conversations_from_vector_db(start_date, end_date, workspace_paths))
         
     except Exception as e:
         import sys
@@ -617,6 +1002,61 @@ def get_conversations_from_vector_db(
         ) from e
 
 
+def iter_conversations_by_chat_ids(
+    chat_ids: list[tuple[str, str, str]],
+    start_date: datetime.date,
+    end_date: datetime.date,
+) -> Iterator[dict]:
+    """
+    Stream conversations for specific chat_ids.
+    
+    Chat ids are grouped per workspace (in chunks of CHAT_ID_FILTER_CHUNK) and
+    the groups are fetched concurrently with projected columns and keyset
+    pagination; each group's conversations are yielded as it completes.
+    
+    Args:
+        chat_ids: List of (workspace, chat_id, chat_type) tuples
+        start_date: Start date (inclusive)
+        end_date: End date (inclusive)
+    
+    Yields:
+        Conversation dicts matching the chat_ids
+    """
+    local = is_local_vector_db()
+    client = None if local else get_supabase_client()
+    if (not client and not local) or not chat_ids:
+        return
+    
+    start_ts, end_ts = _date_range_to_timestamps(start_date, end_date)
+    chat_filter = {(w, c, t) for w, c, t in chat_ids}
+    
+    if local:
+        yield from _group_conversations(
+            _local_db().fetch_messages(start_ts, end_ts, chat_ids=[(w, c) for w, c, _ in chat_ids]),
+            chat_filter,
+        )
+        return
+    
+    # Build workspace and chat_id filters
+    workspace_to_chat_ids: dict[str, set[str]] = {}
+    for workspace, chat_id, _ in chat_ids:
+        workspace_to_chat_ids.setdefault(workspace, set()).add(chat_id)
+    
+    groups = []
+    for workspace, chat_id_set in sorted(workspace_to_chat_ids.items()):
+        chat_id_list = sorted(chat_id_set)
+        for i in range(0, len(chat_id_list), CHAT_ID_FILTER_CHUNK):
+            groups.append((workspace, chat_id_list[i:i + CHAT_ID_FILTER_CHUNK]))
+    
+    yield from _stream_conversation_groups(
+        lambda group: _group_conversations(
+            _iter_message_rows(client, start_ts, end_ts, workspace=group[0], chat_ids=group[1]),
+            chat_filter,
+        ),
+        groups,
+    )
+
+
 def get_conversations_by_chat_ids(
     chat_ids: list[tuple[str, str, str]],
     start_date: datetime.date,
@@ -633,78 +1073,8 @@ def get_conversations_by_chat_ids(
     Returns:
         List of conversation dicts matching the chat_ids
     """
-    client = get_supabase_client()
-    if not client:
-        return []
-    
-    if not chat_ids:
-        return []
-    
-    # Calculate timestamp range
-    start_datetime = datetime.combine(start_date, datetime.min.time())
-    end_datetime = datetime.combine(end_date + timedelta(days=1), datetime.min.time())
-    start_ts = int(start_datetime.timestamp() * 1000)
-    end_ts = int(end_datetime.timestamp() * 1000)
-    
     try:
-        # Build workspace and chat_id filters
-        workspace_to_chat_ids: dict[str, list[str]] = {}
-        for workspace, chat_id, _ in chat_ids:
-            if workspace not in workspace_to_chat_ids:
-                workspace_to_chat_ids[workspace] = []
-            workspace_to_chat_ids[workspace].append(chat_id)
-        
-        # Fetch messages for each workspace/chat_id combination
-        all_messages = []
-        for workspace, chat_id_list in workspace_to_chat_ids.items():
-            # Query messages matching workspace and chat_ids
-            query_builder = client.table("cursor_messages").select("*")
-            query_builder = query_builder.eq("workspace", workspace)
-            query_builder = query_builder.in_("chat_id", chat_id_list)
-            query_builder = query_builder.gte("timestamp", start_ts)
-            query_builder = query_builder.lt("timestamp", end_ts)
-            
-            result = query_builder.execute()
-            if result.data:
-                all_messages.extend(result.data)
-        
-        # Group messages by chat_id and workspace
-        conversations_dict: dict[str, dict] = {}
-        chat_id_set = {(w, c, t) for w, c, t in chat_ids}
-        
-        for msg in all_messages:
-            chat_id = msg.get("chat_id", "unknown")
-            workspace = msg.get("workspace", "Unknown")
-            chat_type = msg.get("chat_type", "unknown")
-            
-            # Only include if in our target set
-            if (workspace, chat_id, chat_type) not in chat_id_set:
-                continue
-            
-            # Create unique key for conversation
-            conv_key = f"{workspace}:{chat_id}"
-            
-            if conv_key not in conversations_dict:
-                conversations_dict[conv_key] = {
-                    "chat_id": chat_id,
-                    "chat_type": chat_type,
-                    "workspace": workspace,
-                    "messages": [],
-                }
-            
-            # Add message to conversation
-            conversations_dict[conv_key]["messages"].append({
-                "type": msg.get("message_type", "user"),
-                "text": msg.get("text", ""),
-                "timestamp": msg.get("timestamp", 0),
-            })
-        
-        # Sort messages within each conversation by timestamp
-        conversations = list(conversations_dict.values())
-        for conv in conversations:
-            conv["messages"].sort(key=lambda m: m.get("timestamp", 0))
-        
-        return conversations
+        return list(iter_conversations_by_chat_ids(chat_ids, start_date, end_date))
         
     except Exception as e:
         import sys
@@ -735,11 +1105,22 @@ def get_high_signal_conversations_vector_db(
     Returns:
         List of conversation dicts (simplified format for Theme Map)
     """
-    client = get_supabase_client()
-    if not client:
+    local = is_local_vector_db()
+    client = None if local else get_supabase_client()
+    if not client and not local:
         return []
         
     try:
+        if local:
+            min_ts = int((datetime.now() - timedelta(days=days_back)).timestamp() * 1000)
+            sampled = _local_db().sample_high_signal_chats(min_ts, max_conversations)
+            if not sampled:
+                return []
+            chat_ids = [(c["workspace"], c["chat_id"], c["chat_type"]) for c in sampled]
+            end_date = datetime.now().date()
+            start_date = end_date - timedelta(days=days_back + 1)  # Add buffer
+            return get_conversations_by_chat_ids(chat_ids, start_date, end_date)
+        
         # Call RPC function
         result = client.rpc("sample_high_signal_conversations", {
             "days_back": days_back,
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""
+In-process engine runtime for the HTTP API.
+
+The API used to shell out to generate.py / seek.py / sync_messages.py for
+every request, paying interpreter startup, imports, Supabase/LLM client
+construction and embedding-cache loading each time, then scraping stdout
+with regexes. This module keeps those warm in the API process and returns
+structured results directly.
+
+Runs go through a small bounded worker pool. progress_markers keeps
+per-run state in module globals, so the default is a single worker
+(requests queue instead of interleaving); raise ENGINE_WORKERS only if
+you accept mixed performance logs.
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+from common import get_llm_config, create_llm, LLMProvider
+from common.progress_markers import start_run, end_run, emit_complete, emit_request_confirmed
+
+
+DEFAULT_ENGINE_WORKERS = 1
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+_llm: LLMProvider | None = None
+_llm_key: str | None = None
+_llm_lock = threading.Lock()
+
+
+# =============================================================================
+# Warm resources
+# =============================================================================
+
+def get_llm() -> LLMProvider:
+    """
+    Get a process-wide LLM provider.
+
+    Rebuilt only if the LLM config changes (e.g. the user switched provider
+    in settings), so HTTP clients are reused across requests.
+    """
+    global _llm, _llm_key
+    llm_config = get_llm_config()
+    key = json.dumps(llm_config, sort_keys=True, default=str)
+    with _llm_lock:
+        if _llm is None or key != _llm_key:
+            _llm = create_llm(llm_config)
+            _llm_key = key
+        return _llm
+
+
+def warm_up() -> dict[str, float]:
+    """
+    Load shared resources once so the first request doesn't pay for them.
+
+    Every step is best-effort; failures are logged and retried lazily on use.
+
+    Returns:
+        Dict of step name → seconds taken
+    """
+    timings: dict[str, float] = {}
+
+    def _step(name: str, fn: Callable[[], Any]) -> None:
+        start = time.time()
+        try:
+            fn()
+        except Exception as e:
+            print(f"⚠️  Warm-up step '{name}' failed: {e}", file=sys.stderr)
+        timings[name] = round(time.time() - start, 3)
+
+    def _load_lenny() -> None:
+        from common.lenny_search import is_lenny_indexed, load_lenny_embeddings
+        if is_lenny_indexed():
+            load_lenny_embeddings()
+
+    def _load_embedding_cache() -> None:
+        from common.semantic_search import _get_embedding_cache
+        _get_embedding_cache()
+
+    def _load_supabase() -> None:
+        from common.vector_db import get_supabase_client
+        get_supabase_client()
+
+    _step("embedding_cache", _load_embedding_cache)
+    _step("lenny", _load_lenny)
+    _step("supabase", _load_supabase)
+    _step("llm", get_llm)
+
+    print(f"🔥 Engine warm-up done: {timings}", file=sys.stderr)
+    return timings
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Get the bounded worker pool (size from ENGINE_WORKERS)."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            workers = int(os.environ.get("ENGINE_WORKERS", DEFAULT_ENGINE_WORKERS))
+            _executor = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="engine")
+        return _executor
+
+
+def submit(fn: Callable[..., dict], *args, **kwargs) -> Future:
+    """Queue a run on the worker pool."""
+    return get_executor().submit(fn, *args, **kwargs)
+
+
+# =============================================================================
+# Generate
+# =============================================================================
+
+def _resolve_generate_range(data: dict) -> dict:
+    """
+    Turn an API request body into the arguments generate.main() would derive.
+
+    Returns:
+        Dict with dates, mode_name, item_count, temperature,
+        timestamp_range, source_date_range
+    """
+    from generate import MODE_PRESETS, get_default_temperature
+
+    today = datetime.now().date()
+    now = datetime.now()
+    preset = data.get("preset", "custom")
+
+    item_count, temperature = 10, get_default_temperature()
+    dates: list = []
+    timestamp_range: tuple[int, int] | None = None
+
+    if preset in MODE_PRESETS:
+        days_or_hours, item_count, temperature, is_hours = MODE_PRESETS[preset]
+        mode_name = preset
+        if is_hours:
+            start = now - timedelta(hours=days_or_hours)
+            timestamp_range = (int(start.timestamp() * 1000), int(now.timestamp() * 1000))
+            dates = [today - timedelta(days=1), today]
+            source_date_range = (start.date().strftime("%Y-%m-%d"), today.strftime("%Y-%m-%d"))
+        else:
+            dates = [today - timedelta(days=i) for i in range(days_or_hours)][::-1]
+    else:
+        mode_name = "custom"
+        if data.get("fromDate") and data.get("toDate"):
+            start_date = datetime.strptime(data["fromDate"], "%Y-%m-%d").date()
+            end_date = datetime.strptime(data["toDate"], "%Y-%m-%d").date()
+            dates = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        elif data.get("days"):
+            dates = [today - timedelta(days=i) for i in range(int(data["days"]))][::-1]
+        elif data.get("date"):
+            dates = [datetime.strptime(data["date"], "%Y-%m-%d").date()]
+        else:
+            dates = [today]
+
+    if not dates:
+        raise ValueError("Empty date range")
+    if timestamp_range is None:
+        source_date_range = (dates[0].strftime("%Y-%m-%d"), dates[-1].strftime("%Y-%m-%d"))
+
+    if data.get("itemCount") is not None:
+        item_count = int(data["itemCount"])
+    if data.get("temperature") is not None:
+        temperature = float(data["temperature"])
+
+    return {
+        "dates": dates,
+        "mode_name": mode_name,
+        "item_count": item_count,
+        "temperature": temperature,
+        "timestamp_range": timestamp_range,
+        "source_date_range": source_date_range,
+    }
+
+
+def run_generate(data: dict) -> dict:
+    """
+    Run an aggregated generate in-process.
+
+    Args:
+        data: /generate request body (mode, preset, days, date, fromDate/toDate,
+              itemCount, temperature, dryRun)
+
+    Returns:
+        API response dict (same shape as the subprocess wrapper's)
+    """
+    import generate
+
+    mode = data["mode"]
+    dry_run = bool(data.get("dryRun"))
+    params = _resolve_generate_range(data)
+    dates = params["dates"]
+    llm = get_llm()
+
+    stale_output_files = generate.detect_stale_output_files(mode)
+    start_run(mode=mode, item_count=params["item_count"], days=len(dates))
+    try:
+        emit_request_confirmed(
+            date_range=f"{dates[0]} to {dates[-1]}",
+            requested_items=params["item_count"],
+            temperature=params["temperature"],
+            days_processed=len(dates),
+        )
+        result = generate.process_aggregated_range(
+            dates,
+            mode,
+            params["mode_name"],
+            llm=llm,
+            dry_run=dry_run,
+            temperature=params["temperature"],
+            item_count=params["item_count"],
+            dedup_threshold=generate.get_default_dedup_threshold(),
+            timestamp_range=params["timestamp_range"],
+            source_date_range=params["source_date_range"],
+        )
+
+        # Read before harmonizing - harmonization removes processed output files
+        output_file = result.get("output_file")
+        content = None
+        if output_file and Path(output_file).exists():
+            content = Path(output_file).read_text(encoding="utf-8")
+
+        harmonization = None
+        if output_file and not dry_run:
+            harmonization = generate.harmonize_aggregated_output(
+                mode,
+                llm,
+                output_file,
+                stale_output_files,
+                source_date_range=params["source_date_range"],
+            )
+        elif not dry_run:
+            emit_complete(0, 0)
+
+        end_run(success=True)
+    except Exception as e:
+        end_run(success=False, error=str(e))
+        raise
+
+    # Same keys as the frontend's GenerateResult["stats"]
+    has_output_key = "has_posts" if mode == "insights" else "has_ideas"
+    stats = {
+        "daysProcessed": len(dates),
+        "daysWithActivity": result.get("days_with_activity", 0),
+        "daysWithOutput": 1 if result.get(has_output_key) else 0,
+        "itemsGenerated": result.get("items_generated", 0),
+        "itemsAfterDedup": result.get("items_after_dedup", 0),
+        "itemsReturned": result.get("items_returned", 0),
+        "conversationsAnalyzed": result.get("total_conversations", 0),
+    }
+    if harmonization:
+        # Merged items are the ones deduplicated against the Library, as in
+        # the "Harmonization Stats" line the CLI prints
+        stats["harmonization"] = {
+            "itemsProcessed": harmonization["items_processed"],
+            "itemsAdded": harmonization["items_added"],
+            "itemsUpdated": harmonization["items_merged"],
+            "itemsDeduplicated": harmonization["items_merged"],
+        }
+
+    return {
+        "success": True,
+        "outputFile": str(output_file) if output_file else None,
+        "content": content,
+        "judgeContent": content,  # Same as content for backward compatibility
+        "stats": stats,
+    }
+
+
+# =============================================================================
+# Seek
+# =============================================================================
+
+def run_seek(data: dict) -> dict:
+    """
+    Run seek in-process with the shared LLM provider.
+
+    Args:
+        data: /seek request body (query, daysBack, topK, minSimilarity,
+              workspaces, temperature, dryRun)
+
+    Returns:
+        seek_use_case() result dict
+    """
+    from seek import seek_use_case
+
+    kwargs: dict[str, Any] = {}
+    if data.get("temperature") is not None:
+        kwargs["temperature"] = float(data["temperature"])
+
+    return seek_use_case(
+        data["query"],
+        days_back=int(data.get("daysBack", 90)),
+        top_k=int(data.get("topK", 10)),
+        min_similarity=float(data.get("minSimilarity", 0.0)),
+        workspace_paths=data.get("workspaces") or None,
+        llm=get_llm(),
+        dry_run=bool(data.get("dryRun")),
+        **kwargs,
+    )
+
+
+# =============================================================================
+# Sync
+# =============================================================================
+
+def run_sync(data: dict | None = None) -> dict:
+    """
+    Run message sync in-process.
+
+    Returns:
+        API response dict with totals across sources
+    """
+    from scripts.sync_messages import sync_new_messages
+
+    data = data or {}
+    per_source = sync_new_messages(
+        days_back=int(data.get("days", 7)),
+        dry_run=bool(data.get("dryRun")),
+    )
+
+    totals = {"indexed": 0, "skipped": 0, "failed": 0}
+    for source_stats in per_source.values():
+        for key in totals:
+            totals[key] += source_stats.get(key, 0)
+
+    return {
+        "success": True,
+        "message": "Sync completed successfully" if totals["indexed"] else "Brain is up to date",
+        "stats": totals,
+        "sources": per_source,
+    }
@@ -744,38 +744,14 @@ def _parse_items_from_output(raw_output: str, mode: str) -> list[dict]:
 
 
 def _deduplicate_items(items: list[dict], threshold: float = 0.85) -> list[dict]:
-    """Deduplicate items by cosine similarity of embeddings."""
-    from common.semantic_search import cosine_similarity
+    """Deduplicate items by cosine similarity of embeddings (earlier items win)."""
+    from common.semantic_search import find_duplicate_indices
     
     if len(items) <= 1:
         return items
     
-    unique_items = []
-    
-    for item in items:
-        is_duplicate = False
-        item_embedding = item.get("_embedding", [])
-        
-        if not item_embedding:
-            unique_items.append(item)
-            continue
-        
-        for existing in unique_items:
-            existing_embedding = existing.get("_embedding", [])
-            if not existing_embedding:
-                continue
-            
-            similarity = cosine_similarity(item_embedding, existing_embedding)
-            if similarity >= threshold:
-                # Found duplicate - keep the one with more content
-                is_duplicate = True
-                # Optionally: merge or update the existing item
-                break
-        
-        if not is_duplicate:
-            unique_items.append(item)
-    
-    return unique_items
+    duplicate_of = find_duplicate_indices([item.get("_embedding") for item in items], threshold)
+    return [item for item, duplicate in zip(items, duplicate_of) if duplicate is None]
 
 
 def _safe_parse_judge_json(response: str) -> dict | None:
@@ -1694,11 +1670,11 @@ def _get_relevant_conversations(
     Optimized with parallel searches and efficient data fetching.
     """
     try:
-        from common.vector_db import get_supabase_client, get_conversations_by_chat_ids
-        from common.semantic_search import search_messages
+        from common.vector_db import is_vector_db_configured, get_conversations_by_chat_ids
+        from common.semantic_search import search_messages_multi
         
         # Try Vector DB semantic search first
-        if get_supabase_client():
+        if is_vector_db_configured():
             # Calculate timestamp range
             start_datetime = datetime.combine(target_date, datetime.min.time())
             end_datetime = datetime.combine(target_date + timedelta(days=1), datetime.min.time())
@@ -1730,35 +1706,20 @@ def _get_relevant_conversations(
                         "What prototypes could I make?",
                     ]
             
-            # Collect unique chat_ids from semantic search (PARALLELIZED)
-            relevant_chat_ids: set[tuple[str, str, str]] = set()  # (workspace, chat_id, chat_type)
-            
-            def search_query(query: str) -> list[dict]:
-                """Helper to run a single search query."""
-                return search_messages(
-                    query,
-                    messages=[],  # Empty - will use Vector DB
-                    top_k=top_k,  # Use full top_k per query (queries are combined now)
-                    min_similarity=0.3,  # Lower threshold to cast wider net
-                    context_messages=0,  # Don't need context for grouping
-                    use_vector_db=True,
-                    start_timestamp=start_ts,
-                    end_timestamp=end_ts,
-                    workspace_paths=workspace_paths,
-                )
-            
-            # Run searches in parallel (much faster!)
-            print(f"🔍 Running {len(search_queries)} semantic searches in parallel...", file=sys.stderr)
-            with ThreadPoolExecutor(max_workers=min(len(search_queries), 5)) as executor:
-                futures = {executor.submit(search_query, query): query for query in search_queries}
-                for future in as_completed(futures):
-                    matches = future.result()
-                    # Collect chat_ids from matches
-                    for match in matches:
-                        chat_id = match.get("chat_id", "unknown")
-                        workspace = match.get("workspace", "Unknown")
-                        chat_type = match.get("chat_type", "unknown")
-                        relevant_chat_ids.add((workspace, chat_id, chat_type))
+            # Collect unique chat_ids from semantic search (one embedding call + one RPC)
+            print(f"🔍 Running {len(search_queries)} semantic searches in one request...", file=sys.stderr)
+            search_results = search_messages_multi(
+                search_queries,
+                top_k=top_k,  # Use full top_k per query
+                min_similarity=0.3,  # Lower threshold to cast wider net
+                start_timestamp=start_ts,
+                end_timestamp=end_ts,
+                workspace_paths=workspace_paths,
+            )
+            relevant_chat_ids: set[tuple[str, str, str]] = {  # (workspace, chat_id, chat_type)
+                (chat["workspace"], chat["chat_id"], chat["chat_type"])
+                for chat in search_results["chats"]
+            }
             
             if relevant_chat_ids:
                 # Fetch ONLY relevant conversations (much more efficient!)
@@ -1950,11 +1911,11 @@ def process_aggregated_range(
     emit_search_started()
     
     try:
-        from common.vector_db import get_supabase_client, get_conversations_by_chat_ids
-        from common.semantic_search import search_messages
+        from common.vector_db import is_vector_db_configured, iter_conversations_by_chat_ids, fetch_message_context
+        from common.semantic_search import search_messages_multi
         
         # Search entire date range at once (much faster!)
-        if get_supabase_client():
+        if is_vector_db_configured():
             # Use timestamp_range if provided, otherwise calculate from dates
             if timestamp_range:
                 start_ts, end_ts = timestamp_range
@@ -2018,21 +1979,7 @@ def process_aggregated_range(
             all_search_results: list[dict] = []
             relevant_chat_ids: set[tuple[str, str, str]] = set()
             
-            def search_query(query: str) -> list[dict]:
-                """Helper to run a single search query across entire date range."""
-                return search_messages(
-                    query,
-                    messages=[],
-                    top_k=smart_max_messages if use_smart_sampling else 50,
-                    min_similarity=smart_min_similarity if use_smart_sampling else 0.3,
-                    context_messages=smart_context_messages,
-                    use_vector_db=True,
-                    start_timestamp=start_ts,
-                    end_timestamp=end_ts,
-                    workspace_paths=None,
-                )
-            
-            # Run searches in parallel (only 3 searches instead of days × 5)
+            # One embedding call + one RPC for all queries (only 3 searches instead of days × 5)
             sampling_mode = "⚡ Smart Sampling" if use_smart_sampling else "📚 Full Conversations"
             print(f"🔍 {sampling_mode}: Running {len(search_queries)} semantic searches across {len(dates)} days...", file=sys.stderr)
             print(f"   Search queries: {search_queries}", file=sys.stderr)
@@ -2040,28 +1987,23 @@ def process_aggregated_range(
             if use_smart_sampling:
                 print(f"   Max messages: {smart_max_messages}, Min similarity: {smart_min_similarity}", file=sys.stderr)
             
-            with ThreadPoolExecutor(max_workers=len(search_queries)) as executor:
-                futures = {executor.submit(search_query, query): query for query in search_queries}
-                for future in as_completed(futures):
-                    query_text = futures[future]
-                    try:
-                        matches = future.result()
-                        print(f"   Query '{query_text}': Found {len(matches)} matches", file=sys.stderr)
-                        for match in matches:
-                            if not isinstance(match, dict):
-                                continue
-                            chat_id = match.get("chat_id", "unknown")
-                            workspace = match.get("workspace", "Unknown")
-                            chat_type = match.get("chat_type", "unknown")
-                            relevant_chat_ids.add((workspace, chat_id, chat_type))
-                            
-                            # For smart sampling, collect the actual results
-                            if use_smart_sampling:
-                                all_search_results.append(match)
-                    except Exception as e:
-                        print(f"⚠️  Error in search query '{query_text}': {e}", file=sys.stderr)
-                        # Continue with other queries
-                        continue
+            search_results = search_messages_multi(
+                search_queries,
+                top_k=smart_max_messages if use_smart_sampling else 50,
+                min_similarity=smart_min_similarity if use_smart_sampling else 0.3,
+                start_timestamp=start_ts,
+                end_timestamp=end_ts,
+                workspace_paths=None,
+            )
+            for query_text, matches in zip(search_queries, search_results["per_query"]):
+                print(f"   Query '{query_text}': Found {len(matches)} matches", file=sys.stderr)
+            relevant_chat_ids = {
+                (chat["workspace"], chat["chat_id"], chat["chat_type"])
+                for chat in search_results["chats"]
+            }
+            if use_smart_sampling:
+                # For smart sampling, collect the actual results
+                all_search_results = [match for matches in search_results["per_query"] for match in matches]
             
             # Option 3: Comprehensive Smart Sampling activation check
             print(f"🔍 Smart Sampling Activation Check:", file=sys.stderr)
@@ -2094,6 +2036,12 @@ def process_aggregated_range(
                     all_conversations = []
                     days_with_activity = 0
                 else:
+                    # Surrounding messages for every sampled hit, in one query
+                    if smart_context_messages > 0:
+                        fetch_message_context(unique_results, smart_context_messages)
+                        with_context = sum(1 for r in unique_results if r["context"]["before"] or r["context"]["after"])
+                        print(f"   Context: ±{smart_context_messages} messages for {with_context}/{len(unique_results)} snippets", file=sys.stderr)
+                    
                     # Convert to synthetic "conversations" format for downstream compatibility
                     all_conversations = [{
                         "workspace": "Smart Sampling",
@@ -2137,24 +2085,16 @@ def process_aggregated_range(
                 print(f"🔍 Found {len(relevant_chat_ids)} relevant conversations via semantic search", file=sys.stderr)
                 print(f"📥 Fetching conversations by chat_ids...", file=sys.stderr)
                 
-                # Fetch all conversations at once (much faster than per-date)
+                # Fetch all conversations at once (much faster than per-date),
+                # adding source_date from message timestamps as each
+                # workspace's conversations stream in
+                all_conversations = []
                 try:
-                    all_conversations = get_conversations_by_chat_ids(
+                    for conv in iter_conversations_by_chat_ids(
                         list(relevant_chat_ids),
                         start_date,
                         end_date,
-                    )
-                    if not all_conversations:
-                        all_conversations = []
-                except Exception as e:
-                    print(f"⚠️  Error fetching conversations: {e}, using empty list", file=sys.stderr)
-                    all_conversations = []
-                
-                # Add source_date based on message timestamps
-                for conv in all_conversations:
-                    if not isinstance(conv, dict):
-                        continue
-                    if conv.get("messages"):
+                    ):
                         messages = conv.get("messages", [])
                         if messages and isinstance(messages[0], dict):
                             first_msg_ts = messages[0].get("timestamp", 0)
@@ -2164,6 +2104,10 @@ def process_aggregated_range(
                                     conv["source_date"] = str(msg_date)
                                 except (ValueError, OSError, TypeError):
                                     pass  # Skip invalid timestamps
+                        all_conversations.append(conv)
+                except Exception as e:
+                    print(f"⚠️  Error fetching conversations: {e}, using empty list", file=sys.stderr)
+                    all_conversations = []
                 
                 days_with_activity = len(set(
                     conv.get("source_date", "") 
@@ -2453,6 +2397,145 @@ def process_aggregated_range(
     return result
 
 
+# =============================================================================
+# Run helpers (shared by CLI and the in-process API runtime)
+# =============================================================================
+
+# MODE_PRESETS: (days_or_hours, item_count, temperature, is_hours)
+# Note: "daily" now uses hours=24 for true "last 24 hours" behavior
+# v4: Simplified to 3 presets (24h, 7d, 14d) for better UX
+MODE_PRESETS = {
+    "daily": (24, 5, 0.3, True),    # 24 hours (not 1 day)
+    "week": (7, 10, 0.35, False),   # 7 days (recommended default)
+    "sprint": (14, 15, 0.4, False), # 14 days
+}
+
+
+def detect_stale_output_files(mode: Literal["insights", "ideas"]) -> list[Path]:
+    """
+    Find output files left over from previous runs.
+    
+    2026-01-12 FIX: These are processed ALONG WITH the current run's output,
+    with a clear breakdown in the harmonization summary.
+    """
+    output_dir = MODE_CONFIG[mode]["output_dir"]
+    stale_output_files = []  # Files in output directory from previous runs
+    if output_dir.exists():
+        stale_output_files = sorted(output_dir.glob("*.md"))
+        if stale_output_files:
+            print(f"\n" + "="*60, file=sys.stderr)
+            print(f"⚠️  STALE FILES DETECTED IN OUTPUT DIRECTORY", file=sys.stderr)
+            print(f"="*60, file=sys.stderr)
+            print(f"📁 Directory: {output_dir}", file=sys.stderr)
+            print(f"📄 Files ({len(stale_output_files)}):", file=sys.stderr)
+            for f in stale_output_files[:5]:  # Show first 5
+                print(f"   - {f.name}", file=sys.stderr)
+            if len(stale_output_files) > 5:
+                print(f"   ... and {len(stale_output_files) - 5} more", file=sys.stderr)
+            print(f"\n✅ These files will be processed ALONG WITH current run's output.", file=sys.stderr)
+            print(f"   The report will show breakdown: Previous Run vs Current Run.", file=sys.stderr)
+            print(f"="*60 + "\n", file=sys.stderr)
+            # Emit warning for frontend
+            emit_warning("stale_files", f"{len(stale_output_files)} leftover file(s) from previous runs will be processed")
+    return stale_output_files
+
+
+def harmonize_aggregated_output(
+    mode: Literal["insights", "ideas"],
+    llm: LLMProvider,
+    output_file: str | Path,
+    stale_output_files: list[Path],
+    source_date_range: tuple[str, str] | None = None,
+) -> dict:
+    """
+    Harmonize an aggregated run's output (plus stale files) into the Library.
+    
+    Always emits the completion marker, and runs the posted/solved status sync
+    afterwards (non-critical).
+    
+    Returns:
+        Dict with items_processed, items_added, items_merged, cleanup_failed
+    """
+    # 2026-01-12 FIX: Track current run's file + stale files for processing
+    # Ensure all paths are Path objects for consistency
+    current_run_files = [Path(output_file)] if output_file else []
+    
+    # Include stale output files from previous runs (detected earlier)
+    # This ensures they get processed and reported with clear breakdown
+    all_files_to_process = stale_output_files + current_run_files
+    
+    if stale_output_files:
+        print(f"\n📦 Harmonizing {len(all_files_to_process)} total files:", file=sys.stderr)
+        print(f"   - {len(stale_output_files)} from PREVIOUS runs (stale)", file=sys.stderr)
+        print(f"   - {len(current_run_files)} from CURRENT run", file=sys.stderr)
+    
+    # Wrap harmonization in try/except to ensure emit_complete() is always called
+    # This prevents frontend from hanging if harmonization fails
+    items_processed = 0
+    items_added = 0
+    items_merged = 0
+    cleanup_failed = []
+    try:
+        harmonization_result = harmonize_all_outputs(
+            mode, 
+            llm, 
+            source_date_range=source_date_range,
+            files_to_process=all_files_to_process,  # 2026-01-12: Process current + stale files
+        )
+        items_processed = harmonization_result.get("items_processed", 0) if harmonization_result else 0
+        items_added = harmonization_result.get("items_added", 0) if harmonization_result else 0
+        items_merged = harmonization_result.get("items_merged", 0) if harmonization_result else 0
+        cleanup_failed = harmonization_result.get("cleanup_failed", []) if harmonization_result else []
+        retried_success = harmonization_result.get("retried_success", []) if harmonization_result else []
+        retried_failed = harmonization_result.get("retried_failed", []) if harmonization_result else []
+        
+        # 2026-01-12: Summary of what was processed
+        if stale_output_files or retried_success or retried_failed:
+            print(f"\n📊 HARMONIZATION SUMMARY:", file=sys.stderr)
+            if stale_output_files:
+                print(f"   📂 {len(stale_output_files)} stale file(s) from previous runs → processed", file=sys.stderr)
+            if retried_success:
+                print(f"   ✅ {len(retried_success)} failed file(s) retried successfully", file=sys.stderr)
+            if retried_failed:
+                print(f"   ❌ {len(retried_failed)} failed file(s) still failing (will retry next run)", file=sys.stderr)
+            if current_run_files:
+                print(f"   🆕 {len(current_run_files)} file(s) from current run → processed", file=sys.stderr)
+            print(f"   📊 Total: {items_added} items added, {items_merged} items merged", file=sys.stderr)
+        
+        # 2026-01-12: If cleanup failed, emit warning for retry prompt
+        if cleanup_failed:
+            print(f"⚠️  Cleanup failed for {len(cleanup_failed)} file(s). User should retry harmonization.", file=sys.stderr)
+            emit_warning("cleanup_failed", f"{len(cleanup_failed)} file(s) could not be deleted. Retry harmonization.")
+    except Exception as e:
+        print(f"⚠️  Harmonization failed: {e}", file=sys.stderr)
+        emit_error("harmonization_failed", f"Harmonization failed: {str(e)[:200]}. Retry harmonization to process files.")
+        items_processed = 0
+        items_added = 0
+        items_merged = 0
+    finally:
+        # Always emit complete, even if harmonization failed
+        # This is critical - frontend waits for this marker
+        emit_complete(items_added, items_merged)
+    
+    # Sync operations are non-critical - don't crash if they fail
+    # The main work (generation + harmonization) is already saved
+    try:
+        if mode == "insights":
+            sync_posted_status(llm)
+        else:
+            sync_solved_status(llm)
+    except Exception as e:
+        print(f"⚠️  Sync operation failed (non-critical, items are saved): {e}", file=sys.stderr)
+        print(f"   You can retry sync later via the UI or by running again", file=sys.stderr)
+    
+    return {
+        "items_processed": items_processed,
+        "items_added": items_added,
+        "items_merged": items_merged,
+        "cleanup_failed": cleanup_failed,
+    }
+
+
 # =============================================================================
 # CLI
 # =============================================================================
@@ -2510,15 +2593,6 @@ def main():
     
     mode: Literal["insights", "ideas"] = args.mode
     
-    # MODE_PRESETS: (days_or_hours, item_count, temperature, is_hours)
-    # Note: "daily" now uses hours=24 for true "last 24 hours" behavior
-    # v4: Simplified to 3 presets (24h, 7d, 14d) for better UX
-    MODE_PRESETS = {
-        "daily": (24, 5, 0.3, True),    # 24 hours (not 1 day)
-        "week": (7, 10, 0.35, False),   # 7 days (recommended default)
-        "sprint": (14, 15, 0.4, False), # 14 days
-    }
-    
     mode_days, mode_item_count, mode_temperature = None, 10, get_default_temperature()
     mode_name = None
     use_aggregated = False
@@ -2621,26 +2695,7 @@ def main():
     
     # 2026-01-12 FIX: Detect stale files BEFORE starting generation
     # These will be processed ALONG WITH current run's output, with clear breakdown
-    config = MODE_CONFIG[mode]
-    output_dir = config["output_dir"]
-    stale_output_files = []  # Files in output directory from previous runs
-    if output_dir.exists():
-        stale_output_files = sorted(output_dir.glob("*.md"))
-        if stale_output_files:
-            print(f"\n" + "="*60, file=sys.stderr)
-            print(f"⚠️  STALE FILES DETECTED IN OUTPUT DIRECTORY", file=sys.stderr)
-            print(f"="*60, file=sys.stderr)
-            print(f"📁 Directory: {output_dir}", file=sys.stderr)
-            print(f"📄 Files ({len(stale_output_files)}):", file=sys.stderr)
-            for f in stale_output_files[:5]:  # Show first 5
-                print(f"   - {f.name}", file=sys.stderr)
-            if len(stale_output_files) > 5:
-                print(f"   ... and {len(stale_output_files) - 5} more", file=sys.stderr)
-            print(f"\n✅ These files will be processed ALONG WITH current run's output.", file=sys.stderr)
-            print(f"   The report will show breakdown: Previous Run vs Current Run.", file=sys.stderr)
-            print(f"="*60 + "\n", file=sys.stderr)
-            # Emit warning for frontend
-            emit_warning("stale_files", f"{len(stale_output_files)} leftover file(s) from previous runs will be processed")
+    stale_output_files = detect_stale_output_files(mode)
     
     llm_config = get_llm_config()
     llm = create_llm(llm_config)
@@ -2704,74 +2759,13 @@ def main():
             
             if result["output_file"] and not args.dry_run:
                 print(f"📄 Output: {result['output_file']}")
-                # 2026-01-12 FIX: Track current run's file + stale files for processing
-                # Ensure all paths are Path objects for consistency
-                current_run_files = [Path(result["output_file"])] if result["output_file"] else []
-                
-                # Include stale output files from previous runs (detected earlier)
-                # This ensures they get processed and reported with clear breakdown
-                all_files_to_process = stale_output_files + current_run_files
-                
-                if stale_output_files:
-                    print(f"\n📦 Harmonizing {len(all_files_to_process)} total files:", file=sys.stderr)
-                    print(f"   - {len(stale_output_files)} from PREVIOUS runs (stale)", file=sys.stderr)
-                    print(f"   - {len(current_run_files)} from CURRENT run", file=sys.stderr)
-                
-                # Wrap harmonization in try/except to ensure emit_complete() is always called
-                # This prevents frontend from hanging if harmonization fails
-                items_added = 0
-                items_merged = 0
-                cleanup_failed = []
-                try:
-                    harmonization_result = harmonize_all_outputs(
-                        mode, 
-                        llm, 
-                        source_date_range=source_date_range,
-                        files_to_process=all_files_to_process,  # 2026-01-12: Process current + stale files
-                    )
-                    items_added = harmonization_result.get("items_added", 0) if harmonization_result else 0
-                    items_merged = harmonization_result.get("items_merged", 0) if harmonization_result else 0
-                    cleanup_failed = harmonization_result.get("cleanup_failed", []) if harmonization_result else []
-                    retried_success = harmonization_result.get("retried_success", []) if harmonization_result else []
-                    retried_failed = harmonization_result.get("retried_failed", []) if harmonization_result else []
-                    
-                    # 2026-01-12: Summary of what was processed
-                    if stale_output_files or retried_success or retried_failed:
-                        print(f"\n📊 HARMONIZATION SUMMARY:", file=sys.stderr)
-                        if stale_output_files:
-                            print(f"   📂 {len(stale_output_files)} stale file(s) from previous runs → processed", file=sys.stderr)
-                        if retried_success:
-                            print(f"   ✅ {len(retried_success)} failed file(s) retried successfully", file=sys.stderr)
-                        if retried_failed:
-                            print(f"   ❌ {len(retried_failed)} failed file(s) still failing (will retry next run)", file=sys.stderr)
-                        if current_run_files:
-                            print(f"   🆕 {len(current_run_files)} file(s) from current run → processed", file=sys.stderr)
-                        print(f"   📊 Total: {items_added} items added, {items_merged} items merged", file=sys.stderr)
-                    
-                    # 2026-01-12: If cleanup failed, emit warning for retry prompt
-                    if cleanup_failed:
-                        print(f"⚠️  Cleanup failed for {len(cleanup_failed)} file(s). User should retry harmonization.", file=sys.stderr)
-                        emit_warning("cleanup_failed", f"{len(cleanup_failed)} file(s) could not be deleted. Retry harmonization.")
-                except Exception as e:
-                    print(f"⚠️  Harmonization failed: {e}", file=sys.stderr)
-                    emit_error("harmonization_failed", f"Harmonization failed: {str(e)[:200]}. Retry harmonization to process files.")
-                    items_added = 0
-                    items_merged = 0
-                finally:
-                    # Always emit complete, even if harmonization failed
-                    # This is critical - frontend waits for this marker
-                    emit_complete(items_added, items_merged)
-                
-                # Sync operations are non-critical - don't crash if they fail
-                # The main work (generation + harmonization) is already saved
-                try:
-                    if mode == "insights":
-                        sync_posted_status(llm)
-                    else:
-                        sync_solved_status(llm)
-                except Exception as e:
-                    print(f"⚠️  Sync operation failed (non-critical, items are saved): {e}", file=sys.stderr)
-                    print(f"   You can retry sync later via the UI or by running again", file=sys.stderr)
+                harmonize_aggregated_output(
+                    mode,
+                    llm,
+                    result["output_file"],
+                    stale_output_files,
+                    source_date_range=source_date_range,
+                )
             elif not args.dry_run:
                 # No output file but still need to emit completion for frontend
                 emit_complete(0, 0)
@@ -28,15 +28,40 @@ from common.cursor_db import (
 from common.vector_db import (
     get_high_signal_conversations_vector_db,
     get_message_count,
-    get_supabase_client,
+    is_vector_db_configured,
 )
 from common.llm import call_llm
 from common.cost_estimator import estimate_cost, format_cost_display
-from common.lenny_search import search_lenny_archive, is_lenny_indexed
+from common.lenny_search import search_lenny_archive, search_lenny_archive_batch, is_lenny_indexed
 from common.semantic_search import is_openai_configured
 from typing import Optional
 
 
+def _theme_query(theme_title: str, theme_summary: str) -> str:
+    """Build the Lenny search query for a theme (title + trimmed summary)."""
+    # Use title as primary query (more specific) and summary as fallback context
+    query = theme_title if theme_title else theme_summary
+    if theme_summary and theme_summary != theme_title:
+        query = f"{theme_title} {theme_summary[:200]}"  # Limit summary length to avoid dilution
+    return query
+
+
+def _results_to_quotes(results) -> list[dict]:
+    """Convert LennySearchResults to quote dicts for the theme map."""
+    return [
+        {
+            "guestName": r.guest_name,
+            "speaker": r.speaker,
+            "content": r.content[:400] + "..." if len(r.content) > 400 else r.content,
+            "episodeTitle": r.episode_title,
+            "youtubeUrl": r.youtube_url,
+            "timestamp": r.timestamp,
+            "similarity": round(r.similarity, 3),
+        }
+        for r in results
+    ]
+
+
 def search_lenny_for_theme(theme_title: str, theme_summary: str, top_k: int = 2) -> list[dict]:
     """
     Search Lenny's archive for expert perspectives on a theme.
@@ -51,28 +76,14 @@ def search_lenny_for_theme(theme_title: str, theme_summary: str, top_k: int = 2)
     
     try:
         # Search with theme title + summary for better context
-        # Use title as primary query (more specific) and summary as fallback context
-        query = theme_title if theme_title else theme_summary
-        if theme_summary and theme_summary != theme_title:
-            query = f"{theme_title} {theme_summary[:200]}"  # Limit summary length to avoid dilution
+        query = _theme_query(theme_title, theme_summary)
         # Lower threshold to 0.20 to be more lenient and catch more matches
         results = search_lenny_archive(query, top_k=top_k, min_similarity=0.20)
         
         if not results:
             print(f"   ℹ️  No expert perspectives found for '{theme_title}' (similarity < 0.20)", file=sys.stderr)
         
-        return [
-            {
-                "guestName": r.guest_name,
-                "speaker": r.speaker,
-                "content": r.content[:400] + "..." if len(r.content) > 400 else r.content,
-                "episodeTitle": r.episode_title,
-                "youtubeUrl": r.youtube_url,
-                "timestamp": r.timestamp,
-                "similarity": round(r.similarity, 3),
-            }
-            for r in results
-        ]
+        return _results_to_quotes(results)
     except Exception as e:
         print(f"⚠️  Lenny search failed for '{theme_title}': {e}", file=sys.stderr)
         import traceback
@@ -80,6 +91,28 @@ def search_lenny_for_theme(theme_title: str, theme_summary: str, top_k: int = 2)
         return []
 
 
+def search_lenny_for_themes(themes: list[tuple[str, str]], top_k: int = 2) -> list[list[dict]]:
+    """
+    Batched search_lenny_for_theme: one embedding request and one matrix
+    product for all (title, summary) pairs.
+    
+    Returns one quote list per input pair (empty lists on failure).
+    """
+    if not themes or not is_lenny_indexed() or not is_openai_configured():
+        return [[] for _ in themes]
+    
+    try:
+        queries = [_theme_query(title, summary) for title, summary in themes]
+        # Lower threshold to 0.20 to be more lenient and catch more matches
+        batch_results = search_lenny_archive_batch(queries, top_k=top_k, min_similarity=0.20)
+        return [_results_to_quotes(results) for results in batch_results]
+    except Exception as e:
+        print(f"⚠️  Batched Lenny search failed: {e}", file=sys.stderr)
+        import traceback
+        traceback.print_exc(file=sys.stderr)
+        return [[] for _ in themes]
+
+
 def enhance_themes_with_lenny(theme_map: dict) -> dict:
     """
     Enhance theme map with expert perspectives from Lenny's podcast.
@@ -101,17 +134,26 @@ def enhance_themes_with_lenny(theme_map: dict) -> dict:
     theme_map["lennyAvailable"] = True
     theme_map["lennyUnlocked"] = True
     
+    themes = theme_map.get("themes", [])
+    counter_items = theme_map.get("counterIntuitive", [])
+    unexplored_items = theme_map.get("unexploredTerritory", [])
+    
+    # One batched search for everything: themes want 2 quotes, the rest 1
+    # Handle both field name variations: title/summary (onboarding-fast) and name/description (theme-map)
+    queries = [
+        (theme.get("title") or theme.get("name", ""), theme.get("summary") or theme.get("description", ""))
+        for theme in themes
+    ]
+    queries += [(item.get("title", ""), item.get("perspective", "")) for item in counter_items]
+    queries += [(item.get("title", ""), item.get("why", "")) for item in unexplored_items]
+    all_quotes = search_lenny_for_themes(queries, top_k=2)
+    
+    theme_quotes = all_quotes[:len(themes)]
+    counter_quotes = all_quotes[len(themes):len(themes) + len(counter_items)]
+    unexplored_quotes = all_quotes[len(themes) + len(counter_items):]
+    
     # Enhance themes
-    for theme in theme_map.get("themes", []):
-        # Handle both field name variations: title/summary (onboarding-fast) and name/description (theme-map)
-        theme_title = theme.get("title") or theme.get("name", "")
-        theme_summary = theme.get("summary") or theme.get("description", "")
-        
-        quotes = search_lenny_for_theme(
-            theme_title,
-            theme_summary,
-            top_k=2
-        )
+    for theme, quotes in zip(themes, theme_quotes):
         theme["expertPerspectives"] = quotes
         theme_display_name = theme.get("title") or theme.get("name", "Theme")
         if quotes:
@@ -120,23 +162,13 @@ def enhance_themes_with_lenny(theme_map: dict) -> dict:
             print(f"   ℹ️  {theme_display_name}: No expert quotes found (similarity threshold: 0.20)", file=sys.stderr)
     
     # Enhance counter-intuitive items
-    for item in theme_map.get("counterIntuitive", []):
-        quotes = search_lenny_for_theme(
-            item.get("title", ""),
-            item.get("perspective", ""),
-            top_k=1
-        )
+    for item, quotes in zip(counter_items, counter_quotes):
         item["expertChallenge"] = quotes[0] if quotes else None
         if quotes:
             print(f"   ✓ Counter-intuitive '{item.get('title', '')}': expert challenge found", file=sys.stderr)
     
     # Enhance unexplored territory items
-    for item in theme_map.get("unexploredTerritory", []):
-        quotes = search_lenny_for_theme(
-            item.get("title", ""),
-            item.get("why", ""),
-            top_k=1
-        )
+    for item, quotes in zip(unexplored_items, unexplored_quotes):
         item["expertInsight"] = quotes[0] if quotes else None
         if quotes:
             print(f"   ✓ Unexplored '{item.get('title', '')}': expert insight found", file=sys.stderr)
@@ -271,8 +303,7 @@ def generate_theme_map(
     source = force_source
     if source is None:
         # Check if Vector DB is configured and has data
-        client = get_supabase_client()
-        if client and get_message_count(client) > 1000:
+        if is_vector_db_configured() and get_message_count() > 1000:
             source = "vectordb"
         else:
             source = "sqlite"
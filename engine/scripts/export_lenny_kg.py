@@ -5,8 +5,15 @@ Export Lenny's Knowledge Graph data for distribution via GitHub Releases.
 Exports all KG data with source_type='expert' or source_type='lenny' to JSON files
 that can be imported into user Supabase instances.
 
+Tables are read with keyset pagination (id > last_id) and written page by
+page, so memory stays flat (only ids are kept, for deduplication). After
+every page the resume cursor is saved to lenny_kg_export_state.json;
+--resume continues an interrupted export from there.
+
 Usage:
     python3 engine/scripts/export_lenny_kg.py --output-dir ./exports
+    python3 engine/scripts/export_lenny_kg.py --output-dir ./exports --format jsonl --gzip --embedding-encoding f16
+    python3 engine/scripts/export_lenny_kg.py --output-dir ./exports --resume
 """
 
 import argparse
@@ -15,587 +22,394 @@ import os
 import sys
 from datetime import datetime, timezone
 from pathlib import Path
+from typing import Callable, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from engine.common.config import get_supabase_client
+from engine.common.kg_export_io import (
+    EMBEDDING_ENCODINGS,
+    EXPORT_FORMATS,
+    TABLE_PAGE_SIZE,
+    ExportWriter,
+    export_filename,
+    iter_export_records,
+    iter_table_pages,
+    iter_table_rows,
+)
+
+
+EXPORT_STATE_FILE = "lenny_kg_export_state.json"
+LENNY_SOURCE_TYPES = ["expert", "lenny"]
+PHASE_DONE = "__done__"
+
+
+class ExportRun:
+    """Export options plus the resume cursor, saved after every written page."""
+
+    def __init__(
+        self,
+        supabase,
+        output_dir: Path,
+        fmt: str = "json",
+        compress: bool = False,
+        embedding_encoding: str = "text",
+        page_size: int = TABLE_PAGE_SIZE,
+        resume: bool = False,
+    ):
+        self.supabase = supabase
+        self.output_dir = output_dir
+        self.page_size = page_size
+        self.options = {"format": fmt, "gzip": compress, "embedding_encoding": embedding_encoding}
+        self.state_path = output_dir / EXPORT_STATE_FILE
+        self.state = {"options": self.options, "tables": {}}
+
+        if resume and self.state_path.exists():
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("options") != self.options:
+                raise ValueError(
+                    f"Export options {self.options} differ from the interrupted export's "
+                    f"{saved.get('options')}; rerun with the same options or without --resume"
+                )
+            self.state = saved
+            print(f"↩️  Resuming export from {self.state_path}")
+
+    def save(self) -> None:
+        tmp_path = self.state_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def clear(self) -> None:
+        """Remove the resume cursor (export finished)."""
+        self.state_path.unlink(missing_ok=True)
+
+    def filename(self, stem: str) -> str:
+        return export_filename(stem, self.options["format"], self.options["gzip"])
+
+    def table_state(self, stem: str) -> dict:
+        return self.state["tables"].setdefault(stem, {"done": False, "phases": {}, "writer": None})
+
+    def is_done(self, stem: str) -> bool:
+        return self.table_state(stem)["done"]
+
+    def open(self, stem: str) -> tuple[ExportWriter, set]:
+        """
+        Open the writer for a table, resuming at the last saved page.
+
+        Returns:
+            (writer, ids already written)
+        """
+        table_state = self.table_state(stem)
+        writer = ExportWriter(
+            self.output_dir / self.filename(stem),
+            fmt=self.options["format"],
+            compress=self.options["gzip"],
+            embedding_encoding=self.options["embedding_encoding"],
+            resume_state=table_state["writer"],
+        )
+        seen = set()
+        if table_state["writer"]:
+            seen = {r.get("id") for r in iter_export_records(writer.path, allow_truncated=True)}
+            print(f"   Resuming after {writer.count:,} rows")
+        return writer, seen
 
+    def write(self, stem: str, writer: ExportWriter, rows: list, seen: set, phase: Optional[str] = None, cursor: str = "") -> None:
+        """Write new rows and save the cursor."""
+        rows = [r for r in rows if r["id"] not in seen]
+        seen.update(r["id"] for r in rows)
+        writer.write_page(rows)
+        table_state = self.table_state(stem)
+        table_state["writer"] = writer.state()
+        if phase:
+            table_state["phases"][phase] = cursor
+        self.save()
 
-def export_entities(supabase, output_dir: Path):
+    def export_phase(
+        self,
+        stem: str,
+        writer: ExportWriter,
+        seen: set,
+        phase: str,
+        table: str,
+        apply_filters: Callable,
+        row_filter: Optional[Callable[[dict], bool]] = None,
+        optional: bool = False,
+    ) -> None:
+        """
+        Stream one filtered query into the export, resumably.
+
+        Args:
+            stem: Export table name
+            writer: Open writer for the table
+            seen: Ids already written (rows are deduplicated across phases)
+            phase: Cursor key, unique within the table
+            table: Source table
+            apply_filters: callable(query) -> query selecting the rows
+            row_filter: Optional client-side filter
+            optional: Warn instead of failing (e.g. a column that may not exist)
+        """
+        phases = self.table_state(stem)["phases"]
+        cursor = phases.get(phase, "")
+        if cursor == PHASE_DONE:
+            return
+        try:
+            pages = iter_table_pages(self.supabase, table, "*", self.page_size, apply_filters, after_id=cursor)
+            for page in pages:
+                rows = [r for r in page if row_filter is None or row_filter(r)]
+                self.write(stem, writer, rows, seen, phase, page[-1]["id"])
+        except Exception as e:
+            if not optional:
+                raise
+            print(f"   ⚠️  {phase} query failed: {e}")
+        phases[phase] = PHASE_DONE
+        self.save()
+
+    def finish(self, stem: str, writer: ExportWriter) -> int:
+        writer.close()
+        table_state = self.table_state(stem)
+        table_state["writer"] = writer.state()
+        table_state["done"] = True
+        self.save()
+        print(f"   ✅ Exported {writer.count:,} rows to {writer.path}")
+        return writer.count
+
+    def done_count(self, stem: str) -> int:
+        count = self.table_state(stem)["writer"]["count"]
+        print(f"   ✅ Already exported ({count:,} rows)")
+        return count
+
+
+def _collect_ids(supabase, table: str, columns: list[str], apply_filters: Callable, optional: bool = True) -> set:
+    """Collect the values of id columns from all matching rows."""
+    ids = set()
+    try:
+        for row in iter_table_rows(supabase, table, ", ".join(["id"] + columns), apply_filters=apply_filters):
+            ids.update(row[c] for c in columns if row.get(c))
+    except Exception:
+        if not optional:
+            raise
+    return ids
+
+
+def export_entities(run: ExportRun):
     """Export all Lenny entities, including those referenced by mentions/relations."""
     print("📦 Exporting entities...")
-    
-    entities_dict = {}
-    
+    stem = "lenny_kg_entities"
+    if run.is_done(stem):
+        return run.done_count(stem)
+    writer, seen = run.open(stem)
+
     # Step 1: Export entities with source_type IN ('expert', 'lenny')
-    try:
-        offset = 0
-        limit = 1000
-        while True:
-            response = (
-                supabase.from_("kg_entities")
-                .select("*")
-                .in_("source_type", ["expert", "lenny"])
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not response.data or len(response.data) == 0:
-                break
-            for entity in response.data:
-                entities_dict[entity["id"]] = entity
-            offset += limit
-            if len(response.data) < limit:
-                break
-        if entities_dict:
-            print(f"   Found {len(entities_dict)} entities via source_type column")
-    except Exception as e:
-        print(f"   ⚠️  source_type column not available: {e}")
-    
+    run.export_phase(
+        stem, writer, seen, "source_type", "kg_entities",
+        lambda q: q.in_("source_type", LENNY_SOURCE_TYPES),
+        optional=True,
+    )
+    if writer.count:
+        print(f"   Found {writer.count:,} entities via source_type column")
+
     # Step 2: Get ALL entity IDs referenced by Lenny mentions (including 'both' or merged entities)
     print("   Collecting entity IDs from mentions...")
-    lenny_entity_ids = set()
-    offset = 0
-    limit = 1000
-    while True:
-        mentions_response = (
-            supabase.from_("kg_entity_mentions")
-            .select("entity_id")
-            .like("message_id", "lenny-%")
-            .range(offset, offset + limit - 1)
-            .execute()
-        )
-        if not mentions_response.data or len(mentions_response.data) == 0:
-            break
-        lenny_entity_ids.update(m["entity_id"] for m in mentions_response.data)
-        offset += limit
-        if len(mentions_response.data) < limit:
-            break
-    
-    # Also check source column for mentions
-    try:
-        offset = 0
-        limit = 1000
-        while True:
-            mentions_source = (
-                supabase.from_("kg_entity_mentions")
-                .select("entity_id")
-                .in_("source", ["expert", "lenny", "unknown"])
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not mentions_source.data or len(mentions_source.data) == 0:
-                break
-            lenny_entity_ids.update(m["entity_id"] for m in mentions_source.data)
-            offset += limit
-            if len(mentions_source.data) < limit:
-                break
-    except Exception:
-        pass
-    
+    referenced = _collect_ids(
+        run.supabase, "kg_entity_mentions", ["entity_id"], lambda q: q.like("message_id", "lenny-%"), optional=False
+    )
+    referenced |= _collect_ids(
+        run.supabase, "kg_entity_mentions", ["entity_id"], lambda q: q.in_("source", ["expert", "lenny", "unknown"])
+    )
+
     # Step 3: Get ALL entity IDs referenced by Lenny relations
     print("   Collecting entity IDs from relations...")
-    offset = 0
-    limit = 1000
-    while True:
-        try:
-            relations_response = (
-                supabase.from_("kg_relations")
-                .select("source_entity_id, target_entity_id")
-                .like("message_id", "lenny-%")
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not relations_response.data or len(relations_response.data) == 0:
-                break
-            for rel in relations_response.data:
-                if rel.get("source_entity_id"):
-                    lenny_entity_ids.add(rel["source_entity_id"])
-                if rel.get("target_entity_id"):
-                    lenny_entity_ids.add(rel["target_entity_id"])
-            offset += limit
-            if len(relations_response.data) < limit:
-                break
-        except Exception:
-            break
-    
-    # Also check source column for relations
-    try:
-        offset = 0
-        limit = 1000
-        while True:
-            relations_source = (
-                supabase.from_("kg_relations")
-                .select("source_entity_id, target_entity_id")
-                .in_("source", ["expert", "lenny", "unknown"])
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not relations_source.data or len(relations_source.data) == 0:
-                break
-            for rel in relations_source.data:
-                if rel.get("source_entity_id"):
-                    lenny_entity_ids.add(rel["source_entity_id"])
-                if rel.get("target_entity_id"):
-                    lenny_entity_ids.add(rel["target_entity_id"])
-            offset += limit
-            if len(relations_source.data) < limit:
-                break
-    except Exception:
-        pass
-    
-    print(f"   Found {len(lenny_entity_ids)} unique entity IDs from mentions/relations")
-    
+    relation_columns = ["source_entity_id", "target_entity_id"]
+    referenced |= _collect_ids(run.supabase, "kg_relations", relation_columns, lambda q: q.like("message_id", "lenny-%"))
+    referenced |= _collect_ids(
+        run.supabase, "kg_relations", relation_columns, lambda q: q.in_("source", ["expert", "lenny", "unknown"])
+    )
+    print(f"   Found {len(referenced):,} unique entity IDs from mentions/relations")
+
     # Step 4: Fetch ALL referenced entities (including 'both' or merged entities)
-    missing_entity_ids = [eid for eid in lenny_entity_ids if eid not in entities_dict]
+    missing_entity_ids = sorted(referenced - seen)
     if missing_entity_ids:
-        print(f"   Fetching {len(missing_entity_ids)} additional entities referenced by mentions/relations...")
-        batch_size = 1000
-        for i in range(0, len(missing_entity_ids), batch_size):
-            batch_ids = missing_entity_ids[i:i + batch_size]
-            entity_response = supabase.from_("kg_entities").select("*").in_("id", batch_ids).execute()
-            if entity_response.data:
-                for entity in entity_response.data:
-                    entities_dict[entity["id"]] = entity
-    
-    entities = list(entities_dict.values())
-    print(f"   Total: {len(entities)} entities (includes all referenced entities)")
-    
-    # Write to JSON
-    output_file = output_dir / "lenny_kg_entities.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(entities, f, indent=2, ensure_ascii=False, default=str)
-    
-    print(f"   ✅ Exported to {output_file}")
-    return len(entities)
+        print(f"   Fetching {len(missing_entity_ids):,} additional entities referenced by mentions/relations...")
+        for i in range(0, len(missing_entity_ids), run.page_size):
+            batch_ids = missing_entity_ids[i:i + run.page_size]
+            response = run.supabase.from_("kg_entities").select("*").in_("id", batch_ids).execute()
+            run.write(stem, writer, response.data or [], seen)
+
+    return run.finish(stem, writer)
 
 
-def export_mentions(supabase, output_dir: Path):
+def export_mentions(run: ExportRun):
     """Export all Lenny entity mentions."""
     print("📦 Exporting entity mentions...")
-    
-    mentions_dict = {}
-    
-    # Fetch all Lenny mentions by message_id pattern (most reliable) with pagination
-    # Lenny mentions have message_id like "lenny-{episode}-{chunk}"
-    offset = 0
-    limit = 1000
-    while True:
-        response = (
-            supabase.from_("kg_entity_mentions")
-            .select("*")
-            .like("message_id", "lenny-%")
-            .range(offset, offset + limit - 1)
-            .execute()
-        )
-        if not response.data or len(response.data) == 0:
-            break
-        for mention in response.data:
-            mentions_dict[mention["id"]] = mention
-        offset += limit
-        if len(response.data) < limit:
-            break
-    
-    # Also try source column if it exists (migration may have added it) with pagination
-    # Include 'unknown' source (likely from Lenny's data)
-    try:
-        offset = 0
-        limit = 1000
-        while True:
-            response_source = (
-                supabase.from_("kg_entity_mentions")
-                .select("*")
-                .in_("source", ["expert", "lenny", "unknown"])
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not response_source.data or len(response_source.data) == 0:
-                break
-            for mention in response_source.data:
-                if mention["id"] not in mentions_dict:
-                    mentions_dict[mention["id"]] = mention
-            offset += limit
-            if len(response_source.data) < limit:
-                break
-    except Exception:
-        # source column doesn't exist, use message_id pattern only
-        pass
-    
-    mentions = list(mentions_dict.values())
-    
-    # Verify no user data contamination
-    user_mentions = [m for m in mentions if m.get("message_id") and not m.get("message_id", "").startswith("lenny-")]
-    if user_mentions:
-        print(f"   ⚠️  WARNING: Found {len(user_mentions)} non-Lenny mentions!")
-        # Remove user mentions
-        mentions = [m for m in mentions if m.get("message_id", "").startswith("lenny-")]
-        print(f"   ✅ Filtered out user mentions, remaining: {len(mentions)}")
-    
-    print(f"   Total: {len(mentions)} Lenny mentions")
-    
-    # Write to JSON
-    output_file = output_dir / "lenny_kg_mentions.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(mentions, f, indent=2, ensure_ascii=False, default=str)
-    
-    print(f"   ✅ Exported to {output_file}")
-    return len(mentions)
+    stem = "lenny_kg_mentions"
+    if run.is_done(stem):
+        return run.done_count(stem)
+    writer, seen = run.open(stem)
+
+    # Lenny mentions have message_id like "lenny-{episode}-{chunk}". Rows matched
+    # only via the source column were always dropped by the user-data filter,
+    # so the message_id pattern alone selects the full export.
+    run.export_phase(
+        stem, writer, seen, "message_id", "kg_entity_mentions",
+        lambda q: q.like("message_id", "lenny-%"),
+    )
+    return run.finish(stem, writer)
 
 
-def export_relations(supabase, output_dir: Path):
+def export_relations(run: ExportRun):
     """Export all Lenny relations."""
     print("📦 Exporting relations...")
-    
+    stem = "lenny_kg_relations"
+    if run.is_done(stem):
+        return run.done_count(stem)
+    writer, seen = run.open(stem)
+
     # First, get all Lenny entity IDs
     print("   Fetching Lenny entity IDs...")
-    lenny_entity_ids = set()
-    offset = 0
-    limit = 1000
-    while True:
-        try:
-            response = (
-                supabase.from_("kg_entities")
-                .select("id")
-                .in_("source_type", ["expert", "lenny"])
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not response.data or len(response.data) == 0:
-                break
-            lenny_entity_ids.update(e["id"] for e in response.data)
-            offset += limit
-            if len(response.data) < limit:
-                break
-        except Exception:
-            # Try source column instead
-            try:
-                response = (
-                    supabase.from_("kg_entities")
-                    .select("id")
-                    .in_("source", ["expert", "lenny"])
-                    .range(offset, offset + limit - 1)
-                    .execute()
-                )
-                if not response.data or len(response.data) == 0:
-                    break
-                lenny_entity_ids.update(e["id"] for e in response.data)
-                offset += limit
-                if len(response.data) < limit:
-                    break
-            except Exception:
-                break
-    
-    print(f"   Found {len(lenny_entity_ids)} Lenny entities")
-    
+    try:
+        lenny_entity_ids = _collect_ids(
+            run.supabase, "kg_entities", ["id"], lambda q: q.in_("source_type", LENNY_SOURCE_TYPES), optional=False
+        )
+    except Exception:
+        # Try source column instead
+        lenny_entity_ids = _collect_ids(
+            run.supabase, "kg_entities", ["id"], lambda q: q.in_("source", LENNY_SOURCE_TYPES)
+        )
+    print(f"   Found {len(lenny_entity_ids):,} Lenny entities")
+
     if not lenny_entity_ids:
         print("   ⚠️  No Lenny entities found, cannot identify Lenny relations")
-        relations = []
     else:
-        # Fetch all relations and filter by checking if source or target is Lenny entity
-        relations_dict = {}
-        lenny_entity_ids_list = list(lenny_entity_ids)
-        
-        # Process in batches to avoid query size limits
+        # Relations where source or target is a Lenny entity; batched to avoid
+        # query size limits. Sorted so batch numbers are stable across resumes.
+        lenny_entity_ids_list = sorted(lenny_entity_ids)
         batch_size = 500
-        total_checked = 0
-        
         for i in range(0, len(lenny_entity_ids_list), batch_size):
             batch_ids = lenny_entity_ids_list[i:i + batch_size]
-            
-            # Check relations where source entity is Lenny
-            offset = 0
-            limit = 1000
-            while True:
-                try:
-                    response = (
-                        supabase.from_("kg_relations")
-                        .select("*")
-                        .in_("source_entity_id", batch_ids)
-                        .range(offset, offset + limit - 1)
-                        .execute()
-                    )
-                    if not response.data or len(response.data) == 0:
-                        break
-                    for relation in response.data:
-                        relations_dict[relation["id"]] = relation
-                    offset += limit
-                    total_checked += len(response.data)
-                    if len(response.data) < limit:
-                        break
-                except Exception as e:
-                    print(f"   ⚠️  Error fetching source relations: {e}")
-                    break
-            
-            # Check relations where target entity is Lenny
-            offset = 0
-            limit = 1000
-            while True:
-                try:
-                    response = (
-                        supabase.from_("kg_relations")
-                        .select("*")
-                        .in_("target_entity_id", batch_ids)
-                        .range(offset, offset + limit - 1)
-                        .execute()
-                    )
-                    if not response.data or len(response.data) == 0:
-                        break
-                    for relation in response.data:
-                        relations_dict[relation["id"]] = relation
-                    offset += limit
-                    total_checked += len(response.data)
-                    if len(response.data) < limit:
-                        break
-                except Exception as e:
-                    print(f"   ⚠️  Error fetching target relations: {e}")
-                    break
-        
-        print(f"   Checked {total_checked} relations, found {len(relations_dict)} Lenny relations")
-        relations = list(relations_dict.values())
-    
+            batch_no = i // batch_size
+            for column in ("source_entity_id", "target_entity_id"):
+                run.export_phase(
+                    stem, writer, seen, f"{column}:{batch_no}", "kg_relations",
+                    lambda q, column=column, batch_ids=batch_ids: q.in_(column, batch_ids),
+                    optional=True,
+                )
+        print(f"   Found {writer.count:,} Lenny relations")
+
     # Also try direct filters (message_id pattern, source column) as fallback
-    if not relations:
+    if not writer.count:
         print("   Trying direct filters...")
-        # Try message_id pattern
-        offset = 0
-        limit = 1000
-        while True:
-            try:
-                response = (
-                    supabase.from_("kg_relations")
-                    .select("*")
-                    .like("message_id", "lenny-%")
-                    .range(offset, offset + limit - 1)
-                    .execute()
-                )
-                if not response.data or len(response.data) == 0:
-                    break
-                for relation in response.data:
-                    relations_dict[relation["id"]] = relation
-                offset += limit
-                if len(response.data) < limit:
-                    break
-            except Exception:
-                break
-        
-        # Try source column
-        try:
-            offset = 0
-            limit = 1000
-            while True:
-                response_source = (
-                    supabase.from_("kg_relations")
-                    .select("*")
-                    .in_("source", ["expert", "lenny"])
-                    .range(offset, offset + limit - 1)
-                    .execute()
-                )
-                if not response_source.data or len(response_source.data) == 0:
-                    break
-                for relation in response_source.data:
-                    relations_dict[relation["id"]] = relation
-                offset += limit
-                if len(response_source.data) < limit:
-                    break
-        except Exception:
-            pass
-        
-        relations = list(relations_dict.values())
-    
-    print(f"   Total: {len(relations)} relations")
-    
-    # Write to JSON
-    output_file = output_dir / "lenny_kg_relations.json"
-    with open(output_file, "w", encoding="utf-8") as f:
-        json.dump(relations, f, indent=2, ensure_ascii=False, default=str)
-    
-    print(f"   ✅ Exported to {output_file}")
-    return len(relations)
+        run.export_phase(
+            stem, writer, seen, "message_id", "kg_relations",
+            lambda q: q.like("message_id", "lenny-%"),
+            optional=True,
+        )
+        run.export_phase(
+            stem, writer, seen, "source", "kg_relations",
+            lambda q: q.in_("source", LENNY_SOURCE_TYPES),
+            optional=True,
+        )
+
+    return run.finish(stem, writer)
 
 
-def export_conversations(supabase, output_dir: Path):
+def export_conversations(run: ExportRun):
     """Export Lenny conversations (if any)."""
     print("📦 Exporting conversations...")
-    
-    conversations_dict = {}
-    
-    # Export by source_type column with pagination (most reliable)
-    try:
-        offset = 0
-        limit = 1000
-        while True:
-            response_type = (
-                supabase.from_("kg_conversations")
-                .select("*")
-                .in_("source_type", ["expert", "lenny"])
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not response_type.data or len(response_type.data) == 0:
-                break
-            for conv in response_type.data:
-                conversations_dict[conv["id"]] = conv
-            offset += limit
-            if len(response_type.data) < limit:
-                break
-        if conversations_dict:
-            print(f"   Found {len(conversations_dict)} conversations via source_type")
-    except Exception as e:
-        print(f"   ⚠️  source_type export failed: {e}")
-    
-    # Also try conversation_id pattern with pagination (as additional filter)
-    try:
-        offset = 0
-        limit = 1000
-        while True:
-            response = (
-                supabase.from_("kg_conversations")
-                .select("*")
-                .like("conversation_id", "lenny-%")
-                .range(offset, offset + limit - 1)
-                .execute()
-            )
-            if not response.data or len(response.data) == 0:
-                break
-            for conv in response.data:
-                # Add to dict (will deduplicate by id)
-                conversations_dict[conv["id"]] = conv
-            offset += limit
-            if len(response.data) < limit:
-                break
-    except Exception:
-        pass
-    
-    conversations = list(conversations_dict.values())
-    
-    # Verify no user data contamination
-    user_contamination = [c for c in conversations if c.get("source_type") == "user"]
-    if user_contamination:
-        print(f"   ⚠️  WARNING: Found {len(user_contamination)} user conversations in export!")
-        # Remove user conversations
-        conversations = [c for c in conversations if c.get("source_type") != "user"]
-        print(f"   ✅ Filtered out user conversations, remaining: {len(conversations)}")
-    
-    if conversations:
-        print(f"   Total: {len(conversations)} Lenny conversations")
-        output_file = output_dir / "lenny_kg_conversations.json"
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(conversations, f, indent=2, ensure_ascii=False, default=str)
-        print(f"   ✅ Exported to {output_file}")
+    stem = "lenny_kg_conversations"
+    if run.is_done(stem):
+        count = run.done_count(stem)
     else:
+        writer, seen = run.open(stem)
+        # Verify no user data contamination
+        not_user = lambda c: c.get("source_type") != "user"
+
+        # Export by source_type column (most reliable)
+        run.export_phase(
+            stem, writer, seen, "source_type", "kg_conversations",
+            lambda q: q.in_("source_type", LENNY_SOURCE_TYPES),
+            row_filter=not_user,
+            optional=True,
+        )
+        # Also try conversation_id pattern (as additional filter)
+        run.export_phase(
+            stem, writer, seen, "conversation_id", "kg_conversations",
+            lambda q: q.like("conversation_id", "lenny-%"),
+            row_filter=not_user,
+            optional=True,
+        )
+        count = run.finish(stem, writer)
+
+    if not count:
         print(f"   ⚠️  No Lenny conversations found")
-    
-    return len(conversations)
+        (run.output_dir / run.filename(stem)).unlink(missing_ok=True)
+    return count
 
 
-def verify_export_integrity(output_dir: Path, stats: dict):
+def verify_export_integrity(run: ExportRun, stats: dict):
     """Verify exported files don't contain user data."""
     print("   Checking for user data contamination...")
-    
-    # Check entities
-    entities_file = output_dir / "lenny_kg_entities.json"
-    if entities_file.exists():
-        with open(entities_file, "r", encoding="utf-8") as f:
-            entities = json.load(f)
-        user_entities = [e for e in entities if e.get("source_type") == "user"]
-        if user_entities:
-            print(f"   ⚠️  WARNING: Found {len(user_entities)} user entities!")
-        else:
-            print(f"   ✅ Entities: All {len(entities)} are Lenny (expert/lenny source_type)")
-    
-    # Check mentions
-    mentions_file = output_dir / "lenny_kg_mentions.json"
-    if mentions_file.exists():
-        with open(mentions_file, "r", encoding="utf-8") as f:
-            mentions = json.load(f)
-        user_mentions = [m for m in mentions if m.get("message_id") and not str(m.get("message_id", "")).startswith("lenny-")]
-        if user_mentions:
-            print(f"   ⚠️  WARNING: Found {len(user_mentions)} user mentions!")
-        else:
-            print(f"   ✅ Mentions: All {len(mentions)} have lenny- prefix")
-    
-    # Check relations (verify they involve Lenny entities)
-    relations_file = output_dir / "lenny_kg_relations.json"
-    if relations_file.exists():
-        with open(relations_file, "r", encoding="utf-8") as f:
-            relations = json.load(f)
-        # Relations are verified during export (must involve Lenny entities)
-        print(f"   ✅ Relations: All {len(relations)} involve Lenny entities")
-    
-    # Check conversations
-    conversations_file = output_dir / "lenny_kg_conversations.json"
-    if conversations_file.exists():
-        with open(conversations_file, "r", encoding="utf-8") as f:
-            conversations = json.load(f)
-        user_conv = [c for c in conversations if c.get("source_type") == "user"]
-        if user_conv:
-            print(f"   ⚠️  WARNING: Found {len(user_conv)} user conversations!")
-        else:
-            print(f"   ✅ Conversations: All {len(conversations)} are Lenny (expert/lenny source_type)")
-            # Note: These are chunks/segments, not episodes
-            unique_episodes = len(set(c.get("conversation_id", "").split("-")[1:3] for c in conversations if c.get("conversation_id")))
-            print(f"      Note: {len(conversations)} conversations represent chunks from ~{unique_episodes} episodes")
 
+    def records(stem):
+        path = run.output_dir / run.filename(stem)
+        return iter_export_records(path) if path.exists() else None
 
-def verify_export_integrity(output_dir: Path, stats: dict):
-    """Verify exported files don't contain user data."""
-    print("\n🔍 Verifying export integrity...")
-    
     # Check entities
-    entities_file = output_dir / "lenny_kg_entities.json"
-    if entities_file.exists():
-        with open(entities_file, "r", encoding="utf-8") as f:
-            entities = json.load(f)
-        user_entities = [e for e in entities if e.get("source_type") == "user"]
-        episode_entities = [e for e in entities if e.get("entity_type") == "episode"]
+    entities = records("lenny_kg_entities")
+    if entities is not None:
+        total = user_entities = episode_entities = 0
+        for e in entities:
+            total += 1
+            user_entities += e.get("source_type") == "user"
+            episode_entities += e.get("entity_type") == "episode"
         if user_entities:
-            print(f"   ⚠️  WARNING: Found {len(user_entities)} user entities!")
+            print(f"   ⚠️  WARNING: Found {user_entities} user entities!")
         else:
-            print(f"   ✅ Entities: All {len(entities)} are Lenny (expert/lenny source_type)")
-            print(f"      Includes {len(episode_entities)} episode entities")
-    
+            print(f"   ✅ Entities: All {total} are Lenny (expert/lenny source_type)")
+            print(f"      Includes {episode_entities} episode entities")
+
     # Check mentions
-    mentions_file = output_dir / "lenny_kg_mentions.json"
-    if mentions_file.exists():
-        with open(mentions_file, "r", encoding="utf-8") as f:
-            mentions = json.load(f)
-        user_mentions = [m for m in mentions if m.get("message_id") and not str(m.get("message_id", "")).startswith("lenny-")]
+    mentions = records("lenny_kg_mentions")
+    if mentions is not None:
+        total = user_mentions = 0
+        for m in mentions:
+            total += 1
+            user_mentions += bool(m.get("message_id") and not str(m.get("message_id", "")).startswith("lenny-"))
         if user_mentions:
-            print(f"   ⚠️  WARNING: Found {len(user_mentions)} user mentions!")
+            print(f"   ⚠️  WARNING: Found {user_mentions} user mentions!")
         else:
-            print(f"   ✅ Mentions: All {len(mentions)} have lenny- prefix")
-    
+            print(f"   ✅ Mentions: All {total} have lenny- prefix")
+
     # Check relations (verify they involve Lenny entities)
-    relations_file = output_dir / "lenny_kg_relations.json"
-    if relations_file.exists():
-        with open(relations_file, "r", encoding="utf-8") as f:
-            relations = json.load(f)
+    if records("lenny_kg_relations") is not None:
         # Relations are verified during export (must involve Lenny entities)
-        print(f"   ✅ Relations: All {len(relations)} involve Lenny entities")
-    
+        print(f"   ✅ Relations: All {stats['relations']} involve Lenny entities")
+
     # Check conversations
-    conversations_file = output_dir / "lenny_kg_conversations.json"
-    if conversations_file.exists():
-        with open(conversations_file, "r", encoding="utf-8") as f:
-            conversations = json.load(f)
-        user_conv = [c for c in conversations if c.get("source_type") == "user"]
+    conversations = records("lenny_kg_conversations")
+    if conversations is not None:
+        total = user_conv = 0
+        episode_slugs = set()
+        for c in conversations:
+            total += 1
+            user_conv += c.get("source_type") == "user"
+            # Note: These are chunks/segments, not episodes
+            conv_id = c.get("conversation_id", "")
+            if conv_id.startswith("lenny-"):
+                parts = conv_id.split("-")
+                if len(parts) >= 3:
+                    episode_slug = "-".join(parts[1:3])  # e.g., "ada-chen-rekhi" from "lenny-ada-chen-rekhi-1"
+                    episode_slugs.add(episode_slug)
         if user_conv:
-            print(f"   ⚠️  WARNING: Found {len(user_conv)} user conversations!")
+            print(f"   ⚠️  WARNING: Found {user_conv} user conversations!")
         else:
-            print(f"   ✅ Conversations: All {len(conversations)} are Lenny (expert/lenny source_type)")
-            # Note: These are chunks/segments, not episodes
-            episode_slugs = set()
-            for c in conversations:
-                conv_id = c.get("conversation_id", "")
-                if conv_id.startswith("lenny-"):
-                    parts = conv_id.split("-")
-                    if len(parts) >= 3:
-                        episode_slug = "-".join(parts[1:3])  # e.g., "ada-chen-rekhi" from "lenny-ada-chen-rekhi-1"
-                        episode_slugs.add(episode_slug)
-            print(f"      Note: {len(conversations)} conversations represent chunks from ~{len(episode_slugs)} unique episodes")
-
-
-def create_manifest(output_dir: Path, stats: dict):
+            print(f"   ✅ Conversations: All {total} are Lenny (expert/lenny source_type)")
+            print(f"      Note: {total} conversations represent chunks from ~{len(episode_slugs)} unique episodes")
+
+
+def create_manifest(run: ExportRun, stats: dict):
     """Create manifest file with export metadata."""
     manifest = {
         "version": "1.0.0",
@@ -607,20 +421,23 @@ def create_manifest(output_dir: Path, stats: dict):
         "relation_count": stats.get("relations", 0),
         "conversation_count": stats.get("conversations", 0),
         "note": "Conversations are episode chunks/segments, not full episodes. Episode entities (entity_type='episode') are included in entities export.",
+        "format": run.options["format"],
+        "compression": "gzip" if run.options["gzip"] else None,
+        "embedding_encoding": run.options["embedding_encoding"],
         "files": [
-            "lenny_kg_entities.json",
-            "lenny_kg_mentions.json",
-            "lenny_kg_relations.json",
+            run.filename("lenny_kg_entities"),
+            run.filename("lenny_kg_mentions"),
+            run.filename("lenny_kg_relations"),
         ],
     }
-    
+
     if stats.get("conversations", 0) > 0:
-        manifest["files"].append("lenny_kg_conversations.json")
-    
-    output_file = output_dir / "lenny_kg_manifest.json"
+        manifest["files"].append(run.filename("lenny_kg_conversations"))
+
+    output_file = run.output_dir / "lenny_kg_manifest.json"
     with open(output_file, "w", encoding="utf-8") as f:
         json.dump(manifest, f, indent=2, ensure_ascii=False)
-    
+
     print(f"   ✅ Manifest created: {output_file}")
     return manifest
 
@@ -639,39 +456,82 @@ def main():
         default=303,
         help="Number of episodes (for manifest, default: 303)",
     )
-    
+    parser.add_argument(
+        "--format",
+        choices=EXPORT_FORMATS,
+        default="json",
+        help="json: one JSON array per table (release format); jsonl: one record per line (default: json)",
+    )
+    parser.add_argument(
+        "--gzip",
+        action="store_true",
+        help="gzip the exported table files (.gz)",
+    )
+    parser.add_argument(
+        "--embedding-encoding",
+        choices=EMBEDDING_ENCODINGS,
+        default="text",
+        help="text: pgvector text as stored; f32/f16: base64 little-endian floats (default: text)",
+    )
+    parser.add_argument(
+        "--page-size",
+        type=int,
+        default=TABLE_PAGE_SIZE,
+        help=f"Rows per request (default: {TABLE_PAGE_SIZE})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Continue an interrupted export from {EXPORT_STATE_FILE}",
+    )
+
     args = parser.parse_args()
-    
+
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
-    
+
     print("🔮 Lenny's Knowledge Graph Exporter")
     print("=" * 50)
     print(f"Output directory: {output_dir.absolute()}")
     print()
-    
+
     # Connect to Supabase
     supabase = get_supabase_client()
     if not supabase:
         print("❌ Failed to connect to Supabase. Check SUPABASE_URL and SUPABASE_ANON_KEY.")
         sys.exit(1)
-    
+
+    try:
+        run = ExportRun(
+            supabase,
+            output_dir,
+            fmt=args.format,
+            compress=args.gzip,
+            embedding_encoding=args.embedding_encoding,
+            page_size=args.page_size,
+            resume=args.resume,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
     # Export all tables
     stats = {
         "episodes": args.episode_count,
-        "entities": export_entities(supabase, output_dir),
-        "mentions": export_mentions(supabase, output_dir),
-        "relations": export_relations(supabase, output_dir),
-        "conversations": export_conversations(supabase, output_dir),  # Optional - derived from mentions
+        "entities": export_entities(run),
+        "mentions": export_mentions(run),
+        "relations": export_relations(run),
+        "conversations": export_conversations(run),  # Optional - derived from mentions
     }
-    
+
     # Verify no user data contamination
     print("\n🔍 Verifying export integrity...")
-    verify_export_integrity(output_dir, stats)
-    
+    verify_export_integrity(run, stats)
+
     # Create manifest
-    manifest = create_manifest(output_dir, stats)
-    
+    manifest = create_manifest(run, stats)
+    run.clear()
+
     print()
     print("=" * 50)
     print("✅ Export complete!")
@@ -5,28 +5,44 @@ Import Lenny's Knowledge Graph data from exported JSON files.
 Imports KG data into user's Supabase instance, handling deduplication
 and preserving user's existing data.
 
+By default the export is imported in bulk: each file is streamed, existing
+keys are pre-fetched into memory sets with keyset-paginated selects, and new
+rows are written as batched upserts by a bounded thread pool. --row-by-row
+keeps the original select-then-insert per record.
+
 Usage:
     python3 engine/scripts/import_lenny_kg.py --data-dir ./exports/lenny-kg
+    python3 engine/scripts/import_lenny_kg.py --data-dir ./exports/lenny-kg --workers 8
 """
 
 import argparse
 import json
 import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
+from typing import Callable, Iterable, Optional
 
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
 from engine.common.config import get_supabase_client
+from engine.common.kg_export_io import find_export_file, iter_export_records, iter_table_rows
+
+
+BULK_BATCH_SIZE = 500
+BULK_WORKERS = 4
 
 
 def load_json_file(data_dir: Path, filename: str):
-    """Load JSON file from data directory."""
-    file_path = data_dir / filename
-    if not file_path.exists():
+    """Load JSON file from data directory (table files may be .jsonl / .gz)."""
+    file_path = find_export_file(data_dir, filename)
+    if not file_path:
         print(f"⚠️  File not found: {filename}")
         return None
     
+    if filename != "lenny_kg_manifest.json":
+        return list(iter_export_records(file_path))
     with open(file_path, "r", encoding="utf-8") as f:
         return json.load(f)
 
@@ -209,6 +225,208 @@ def import_conversations(supabase, conversations: list, dry_run: bool = False):
     return imported
 
 
+# ============================================================================
+# Bulk import
+# ============================================================================
+
+def _write_batch(supabase, table: str, rows: list) -> list:
+    """
+    Upsert one batch; on failure retry row by row to isolate bad records.
+
+    Returns:
+        ids of rows that could not be written
+    """
+    try:
+        supabase.from_(table).upsert(rows, on_conflict="id", ignore_duplicates=True).execute()
+        return []
+    except Exception as e:
+        print(f"   ⚠️  Batch write to {table} failed ({e}), retrying row by row")
+
+    failed = []
+    for row in rows:
+        try:
+            supabase.from_(table).upsert(row, on_conflict="id", ignore_duplicates=True).execute()
+        except Exception as e:
+            print(f"   ⚠️  Failed to import {table} row {row.get('id')}: {e}")
+            failed.append(row.get("id"))
+    return failed
+
+
+def write_batches(supabase, table: str, rows: Iterable[dict], batch_size: int, workers: int) -> tuple[int, set]:
+    """
+    Write rows in batched upserts with at most `workers` requests in flight.
+
+    Args:
+        supabase: Supabase client
+        table: Target table
+        rows: Rows to write (consumed lazily)
+        batch_size: Rows per upsert
+        workers: Concurrent upsert requests
+
+    Returns:
+        (rows submitted, ids of rows that failed)
+    """
+    submitted = 0
+    failed: set = set()
+    in_flight = set()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        def submit(batch):
+            # Bound memory: wait for a slot before queuing the next batch
+            while len(in_flight) >= workers:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    in_flight.remove(future)
+                    failed.update(future.result())
+            in_flight.add(executor.submit(_write_batch, supabase, table, batch))
+
+        batch = []
+        for row in rows:
+            batch.append(row)
+            submitted += 1
+            if len(batch) >= batch_size:
+                submit(batch)
+                batch = []
+        if batch:
+            submit(batch)
+
+        for future in in_flight:
+            failed.update(future.result())
+
+    return submitted, failed
+
+
+def bulk_import_table(
+    supabase,
+    data_dir: Path,
+    filename: str,
+    label: str,
+    table: str,
+    key_columns: str,
+    key_of: Callable[[dict], tuple],
+    is_valid: Optional[Callable[[dict], bool]] = None,
+    batch_size: int = BULK_BATCH_SIZE,
+    workers: int = BULK_WORKERS,
+    dry_run: bool = False,
+) -> tuple[int, set]:
+    """
+    Import one export file in bulk.
+
+    Existing rows are identified by the same natural key the row-by-row
+    importer checks (key_of), plus the row id; rows failing is_valid (e.g.
+    unknown entity references) are skipped.
+
+    Args:
+        supabase: Supabase client
+        data_dir: Export directory
+        filename: Release file name (.jsonl / .gz variants are found too)
+        label: Name used in progress output
+        table: Target table
+        key_columns: Columns to pre-fetch (must include id and key_of's fields)
+        key_of: Natural key of a row
+        is_valid: Optional filter for rows that can be imported
+        batch_size: Rows per upsert
+        workers: Concurrent upsert requests
+        dry_run: Count new rows without writing
+
+    Returns:
+        (rows imported, ids of imported rows)
+    """
+    file_path = find_export_file(data_dir, filename)
+    if not file_path:
+        print(f"⚠️  File not found: {filename}")
+        return 0, set()
+
+    print(f"📦 Importing {label}...")
+    start = time.time()
+
+    existing_ids = set()
+    existing_keys = set()
+    for row in iter_table_rows(supabase, table, key_columns):
+        existing_ids.add(row["id"])
+        existing_keys.add(key_of(row))
+    print(f"   Pre-fetched {len(existing_keys):,} existing keys in {time.time() - start:.1f}s")
+
+    seen = 0
+    skipped = 0
+    new_ids = set()
+
+    def new_rows():
+        nonlocal seen, skipped
+        for row in iter_export_records(file_path):
+            seen += 1
+            key = key_of(row)
+            if key in existing_keys or row.get("id") in existing_ids or (is_valid and not is_valid(row)):
+                skipped += 1
+                continue
+            # Also dedupes repeats within the export itself
+            existing_keys.add(key)
+            existing_ids.add(row.get("id"))
+            new_ids.add(row.get("id"))
+            yield row
+
+    if dry_run:
+        imported = sum(1 for _ in new_rows())
+        failed = set()
+    else:
+        imported, failed = write_batches(supabase, table, new_rows(), batch_size, workers)
+        imported -= len(failed)
+        new_ids -= failed
+
+    elapsed = max(time.time() - start, 1e-6)
+    status = "[DRY RUN] Would import" if dry_run else "✅ Imported"
+    failed_note = f", Failed: {len(failed):,}" if failed else ""
+    print(f"   {status}: {imported:,}, Skipped: {skipped:,}{failed_note} ({seen / elapsed:,.0f} rows/s)")
+    return imported, new_ids
+
+
+def bulk_import(supabase, data_dir: Path, batch_size: int, workers: int, dry_run: bool = False) -> dict:
+    """Import all export files in dependency order: entities → mentions → relations → conversations."""
+    # Entity ids that mentions/relations may reference: existing plus newly imported
+    entity_ids = {row["id"] for row in iter_table_rows(supabase, "kg_entities", "id")}
+    common = {"batch_size": batch_size, "workers": workers, "dry_run": dry_run}
+
+    entities, new_entity_ids = bulk_import_table(
+        supabase, data_dir, "lenny_kg_entities.json", "entities", "kg_entities",
+        "id, canonical_name, entity_type",
+        key_of=lambda e: (e.get("canonical_name"), e.get("entity_type") or "other"),
+        **common,
+    )
+    entity_ids |= new_entity_ids
+
+    mentions, _ = bulk_import_table(
+        supabase, data_dir, "lenny_kg_mentions.json", "mentions", "kg_entity_mentions",
+        "id, message_id, entity_id",
+        key_of=lambda m: (m.get("message_id") or "", m.get("entity_id")),
+        is_valid=lambda m: m.get("entity_id") in entity_ids,
+        **common,
+    )
+
+    relations, _ = bulk_import_table(
+        supabase, data_dir, "lenny_kg_relations.json", "relations", "kg_relations",
+        "id, source_entity_id, target_entity_id, relation_type",
+        key_of=lambda r: (r.get("source_entity_id"), r.get("target_entity_id"), r.get("relation_type") or ""),
+        is_valid=lambda r: r.get("source_entity_id") in entity_ids and r.get("target_entity_id") in entity_ids,
+        **common,
+    )
+
+    conversations = 0
+    if find_export_file(data_dir, "lenny_kg_conversations.json"):
+        conversations, _ = bulk_import_table(
+            supabase, data_dir, "lenny_kg_conversations.json", "conversations", "kg_conversations",
+            "id, conversation_id",
+            key_of=lambda c: (c.get("conversation_id") or "",),
+            **common,
+        )
+
+    return {
+        "entities": entities,
+        "mentions": mentions,
+        "relations": relations,
+        "conversations": conversations,
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description="Import Lenny's Knowledge Graph from exported files")
     parser.add_argument(
@@ -222,6 +440,23 @@ def main():
         action="store_true",
         help="Dry run mode (don't actually import)",
     )
+    parser.add_argument(
+        "--row-by-row",
+        action="store_true",
+        help="Use the original select-then-insert per record instead of bulk import",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=BULK_WORKERS,
+        help=f"Concurrent upsert requests in bulk mode (default: {BULK_WORKERS})",
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=BULK_BATCH_SIZE,
+        help=f"Rows per upsert in bulk mode (default: {BULK_BATCH_SIZE})",
+    )
     
     args = parser.parse_args()
     
@@ -255,19 +490,24 @@ def main():
         print(f"   Relations: {manifest.get('relation_count', 0):,}")
         print()
     
-    # Load and import data
-    entities = load_json_file(data_dir, "lenny_kg_entities.json") or []
-    mentions = load_json_file(data_dir, "lenny_kg_mentions.json") or []
-    relations = load_json_file(data_dir, "lenny_kg_relations.json") or []
-    conversations = load_json_file(data_dir, "lenny_kg_conversations.json") or []
-    
-    # Import in order: entities → mentions → relations → conversations
-    stats = {
-        "entities": import_entities(supabase, entities, args.dry_run),
-        "mentions": import_mentions(supabase, mentions, args.dry_run),
-        "relations": import_relations(supabase, relations, args.dry_run),
-        "conversations": import_conversations(supabase, conversations, args.dry_run),
-    }
+    start = time.time()
+    if args.row_by_row:
+        # Load and import data
+        entities = load_json_file(data_dir, "lenny_kg_entities.json") or []
+        mentions = load_json_file(data_dir, "lenny_kg_mentions.json") or []
+        relations = load_json_file(data_dir, "lenny_kg_relations.json") or []
+        conversations = load_json_file(data_dir, "lenny_kg_conversations.json") or []
+        
+        # Import in order: entities → mentions → relations → conversations
+        stats = {
+            "entities": import_entities(supabase, entities, args.dry_run),
+            "mentions": import_mentions(supabase, mentions, args.dry_run),
+            "relations": import_relations(supabase, relations, args.dry_run),
+            "conversations": import_conversations(supabase, conversations, args.dry_run),
+        }
+    else:
+        stats = bulk_import(supabase, data_dir, args.batch_size, max(1, args.workers), args.dry_run)
+    elapsed = time.time() - start
     
     print()
     print("=" * 50)
@@ -282,6 +522,7 @@ def main():
     print(f"   Relations: {stats['relations']:,}")
     if stats["conversations"] > 0:
         print(f"   Conversations: {stats['conversations']:,}")
+    print(f"   Time: {elapsed:.1f}s")
 
 
 if __name__ == "__main__":
@@ -16,44 +16,15 @@ from typing import Optional
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from common.cursor_db import get_conversations_for_range, _get_conversations_for_date_sqlite, get_cursor_db_path
-from common.vector_db import get_supabase_client, index_message, index_messages_batch, save_sync_state, get_existing_message_ids
+from common.vector_db import get_supabase_client, index_message, index_messages_batch, save_sync_state
 from common.semantic_search import batch_get_embeddings
-from common.prompt_compression import compress_single_message
 from common.db_health_check import detect_schema_version, save_diagnostic_report
+from scripts.sync_messages import build_candidate_message, compress_long_messages, filter_already_indexed
 
-# Optimization constants (matching sync_messages.py)
-MAX_TEXT_LENGTH = 6000  # Compress messages longer than this (preserves more info)
+# Optimization constants (compression threshold and message IDs come from sync_messages.py)
 MIN_TEXT_LENGTH = 10   # Skip messages shorter than this (not useful for search)
 
 
-def truncate_text_for_embedding(text: str, max_chars: int = MAX_TEXT_LENGTH) -> str:
-    """
-    Truncate text to fit within embedding API limits.
-    Used as fallback when compression fails after retries.
-    """
-    if len(text) <= max_chars:
-        return text
-    
-    # Truncate and add indicator
-    truncated = text[:max_chars]
-    # Try to cut at a sentence boundary
-    last_period = truncated.rfind('.')
-    last_newline = truncated.rfind('\n')
-    cut_point = max(last_period, last_newline)
-    
-    if cut_point > max_chars * 0.8:  # If we found a good break point
-        return truncated[:cut_point + 1] + "\n\n[Message truncated due to length]"
-    else:
-        return truncated + "\n\n[Message truncated due to length]"
-
-
-def generate_message_id(workspace: str, chat_id: str, timestamp: int, text: str) -> str:
-    """Generate unique message ID."""
-    import hashlib
-    key = f"{workspace}:{chat_id}:{timestamp}:{text[:50]}"
-    return hashlib.sha256(key.encode()).hexdigest()[:16]
-
-
 def index_all_messages(
     batch_size: int = 200,
     dry_run: bool = False,
@@ -245,47 +216,17 @@ def index_all_messages(
             if len(msg_text) < MIN_TEXT_LENGTH:
                 continue
             
-            # OPTIMIZATION: Compress long messages to preserve information
-            if len(msg_text) > MAX_TEXT_LENGTH:
-                # Compress messages longer than MAX_TEXT_LENGTH to preserve critical info
-                # This adds cost (~$0.001) but preserves technical decisions, code patterns, insights
-                # Retry logic is built into compress_single_message (3 attempts with exponential backoff)
-                compressed_text = compress_single_message(msg_text, max_chars=MAX_TEXT_LENGTH, max_retries=3)
-                if compressed_text is None:
-                    # Compression failed after all retries - fallback to truncation
-                    print(f"  ⚠️  Compression failed after retries, using truncation fallback", flush=True)
-                    msg_text = truncate_text_for_embedding(msg_text)
-                else:
-                    msg_text = compressed_text
-            
-            message_id = generate_message_id(
-                workspace,
-                chat_id,
-                msg.get("timestamp", 0),
-                msg_text,
-            )
-            
-            all_messages.append({
-                "message_id": message_id,
-                "text": msg_text,
-                "timestamp": msg.get("timestamp", 0),
-                "workspace": workspace,
-                "chat_id": chat_id,
-                "chat_type": chat_type,
-                "message_type": msg.get("type", "user"),
-                "source_detail": source_detail # Attach metrics
-            })
+            # ID from the raw text, same as sync_messages (long messages are
+            # compressed after deduplication, see compress_long_messages)
+            candidate = build_candidate_message(workspace, chat_id, chat_type, msg, msg_text)
+            candidate["source_detail"] = source_detail  # Attach metrics
+            all_messages.append(candidate)
     
     print(f"📝 Found {len(all_messages)} messages in local database")
     
     # Check which messages already exist in Vector DB to avoid duplicates
     print("🔍 Checking which messages already exist in Vector DB...", flush=True)
-    all_message_ids = [msg["message_id"] for msg in all_messages]
-    existing_ids = get_existing_message_ids(all_message_ids, client)
-    
-    # Filter out messages that already exist
-    new_messages = [msg for msg in all_messages if msg["message_id"] not in existing_ids]
-    skipped_count = len(all_messages) - len(new_messages)
+    new_messages, skipped_count = filter_already_indexed(all_messages, client)
     
     print(f"   ✅ Already indexed: {skipped_count:,} messages (skipping)", flush=True)
     print(f"   🆕 Need to index: {len(new_messages):,} messages", flush=True)
@@ -307,6 +248,7 @@ def index_all_messages(
     indexed_count = 0
     failed_count = 0
     max_timestamp = 0
+    compress_long_messages(new_messages)
     compressed_count = sum(1 for msg in new_messages if "[Message compressed" in msg["text"])
     
     if compressed_count > 0:
@@ -41,6 +41,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from common.cursor_db import get_cursor_db_path, get_high_signal_conversations_sqlite_fast
 from common.entity_deduplicator import create_deduplicator
 from common.entity_extractor import extract_entities
+from common.extraction_cache import cached_extraction
 from common.kg_quality_filter import (
     score_chunk_quality,
     validate_entity,
@@ -58,6 +59,7 @@ load_dotenv()
 # Configuration
 LLM_MODEL = "claude-haiku-4-5"
 LLM_PROVIDER = "anthropic"
+LLM_CACHE_MODEL = f"{LLM_PROVIDER}/{LLM_MODEL}"  # Part of the extraction cache key
 MAX_RETRIES = 3
 INITIAL_RETRY_DELAY = 2  # seconds
 MAX_RETRY_DELAY = 60  # seconds
@@ -285,12 +287,17 @@ def process_chunk(chunk: ChunkToProcess, with_relations: bool, worker_id: int) -
         deduplicator = create_deduplicator()
         
         # Extract entities with retry
-        entities = retry_with_backoff(
-            extract_entities,
+        entities = cached_extraction(
+            "entities",
             chunk.chunk_text,
-            model=LLM_MODEL,
-            provider=LLM_PROVIDER,
-            operation_name=f"entity extraction ({chunk.chunk_id})"
+            LLM_CACHE_MODEL,
+            lambda: retry_with_backoff(
+                extract_entities,
+                chunk.chunk_text,
+                model=LLM_MODEL,
+                provider=LLM_PROVIDER,
+                operation_name=f"entity extraction ({chunk.chunk_id})"
+            ),
         )
         
         if not entities:
@@ -345,13 +352,19 @@ def process_chunk(chunk: ChunkToProcess, with_relations: bool, worker_id: int) -
         if with_relations and len(entity_map) >= 2:
             entity_list = [{"name": name, "type": ""} for name in entity_map.keys()]
             
-            relations = retry_with_backoff(
-                extract_relations,
+            relations = cached_extraction(
+                "relations",
                 chunk.chunk_text,
-                entity_list,
-                model=LLM_MODEL,
-                provider=LLM_PROVIDER,
-                operation_name=f"relation extraction ({chunk.chunk_id})"
+                LLM_CACHE_MODEL,
+                lambda: retry_with_backoff(
+                    extract_relations,
+                    chunk.chunk_text,
+                    entity_list,
+                    model=LLM_MODEL,
+                    provider=LLM_PROVIDER,
+                    operation_name=f"relation extraction ({chunk.chunk_id})"
+                ),
+                variant="\n".join(entity_map.keys()),
             )
             
             for rel in relations:
@@ -397,9 +410,14 @@ def main():
     parser.add_argument("--min-quality", type=float, default=0.35,
                        help="Minimum quality score (0-1) for chunk to be indexed")
     parser.add_argument("--max-chunks", type=int, help="Limit chunks for testing")
+    parser.add_argument("--no-extraction-cache", action="store_true",
+                       help="Always call the LLM instead of replaying cached extractions")
     
     args = parser.parse_args()
     
+    if args.no_extraction_cache:
+        os.environ["KG_EXTRACTION_CACHE"] = "0"  # Inherited by pool workers
+    
     print("=" * 60)
     print("🚀 Quality-Driven Knowledge Graph Indexing")
     print("=" * 60)
@@ -36,6 +36,8 @@ load_dotenv()
 
 from engine.common.entity_extractor import extract_entities
 from engine.common.entity_deduplicator import create_deduplicator
+from engine.common.kg_write_buffer import KGWriteBuffer
+from engine.common.entity_vector_index import build_entity_vector_index, activate_entity_vector_index
 from engine.common.entity_canonicalizer import EntityCanonicalizer
 from engine.common.knowledge_graph import EntityMention
 from engine.common.semantic_search import get_embedding
@@ -44,6 +46,7 @@ from engine.common.lenny_parser import parse_all_episodes
 from engine.common.kg_quality_filter import score_chunk_quality, validate_entity
 from engine.common.llm import PermanentAPIFailure
 from engine.common.triple_extractor import extract_triples, triples_to_entities
+from engine.common.extraction_cache import cached_extraction
 
 # Known problematic chunks to skip (same as sequential version)
 SKIP_EPISODES_CHUNKS = {
@@ -52,6 +55,11 @@ SKIP_EPISODES_CHUNKS = {
     "Vijay": {385},
 }
 
+# Extraction model (part of the extraction cache key)
+LLM_MODEL = "claude-haiku-4-5"
+LLM_PROVIDER = "anthropic"
+LLM_CACHE_MODEL = f"{LLM_PROVIDER}/{LLM_MODEL}"
+
 # Retry configuration
 MAX_RETRIES = 3
 INITIAL_RETRY_DELAY_SECONDS = 2
@@ -185,61 +193,6 @@ def retry_with_backoff(func, *args, max_retries=MAX_RETRIES, operation_name="ope
     return None
 
 
-def save_entity_mention(supabase, entity_id: str, chunk_id: str, context_snippet: str, message_timestamp: int):
-    """
-    Save entity mention to database.
-    
-    Handles race condition where two workers try to save the same mention.
-    Silently ignores duplicate key errors.
-    """
-    mention_data = {
-        "id": str(uuid.uuid4()),
-        "entity_id": entity_id,
-        "message_id": chunk_id,
-        "context_snippet": context_snippet[:MAX_SNIPPET_LENGTH],
-        "message_timestamp": message_timestamp,
-    }
-    try:
-        supabase.table("kg_entity_mentions").insert(mention_data).execute()
-    except Exception as e:
-        error_msg = str(e).lower()
-        # Ignore duplicate key errors (race condition between workers)
-        if "duplicate" in error_msg or "unique" in error_msg or "constraint" in error_msg:
-            # This is expected when two workers process the same chunk
-            pass
-        else:
-            # Re-raise other errors
-            raise
-
-
-def save_relation(supabase, source_entity_id: str, target_entity_id: str, relation_type: str, evidence_snippet: str, chunk_id: str):
-    """
-    Save relation to database.
-    
-    Handles race condition where two workers try to save the same relation.
-    Silently ignores duplicate key errors.
-    """
-    relation_data = {
-        "id": str(uuid.uuid4()),
-        "source_entity_id": source_entity_id,
-        "target_entity_id": target_entity_id,
-        "relation_type": relation_type,
-        "evidence_snippet": evidence_snippet[:MAX_SNIPPET_LENGTH],
-        "source_message_id": chunk_id,
-    }
-    try:
-        supabase.table("kg_relations").insert(relation_data).execute()
-    except Exception as e:
-        error_msg = str(e).lower()
-        # Ignore duplicate key errors (race condition between workers)
-        if "duplicate" in error_msg or "unique" in error_msg or "constraint" in error_msg:
-            # This is expected when two workers process the same chunk
-            pass
-        else:
-            # Re-raise other errors
-            raise
-
-
 def process_chunk_worker(chunk_data: dict) -> dict:
     """
     Worker function to process a single chunk.
@@ -296,7 +249,9 @@ def process_chunk_worker(chunk_data: dict) -> dict:
         
         # Create worker-local connections
         supabase = get_supabase_client()
-        deduplicator = create_deduplicator()
+        # Mentions, relations and entity stats are queued and flushed in bulk
+        write_buffer = KGWriteBuffer(supabase)
+        deduplicator = create_deduplicator(write_buffer=write_buffer)
         
         # Double-check if already indexed (atomic check for race condition protection)
         existing = supabase.table("kg_entity_mentions").select("id").eq("message_id", chunk_id).limit(1).execute()
@@ -312,13 +267,18 @@ def process_chunk_worker(chunk_data: dict) -> dict:
         # Use Claude Haiku 4.5 for baseline quality (consistent with entity extraction)
         triples = []
         try:
-            triples = retry_with_backoff(
-                extract_triples,
+            triples = cached_extraction(
+                "triples",
                 chunk_text,
-                model="claude-haiku-4-5",
-                provider="anthropic",
-                context="baseline",
-                operation_name=f"triple extraction for {chunk_id}"
+                LLM_CACHE_MODEL,
+                lambda: retry_with_backoff(
+                    extract_triples,
+                    chunk_text,
+                    model=LLM_MODEL,
+                    provider=LLM_PROVIDER,
+                    context="baseline",
+                    operation_name=f"triple extraction for {chunk_id}"
+                ),
             )
         except Exception as e:
             # If triple extraction fails, log but continue (fallback to direct extraction)
@@ -333,13 +293,18 @@ def process_chunk_worker(chunk_data: dict) -> dict:
         try:
             # Extract entities (triples provide structure/context for better extraction)
             # The entity extractor already supports "unknown" type via EntityType.UNKNOWN
-            entities = retry_with_backoff(
-                extract_entities,
+            entities = cached_extraction(
+                "entities",
                 chunk_text,
-                model="claude-haiku-4-5",
-                provider="anthropic",
-                context="baseline",
-                operation_name=f"entity extraction for {chunk_id}"
+                LLM_CACHE_MODEL,
+                lambda: retry_with_backoff(
+                    extract_entities,
+                    chunk_text,
+                    model=LLM_MODEL,
+                    provider=LLM_PROVIDER,
+                    context="baseline",
+                    operation_name=f"entity extraction for {chunk_id}"
+                ),
             )
             
             # Phase 0 Enhancement: If triples available, validate entities against triples
@@ -369,10 +334,9 @@ def process_chunk_worker(chunk_data: dict) -> dict:
         if not entities:
             return stats
         
-        # Process entities with post-filter validation
-        entity_id_map = {}
+        # POST-FILTER: Validate entity quality
+        valid_entities = []
         for entity in entities:
-            # POST-FILTER: Validate entity quality
             is_valid, rejection_reason = validate_entity(
                 entity.name,
                 entity.entity_type,
@@ -382,7 +346,14 @@ def process_chunk_worker(chunk_data: dict) -> dict:
             if not is_valid:
                 stats["entities_rejected"] += 1
                 continue  # Skip low-quality entity
-            
+            valid_entities.append(entity)
+        
+        # Embed all new names in one batch (one local index query with --local-entity-index)
+        deduplicator.prefetch_embedding_matches([(e.name, e.entity_type) for e in valid_entities])
+        
+        # Process entities with deduplication
+        entity_id_map = {}
+        for entity in valid_entities:
             # Find or create entity with deduplication
             result = retry_with_backoff(
                 deduplicator.find_or_create_entity,
@@ -405,16 +376,8 @@ def process_chunk_worker(chunk_data: dict) -> dict:
             else:
                 stats["entities_deduplicated"] += 1
             
-            # Save mention
-            retry_with_backoff(
-                save_entity_mention,
-                supabase,
-                entity_id,
-                chunk_id,
-                chunk_text[:MAX_SNIPPET_LENGTH],
-                message_timestamp,
-                operation_name=f"saving mention for {entity.name}"
-            )
+            # Queue mention
+            write_buffer.add_mention(entity_id, chunk_id, chunk_text[:MAX_SNIPPET_LENGTH], message_timestamp)
         
         # Extract and save relations if enabled
         # Phase 0: Relations should be extracted from triples (if available)
@@ -425,12 +388,19 @@ def process_chunk_worker(chunk_data: dict) -> dict:
                 # Phase 0: Use triples for relation extraction if available
                 # For now, we extract triples but still use RelationExtractor for validation
                 # Future: Extract relations directly from triples
-                relation_extractor = RelationExtractor(model="claude-haiku-4-5", provider="anthropic")
-                relations = retry_with_backoff(
-                    relation_extractor.extract_relations,
+                relation_extractor = RelationExtractor(model=LLM_MODEL, provider=LLM_PROVIDER)
+                known_entities = list(entity_id_map.keys())
+                relations = cached_extraction(
+                    "relations",
                     chunk_text,
-                    known_entities=list(entity_id_map.keys()),
-                    operation_name=f"relation extraction for {chunk_id}"
+                    LLM_CACHE_MODEL,
+                    lambda: retry_with_backoff(
+                        relation_extractor.extract_relations,
+                        chunk_text,
+                        known_entities=known_entities,
+                        operation_name=f"relation extraction for {chunk_id}"
+                    ),
+                    variant="\n".join(known_entities[:20]),
                 )
             except Exception as e:
                 # If relation extraction fails, log and continue (don't skip chunk)
@@ -456,18 +426,21 @@ def process_chunk_worker(chunk_data: dict) -> dict:
                         # Convert RelationType enum to string value
                         relation_type_str = rel.relation_type.value if hasattr(rel.relation_type, 'value') else str(rel.relation_type)
                         
-                        retry_with_backoff(
-                            save_relation,
-                            supabase,
+                        write_buffer.add_relation(
                             source_id,
                             target_id,
                             relation_type_str,
                             rel.evidence_snippet or "",
                             chunk_id,
-                            operation_name=f"saving relation {rel.source_name}->{rel.target_name}"
                         )
                         stats["relations_created"] += 1
         
+        # Write queued mentions, relations and entity stats in bulk
+        retry_with_backoff(
+            write_buffer.flush,
+            operation_name=f"flushing KG writes for {chunk_id}"
+        )
+        
         return stats
     
     except PermanentAPIFailure as e:
@@ -566,13 +539,22 @@ def main():
     parser.add_argument("--limit", type=int, help="Limit number of episodes to process")
     parser.add_argument("--with-relations", action="store_true", help="Extract relations between entities")
     parser.add_argument("--workers", type=int, default=4, help="Number of parallel workers (default: 4)")
+    parser.add_argument("--local-entity-index", action="store_true",
+                        help="Match entity embeddings against a local memory-mapped index instead of per-entity RPCs "
+                             "(snapshot at start: entities created by other workers are only caught by the "
+                             "exact-name re-check before insert, not by embedding similarity)")
     parser.add_argument("--archive-path", type=str, default="data/lenny-transcripts", 
                        help="Path to Lenny transcripts archive")
     parser.add_argument("--max-chunks", type=int, help="Limit total chunks to process (for testing)")
     parser.add_argument("--error-log", type=str, default="/tmp/lenny_kg_errors.log",
                        help="Path to error log file (default: /tmp/lenny_kg_errors.log)")
+    parser.add_argument("--no-extraction-cache", action="store_true",
+                        help="Always call the LLM instead of replaying cached extractions")
     args = parser.parse_args()
     
+    if args.no_extraction_cache:
+        os.environ["KG_EXTRACTION_CACHE"] = "0"  # Inherited by pool workers
+    
     # Initialize error logging
     _error_log_file = args.error_log
     print(f"📝 Error log: {_error_log_file}")
@@ -678,8 +660,15 @@ def main():
     for i, chunk in enumerate(chunks_to_process):
         chunk["worker_id"] = (i % args.workers) + 1
     
+    # Local entity index: built once here, memory-mapped by every worker
+    pool_kwargs = {}
+    if args.local_entity_index:
+        print("🧭 Building local entity index...")
+        index_path = build_entity_vector_index(get_supabase_client())
+        pool_kwargs = {"initializer": activate_entity_vector_index, "initargs": (str(index_path),)}
+    
     # Create pool and process
-    with mp.Pool(processes=args.workers) as pool:
+    with mp.Pool(processes=args.workers, **pool_kwargs) as pool:
         try:
             for i, result in enumerate(pool.imap_unordered(process_chunk_worker, chunks_to_process), 1):
                 update_progress(result)
@@ -3,8 +3,13 @@
 Index Lenny Podcast Archive — Create local embeddings for semantic search.
 
 Creates:
-- data/lenny_embeddings.npz — Pre-computed embeddings (~74MB)
-- data/lenny_metadata.json — Episode and chunk metadata (lossless)
+- data/lenny_shards/ — Per-episode embeddings + chunks (only new/changed
+  episodes are embedded and written on re-index)
+- data/lenny_embeddings.npy — All embeddings, L2-normalized, for mmap search
+- data/lenny_chunks.bin — Binary chunk metadata sidecar, mmap'd at query time
+- data/lenny_metadata.json — Stats and episode list (chunks live in shards)
+- data/lenny_embeddings.npz — Full export with --export-npz (~74MB, the
+  distributable release format; metadata then includes all chunks)
 
 Supports two formats:
 - GitHub repo format (preferred): data/lenny-transcripts/episodes/*/transcript.md
@@ -19,6 +24,8 @@ Options:
     --dry-run       Parse and report stats without generating embeddings
     --force         Re-index even if already indexed with same file hashes
     --batch-size N  Number of chunks to embed in one API call (default: 100)
+    --float16       Store the normalized search matrix as float16 (half the size)
+    --export-npz    Also write the full .npz + lossless metadata (for releases)
 """
 
 import argparse
@@ -45,6 +52,9 @@ from engine.common.lenny_parser import (
     ParsedEpisode,
 )
 from engine.common.config import get_data_dir, load_env_file
+from engine.common.lenny_chunks import write_chunk_table
+from engine.common.lenny_search import clear_lenny_cache, get_lenny_chunks_path, get_lenny_matrix_path
+from engine.common.lenny_shards import LennyShardStore
 from engine.common.semantic_search import (
     batch_get_embeddings,
     is_openai_configured,
@@ -83,6 +93,52 @@ def get_indexed_file_hashes(metadata: dict) -> dict[str, str]:
     }
 
 
+def get_episode_id(ep: ParsedEpisode) -> str:
+    """Generate episode ID from filename or guest folder."""
+    if ep.filename == "transcript.md":
+        # GitHub format: use parent folder name
+        return ep.guest_name.lower().replace(' ', '-')
+    # Legacy format: use filename
+    return ep.filename.replace('.txt', '').lower().replace(' ', '-')
+
+
+def episode_entry(ep: ParsedEpisode) -> dict:
+    """Build episode entry with rich metadata (no chunk positions)."""
+    entry = {
+        "id": get_episode_id(ep),
+        "filename": ep.filename,
+        "guest_name": ep.guest_name,
+        "word_count": ep.word_count,
+        "chunk_count": len(ep.chunks),
+        "file_hash": ep.file_hash,
+    }
+    
+    # Add rich metadata if available (GitHub format)
+    if ep.metadata:
+        entry["title"] = ep.metadata.title
+        entry["youtube_url"] = ep.metadata.youtube_url
+        entry["video_id"] = ep.metadata.video_id
+        entry["description"] = ep.metadata.description
+        entry["duration_seconds"] = ep.metadata.duration_seconds
+        entry["duration"] = ep.metadata.duration
+        entry["view_count"] = ep.metadata.view_count
+    
+    return entry
+
+
+def chunk_entries(ep: ParsedEpisode) -> list[dict]:
+    """Chunk dicts for one episode (idx/episode_id are assigned on load)."""
+    return [
+        {
+            "speaker": chunk.speaker,
+            "timestamp": chunk.timestamp,
+            "content": chunk.content,  # LOSSLESS: full chunk content
+            "word_count": chunk.word_count,
+        }
+        for chunk in ep.chunks
+    ]
+
+
 def episodes_to_metadata(episodes: list[ParsedEpisode], archive_format: str) -> dict:
     """
     Convert parsed episodes to metadata JSON structure.
@@ -92,50 +148,14 @@ def episodes_to_metadata(episodes: list[ParsedEpisode], archive_format: str) ->
     """
     episode_list = []
     chunk_list = []
-    chunk_idx = 0
     
     for ep in episodes:
-        # Generate episode ID from filename or guest folder
-        if ep.filename == "transcript.md":
-            # GitHub format: use parent folder name
-            episode_id = ep.guest_name.lower().replace(' ', '-')
-        else:
-            # Legacy format: use filename
-            episode_id = ep.filename.replace('.txt', '').lower().replace(' ', '-')
-        
-        # Build episode entry with rich metadata
-        episode_entry = {
-            "id": episode_id,
-            "filename": ep.filename,
-            "guest_name": ep.guest_name,
-            "word_count": ep.word_count,
-            "chunk_count": len(ep.chunks),
-            "chunk_start_idx": chunk_idx,
-            "file_hash": ep.file_hash,
-        }
+        entry = episode_entry(ep)
+        entry["chunk_start_idx"] = len(chunk_list)
+        episode_list.append(entry)
         
-        # Add rich metadata if available (GitHub format)
-        if ep.metadata:
-            episode_entry["title"] = ep.metadata.title
-            episode_entry["youtube_url"] = ep.metadata.youtube_url
-            episode_entry["video_id"] = ep.metadata.video_id
-            episode_entry["description"] = ep.metadata.description
-            episode_entry["duration_seconds"] = ep.metadata.duration_seconds
-            episode_entry["duration"] = ep.metadata.duration
-            episode_entry["view_count"] = ep.metadata.view_count
-        
-        episode_list.append(episode_entry)
-        
-        for chunk in ep.chunks:
-            chunk_list.append({
-                "idx": chunk_idx,
-                "episode_id": episode_id,
-                "speaker": chunk.speaker,
-                "timestamp": chunk.timestamp,
-                "content": chunk.content,  # LOSSLESS: full chunk content
-                "word_count": chunk.word_count,
-            })
-            chunk_idx += 1
+        for chunk in chunk_entries(ep):
+            chunk_list.append({"idx": len(chunk_list), "episode_id": entry["id"], **chunk})
     
     total_words = sum(ep.word_count for ep in episodes)
     with_rich_metadata = sum(1 for ep in episodes if ep.metadata)
@@ -155,11 +175,59 @@ def episodes_to_metadata(episodes: list[ParsedEpisode], archive_format: str) ->
     }
 
 
+def seed_shards_from_npz(store: LennyShardStore, episodes: list[ParsedEpisode], reusable: set[str]) -> int:
+    """
+    Write shards for unchanged episodes from an existing full .npz export
+    (a downloaded release or a pre-shard index) instead of re-embedding them.
+    
+    Args:
+        store: Shard store to write into
+        episodes: Parsed episodes
+        reusable: Episode IDs with a current shard (updated in place)
+    
+    Returns:
+        Number of episodes seeded
+    """
+    embeddings_path, _ = get_output_paths()
+    metadata = load_existing_metadata()
+    if not embeddings_path.exists() or not metadata or not metadata.get("chunks"):
+        return 0
+    
+    indexed = {ep["id"]: ep for ep in metadata.get("episodes", [])}
+    candidates = []
+    for ep in episodes:
+        previous = indexed.get(get_episode_id(ep))
+        if (
+            get_episode_id(ep) not in reusable
+            and previous
+            and previous.get("file_hash") == ep.file_hash
+            and previous.get("chunk_count") == len(ep.chunks)
+        ):
+            candidates.append((ep, previous["chunk_start_idx"]))
+    if not candidates:
+        return 0
+    
+    try:
+        embeddings = np.load(embeddings_path)["embeddings"]
+    except Exception as e:
+        print(f"   ⚠️ Could not load existing embeddings: {e}")
+        return 0
+    if len(embeddings) != len(metadata["chunks"]):
+        return 0
+    
+    for ep, start in candidates:
+        store.write_episode(episode_entry(ep), chunk_entries(ep), embeddings[start:start + len(ep.chunks)])
+        reusable.add(get_episode_id(ep))
+    return len(candidates)
+
+
 def index_lenny_archive(
     archive_path: Path,
     dry_run: bool = False,
     force: bool = False,
     batch_size: int = 100,
+    matrix_dtype: str = "float32",
+    export_npz: bool = False,
 ) -> dict:
     """
     Index the Lenny podcast archive to local embeddings.
@@ -169,6 +237,8 @@ def index_lenny_archive(
         dry_run: If True, only parse and report stats (no embeddings)
         force: If True, re-index even if files haven't changed
         batch_size: Number of chunks to embed per API call
+        matrix_dtype: dtype of the normalized search matrix ("float32" or "float16")
+        export_npz: Also write the full .npz and lossless metadata (release format)
         
     Returns:
         Dict with indexing results
@@ -247,20 +317,27 @@ def index_lenny_archive(
     # INCREMENTAL INDEXING: Only embed new/changed episodes
     # 
     # Designed for continuous growth: Lenny's Podcast adds 2-3 episodes/week.
-    # This incremental approach ensures weekly syncs only embed new episodes,
-    # reusing cached embeddings for unchanged content (saves ~$3-4 per sync).
+    # This incremental approach ensures weekly syncs only embed and write
+    # shards for new episodes; unchanged shards are reused as-is (saves
+    # ~$3-4 per sync and avoids rewriting the whole archive).
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    existing_metadata = load_existing_metadata()
-    existing_embeddings = None
-    episodes_to_embed = episodes  # Default: embed all
-    reuse_existing = False
-    
-    if not force and existing_metadata:
-        existing_hashes = get_indexed_file_hashes(existing_metadata)
-        new_hashes = {ep.filename: ep.file_hash for ep in episodes}
+    store = LennyShardStore()
+    episode_ids = [get_episode_id(ep) for ep in episodes]
+    reusable: set[str] = set()
+    
+    if not force:
+        reusable = {
+            get_episode_id(ep) for ep in episodes
+            if store.has_episode(get_episode_id(ep), ep.file_hash)
+        }
+        seeded = seed_shards_from_npz(store, episodes, reusable)
+        if seeded:
+            print(f"\n📦 Seeded {seeded} episode shards from existing embeddings")
         
         # Check if completely unchanged
-        if existing_hashes == new_hashes:
+        _, metadata_path = get_output_paths()
+        manifest_ids = [e["id"] for e in store.manifest["episodes"]]
+        if len(reusable) == len(episodes) and manifest_ids == episode_ids and metadata_path.exists():
             print(f"\n✅ Archive already indexed and unchanged.")
             print(f"   Use --force to re-index anyway.")
             return {
@@ -268,39 +345,14 @@ def index_lenny_archive(
                 "skipped": True,
                 "reason": "Already indexed, no changes",
             }
-        
-        # Find new/changed episodes
-        new_episodes = []
-        unchanged_episodes = []
-        for ep in episodes:
-            if ep.filename not in existing_hashes:
-                new_episodes.append(ep)
-            elif existing_hashes.get(ep.filename) != ep.file_hash:
-                new_episodes.append(ep)
-            else:
-                unchanged_episodes.append(ep)
-        
-        if new_episodes:
-            print(f"\n📈 Incremental update detected:")
-            print(f"   New/changed episodes: {len(new_episodes)}")
-            print(f"   Unchanged episodes:   {len(unchanged_episodes)}")
-            
-            # Load existing embeddings for reuse
-            embeddings_path, _ = get_output_paths()
-            if embeddings_path.exists():
-                try:
-                    data = np.load(embeddings_path)
-                    existing_embeddings = data["embeddings"]
-                    reuse_existing = True
-                    print(f"   Reusing {existing_embeddings.shape[0]:,} existing embeddings")
-                except Exception as e:
-                    print(f"   ⚠️ Could not load existing embeddings: {e}")
-                    print(f"   Will re-embed all episodes")
-            
-            if reuse_existing:
-                episodes_to_embed = new_episodes
-            else:
-                episodes_to_embed = episodes  # Full re-index
+    
+    episodes_to_embed = [ep for ep in episodes if get_episode_id(ep) not in reusable]
+    removed = set(e["id"] for e in store.manifest["episodes"]) - set(episode_ids)
+    if reusable:
+        print(f"\n📈 Incremental update detected:")
+        print(f"   New/changed episodes: {len(episodes_to_embed)}")
+        print(f"   Unchanged episodes:   {len(reusable)}")
+        print(f"   Removed episodes:     {len(removed)}")
     
     # Calculate chunks to embed
     chunks_to_embed = sum(len(ep.chunks) for ep in episodes_to_embed)
@@ -425,46 +477,25 @@ def index_lenny_archive(
     print(f"   ✅ Generated {len(new_embeddings)} embeddings in {embed_time:.1f}s")
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # MERGE: Combine new embeddings with existing (if incremental)
+    # SHARDS: Write one shard per new/changed episode; unchanged shards
+    # are left untouched on disk
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
-    # Note: For simplicity, we always regenerate the full embeddings array
-    # from ALL episodes (in order). The incremental part just saves API calls
-    # by using the embedding cache for unchanged chunks.
-    # 
-    # A more complex approach would merge embeddings by episode index,
-    # but that requires tracking chunk-to-episode mapping carefully.
-    # For now, we regenerate metadata for all episodes but only call
-    # the API for new/changed chunks (cache handles the rest).
-    
-    # Convert to numpy array (these are all the embeddings we need)
-    all_chunk_contents = []
-    for ep in episodes:
-        for chunk in ep.chunks:
-            all_chunk_contents.append(chunk.content)
+    if len(new_embeddings) != chunks_to_embed:
+        return {
+            "success": False,
+            "error": f"Embedding count mismatch: {len(new_embeddings)} embeddings vs {chunks_to_embed} chunks",
+        }
     
-    # For full re-indexing, we already have all embeddings
-    # For incremental, the cache should have the unchanged ones
-    if len(new_embeddings) == chunks_to_embed and chunks_to_embed == total_chunks:
-        # Full index - use new embeddings directly
-        embeddings_array = np.array(new_embeddings, dtype=np.float32)
-    else:
-        # Incremental - we need to get embeddings for ALL chunks
-        # The cache will return cached values for unchanged chunks
-        print(f"\n📦 Building complete embeddings array...")
-        print(f"   Total chunks needed: {total_chunks:,}")
-        print(f"   New embeddings generated: {len(new_embeddings)}")
-        print(f"   Getting remaining from cache...")
-        
-        # Get all embeddings (cache will be hit for unchanged)
-        all_embeddings_list = []
-        for i in range(0, len(all_chunk_contents), batch_size):
-            batch = all_chunk_contents[i:i + batch_size]
-            batch_embeddings = batch_get_embeddings(batch, use_cache=True, allow_fallback=False)
-            all_embeddings_list.extend(batch_embeddings)
-        
-        embeddings_array = np.array(all_embeddings_list, dtype=np.float32)
+    row = 0
+    for ep in episodes_to_embed:
+        store.write_episode(episode_entry(ep), chunk_entries(ep), new_embeddings[row:row + len(ep.chunks)])
+        row += len(ep.chunks)
+    print(f"   💾 Wrote {len(episodes_to_embed)} episode shards")
     
-    print(f"   📐 Final embeddings shape: {embeddings_array.shape}")
+    all_chunk_contents = [chunk.content for ep in episodes for chunk in ep.chunks]
+    shard_shapes = [store.load_embeddings(episode_id).shape for episode_id in episode_ids]
+    total_embeddings = sum(shape[0] for shape in shard_shapes)
+    dims = {shape[1] for shape in shard_shapes}
     
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     # VALIDATION: Verify indexing completeness
@@ -483,12 +514,12 @@ def index_lenny_archive(
         print(f"   ✅ Episode count: {len(episodes)} files = {len(episodes)} episodes")
     
     # 2. Check embedding count matches chunk count
-    if embeddings_array.shape[0] != total_chunks:
+    if total_embeddings != total_chunks:
         validation_errors.append(
-            f"Embedding count mismatch: {embeddings_array.shape[0]} embeddings vs {total_chunks} chunks"
+            f"Embedding count mismatch: {total_embeddings} embeddings vs {total_chunks} chunks"
         )
     else:
-        print(f"   ✅ Chunk coverage: {total_chunks:,} chunks = {embeddings_array.shape[0]:,} embeddings")
+        print(f"   ✅ Chunk coverage: {total_chunks:,} chunks = {total_embeddings:,} embeddings")
     
     # 3. Check for empty chunks (check ALL chunks, not just new ones)
     empty_chunks = sum(1 for chunk in all_chunk_contents if not chunk.strip())
@@ -508,12 +539,12 @@ def index_lenny_archive(
         print(f"   ✅ Word coverage: {word_coverage:.1%} of original content in chunks")
     
     # 5. Check embedding dimension
-    if embeddings_array.shape[1] != EMBEDDING_DIM:
+    if dims != {EMBEDDING_DIM}:
         validation_errors.append(
-            f"Embedding dimension mismatch: {embeddings_array.shape[1]} vs expected {EMBEDDING_DIM}"
+            f"Embedding dimension mismatch: {sorted(dims)} vs expected {EMBEDDING_DIM}"
         )
     else:
-        print(f"   ✅ Embedding dimension: {embeddings_array.shape[1]}")
+        print(f"   ✅ Embedding dimension: {EMBEDDING_DIM}")
     
     # Report validation results
     if validation_errors:
@@ -531,7 +562,7 @@ def index_lenny_archive(
         "source_files": len(source_files),
         "parsed_episodes": len(episodes),
         "total_chunks": total_chunks,
-        "total_embeddings": embeddings_array.shape[0],
+        "total_embeddings": total_embeddings,
         "word_coverage_pct": round(word_coverage * 100, 1),
         "empty_chunks": empty_chunks,
         "validated_at": datetime.utcnow().isoformat() + "Z",
@@ -542,17 +573,55 @@ def index_lenny_archive(
     
     print(f"\n💾 Saving files...")
     
-    # Save embeddings
-    np.savez_compressed(embeddings_path, embeddings=embeddings_array)
-    embeddings_size = embeddings_path.stat().st_size / (1024 * 1024)
-    print(f"   ✅ {embeddings_path.name}: {embeddings_size:.1f}MB")
+    # Release export is written before the manifest: the loader prefers
+    # whichever is newer, and the shards (plus their float16/float32
+    # matrix) must win over an npz exported from them
+    embeddings_size = None
+    if export_npz:
+        embeddings_array = np.concatenate([np.asarray(store.load_embeddings(i)) for i in episode_ids])
+        np.savez_compressed(embeddings_path, embeddings=embeddings_array)
+        embeddings_size = embeddings_path.stat().st_size / (1024 * 1024)
+        print(f"   ✅ {embeddings_path.name}: {embeddings_size:.1f}MB")
+    elif embeddings_path.exists():
+        # A downloaded/older npz no longer matches the slim metadata below
+        embeddings_path.unlink()
+        print(f"   🗑️  Removed superseded {embeddings_path.name} (shards are now the source)")
+    
+    # Record shard order (drops shards of removed episodes)
+    store.save_manifest(
+        [
+            {"id": episode_id, "file_hash": ep.file_hash, "chunk_count": len(ep.chunks)}
+            for episode_id, ep in zip(episode_ids, episodes)
+        ],
+        dim=EMBEDDING_DIM,
+        extra={"format": archive_format, "matrix_dtype": matrix_dtype, "indexed_at": metadata["indexed_at"]},
+    )
+    print(f"   ✅ {store.dir.name}/: {len(episode_ids)} episodes ({len(episodes_to_embed)} written, {len(removed)} removed)")
+    
+    # Assemble pre-normalized search matrix (memory-mapped at query time)
+    matrix_path = store.assemble_matrix(get_lenny_matrix_path(), dtype=matrix_dtype)
+    matrix_size = matrix_path.stat().st_size / (1024 * 1024)
+    print(f"   ✅ {matrix_path.name}: {matrix_size:.1f}MB ({matrix_dtype})")
     
-    # Save metadata
+    # Save binary chunk sidecar (memory-mapped at query time)
+    chunks_path = write_chunk_table(
+        get_lenny_chunks_path(), metadata["episodes"], metadata["chunks"], metadata["stats"]
+    )
+    print(f"   ✅ {chunks_path.name}: {chunks_path.stat().st_size / (1024 * 1024):.1f}MB")
+    clear_lenny_cache()
+    
+    # Save metadata (chunks stay in the shards unless exporting a release)
+    if not export_npz:
+        metadata.pop("chunks")
+        metadata["sharded"] = True
     with open(metadata_path, 'w') as f:
         json.dump(metadata, f, indent=2)
     metadata_size = metadata_path.stat().st_size / (1024 * 1024)
     print(f"   ✅ {metadata_path.name}: {metadata_size:.1f}MB")
     
+    if embeddings_size is None:
+        embeddings_size = matrix_size
+    
     print(f"\n🎉 Indexing complete!")
     print(f"   Total time: {parse_time + embed_time:.1f}s")
     print(f"   Total size: {embeddings_size + metadata_size:.1f}MB")
@@ -572,6 +641,8 @@ def index_lenny_archive(
         "with_metadata": with_metadata,
         "chunks": total_chunks,
         "words": total_words,
+        "episodes_embedded": len(episodes_to_embed),
+        "episodes_removed": len(removed),
         "embeddings_size_mb": embeddings_size,
         "metadata_size_mb": metadata_size,
         "time_seconds": parse_time + embed_time,
@@ -609,6 +680,16 @@ def main():
         default=100,
         help="Number of chunks to embed per API call (default: 100)",
     )
+    parser.add_argument(
+        "--float16",
+        action="store_true",
+        help="Store the normalized search matrix as float16 (half the size)",
+    )
+    parser.add_argument(
+        "--export-npz",
+        action="store_true",
+        help="Also write the full .npz + lossless metadata (release format)",
+    )
     
     args = parser.parse_args()
     
@@ -623,6 +704,8 @@ def main():
         dry_run=args.dry_run,
         force=args.force,
         batch_size=args.batch_size,
+        matrix_dtype="float16" if args.float16 else "float32",
+        export_npz=args.export_npz,
     )
     
     if not result.get("success"):
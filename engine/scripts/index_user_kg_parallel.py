@@ -14,6 +14,9 @@ Usage:
     
     # Custom worker count
     python3 engine/scripts/index_user_kg_parallel.py --with-relations --workers 6
+    
+    # One LLM call per conversation for entities + relations + decisions
+    python3 engine/scripts/index_user_kg_parallel.py --with-relations --with-decisions --fused-extraction
 """
 
 import argparse
@@ -35,6 +38,8 @@ load_dotenv()
 
 from engine.common.entity_extractor import extract_entities
 from engine.common.entity_deduplicator import create_deduplicator
+from engine.common.kg_write_buffer import KGWriteBuffer
+from engine.common.entity_vector_index import build_entity_vector_index, activate_entity_vector_index
 from engine.common.entity_canonicalizer import EntityCanonicalizer
 from engine.common.knowledge_graph import EntityMention
 from engine.common.semantic_search import get_embedding
@@ -48,6 +53,13 @@ from engine.common.triple_extractor import extract_triples, triples_to_entities
 from engine.common.temporal_tracker import build_temporal_chains, TemporalChain
 from engine.common.decision_extractor import extract_decisions, extract_trace_ids
 from engine.common.relation_extractor import RelationExtractor
+from engine.common.fused_extractor import extract_kg_fused
+from engine.common.extraction_cache import cached_extraction
+
+# Extraction model (part of the extraction cache key)
+LLM_MODEL = "claude-haiku-4-5"
+LLM_PROVIDER = "anthropic"
+LLM_CACHE_MODEL = f"{LLM_PROVIDER}/{LLM_MODEL}"
 
 # Retry configuration
 MAX_RETRIES = 3
@@ -93,39 +105,6 @@ def log_error(error_msg: str, chat_id: str = ""):
         _error_log_file.flush()
 
 
-def save_entity_mention(supabase, entity_id: str, chat_id: str, context_snippet: str, message_timestamp: int):
-    """Save entity mention to database."""
-    mention_data = {
-        "id": str(uuid.uuid4()),
-        "entity_id": entity_id,
-        "message_id": chat_id,
-        "context_snippet": context_snippet[:MAX_SNIPPET_LENGTH],
-        "message_timestamp": message_timestamp,
-    }
-    
-    try:
-        supabase.table("kg_entity_mentions").insert(mention_data).execute()
-    except Exception as e:
-        error_msg = str(e).lower()
-        if "duplicate" in error_msg or "unique" in error_msg or "constraint" in error_msg:
-            pass  # Expected race condition
-        else:
-            raise
-
-
-def save_relation(supabase, source_entity_id: str, target_entity_id: str, relation_type: str, evidence_snippet: str, chat_id: str):
-    """Save relation to database."""
-    relation_data = {
-        "id": str(uuid.uuid4()),
-        "source_entity_id": source_entity_id,
-        "target_entity_id": target_entity_id,
-        "relation_type": relation_type,
-        "evidence_snippet": evidence_snippet[:MAX_SNIPPET_LENGTH],
-        "source_message_id": chat_id,
-    }
-    supabase.table("kg_relations").insert(relation_data).execute()
-
-
 def get_or_create_conversation_entity(supabase, deduplicator, chat_id: str, timestamp: int) -> str:
     """
     Get or create a conversation entity for temporal chain tracking.
@@ -264,6 +243,7 @@ def process_conversation_worker(conv_data: dict) -> dict:
     timestamp = conv_data["timestamp"]
     with_relations = conv_data["with_relations"]
     with_decisions = conv_data["with_decisions"]
+    fused_extraction = conv_data.get("fused_extraction", False)
     dry_run = conv_data["dry_run"]
     worker_id = conv_data["worker_id"]
     
@@ -298,7 +278,9 @@ def process_conversation_worker(conv_data: dict) -> dict:
         
         # Create worker-local connections
         supabase = get_supabase_client()
-        deduplicator = create_deduplicator()
+        # Mentions, relations and entity stats are queued and flushed in bulk
+        write_buffer = KGWriteBuffer(supabase)
+        deduplicator = create_deduplicator(write_buffer=write_buffer)
         canonicalizer = EntityCanonicalizer(deduplicator)
         
         # Check if already indexed
@@ -309,42 +291,64 @@ def process_conversation_worker(conv_data: dict) -> dict:
             print(f"   [Worker {worker_id}] Skipped {chat_id}: already_indexed")
             return stats
         
-        # Extract triples (Phase 0: Triple-Based Foundation)
-        # Use Claude Haiku 4.5 for consistent quality (same as Lenny's indexing)
-        try:
-            triples = retry_with_backoff(
-                extract_triples,
-                combined_text,
-                model="claude-haiku-4-5",
-                provider="anthropic",
-                context="user",
-                operation_name=f"triple extraction for {chat_id}"
-            )
-        except Exception as e:
-            print(f"   ⚠️ Triple extraction failed for {chat_id}: {str(e)}")
-            triples = []
-        
-        # Extract entities (from triples if available, otherwise direct extraction)
-        if triples:
-            # Extract entity names from triples
-            entity_names_from_triples = triples_to_entities(triples)
-            # Use direct extraction for now (can enhance later to use triple-based entity extraction)
-            entities = retry_with_backoff(
-                extract_entities,
+        fused = None
+        if fused_extraction:
+            # Entities, relations and decisions from a single LLM call
+            fused = cached_extraction(
+                "fused",
                 combined_text,
-                model="claude-haiku-4-5",
-                provider="anthropic",
-                context="user",
-                operation_name=f"entity extraction for {chat_id}"
+                LLM_CACHE_MODEL,
+                lambda: retry_with_backoff(
+                    extract_kg_fused,
+                    combined_text,
+                    model=LLM_MODEL,
+                    provider=LLM_PROVIDER,
+                    context="user",
+                    with_relations=with_relations,
+                    with_decisions=with_decisions,
+                    operation_name=f"fused extraction for {chat_id}"
+                ),
+                variant=f"relations={with_relations},decisions={with_decisions}",
             )
+            entities = fused.entities
         else:
-            entities = retry_with_backoff(
-                extract_entities,
+            # Extract triples (Phase 0: Triple-Based Foundation)
+            # Use Claude Haiku 4.5 for consistent quality (same as Lenny's indexing)
+            try:
+                triples = cached_extraction(
+                    "triples",
+                    combined_text,
+                    LLM_CACHE_MODEL,
+                    lambda: retry_with_backoff(
+                        extract_triples,
+                        combined_text,
+                        model=LLM_MODEL,
+                        provider=LLM_PROVIDER,
+                        context="user",
+                        operation_name=f"triple extraction for {chat_id}"
+                    ),
+                )
+            except Exception as e:
+                print(f"   ⚠️ Triple extraction failed for {chat_id}: {str(e)}")
+                triples = []
+            
+            # Extract entities (from triples if available, otherwise direct extraction)
+            if triples:
+                # Extract entity names from triples
+                entity_names_from_triples = triples_to_entities(triples)
+            # Use direct extraction for now (can enhance later to use triple-based entity extraction)
+            entities = cached_extraction(
+                "entities",
                 combined_text,
-                model="claude-haiku-4-5",
-                provider="anthropic",
-                context="user",
-                operation_name=f"entity extraction for {chat_id}"
+                LLM_CACHE_MODEL,
+                lambda: retry_with_backoff(
+                    extract_entities,
+                    combined_text,
+                    model=LLM_MODEL,
+                    provider=LLM_PROVIDER,
+                    context="user",
+                    operation_name=f"entity extraction for {chat_id}"
+                ),
             )
         
         if not isinstance(entities, list):
@@ -356,10 +360,9 @@ def process_conversation_worker(conv_data: dict) -> dict:
             print(f"   [Worker {worker_id}] No entities extracted from {chat_id}")
             return stats
         
-        # Process entities with canonicalization
-        entity_id_map = {}
+        # Post-filter validation
+        valid_entities = []
         for entity in entities:
-            # Post-filter validation
             is_valid, rejection_reason = validate_entity(
                 entity.name,
                 entity.entity_type,
@@ -369,7 +372,14 @@ def process_conversation_worker(conv_data: dict) -> dict:
             if not is_valid:
                 stats["entities_rejected"] += 1
                 continue
-            
+            valid_entities.append(entity)
+        
+        # Embed all new names in one batch (one local index query with --local-entity-index)
+        deduplicator.prefetch_embedding_matches([(e.name, e.entity_type) for e in valid_entities])
+        
+        # Process entities with canonicalization
+        entity_id_map = {}
+        for entity in valid_entities:
             # Canonicalize entity (Phase 0: CRITICAL STEP)
             try:
                 entity_id, is_new, canonical_name = canonicalizer.canonicalize_entity(
@@ -390,23 +400,25 @@ def process_conversation_worker(conv_data: dict) -> dict:
             else:
                 stats["entities_deduplicated"] += 1
             
-            # Save mention
-            retry_with_backoff(
-                save_entity_mention,
-                supabase,
-                entity_id,
-                chat_id,
-                combined_text[:MAX_SNIPPET_LENGTH],
-                timestamp,
-                operation_name=f"saving mention for {entity.name}"
-            )
+            # Queue mention
+            write_buffer.add_mention(entity_id, chat_id, combined_text[:MAX_SNIPPET_LENGTH], timestamp)
         
         # Extract and save relations if enabled
         if with_relations and entity_id_map:
             try:
-                # Use Claude Haiku 4.5 for consistent quality (same as Lenny's indexing)
-                relation_extractor = RelationExtractor(model="claude-haiku-4-5", provider="anthropic")
-                relations = relation_extractor.extract_relations(combined_text, known_entities=list(entity_id_map.keys()))
+                if fused is not None:
+                    relations = fused.relations
+                else:
+                    # Use Claude Haiku 4.5 for consistent quality (same as Lenny's indexing)
+                    relation_extractor = RelationExtractor(model=LLM_MODEL, provider=LLM_PROVIDER)
+                    known_entities = list(entity_id_map.keys())
+                    relations = cached_extraction(
+                        "relations",
+                        combined_text,
+                        LLM_CACHE_MODEL,
+                        lambda: relation_extractor.extract_relations(combined_text, known_entities=known_entities),
+                        variant="\n".join(known_entities[:20]),
+                    )
                 
                 for rel in relations:
                     source_id = entity_id_map.get(rel.source_name)
@@ -416,15 +428,12 @@ def process_conversation_worker(conv_data: dict) -> dict:
                         # Convert RelationType enum to string value
                         relation_type_str = rel.relation_type.value if hasattr(rel.relation_type, 'value') else str(rel.relation_type)
                         
-                        retry_with_backoff(
-                            save_relation,
-                            supabase,
+                        write_buffer.add_relation(
                             source_id,
                             target_id,
                             relation_type_str,
                             rel.evidence_snippet or "",
                             chat_id,
-                            operation_name=f"saving relation {rel.source_name}->{rel.target_name}"
                         )
                         stats["relations_created"] += 1
             except Exception as e:
@@ -433,11 +442,19 @@ def process_conversation_worker(conv_data: dict) -> dict:
         # Extract decisions if enabled
         if with_decisions:
             try:
-                decisions = retry_with_backoff(
-                    extract_decisions,
-                    combined_text,
-                    operation_name=f"decision extraction for {chat_id}"
-                )
+                if fused is not None:
+                    decisions = fused.decisions
+                else:
+                    decisions = cached_extraction(
+                        "decisions",
+                        combined_text,
+                        "openai/gpt-4o-mini",  # extract_decisions defaults
+                        lambda: retry_with_backoff(
+                            extract_decisions,
+                            combined_text,
+                            operation_name=f"decision extraction for {chat_id}"
+                        ),
+                    )
                 stats["decisions_extracted"] = len(decisions)
                 
                 # Extract trace IDs from code comments
@@ -464,6 +481,12 @@ def process_conversation_worker(conv_data: dict) -> dict:
             except Exception as e:
                 print(f"   ⚠️ Decision extraction failed for {chat_id}: {str(e)}")
         
+        # Write queued mentions, relations and entity stats in bulk
+        retry_with_backoff(
+            write_buffer.flush,
+            operation_name=f"flushing KG writes for {chat_id}"
+        )
+        
         return stats
     
     except PermanentAPIFailure as e:
@@ -544,9 +567,20 @@ def main():
     parser.add_argument("--with-relations", action="store_true", help="Extract relations between entities")
     parser.add_argument("--with-decisions", action="store_true", help="Extract decision points")
     parser.add_argument("--days-back", type=int, default=90, help="Number of days to look back (default: 90)")
+    parser.add_argument("--local-entity-index", action="store_true",
+                        help="Match entity embeddings against a local memory-mapped index instead of per-entity RPCs "
+                             "(snapshot at start: entities created by other workers are only caught by the "
+                             "exact-name re-check before insert, not by embedding similarity)")
+    parser.add_argument("--fused-extraction", action="store_true",
+                        help="Extract entities, relations and decisions with one LLM call per conversation")
+    parser.add_argument("--no-extraction-cache", action="store_true",
+                        help="Always call the LLM instead of replaying cached extractions")
     
     args = parser.parse_args()
     
+    if args.no_extraction_cache:
+        os.environ["KG_EXTRACTION_CACHE"] = "0"  # Inherited by pool workers
+    
     # Initialize progress tracking
     manager = mp.Manager()
     _progress_lock = manager.Lock()
@@ -571,6 +605,7 @@ def main():
     print(f"Days back: {args.days_back}")
     print(f"Extract relations: {args.with_relations}")
     print(f"Extract decisions: {args.with_decisions}")
+    print(f"Fused extraction: {args.fused_extraction}")
     print(f"Dry run: {args.dry_run}")
     print("=" * 60)
     
@@ -657,6 +692,7 @@ def main():
             "timestamp": timestamp,
             "with_relations": args.with_relations,
             "with_decisions": args.with_decisions,
+            "fused_extraction": args.fused_extraction,
             "dry_run": args.dry_run,
             "worker_id": i % args.workers,
         })
@@ -676,8 +712,15 @@ def main():
     print(f"[PHASE:name=indexing,message=Indexing conversations with {args.workers} workers]")
     start_time = time.time()
     
+    # Local entity index: built once here, memory-mapped by every worker
+    pool_kwargs = {}
+    if args.local_entity_index:
+        print("🧭 Building local entity index...")
+        index_path = build_entity_vector_index(get_supabase_client())
+        pool_kwargs = {"initializer": activate_entity_vector_index, "initargs": (str(index_path),)}
+    
     try:
-        with mp.Pool(processes=args.workers) as pool:
+        with mp.Pool(processes=args.workers, **pool_kwargs) as pool:
             results = pool.map(process_conversation_worker, conv_data_list)
         
         # Print final stats
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Migrate Embedding Cache
+
+One-time script to convert data/embedding_cache.json into the append-only
+binary embedding store (embedding_cache.f32 + embedding_cache.idx).
+The engine also migrates automatically on first use; this script lets you
+do it up front and optionally remove the old JSON afterwards.
+
+Usage:
+    python3 engine/scripts/migrate_embedding_cache.py [--remove-json]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add parent to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from engine.common.embedding_store import EmbeddingStore, get_embedding_store_paths, migrate_json_cache
+from engine.common.semantic_search import EMBEDDING_DIM, get_embedding_cache_path
+
+
+def migrate(remove_json: bool = False) -> dict:
+    """
+    Migrate the legacy JSON cache into the binary store.
+
+    Args:
+        remove_json: Delete embedding_cache.json after a successful migration
+
+    Returns:
+        Stats dict with counts
+    """
+    json_path = get_embedding_cache_path()
+    matrix_path, index_path = get_embedding_store_paths()
+
+    if not json_path.exists():
+        print(f"✅ No legacy cache at {json_path} - nothing to migrate")
+        return {"migrated": 0}
+
+    store = EmbeddingStore(matrix_path, index_path, EMBEDDING_DIM)
+    before = len(store)
+    size_mb = json_path.stat().st_size / 1024 / 1024
+    print(f"📦 Migrating {json_path.name} ({size_mb:.1f} MB) → {matrix_path.name}")
+    print(f"   Store currently holds {before:,} embeddings")
+
+    start = time.time()
+    migrated = migrate_json_cache(json_path, store)
+    elapsed = time.time() - start
+
+    print(f"✅ Migrated {migrated:,} embeddings in {elapsed:.1f}s (store now {len(store):,})")
+
+    if remove_json:
+        json_path.unlink()
+        print(f"🗑️  Removed {json_path.name}")
+
+    return {"migrated": migrated, "total": len(store), "seconds": elapsed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migrate JSON embedding cache to binary store")
+    parser.add_argument("--remove-json", action="store_true", help="Delete embedding_cache.json after migrating")
+
+    args = parser.parse_args()
+    migrate(remove_json=args.remove_json)
@@ -0,0 +1,62 @@
+-- ============================================================================
+-- Migration 008: Bulk KG Writes
+-- ============================================================================
+-- Purpose: Let KG indexing workers apply entity stat updates in one request
+--          (KGWriteBuffer.flush) instead of a read-then-update round trip per
+--          mention.
+--
+-- Mentions and relations need no schema change: mentions use deterministic
+-- ids (upsert on id), relations upsert on the existing
+-- kg_relations_source_target_type_source_message_key constraint.
+--
+-- Usage:
+--   Run this migration in Supabase SQL Editor
+-- ============================================================================
+
+-- ============================================================================
+-- apply_entity_stat_deltas
+-- ============================================================================
+-- p_deltas: JSON array of
+--   {"id": TEXT, "user": INT, "lenny": INT, "first_seen": TIMESTAMPTZ|null, "last_seen": TIMESTAMPTZ|null}
+-- Increments are computed in SET from the row being updated (not from a
+-- snapshot read earlier in the statement): under READ COMMITTED a concurrent
+-- update makes Postgres re-evaluate SET against the committed row, so
+-- concurrent workers cannot lose each other's counts.
+
+CREATE OR REPLACE FUNCTION apply_entity_stat_deltas(p_deltas JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    updated_count INTEGER;
+BEGIN
+    WITH d AS (
+        SELECT
+            x.id,
+            COALESCE(x."user", 0) AS user_delta,
+            COALESCE(x.lenny, 0) AS lenny_delta,
+            x.first_seen,
+            x.last_seen
+        FROM jsonb_to_recordset(p_deltas)
+            AS x(id TEXT, "user" INTEGER, lenny INTEGER, first_seen TIMESTAMPTZ, last_seen TIMESTAMPTZ)
+    )
+    UPDATE kg_entities e
+    SET
+        mention_count = COALESCE(e.mention_count, 0) + d.user_delta + d.lenny_delta,
+        source_breakdown = COALESCE(e.source_breakdown, '{}'::jsonb) || jsonb_build_object(
+            'user', COALESCE((e.source_breakdown->>'user')::integer, 0) + d.user_delta,
+            'lenny', COALESCE((e.source_breakdown->>'lenny')::integer, 0) + d.lenny_delta
+        ),
+        source_type = CASE
+            WHEN COALESCE((e.source_breakdown->>'user')::integer, 0) + d.user_delta > 0
+                 AND COALESCE((e.source_breakdown->>'lenny')::integer, 0) + d.lenny_delta > 0 THEN 'both'
+            WHEN COALESCE((e.source_breakdown->>'lenny')::integer, 0) + d.lenny_delta > 0 THEN 'expert'
+            ELSE 'user'
+        END,
+        first_seen = LEAST(e.first_seen, COALESCE(d.first_seen, e.first_seen)),
+        last_seen = GREATEST(e.last_seen, COALESCE(d.last_seen, e.last_seen))
+    FROM d
+    WHERE e.id = d.id;
+
+    GET DIAGNOSTICS updated_count = ROW_COUNT;
+    RETURN updated_count;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,83 @@
+-- ============================================================================
+-- Migration 009: Multi-Query Message Search
+-- ============================================================================
+-- Purpose: Run several semantic searches over cursor_messages in one request
+--          (search_messages_multi) instead of one search_cursor_messages RPC
+--          per query.
+--
+-- Each query is a LATERAL top-k, so every query still uses the HNSW index on
+-- cursor_messages.embedding. Filters match search_cursor_messages.
+--
+-- Usage:
+--   Run this migration in Supabase SQL Editor
+-- ============================================================================
+
+-- ============================================================================
+-- search_cursor_messages_multi
+-- ============================================================================
+-- query_embeddings: JSON array of 1536-dim embeddings ([[...], [...], ...])
+-- Returns up to match_count rows per query, tagged with the 0-based
+-- query_index of the embedding that matched.
+
+CREATE OR REPLACE FUNCTION search_cursor_messages_multi(
+    query_embeddings JSONB,
+    match_threshold float DEFAULT 0.0,
+    match_count int DEFAULT 10,
+    start_ts bigint DEFAULT NULL,
+    end_ts bigint DEFAULT NULL,
+    workspace_filter text[] DEFAULT NULL
+)
+RETURNS TABLE (
+    query_index int,
+    message_id text,
+    "text" text,
+    "timestamp" bigint,
+    workspace text,
+    chat_id text,
+    chat_type text,
+    message_type text,
+    similarity float
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+    SELECT
+        (q.ord - 1)::int AS query_index,
+        m.message_id,
+        m.text,
+        m.timestamp,
+        m.workspace,
+        m.chat_id,
+        m.chat_type,
+        m.message_type,
+        m.similarity
+    FROM (
+        SELECT e.value::extensions.vector(1536) AS embedding, e.ord
+        FROM jsonb_array_elements_text(query_embeddings) WITH ORDINALITY AS e(value, ord)
+    ) q
+    CROSS JOIN LATERAL (
+        SELECT
+            cm.message_id,
+            cm.text,
+            cm.timestamp,
+            cm.workspace,
+            cm.chat_id,
+            cm.chat_type,
+            cm.message_type,
+            1 - (cm.embedding <=> q.embedding) AS similarity
+        FROM cursor_messages cm
+        WHERE
+            (start_ts IS NULL OR cm.timestamp >= start_ts)
+            AND (end_ts IS NULL OR cm.timestamp < end_ts)
+            AND (workspace_filter IS NULL OR cm.workspace = ANY(workspace_filter))
+            AND (1 - (cm.embedding <=> q.embedding)) >= match_threshold
+        ORDER BY cm.embedding <=> q.embedding
+        LIMIT match_count
+    ) m
+    ORDER BY query_index, m.similarity DESC;
+$$;
+
+GRANT EXECUTE ON FUNCTION search_cursor_messages_multi TO anon;
+GRANT EXECUTE ON FUNCTION search_cursor_messages_multi TO authenticated;
@@ -0,0 +1,74 @@
+-- ============================================================================
+-- Migration 010: Message Context Windows
+-- ============================================================================
+-- Purpose: Fetch the messages around many search hits in one request
+--          (fetch_message_context) so Smart Sampling prompts get real
+--          before/after context without fetching full conversations.
+--
+-- Usage:
+--   Run this migration in Supabase SQL Editor
+-- ============================================================================
+
+-- Neighbor lookups walk one chat in timestamp order
+CREATE INDEX IF NOT EXISTS idx_cursor_messages_chat_timestamp
+    ON cursor_messages(workspace, chat_id, timestamp);
+
+-- ============================================================================
+-- get_cursor_message_neighbors
+-- ============================================================================
+-- anchors: JSON array of {"workspace": TEXT, "chat_id": TEXT, "timestamp": BIGINT}
+-- Returns up to context_count messages before and after each anchor in the
+-- same chat, tagged with the 0-based anchor_index and position
+-- ('before' | 'after'), ordered by timestamp.
+
+CREATE OR REPLACE FUNCTION get_cursor_message_neighbors(
+    anchors JSONB,
+    context_count int DEFAULT 2
+)
+RETURNS TABLE (
+    anchor_index int,
+    "position" text,
+    "text" text,
+    "timestamp" bigint,
+    message_type text
+)
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+SET search_path = public, extensions
+AS $$
+    WITH a AS (
+        SELECT
+            (x.ord - 1)::int AS anchor_index,
+            x.value->>'workspace' AS workspace,
+            x.value->>'chat_id' AS chat_id,
+            (x.value->>'timestamp')::bigint AS ts
+        FROM jsonb_array_elements(anchors) WITH ORDINALITY AS x(value, ord)
+    )
+    SELECT n.anchor_index, n.position, n.text, n.timestamp, n.message_type
+    FROM (
+        SELECT a.anchor_index, 'before'::text AS position, b.text, b.timestamp, b.message_type
+        FROM a
+        CROSS JOIN LATERAL (
+            SELECT cm.text, cm.timestamp, cm.message_type
+            FROM cursor_messages cm
+            WHERE cm.workspace = a.workspace AND cm.chat_id = a.chat_id AND cm.timestamp < a.ts
+            ORDER BY cm.timestamp DESC
+            LIMIT context_count
+        ) b
+        UNION ALL
+        SELECT a.anchor_index, 'after'::text AS position, f.text, f.timestamp, f.message_type
+        FROM a
+        CROSS JOIN LATERAL (
+            SELECT cm.text, cm.timestamp, cm.message_type
+            FROM cursor_messages cm
+            WHERE cm.workspace = a.workspace AND cm.chat_id = a.chat_id AND cm.timestamp > a.ts
+            ORDER BY cm.timestamp ASC
+            LIMIT context_count
+        ) f
+    ) n
+    ORDER BY n.anchor_index, n.timestamp;
+$$;
+
+GRANT EXECUTE ON FUNCTION get_cursor_message_neighbors TO anon;
+GRANT EXECUTE ON FUNCTION get_cursor_message_neighbors TO authenticated;
@@ -21,11 +21,13 @@ from pathlib import Path
 # Add parent directory to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from common.cursor_db import get_conversations_for_range, _get_conversations_for_date_sqlite, get_cursor_db_path
+from common.cursor_db import get_conversations_for_range, get_cursor_conversations_since, get_cursor_db_path
 from common.claude_code_db import get_claude_code_conversations
 from common.source_detector import detect_sources, print_detection_report
 from common.vector_db import (
     get_supabase_client,
+    is_local_vector_db,
+    is_vector_db_configured,
     get_last_sync_timestamp,
     get_sync_state_path,
     save_sync_state,
@@ -35,6 +37,7 @@ from common.vector_db import (
 )
 from common.semantic_search import batch_get_embeddings
 from common.prompt_compression import compress_single_message
+from common.compression_cache import get_compression_cache
 from common.db_health_check import detect_schema_version, save_diagnostic_report
 from common.config import load_config
 
@@ -127,6 +130,91 @@ def generate_message_id(workspace: str, chat_id: str, timestamp: int, text: str,
     return f"{source}:{hash_id}" if source != "cursor" else hash_id  # Backward compat: cursor has no prefix
 
 
+def build_candidate_message(
+    workspace: str,
+    chat_id: str,
+    chat_type: str,
+    msg: dict,
+    msg_text: str,
+    source: str = "cursor",
+) -> dict:
+    """
+    Build a sync candidate keyed by a raw-content message ID.
+    
+    The ID is derived from the raw text, so it is known before any LLM
+    compression. If a compressed version of a long message is already
+    cached, the ID it was indexed under before raw-content IDs existed is
+    also recorded, so that row is recognised as a duplicate too.
+    """
+    msg_ts = msg.get("timestamp", 0)
+    candidate = {
+        "message_id": generate_message_id(workspace, chat_id, msg_ts, msg_text, source=source),
+        "text": msg_text,
+        "timestamp": msg_ts,
+        "workspace": workspace,
+        "chat_id": chat_id,
+        "chat_type": chat_type,
+        "message_type": msg.get("type", "user"),
+    }
+    if len(msg_text) > MAX_TEXT_LENGTH:
+        cached = get_compression_cache().get(msg_text, MAX_TEXT_LENGTH)
+        if cached is not None:
+            candidate["legacy_message_id"] = generate_message_id(workspace, chat_id, msg_ts, cached, source=source)
+    return candidate
+
+
+def filter_already_indexed(candidate_messages: list[dict], client) -> tuple[list[dict], int]:
+    """
+    Drop candidates already in the Vector DB (by raw-content or legacy ID).
+    
+    Returns:
+        (new_messages, skipped_count)
+    """
+    all_message_ids = [msg["message_id"] for msg in candidate_messages]
+    all_message_ids += [msg["legacy_message_id"] for msg in candidate_messages if msg.get("legacy_message_id")]
+    existing_ids = get_existing_message_ids(all_message_ids, client)
+    
+    new_messages = [
+        msg for msg in candidate_messages
+        if msg["message_id"] not in existing_ids and msg.get("legacy_message_id") not in existing_ids
+    ]
+    return new_messages, len(candidate_messages) - len(new_messages)
+
+
+def compress_long_messages(messages: list[dict]) -> int:
+    """
+    Compress over-length message texts in place, via the compression cache.
+    
+    Only messages that survived deduplication get here, and cached
+    compressions are reused, so repeated syncs make no LLM calls.
+    
+    Returns:
+        Number of LLM compression calls made
+    """
+    cache = get_compression_cache()
+    llm_calls = 0
+    for msg in messages:
+        raw_text = msg["text"]
+        if len(raw_text) <= MAX_TEXT_LENGTH:
+            continue
+        
+        compressed_text = cache.get(raw_text, MAX_TEXT_LENGTH)
+        if compressed_text is None:
+            # Compress messages longer than MAX_TEXT_LENGTH to preserve critical info
+            # This adds cost (~$0.001) but preserves technical decisions, code patterns, insights
+            # Retry logic is built into compress_single_message (3 attempts with exponential backoff)
+            llm_calls += 1
+            compressed_text = compress_single_message(raw_text, max_chars=MAX_TEXT_LENGTH, max_retries=3)
+            if compressed_text is None:
+                # Compression failed after all retries - fallback to truncation (not cached, retried next time)
+                print(f"  ⚠️  Compression failed after retries, using truncation fallback", flush=True)
+                compressed_text = truncate_text_for_embedding(raw_text)
+            else:
+                cache.put(raw_text, MAX_TEXT_LENGTH, compressed_text)
+        msg["text"] = compressed_text
+    return llm_calls
+
+
 def sync_cursor_messages(
     days_back: int,
     dry_run: bool,
@@ -183,23 +271,12 @@ def sync_cursor_messages(
     
     # Get conversations from LOCAL SQLite database (not Vector DB)
     # We need to read from local DB to find new messages
+    # Single scan for the whole range (not one full-DB scan per day)
     print("📚 Loading conversations from LOCAL database...")
-    conversations = []
-    current_date = start_date
-    while current_date <= end_date:
-        day_conversations = _get_conversations_for_date_sqlite(current_date, workspace_paths=None, use_cache=False)
-        conversations.extend(day_conversations)
-        current_date += timedelta(days=1)
-    
-    # Deduplicate conversations by chat_id + workspace
-    seen = set()
-    unique_conversations = []
-    for conv in conversations:
-        key = (conv.get("chat_id"), conv.get("workspace"))
-        if key not in seen:
-            seen.add(key)
-            unique_conversations.append(conv)
-    conversations = unique_conversations
+    range_start_ts = int(datetime.combine(start_date, datetime.min.time()).timestamp() * 1000)
+    range_end_ts = int(datetime.combine(end_date + timedelta(days=1), datetime.min.time()).timestamp() * 1000)
+    since_ts = max(last_sync_ts, range_start_ts - 1)
+    conversations = get_cursor_conversations_since(since_ts, until_ts=range_end_ts, workspace_paths=None)
     
     # Filter to only new messages (timestamp > last_sync_ts)
     candidate_messages = []
@@ -221,46 +298,16 @@ def sync_cursor_messages(
             if len(msg_text) < MIN_TEXT_LENGTH:
                 continue
             
-            # OPTIMIZATION: Compress long messages to preserve information
-            if len(msg_text) > MAX_TEXT_LENGTH:
-                # Compress messages longer than MAX_TEXT_LENGTH to preserve critical info
-                # This adds cost (~$0.001) but preserves technical decisions, code patterns, insights
-                # Retry logic is built into compress_single_message (3 attempts with exponential backoff)
-                compressed_text = compress_single_message(msg_text, max_chars=MAX_TEXT_LENGTH, max_retries=3)
-                if compressed_text is None:
-                    # Compression failed after all retries - fallback to truncation
-                    print(f"  ⚠️  Compression failed after retries, using truncation fallback", flush=True)
-                    msg_text = truncate_text_for_embedding(msg_text)
-                else:
-                    msg_text = compressed_text
-            
-            message_id = generate_message_id(
-                workspace,
-                chat_id,
-                msg_ts,
-                msg_text,
+            # Long messages are compressed after deduplication (see compress_long_messages)
+            candidate_messages.append(
+                build_candidate_message(workspace, chat_id, chat_type, msg, msg_text)
             )
-            
-            candidate_messages.append({
-                "message_id": message_id,
-                "text": msg_text,
-                "timestamp": msg_ts,
-                "workspace": workspace,
-                "chat_id": chat_id,
-                "chat_type": chat_type,
-                "message_type": msg.get("type", "user"),
-            })
     
     print(f"📝 Found {len(candidate_messages)} messages since last sync")
     
-    # Check which ones already exist in Vector DB (deduplication)
+    # Check which ones already exist in Vector DB (deduplication, before any LLM call)
     print("🔍 Checking for duplicates in Vector DB...")
-    all_message_ids = [msg["message_id"] for msg in candidate_messages]
-    existing_ids = get_existing_message_ids(all_message_ids, client)
-    
-    # Filter to only truly new messages
-    new_messages = [msg for msg in candidate_messages if msg["message_id"] not in existing_ids]
-    skipped_count = len(candidate_messages) - len(new_messages)
+    new_messages, skipped_count = filter_already_indexed(candidate_messages, client)
     
     if skipped_count > 0:
         print(f"   ✅ Already indexed: {skipped_count} messages (skipping)")
@@ -282,11 +329,14 @@ def sync_cursor_messages(
     
     if dry_run:
         print("🔍 DRY RUN: Would index messages above")
-        return
+        return {"indexed": 0, "skipped": skipped_count, "failed": 0}
     
     if not new_messages:
         print("✅ No new messages to sync")
-        return
+        return {"indexed": 0, "skipped": skipped_count, "failed": 0}
+    
+    # Compress over-length messages (cached by raw text)
+    compress_long_messages(new_messages)
     
     # Process in batches (optimized batch size for faster processing)
     indexed_count = 0
@@ -436,44 +486,18 @@ def sync_claude_code_messages(
             if len(msg_text) < MIN_TEXT_LENGTH:
                 continue
 
-            # OPTIMIZATION: Compress long messages
-            if len(msg_text) > MAX_TEXT_LENGTH:
-                compressed_text = compress_single_message(msg_text, max_chars=MAX_TEXT_LENGTH, max_retries=3)
-                if compressed_text is None:
-                    print(f"  ⚠️  Compression failed after retries, using truncation fallback", flush=True)
-                    msg_text = truncate_text_for_embedding(msg_text)
-                else:
-                    msg_text = compressed_text
-
-            message_id = generate_message_id(
-                workspace,
-                chat_id,
-                msg_ts,
-                msg_text,
-                source="claude_code",
+            # Long messages are compressed after deduplication (see compress_long_messages)
+            candidate = build_candidate_message(
+                workspace, chat_id, chat_type, msg, msg_text, source="claude_code"
             )
-
-            candidate_messages.append({
-                "message_id": message_id,
-                "text": msg_text,
-                "timestamp": msg_ts,
-                "workspace": workspace,
-                "chat_id": chat_id,
-                "chat_type": chat_type,
-                "message_type": msg.get("type", "user"),
-                "source_detail": msg.get("metadata", {}),
-            })
+            candidate["source_detail"] = msg.get("metadata", {})
+            candidate_messages.append(candidate)
 
     print(f"📝 Found {len(candidate_messages)} messages since last sync")
 
-    # Check which ones already exist in Vector DB (deduplication)
+    # Check which ones already exist in Vector DB (deduplication, before any LLM call)
     print("🔍 Checking for duplicates in Vector DB...")
-    all_message_ids = [msg["message_id"] for msg in candidate_messages]
-    existing_ids = get_existing_message_ids(all_message_ids, client)
-
-    # Filter to only truly new messages
-    new_messages = [msg for msg in candidate_messages if msg["message_id"] not in existing_ids]
-    skipped_count = len(candidate_messages) - len(new_messages)
+    new_messages, skipped_count = filter_already_indexed(candidate_messages, client)
 
     if skipped_count > 0:
         print(f"   ✅ Already indexed: {skipped_count} messages (skipping)")
@@ -501,6 +525,9 @@ def sync_claude_code_messages(
         print("✅ No new messages to sync")
         return {"indexed": 0, "skipped": skipped_count, "failed": 0}
 
+    # Compress over-length messages (cached by raw text)
+    compress_long_messages(new_messages)
+
     # Process in batches
     indexed_count = 0
     failed_count = 0
@@ -749,8 +776,13 @@ def sync_new_messages(
     days_back: int = 7,
     dry_run: bool = False,
     include_workspace_docs: bool = True,
-) -> None:
-    """Sync new messages from all detected sources."""
+) -> dict:
+    """
+    Sync new messages from all detected sources.
+    
+    Returns:
+        Per-source stats dict: {source_name: {"indexed", "skipped", "failed"}}
+    """
 
     # Detect available sources
     print("=" * 60)
@@ -761,13 +793,13 @@ def sync_new_messages(
     if not detected_sources and not include_workspace_docs:
         print("❌ No chat history sources found")
         print("   Make sure you have Cursor or Claude installed with conversation history")
-        return
+        return {}
 
-    # Get Supabase client
-    client = get_supabase_client()
-    if not client:
+    # Get Supabase client (None with the local vector DB backend)
+    if not is_vector_db_configured():
         print("❌ Supabase client not available. Check SUPABASE_URL and SUPABASE_ANON_KEY in .env")
-        return
+        return {}
+    client = None if is_local_vector_db() else get_supabase_client()
 
     # Sync each detected source
     stats = {}
@@ -814,6 +846,8 @@ def sync_new_messages(
 
     print("=" * 60)
 
+    return stats
+
 
 def main():
     parser = argparse.ArgumentParser(description="Sync new messages from all sources (Cursor, Claude Code, etc.) into vector DB")
@@ -2,7 +2,8 @@
 """
 Verify Lenny Index — Check that all episodes are indexed completely.
 
-Validates:
+Validates (against the per-episode shards when the loader uses them, else the
+.npz):
 1. Source count matches indexed count
 2. All chunks have embeddings
 3. No empty chunks
@@ -33,6 +34,43 @@ except ImportError:
 
 from engine.common.lenny_parser import find_transcript_files
 from engine.common.config import get_data_dir
+from engine.common.lenny_search import _use_lenny_shards
+from engine.common.lenny_shards import LennyShardStore
+
+
+def _check_shard_embeddings(store: LennyShardStore, indexed_chunks: int, errors: list, stats: dict) -> None:
+    """Validate shard files, per-shard row counts and zero vectors against the manifest."""
+    total_rows = 0
+    zero_count = 0
+    for entry in store.manifest["episodes"]:
+        try:
+            embeddings = store.load_embeddings(entry["id"])
+        except Exception as e:
+            errors.append(f"Failed to load shard {entry['id']}: {e}")
+            print(f"   ❌ Shard {entry['id']}: load failed: {e}")
+            continue
+        if embeddings.shape[0] != entry["chunk_count"]:
+            errors.append(
+                f"Shard {entry['id']}: {embeddings.shape[0]} embeddings vs {entry['chunk_count']} chunks in manifest"
+            )
+            print(f"   ❌ Shard {entry['id']}: {embeddings.shape[0]} != {entry['chunk_count']}")
+        total_rows += embeddings.shape[0]
+        zero_count += int(np.sum(np.all(embeddings == 0, axis=1)))
+    
+    stats["embedding_shape"] = [total_rows, store.manifest.get("dim", 0)]
+    print(f"   Shape: ({total_rows}, {store.manifest.get('dim', 0)}) across {len(store.manifest['episodes'])} shards")
+    
+    if total_rows != indexed_chunks:
+        errors.append(f"Embedding count mismatch: {total_rows} embeddings vs {indexed_chunks} chunks in metadata")
+        print(f"   ❌ Count mismatch: {total_rows} != {indexed_chunks}")
+    else:
+        print(f"   ✅ Embedding count matches chunk count")
+    
+    if zero_count > 0:
+        errors.append(f"Found {zero_count} zero vectors (failed embeddings)")
+        print(f"   ❌ {zero_count} zero vectors found")
+    else:
+        print(f"   ✅ No zero vectors (all embeddings valid)")
 
 
 def verify_lenny_index(check_github: bool = False) -> dict:
@@ -58,7 +96,13 @@ def verify_lenny_index(check_github: bool = False) -> dict:
     # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
     print("📁 Checking index files...")
     
-    if not embeddings_path.exists():
+    # Same source the search loader picks: shards unless a newer .npz exists
+    store = LennyShardStore() if _use_lenny_shards() else None
+    if store is not None:
+        size_mb = sum(p.stat().st_size for p in store.dir.glob("*.npy")) / (1024 * 1024)
+        stats["embeddings_size_mb"] = round(size_mb, 1)
+        print(f"   ✅ {store.dir.name}/{store.manifest_path.name}: {len(store.manifest['episodes'])} episode shards, {size_mb:.1f}MB")
+    elif not embeddings_path.exists():
         errors.append(f"Embeddings file not found: {embeddings_path}")
         print(f"   ❌ {embeddings_path.name}: NOT FOUND")
     else:
@@ -91,7 +135,11 @@ def verify_lenny_index(check_github: bool = False) -> dict:
         return {"valid": False, "errors": errors, "stats": stats}
     
     indexed_episodes = len(metadata.get("episodes", []))
-    indexed_chunks = len(metadata.get("chunks", []))
+    # Sharded metadata is slim: chunks live in the shards (see index_lenny_local)
+    if metadata.get("sharded"):
+        indexed_chunks = metadata.get("stats", {}).get("total_chunks", 0)
+    else:
+        indexed_chunks = len(metadata.get("chunks", []))
     stats["indexed_episodes"] = indexed_episodes
     stats["indexed_chunks"] = indexed_chunks
     
@@ -112,6 +160,8 @@ def verify_lenny_index(check_github: bool = False) -> dict:
     if not NUMPY_AVAILABLE:
         warnings.append("numpy not available, skipping embedding validation")
         print("   ⚠️ numpy not available, skipping")
+    elif store is not None:
+        _check_shard_embeddings(store, indexed_chunks, errors, stats)
     else:
         try:
             data = np.load(embeddings_path)
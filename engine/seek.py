@@ -35,7 +35,7 @@ from common.progress_markers import (
 )
 
 from common.cursor_db import format_conversations_for_prompt
-from common.semantic_search import search_messages
+from common.semantic_search import search_messages_multi
 from common.config import (
     load_config,
     load_env_file,
@@ -105,35 +105,20 @@ def _get_relevant_conversations_for_query(
         print(f"📅 Date range: {start_date} to {end_date}", file=sys.stderr)
         print(f"🔍 Using {len(all_queries)} search queries (1 user query + {len(search_queries)} predefined)", file=sys.stderr)
         
-        # Collect unique chat_ids from all searches (PARALLELIZED like Generate)
-        relevant_chat_ids: set[tuple[str, str, str]] = set()
-        
-        def search_query(search_query_text: str) -> list[dict]:
-            """Helper to run a single search query."""
-            return search_messages(
-                search_query_text,
-                messages=[],
-                top_k=top_k,  # Use full top_k per query
-                min_similarity=0.3,  # Lower threshold to cast wider net
-                context_messages=0,
-                use_vector_db=True,
-                start_timestamp=start_ts,
-                end_timestamp=end_ts,
-                workspace_paths=workspace_paths,
-            )
-        
-        # Run searches in parallel (much faster!)
-        print(f"🔍 Running {len(all_queries)} semantic searches in parallel...", file=sys.stderr)
-        with ThreadPoolExecutor(max_workers=min(len(all_queries), 5)) as executor:
-            futures = {executor.submit(search_query, q): q for q in all_queries}
-            for future in as_completed(futures):
-                matches = future.result()
-                # Collect chat_ids from matches
-                for match in matches:
-                    chat_id = match.get("chat_id", "unknown")
-                    workspace = match.get("workspace", "Unknown")
-                    chat_type = match.get("chat_type", "unknown")
-                    relevant_chat_ids.add((workspace, chat_id, chat_type))
+        # Collect unique chat_ids from all searches (one embedding call + one RPC, like Generate)
+        print(f"🔍 Running {len(all_queries)} semantic searches in one request...", file=sys.stderr)
+        search_results = search_messages_multi(
+            all_queries,
+            top_k=top_k,  # Use full top_k per query
+            min_similarity=0.3,  # Lower threshold to cast wider net
+            start_timestamp=start_ts,
+            end_timestamp=end_ts,
+            workspace_paths=workspace_paths,
+        )
+        relevant_chat_ids: set[tuple[str, str, str]] = {
+            (chat["workspace"], chat["chat_id"], chat["chat_type"])
+            for chat in search_results["chats"]
+        }
         
         if not relevant_chat_ids:
             print(f"⚠️  No conversations found matching queries", file=sys.stderr)
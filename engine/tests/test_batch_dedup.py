@@ -0,0 +1,75 @@
+"""
+Unit tests for shared in-batch dedup (generation dedup + Library batch insert).
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import semantic_search
+from common.items_bank_supabase import ItemsBankSupabase
+from common.semantic_search import find_duplicate_indices
+
+A = [1.0, 0.0, 0.0]
+A2 = [0.99, 0.05, 0.0]
+B = [0.0, 1.0, 0.0]
+B2 = [0.0, 0.98, 0.1]
+
+
+def test_find_duplicate_indices_greedy_first_kept_wins():
+    embeddings = [A, B, A2, None, [0.0, 0.0, 0.0], B2, A]
+    assert find_duplicate_indices(embeddings, 0.9) == [None, None, 0, None, None, 1, 0]
+
+
+def test_find_duplicate_indices_matches_python_fallback(monkeypatch):
+    embeddings = [A, A2, B, [0.7, 0.7, 0.0], B2]
+    vectorized = find_duplicate_indices(embeddings, 0.7)
+    monkeypatch.setattr(semantic_search, "NUMPY_AVAILABLE", False)
+    assert find_duplicate_indices(embeddings, 0.7) == vectorized
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class FakeLibraryClient:
+    def __init__(self, existing_match=None):
+        self.existing_match, self.rpc_calls, self.inserted = existing_match, 0, []
+
+    def rpc(self, name, params):
+        self.rpc_calls += 1
+        match = self.existing_match if params["query_embedding"] == B else None
+        return type("Q", (), {"execute": lambda _: _Result([{"id": match}] if match else [])})()
+
+    def table(self, name):
+        client = self
+
+        class Table:
+            def insert(self, rows):
+                client.inserted.extend(rows)
+                return type("Q", (), {"execute": lambda _: _Result(rows)})()
+
+        return Table()
+
+
+def test_batch_add_items_collapses_in_batch_duplicates(monkeypatch):
+    bank = ItemsBankSupabase.__new__(ItemsBankSupabase)
+    bank.client = FakeLibraryClient(existing_match="item-existing")
+    updates = []
+    monkeypatch.setattr(bank, "_update_existing_item_on_dedup", lambda *args: updates.append(args) or True)
+
+    items = [
+        {"title": "a", "description": "", "embedding": A},
+        {"title": "a again", "description": "", "embedding": A2},
+        {"title": "b", "description": "", "embedding": B},
+        {"title": "b again", "description": "", "embedding": B2},
+    ]
+    result = bank.batch_add_items(items, "idea", threshold=0.9, max_workers=2)
+
+    assert bank.client.rpc_calls == 2
+    assert [(row["title"], row["occurrence"]) for row in bank.client.inserted] == [("a", 2)]
+    assert updates == [("item-existing", None, None, 2)]
+    assert result["added"] == 1 and result["batch_duplicates"] == 2
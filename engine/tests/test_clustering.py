@@ -0,0 +1,74 @@
+"""
+Unit tests for vectorized leader clustering.
+
+Checks that block-wise matmul clustering produces the same clusters as the
+original per-pair cosine_similarity loop.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import clustering
+from common.clustering import embeddings_to_matrix, leader_cluster, seed_cluster, seed_cluster_embeddings
+from common.semantic_search import cosine_similarity
+
+
+def _reference_clusters(embeddings: list[list[float]], threshold: float) -> list[list[int]]:
+    clusters: list[list[int]] = []
+    for i, embedding in enumerate(embeddings):
+        best_cluster_idx = None
+        best_similarity = 0
+        for idx, cluster in enumerate(clusters):
+            similarity = cosine_similarity(embedding, embeddings[cluster[0]])
+            if similarity >= threshold and similarity > best_similarity:
+                best_similarity = similarity
+                best_cluster_idx = idx
+        if best_cluster_idx is not None:
+            clusters[best_cluster_idx].append(i)
+        else:
+            clusters.append([i])
+    return clusters
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 1024])
+def test_matches_pairwise_loop(block_size):
+    rng = np.random.default_rng(0)
+    centers = rng.normal(size=(6, 16))
+    points = centers[rng.integers(0, 6, size=200)] + rng.normal(scale=0.4, size=(200, 16))
+    embeddings = points.tolist()
+
+    expected = _reference_clusters(embeddings, 0.8)
+    actual = leader_cluster(embeddings_to_matrix(embeddings), 0.8, block_size=block_size)
+
+    assert [c.tolist() for c in actual] == expected
+
+
+def test_zero_vectors_start_own_clusters():
+    matrix = embeddings_to_matrix([[0.0, 0.0], [0.0, 0.0], [1.0, 0.0]])
+    assert [c.tolist() for c in leader_cluster(matrix, 0.0)] == [[0], [1], [2]]
+
+
+def test_empty_input():
+    assert leader_cluster(embeddings_to_matrix([]), 0.75) == []
+
+
+@pytest.mark.parametrize("block_size", [1, 16, 512])
+def test_seed_cluster_matches_pairwise_loop(monkeypatch, block_size):
+    rng = np.random.default_rng(7)
+    centers = rng.normal(size=(6, 8))
+    embeddings = (centers[rng.integers(0, 6, size=300)] + rng.normal(scale=0.6, size=(300, 8))).tolist()
+    embeddings[3] = [0.0] * 8  # Zero vector never clusters
+
+    actual = seed_cluster(embeddings_to_matrix(embeddings), embeddings, 0.7, block_size=block_size)
+    monkeypatch.setattr(clustering, "NUMPY_AVAILABLE", False)
+    expected = seed_cluster_embeddings(embeddings, 0.7)
+
+    assert actual == expected
+    assert [3] in expected
@@ -0,0 +1,54 @@
+"""
+Unit tests for the raw-text → compressed-text cache used by sync.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.compression_cache import CompressionCache, raw_text_hash
+
+RAW = "x" * 7000
+
+
+def test_miss_then_hit(tmp_path):
+    cache = CompressionCache(tmp_path / "cache.jsonl")
+    assert cache.get(RAW, 6000) is None
+
+    cache.put(RAW, 6000, "compressed")
+    assert cache.get(RAW, 6000) == "compressed"
+    assert len(cache) == 1
+
+
+def test_key_is_raw_text_hash_and_max_chars(tmp_path):
+    cache = CompressionCache(tmp_path / "cache.jsonl")
+    cache.put(RAW, 6000, "compressed")
+
+    assert cache.get(RAW + " ", 6000) is None
+    assert cache.get(RAW, 4000) is None
+    assert raw_text_hash(RAW) != raw_text_hash(RAW + " ")
+
+
+def test_entries_persist_and_later_records_win(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    cache = CompressionCache(path)
+    cache.put(RAW, 6000, "first")
+    cache.put(RAW, 6000, "first")  # Unchanged value is not appended again
+    cache.put(RAW, 6000, "second")
+    assert len(path.read_text().splitlines()) == 2
+
+    reloaded = CompressionCache(path)
+    assert reloaded.get(RAW, 6000) == "second"
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    path = tmp_path / "cache.jsonl"
+    CompressionCache(path).put(RAW, 6000, "compressed")
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"hash": "abc", "max_ch')
+
+    reloaded = CompressionCache(path)
+    assert reloaded.get(RAW, 6000) == "compressed"
+    assert len(reloaded) == 1
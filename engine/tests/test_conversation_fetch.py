@@ -0,0 +1,118 @@
+"""
+Unit tests for paginated, column-projected conversation fetches.
+"""
+
+import sys
+import threading
+from datetime import date, datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import vector_db
+
+DAY_TS = int(datetime(2026, 1, 5).timestamp() * 1000)
+
+
+class FakeQuery:
+    def __init__(self, client, columns):
+        self.client, self.columns, self.filters, self.limit_n = client, columns, [], None
+
+    def gte(self, col, value):
+        self.filters.append(lambda r: r[col] >= value)
+        return self
+
+    def lt(self, col, value):
+        self.filters.append(lambda r: r[col] < value)
+        return self
+
+    def gt(self, col, value):
+        self.filters.append(lambda r: r[col] > value)
+        return self
+
+    def eq(self, col, value):
+        self.filters.append(lambda r: r[col] == value)
+        return self
+
+    def in_(self, col, values):
+        self.filters.append(lambda r: r[col] in values)
+        return self
+
+    def order(self, col):
+        assert col == "id"
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        with self.client.lock:
+            self.client.selects.append(self.columns)
+        rows = [r for r in self.client.rows if all(f(r) for f in self.filters)]
+        rows = sorted(rows, key=lambda r: r["id"])[:self.limit_n]
+        fields = self.columns.split(",")
+        return type("R", (), {"data": [{k: r[k] for k in fields} for r in rows]})()
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows, self.selects, self.lock = rows, [], threading.Lock()
+
+    def table(self, name):
+        assert name == "cursor_messages"
+        return type("T", (), {"select": lambda _, columns: FakeQuery(self, columns)})()
+
+
+def _rows():
+    rows = []
+    for i in range(25):
+        rows.append({
+            "id": i + 1, "text": f"t{i}", "timestamp": DAY_TS + i * 3_400_000,
+            "workspace": f"ws{i % 2}", "chat_id": f"c{i % 4}", "chat_type": "composer",
+            "message_type": "user", "embedding": [0.0] * 1536,
+        })
+    return rows
+
+
+def _patch(monkeypatch, client):
+    monkeypatch.setattr(vector_db, "is_local_vector_db", lambda: False)
+    monkeypatch.setattr(vector_db, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(vector_db, "CONVERSATION_PAGE_SIZE", 4)
+
+
+def test_split_timestamp_range_covers_range():
+    assert vector_db._split_timestamp_range(0, 10, 4) == [(0, 2), (2, 5), (5, 7), (7, 10)]
+    assert vector_db._split_timestamp_range(0, 2, 4) == [(0, 1), (1, 2)]
+
+
+def test_date_range_fetch_pages_without_embeddings(monkeypatch):
+    client = FakeSupabase(_rows())
+    _patch(monkeypatch, client)
+
+    conversations = vector_db.get_conversations_from_vector_db(date(2026, 1, 5), date(2026, 1, 5))
+    assert sorted((c["workspace"], c["chat_id"], len(c["messages"])) for c in conversations) == [
+        ("ws0", "c0", 7), ("ws0", "c2", 6), ("ws1", "c1", 6), ("ws1", "c3", 6),
+    ]
+    for conv in conversations:
+        timestamps = [m["timestamp"] for m in conv["messages"]]
+        assert timestamps == sorted(timestamps)
+    # Rows span the day: 4 sub-ranges of 7/6/7/5 rows, 2 pages each; chats
+    # spanning sub-ranges are merged back into one conversation
+    assert len(client.selects) == 8
+    assert all("embedding" not in columns for columns in client.selects)
+
+
+def test_chat_id_fetch_streams_per_workspace(monkeypatch):
+    client = FakeSupabase(_rows())
+    _patch(monkeypatch, client)
+
+    stream = vector_db.iter_conversations_by_chat_ids(
+        [("ws0", "c0", "composer"), ("ws1", "c3", "composer"), ("ws1", "c1", "chat")],
+        date(2026, 1, 5), date(2026, 1, 5),
+    )
+    conversations = list(stream)
+    # c1 is stored as composer, so the ("ws1", "c1", "chat") request matches nothing
+    assert sorted((c["workspace"], c["chat_id"]) for c in conversations) == [("ws0", "c0"), ("ws1", "c3")]
+    assert vector_db.get_conversations_by_chat_ids([], date(2026, 1, 5), date(2026, 1, 5)) == []
@@ -0,0 +1,48 @@
+"""
+Unit tests for the blocked cross-KG semantic matcher.
+"""
+
+import json
+import random
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import cross_kg_matcher
+from common.cross_kg_matcher import CrossKGMatcher
+
+
+def _entities(prefix: str, n: int, rng: random.Random) -> list[dict]:
+    return [
+        {"id": f"{prefix}{i}", "canonical_name": f"{prefix}{i}", "entity_type": "tool",
+         "embedding": [rng.gauss(0, 1) for _ in range(8)]}
+        for i in range(n)
+    ]
+
+
+def test_blocked_top_k_matches_pairwise(monkeypatch):
+    rng = random.Random(3)
+    user, lenny = _entities("u", 40, rng), _entities("l", 60, rng)
+    lenny[5]["embedding"] = json.dumps(lenny[5]["embedding"])  # pgvector string
+    user[0]["embedding"] = None
+    matcher = CrossKGMatcher(None)
+
+    expected = set()
+    for u in user[1:]:
+        scored = []
+        for l in lenny:
+            vector = l["embedding"] if isinstance(l["embedding"], list) else json.loads(l["embedding"])
+            similarity = matcher.cosine_similarity(u["embedding"], vector)
+            if similarity >= 0.5:
+                scored.append((similarity, l["id"]))
+        scored.sort(reverse=True)
+        expected |= {(u["id"], lid) for _, lid in scored[:3]}
+
+    # Force several row blocks
+    monkeypatch.setattr(cross_kg_matcher, "MAX_BLOCK_SCORES", 200)
+    matches = matcher.find_semantic_matches(user, lenny, similarity_threshold=0.5, top_k=3)
+
+    assert {(m.user_entity_id, m.lenny_entity_id) for m in matches} == expected
+    assert [m.similarity for m in matches] == sorted((m.similarity for m in matches), reverse=True)
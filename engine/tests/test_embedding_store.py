@@ -0,0 +1,134 @@
+"""
+Unit tests for the append-only embedding store.
+
+Tests cover:
+- Append and lookup round-trip
+- Reopening from disk
+- Legacy JSON migration
+- Recovery from a torn write
+- Concurrent reads while another thread appends
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.embedding_store import EmbeddingStore, migrate_json_cache, DIGEST_SIZE
+
+
+DIM = 8
+
+
+def _key(i: int) -> str:
+    return f"{i:064x}"
+
+
+@pytest.fixture
+def store_paths(tmp_path):
+    return tmp_path / "cache.f32", tmp_path / "cache.idx"
+
+
+class TestAppendAndLookup:
+    """Test basic put/get behaviour."""
+
+    def test_put_then_get(self, store_paths):
+        store = EmbeddingStore(*store_paths, DIM)
+        store.put(_key(1), [0.5] * DIM)
+        assert _key(1) in store
+        assert store[_key(1)] == [0.5] * DIM
+        assert len(store) == 1
+
+    def test_missing_key(self, store_paths):
+        store = EmbeddingStore(*store_paths, DIM)
+        assert store.get(_key(1)) is None
+        assert _key(1) not in store
+        with pytest.raises(KeyError):
+            store[_key(1)]
+
+    def test_duplicate_keys_not_appended(self, store_paths):
+        store = EmbeddingStore(*store_paths, DIM)
+        assert store.put_many([(_key(1), [1.0] * DIM), (_key(1), [2.0] * DIM)]) == 1
+        assert store.put_many([(_key(1), [3.0] * DIM)]) == 0
+        assert store[_key(1)] == [1.0] * DIM
+
+    def test_wrong_dimension_rejected(self, store_paths):
+        store = EmbeddingStore(*store_paths, DIM)
+        with pytest.raises(ValueError):
+            store.put(_key(1), [1.0] * (DIM + 1))
+
+    def test_reopen_reads_from_disk(self, store_paths):
+        store = EmbeddingStore(*store_paths, DIM)
+        store.put_many([(_key(i), [float(i)] * DIM) for i in range(5)])
+        store.close()
+
+        reopened = EmbeddingStore(*store_paths, DIM)
+        assert len(reopened) == 5
+        assert reopened[_key(3)] == [3.0] * DIM
+        assert reopened.as_matrix().shape == (5, DIM)
+
+
+class TestMigrationAndRecovery:
+    """Test legacy JSON migration and torn-write handling."""
+
+    def test_migrate_json_cache(self, tmp_path, store_paths):
+        legacy = {_key(i): [float(i)] * DIM for i in range(3)}
+        legacy["bad"] = [1.0, 2.0]  # Wrong dimension - skipped
+        json_path = tmp_path / "embedding_cache.json"
+        json_path.write_text(json.dumps(legacy))
+
+        store = EmbeddingStore(*store_paths, DIM)
+        assert migrate_json_cache(json_path, store) == 3
+        assert store[_key(2)] == [2.0] * DIM
+
+    def test_torn_write_truncated_on_next_append(self, store_paths):
+        matrix_path, index_path = store_paths
+        store = EmbeddingStore(*store_paths, DIM)
+        store.put(_key(1), [1.0] * DIM)
+        store.close()
+
+        # Simulate a crash after the matrix row was written but before the index
+        with open(matrix_path, "ab") as f:
+            f.write(b"\x00" * (DIM * 4))
+
+        reopened = EmbeddingStore(*store_paths, DIM)
+        assert len(reopened) == 1
+        reopened.put(_key(2), [2.0] * DIM)
+        assert matrix_path.stat().st_size == 2 * DIM * 4
+        assert index_path.stat().st_size == 2 * DIGEST_SIZE
+        assert reopened[_key(2)] == [2.0] * DIM
+
+
+class TestConcurrentReads:
+    """Test readers racing the remap triggered by appends."""
+
+    def test_get_while_appending(self, store_paths):
+        store = EmbeddingStore(*store_paths, DIM)
+        store.put(_key(0), [0.0] * DIM)
+        errors = []
+        done = threading.Event()
+
+        def reader():
+            while not done.is_set():
+                try:
+                    assert store.get(_key(0)) == [0.0] * DIM
+                except Exception as e:
+                    errors.append(e)
+
+        readers = [threading.Thread(target=reader) for _ in range(4)]
+        for t in readers:
+            t.start()
+        try:
+            for i in range(1, 500):
+                store.put(_key(i), [float(i)] * DIM)
+                assert store.get(_key(i)) == [float(i)] * DIM
+        finally:
+            done.set()
+            for t in readers:
+                t.join()
+        assert errors == []
@@ -0,0 +1,115 @@
+"""
+Unit tests for entity creation across workers with stale name indexes.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.entity_deduplicator import EntityDeduplicator, EntityNameIndex
+from common.knowledge_graph import EntityType
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Query:
+    def __init__(self, client):
+        self.client = client
+        self.filters = {}
+
+    def select(self, columns):
+        return self
+
+    def ilike(self, column, pattern):
+        self.filters[column] = pattern.replace("\\", "").lower()
+        return self
+
+    def eq(self, column, value):
+        self.filters[column] = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, n):
+        return self
+
+    def insert(self, row):
+        self.client.rows.append(row)
+        return self
+
+    def execute(self):
+        rows = [
+            row for row in self.client.rows
+            if all(str(row.get(k, "")).lower() == v for k, v in self.filters.items())
+        ]
+        return _Result(rows)
+
+
+class FakeSupabase:
+    """Shared kg_entities table; search_kg_entities never matches."""
+
+    def __init__(self):
+        self.rows = []
+
+    def table(self, name):
+        return _Query(self)
+
+    def rpc(self, name, params):
+        return _Query(FakeSupabase())
+
+
+class _StatBuffer:
+    def __init__(self):
+        self.stats = []
+
+    def add_entity_stat(self, entity_id, message_timestamp, source_type):
+        self.stats.append(entity_id)
+
+
+def _worker(client):
+    # Each worker's name index was loaded before the other inserted anything
+    index = EntityNameIndex()
+    index.loaded = True
+    return EntityDeduplicator(client, name_index=index, write_buffer=_StatBuffer())
+
+
+def test_second_worker_reuses_entity_created_after_its_index_loaded():
+    client = FakeSupabase()
+    first, second = _worker(client), _worker(client)
+
+    created_id, created = first.find_or_create_entity("Next_JS", EntityType.TOOL, embedding=[1.0, 0.0])
+    found_id, found_new = second.find_or_create_entity("next_js", EntityType.TOOL, embedding=[0.0, 1.0])
+
+    assert created and not found_new
+    assert found_id == created_id
+    assert len(client.rows) == 1
+    assert second.name_index.find_by_name("next_js")["id"] == created_id
+
+
+def test_same_name_different_type_is_a_new_entity():
+    client = FakeSupabase()
+    first, second = _worker(client), _worker(client)
+
+    first.find_or_create_entity("Cursor", EntityType.TOOL, embedding=[1.0, 0.0])
+    _, is_new = second.find_or_create_entity("Cursor", EntityType.CONCEPT, embedding=[0.0, 1.0])
+
+    assert is_new
+    assert len(client.rows) == 2
+
+
+def test_prefetch_keeps_one_entry_per_name_and_type(monkeypatch):
+    monkeypatch.setattr(
+        "common.entity_deduplicator.batch_get_embeddings",
+        lambda texts: [[1.0, 0.0] for _ in texts],
+    )
+    worker = _worker(FakeSupabase())
+
+    worker.prefetch_embedding_matches([("Cursor", EntityType.TOOL), ("cursor", EntityType.CONCEPT)])
+
+    assert set(worker._prefetched) == {("cursor", EntityType.TOOL), ("cursor", EntityType.CONCEPT)}
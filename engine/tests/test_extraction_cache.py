@@ -0,0 +1,73 @@
+"""
+Unit tests for the content-addressed KG extraction cache.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import extraction_cache
+from common.fused_extractor import FusedExtraction
+from common.knowledge_graph import EntityType, ExtractedEntity, ExtractedRelation, RelationType
+
+
+@pytest.fixture
+def cache_path(tmp_path, monkeypatch):
+    path = tmp_path / "extraction_cache.jsonl"
+    monkeypatch.setattr(extraction_cache, "get_extraction_cache_path", lambda: path)
+    monkeypatch.setattr(extraction_cache, "_extraction_cache", None)
+    monkeypatch.delenv("KG_EXTRACTION_CACHE", raising=False)
+    return path
+
+
+def _counting(result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return result
+    return compute, calls
+
+
+def test_replays_across_processes(cache_path, monkeypatch):
+    entities = [ExtractedEntity(name="Supabase", entity_type=EntityType.TOOL, aliases=["sb"], confidence=0.9)]
+    compute, calls = _counting(entities)
+
+    assert extraction_cache.cached_extraction("entities", "text", "anthropic/m", compute) == entities
+    # Fresh process view: reload from disk
+    monkeypatch.setattr(extraction_cache, "_extraction_cache", None)
+    assert extraction_cache.cached_extraction("entities", "text", "anthropic/m", compute) == entities
+    assert len(calls) == 1
+
+
+def test_key_includes_text_model_and_variant(cache_path):
+    relations = [ExtractedRelation("A", "B", RelationType.SOLVES, "because", 0.7)]
+    compute, calls = _counting(relations)
+
+    extraction_cache.cached_extraction("relations", "text", "anthropic/m", compute, variant="A\nB")
+    extraction_cache.cached_extraction("relations", "other text", "anthropic/m", compute, variant="A\nB")
+    extraction_cache.cached_extraction("relations", "text", "openai/m", compute, variant="A\nB")
+    extraction_cache.cached_extraction("relations", "text", "anthropic/m", compute, variant="A")
+    assert len(calls) == 4
+
+
+def test_empty_results_are_not_cached(cache_path):
+    compute, calls = _counting(FusedExtraction())
+
+    extraction_cache.cached_extraction("fused", "text", "anthropic/m", compute)
+    extraction_cache.cached_extraction("fused", "text", "anthropic/m", compute)
+    assert len(calls) == 2
+    assert not cache_path.exists()
+
+
+def test_disabled_by_env(cache_path, monkeypatch):
+    monkeypatch.setenv("KG_EXTRACTION_CACHE", "0")
+    compute, calls = _counting([ExtractedEntity(name="Prisma", entity_type=EntityType.TOOL)])
+
+    extraction_cache.cached_extraction("entities", "text", "anthropic/m", compute)
+    extraction_cache.cached_extraction("entities", "text", "anthropic/m", compute)
+    assert len(calls) == 2
@@ -0,0 +1,68 @@
+"""
+Unit tests for fused (single-call) KG extraction parsing.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import fused_extractor
+from common.knowledge_graph import EntityType, RelationType
+
+
+RESPONSE = """```json
+{
+  "entities": [
+    {"name": "Supabase", "type": "tool", "aliases": ["supabase-js"], "confidence": 0.9},
+    {"name": "N+1 query", "type": "problem"},
+    {"name": "database", "type": "tool"},
+    {"name": "Acme", "type": "company"}
+  ],
+  "relations": [
+    {"source": "Supabase", "target": "N+1 query", "relation": "FIXES", "evidence": "batched RPC"},
+    {"source": "Supabase", "target": "Supabase", "relation": "SOLVES"}
+  ],
+  "decisions": [
+    {"decision_text": "Use Postgres instead of MongoDB", "decision_type": "TECHNOLOGY_CHOICE"},
+    {"rationale": "missing text"}
+  ]
+}
+```"""
+
+
+def test_parses_all_sections_with_existing_rules():
+    result = fused_extractor._parse_fused_response(RESPONSE)
+
+    assert [(e.name, e.entity_type) for e in result.entities] == [
+        ("Supabase", EntityType.TOOL),
+        ("N+1 query", EntityType.PROBLEM),
+    ]
+    assert [(r.source_name, r.target_name, r.relation_type) for r in result.relations] == [
+        ("Supabase", "N+1 query", RelationType.SOLVES),
+    ]
+    assert [d.decision_text for d in result.decisions] == ["Use Postgres instead of MongoDB"]
+
+
+def test_single_llm_call_and_omitted_sections(monkeypatch):
+    prompts = []
+
+    def fake_call_llm(prompt, **kwargs):
+        prompts.append(prompt)
+        return '{"entities": [{"name": "Prisma", "type": "tool"}]}'
+    monkeypatch.setattr(fused_extractor, "call_llm", fake_call_llm)
+
+    result = fused_extractor.extract_kg_fused(
+        "We moved the data layer to Prisma last week.", with_relations=False, with_decisions=False
+    )
+
+    assert len(prompts) == 1
+    assert '"relations"' not in prompts[0] and '"decisions"' not in prompts[0]
+    assert [e.name for e in result.entities] == ["Prisma"]
+    assert result.relations == [] and result.decisions == []
+
+
+def test_unparseable_response_is_empty():
+    result = fused_extractor._parse_fused_response("no json here")
+    assert result.entities == [] and result.relations == [] and result.decisions == []
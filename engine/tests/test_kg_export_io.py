@@ -0,0 +1,122 @@
+"""
+Unit tests for streaming KG export/import helpers.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.kg_export_io import (
+    ExportWriter,
+    decode_embedding,
+    encode_embedding,
+    export_filename,
+    iter_export_records,
+    iter_json_array,
+    iter_table_rows,
+)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096])
+def test_iter_json_array_matches_json_load(tmp_path, chunk_size):
+    records = [
+        {"id": "e1", "canonical_name": "Supabase, Inc.", "aliases": ["sb", "]"]},
+        {"id": "e2", "mention_count": 12345, "score": -0.5e3},
+        {"id": "e3", "note": "unicode ✅ and \"quotes\""},
+        42,
+    ]
+    path = tmp_path / "export.json"
+    path.write_text(json.dumps(records, indent=2, ensure_ascii=False), encoding="utf-8")
+
+    assert list(iter_json_array(path, chunk_size=chunk_size)) == records
+
+
+def test_iter_json_array_empty_and_invalid(tmp_path):
+    empty = tmp_path / "empty.json"
+    empty.write_text(" [ ]\n")
+    assert list(iter_json_array(empty)) == []
+
+    not_array = tmp_path / "object.json"
+    not_array.write_text('{"id": 1}')
+    with pytest.raises(ValueError):
+        list(iter_json_array(not_array))
+
+
+class _Query:
+    def __init__(self, rows):
+        self.rows = rows
+        self.last_id = ""
+        self.page = None
+
+    def select(self, columns):
+        return self
+
+    def gt(self, column, value):
+        self.last_id = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def limit(self, n):
+        self.page = n
+        return self
+
+    def execute(self):
+        self.data = [r for r in self.rows if r["id"] > self.last_id][:self.page]
+        return self
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.requests = 0
+
+    def table(self, name):
+        self.requests += 1
+        return _Query(self.rows)
+
+
+def test_iter_table_rows_keyset_pages():
+    rows = [{"id": f"id-{i:03d}"} for i in range(25)]
+    client = FakeSupabase(rows)
+
+    assert list(iter_table_rows(client, "kg_entities", "id", page_size=10)) == rows
+    assert client.requests == 3
+
+
+@pytest.mark.parametrize("fmt,compress", [("json", False), ("json", True), ("jsonl", False), ("jsonl", True)])
+def test_export_writer_resumes_at_page_boundary(tmp_path, fmt, compress):
+    path = tmp_path / export_filename("lenny_kg_entities", fmt, compress)
+    pages = [[{"id": f"e{p}{i}", "embedding": "[0.5,-0.25]"} for i in range(3)] for p in range(3)]
+
+    writer = ExportWriter(path, fmt, compress, embedding_encoding="f16")
+    writer.write_page(pages[0])
+    checkpoint = writer.state()
+    writer.write_page(pages[1])  # Written but never checkpointed (crash)
+    writer._file.close()
+
+    writer = ExportWriter(path, fmt, compress, embedding_encoding="f16", resume_state=checkpoint)
+    writer.write_page(pages[1])
+    writer.write_page(pages[2])
+    writer.close()
+
+    records = list(iter_export_records(path))
+    assert [r["id"] for r in records] == [r["id"] for page in pages for r in page]
+    assert records[0]["embedding"] == "[0.5,-0.25]"
+    if fmt == "json" and not compress:
+        assert len(json.loads(path.read_text())) == 9
+
+
+def test_embedding_encoding_roundtrip():
+    vector = "[0.1,-2.5,3.0]"
+    assert encode_embedding(vector, "text") == vector
+    encoded = encode_embedding(vector, "f32")
+    assert encoded["dim"] == 3
+    assert json.loads(decode_embedding(encoded)) == pytest.approx([0.1, -2.5, 3.0])
+    assert decode_embedding(None) is None
@@ -0,0 +1,76 @@
+"""
+Unit tests for batched KG writes.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common.kg_write_buffer import KGWriteBuffer, mention_id
+
+
+class _Query:
+    def __init__(self, client, call):
+        self.client = client
+        self.call = call
+
+    def upsert(self, rows, **kwargs):
+        self.call.update(op="upsert", rows=rows, **kwargs)
+        return self
+
+    def execute(self):
+        self.client.calls.append(self.call)
+        return self
+
+
+class FakeSupabase:
+    def __init__(self):
+        self.calls = []
+
+    def table(self, name):
+        return _Query(self, {"table": name})
+
+    def rpc(self, name, params):
+        return _Query(self, {"rpc": name, "params": params})
+
+
+def test_flush_batches_into_three_requests():
+    client = FakeSupabase()
+    buffer = KGWriteBuffer(client)
+    for entity_id, ts in [("e1", 2000), ("e2", 1000), ("e1", 1000)]:
+        buffer.add_entity_stat(entity_id, ts, "expert")
+        buffer.add_mention(entity_id, "chat-1", "snippet", ts)
+    buffer.add_relation("e1", "e2", "SOLVES", "because", "chat-1")
+    buffer.add_relation("e1", "e2", "SOLVES", "again", "chat-1")
+
+    written = buffer.flush()
+
+    assert written == {"mentions": 2, "relations": 1, "entity_stats": 2}
+    assert [c.get("table") or c.get("rpc") for c in client.calls] == [
+        "kg_relations", "apply_entity_stat_deltas", "kg_entity_mentions",
+    ]
+    deltas = {d["id"]: d for d in client.calls[1]["params"]["p_deltas"]}
+    assert deltas["e1"]["lenny"] == 2 and deltas["e1"]["user"] == 0
+    assert deltas["e1"]["first_seen"] < deltas["e1"]["last_seen"]
+    assert {r["id"] for r in client.calls[2]["rows"]} == {mention_id("e1", "chat-1"), mention_id("e2", "chat-1")}
+    assert all(c.get("ignore_duplicates", True) for c in client.calls)
+    assert len(buffer) == 0
+
+
+def test_remap_after_merge():
+    buffer = KGWriteBuffer(FakeSupabase())
+    buffer.add_entity_stat("old", 1000)
+    buffer.add_entity_stat("new", 3000)
+    buffer.add_mention("old", "chat-1", "s", 1000)
+    buffer.add_relation("old", "new", "USED_WITH", "", "chat-1")
+    buffer.add_relation("old", "other", "SOLVES", "", "chat-1")
+
+    buffer.remap_entity("old", "new")
+
+    assert set(buffer._stats) == {"new"}
+    assert buffer._stats["new"]["user"] == 2
+    assert [r["entity_id"] for r in buffer._mentions.values()] == ["new"]
+    # Self-relation created by the merge is dropped
+    assert list(buffer._relations) == [("new", "other", "SOLVES", "chat-1")]
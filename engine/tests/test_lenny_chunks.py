@@ -0,0 +1,62 @@
+"""
+Unit tests for the binary Lenny chunk sidecar.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import lenny_search, lenny_shards
+from common.lenny_chunks import ChunkTable, write_chunk_table
+
+
+def _metadata():
+    episodes = [
+        {"id": "ada", "guest_name": "Ada Lovelace", "filename": "ada.md", "chunk_start_idx": 0, "chunk_count": 3},
+        {"id": "bob", "guest_name": "Bob", "filename": "bob.md", "chunk_start_idx": 3, "chunk_count": 2},
+    ]
+    speakers = ["Lenny", "Ada Lovelace", "lenny", "Bob", "Lenny"]
+    chunks = [
+        {"idx": i, "episode_id": "ada" if i < 3 else "bob", "speaker": speaker,
+         "timestamp": f"00:0{i}:00", "content": f"chunk {i} — ünïcode", "word_count": i + 1}
+        for i, speaker in enumerate(speakers)
+    ]
+    return {"stats": {"total_chunks": 5}, "episodes": episodes, "chunks": chunks}
+
+
+def test_chunk_table_roundtrip_and_guest_index(tmp_path):
+    metadata = _metadata()
+    path = write_chunk_table(tmp_path / "chunks.bin", metadata["episodes"], metadata["chunks"], metadata["stats"])
+    table = ChunkTable(path)
+
+    assert len(table) == 5
+    assert list(table) == metadata["chunks"]
+    assert table[-1] == metadata["chunks"][-1]
+    assert table.episodes == metadata["episodes"] and table.stats == {"total_chunks": 5}
+
+    episodes = {ep["id"]: ep for ep in metadata["episodes"]}
+    fast_ranges, fast_rows = lenny_search._build_guest_index(table, episodes)
+    ranges, rows = lenny_search._build_guest_index(metadata["chunks"], episodes)
+    assert fast_ranges == ranges
+    assert {k: v.tolist() for k, v in fast_rows.items()} == {k: v.tolist() for k, v in rows.items()}
+
+
+def test_loader_builds_sidecar_from_metadata_json(monkeypatch, tmp_path):
+    monkeypatch.setattr(lenny_search, "get_data_dir", lambda: tmp_path)
+    monkeypatch.setattr(lenny_shards, "get_data_dir", lambda: tmp_path)
+    (tmp_path / "lenny_metadata.json").write_text(json.dumps(_metadata()))
+    np.savez_compressed(tmp_path / "lenny_embeddings.npz", embeddings=np.eye(5, 4, dtype=np.float32))
+
+    lenny_search.clear_lenny_cache()
+    _, chunks = lenny_search.load_lenny_embeddings()
+    assert isinstance(chunks, ChunkTable)
+    assert (tmp_path / "lenny_chunks.bin").exists()
+    assert lenny_search.get_episode_context("ada.md", 1, context_chunks=1) == {
+        "before": [_metadata()["chunks"][0]], "after": [_metadata()["chunks"][2]],
+    }
+    lenny_search.clear_lenny_cache()
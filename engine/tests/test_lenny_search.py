@@ -0,0 +1,94 @@
+"""
+Unit tests for Lenny archive search over the normalized mmap matrix.
+
+Tests cover:
+- Top-k matches a brute-force cosine ranking
+- Guest filter restricts results to that guest's rows
+- The .npy matrix is derived from the .npz on first load
+- Batched search matches single-query search with one embedding call
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import lenny_search
+
+
+DIM = 16
+
+
+@pytest.fixture
+def archive(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    embeddings = rng.normal(size=(60, DIM)).astype(np.float32) * 3
+    episodes = [
+        {"id": f"ep{e}", "guest_name": name, "filename": f"{name}.md"}
+        for e, name in enumerate(["Ada Lovelace", "Grace Hopper", "Alan Kay"])
+    ]
+    chunks = [
+        {"episode_id": f"ep{i // 20}", "speaker": "Lenny" if i % 2 else episodes[i // 20]["guest_name"],
+         "content": f"chunk {i}", "idx": i}
+        for i in range(60)
+    ]
+    np.savez_compressed(tmp_path / "lenny_embeddings.npz", embeddings=embeddings)
+    (tmp_path / "lenny_metadata.json").write_text(json.dumps({"chunks": chunks, "episodes": episodes}))
+
+    monkeypatch.setattr(lenny_search, "get_data_dir", lambda: tmp_path)
+    lenny_search.clear_lenny_cache()
+    yield tmp_path, embeddings, chunks
+    lenny_search.clear_lenny_cache()
+
+
+def _brute_force(embeddings, query, rows):
+    normalized = embeddings / np.linalg.norm(embeddings, axis=1, keepdims=True)
+    scores = normalized[rows] @ (query / np.linalg.norm(query))
+    return [rows[i] for i in np.argsort(-scores)]
+
+
+def test_top_k_matches_brute_force(archive, monkeypatch):
+    tmp_path, embeddings, _ = archive
+    query = embeddings[7] + 0.1
+    monkeypatch.setattr(lenny_search, "get_embedding", lambda q, allow_fallback=True: query.tolist())
+
+    results = lenny_search.search_lenny_archive("q", top_k=5, min_similarity=-1.0)
+
+    assert [r.chunk_index for r in results] == _brute_force(embeddings, query, list(range(60)))[:5]
+    assert (tmp_path / "lenny_embeddings.npy").exists()
+
+
+def test_guest_filter(archive, monkeypatch):
+    _, embeddings, chunks = archive
+    query = embeddings[3]
+    monkeypatch.setattr(lenny_search, "get_embedding", lambda q, allow_fallback=True: query.tolist())
+
+    results = lenny_search.search_lenny_archive("q", top_k=50, min_similarity=-1.0, guest_filter="grace")
+
+    assert [r.chunk_index for r in results] == _brute_force(embeddings, query, list(range(20, 40)))
+    assert {r.guest_name for r in results} == {"Grace Hopper"}
+
+
+def test_batch_matches_single_queries(archive, monkeypatch):
+    _, embeddings, _ = archive
+    vectors = {"a": embeddings[1] + 0.2, "b": embeddings[45] - 0.1}
+    calls = []
+    monkeypatch.setattr(lenny_search, "get_embedding", lambda q, allow_fallback=True: vectors[q].tolist())
+
+    def fake_batch(texts, allow_fallback=True):
+        calls.append(texts)
+        return [vectors[t].tolist() for t in texts]
+    monkeypatch.setattr(lenny_search, "batch_get_embeddings", fake_batch)
+
+    batch = lenny_search.search_lenny_archive_batch(["a", "b"], top_k=3, min_similarity=-1.0)
+
+    assert calls == [["a", "b"]]
+    for query, results in zip(["a", "b"], batch):
+        single = lenny_search.search_lenny_archive(query, top_k=3, min_similarity=-1.0)
+        assert [r.chunk_index for r in results] == [r.chunk_index for r in single]
@@ -0,0 +1,66 @@
+"""
+Unit tests for per-episode Lenny shards and the sharded search loader.
+"""
+
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import lenny_search, lenny_shards
+from common.lenny_shards import LennyShardStore
+
+
+def _episode(episode_id: str, n: int, seed: int):
+    rng = np.random.default_rng(seed)
+    entry = {"id": episode_id, "filename": "transcript.md", "guest_name": episode_id.title(), "file_hash": f"h{seed}"}
+    chunks = [{"speaker": "Lenny", "timestamp": "00:00:00", "content": f"{episode_id} {i}", "word_count": 2} for i in range(n)]
+    return entry, chunks, rng.normal(size=(n, 4)).astype(np.float32)
+
+
+def _save(store, episodes):
+    store.save_manifest(
+        [{"id": e["id"], "file_hash": e["file_hash"], "chunk_count": len(c)} for e, c, _ in episodes],
+        dim=4,
+    )
+
+
+def test_sharded_index_loads_and_updates_incrementally(monkeypatch, tmp_path):
+    monkeypatch.setattr(lenny_search, "get_data_dir", lambda: tmp_path)
+    monkeypatch.setattr(lenny_shards, "get_data_dir", lambda: tmp_path)
+    (tmp_path / "lenny_metadata.json").write_text(json.dumps({"episodes": [], "sharded": True}))
+
+    episodes = [_episode("ada", 3, 1), _episode("bob", 2, 2)]
+    store = LennyShardStore()
+    for entry, chunks, embeddings in episodes:
+        store.write_episode(entry, chunks, embeddings)
+    _save(store, episodes)
+
+    assert lenny_search.is_lenny_indexed()
+    lenny_search.clear_lenny_cache()
+    matrix, chunks = lenny_search.load_lenny_embeddings()
+    expected = np.concatenate([e for _, _, e in episodes])
+    expected /= np.linalg.norm(expected, axis=1, keepdims=True)
+    assert np.allclose(matrix, expected, atol=1e-6)
+    assert [c["idx"] for c in chunks] == list(range(5))
+    assert lenny_search.get_episode_by_id("bob")["chunk_start_idx"] == 3
+
+    # Add one episode and drop another: untouched shards are not rewritten
+    ada_npy = store.dir / "ada.npy"
+    os.utime(ada_npy, (0, 0))
+    assert store.has_episode("ada", "h1") and not store.has_episode("ada", "changed")
+    episodes = [episodes[0], _episode("cy", 4, 3)]
+    store.write_episode(*episodes[1])
+    _save(store, episodes)
+
+    assert ada_npy.stat().st_mtime == 0
+    assert not (store.dir / "bob.npy").exists()
+    lenny_search.clear_lenny_cache()
+    matrix, chunks = lenny_search.load_lenny_embeddings()
+    assert matrix.shape == (7, 4)
+    assert chunks[-1]["episode_id"] == "cy" and chunks[-1]["idx"] == 6
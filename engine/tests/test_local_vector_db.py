@@ -0,0 +1,103 @@
+"""
+Unit tests for the embedded local vector DB backend.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import local_vector_db, vector_db
+from common.local_vector_db import LocalVectorDB
+
+DIM = 16
+
+
+def _messages(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [
+        {
+            "message_id": f"m{i}",
+            "text": f"message {i}",
+            "timestamp": 1000 + i,
+            "workspace": f"ws{i % 3}",
+            "chat_id": f"c{i % 5}",
+            "chat_type": "composer",
+            "message_type": "user" if i % 2 else "assistant",
+            "embedding": rng.normal(size=DIM).tolist(),
+        }
+        for i in range(n)
+    ]
+
+
+def _brute_force(messages, query, top_k, start_ts=None, workspaces=None):
+    q = np.asarray(query) / np.linalg.norm(query)
+    scored = []
+    for msg in messages:
+        if start_ts is not None and msg["timestamp"] < start_ts:
+            continue
+        if workspaces and msg["workspace"] not in workspaces:
+            continue
+        e = np.asarray(msg["embedding"])
+        scored.append((float(e @ q / np.linalg.norm(e)), msg["message_id"]))
+    return [mid for _, mid in sorted(scored, reverse=True)[:top_k]]
+
+
+def test_search_matches_brute_force_with_filters(tmp_path):
+    db = LocalVectorDB(tmp_path, dim=DIM)
+    messages = _messages(200)
+    assert db.upsert_messages(messages) == (200, 0)
+
+    query = np.random.default_rng(1).normal(size=DIM).tolist()
+    [hits] = db.search([query], start_ts=1050, workspace_paths=["ws1"], top_k=5, min_similarity=-1.0)
+    assert [h["message_id"] for h in hits] == _brute_force(messages, query, 5, 1050, ["ws1"])
+    assert all(h["workspace"] == "ws1" and h["timestamp"] >= 1050 for h in hits)
+    assert hits[0]["similarity"] >= hits[-1]["similarity"]
+
+
+def test_upsert_overwrites_row_in_place(tmp_path):
+    db = LocalVectorDB(tmp_path, dim=DIM)
+    messages = _messages(10)
+    db.upsert_messages(messages)
+    db.search([messages[0]["embedding"]], top_k=1)  # Load columns before the update
+
+    target = np.zeros(DIM)
+    target[0] = 1.0
+    db.upsert_messages([{**messages[3], "text": "updated", "embedding": target.tolist()}])
+    [hits] = db.search([target.tolist()], top_k=1)
+    assert hits[0]["message_id"] == "m3" and hits[0]["text"] == "updated"
+    assert db.count() == 10
+    assert db.existing_message_ids(["m3", "missing"]) == {"m3"}
+
+
+def test_ivf_path_finds_exact_neighbors(tmp_path, monkeypatch):
+    monkeypatch.setattr(local_vector_db, "IVF_MIN_ROWS", 100)
+    db = LocalVectorDB(tmp_path, dim=DIM)
+    messages = _messages(2000)
+    db.upsert_messages(messages)
+
+    [hits] = db.search([messages[42]["embedding"]], top_k=3)
+    assert db._ivf is not None and (tmp_path / "ivf.npz").exists()
+    assert hits[0]["message_id"] == "m42"
+    assert abs(hits[0]["similarity"] - 1.0) < 1e-5
+
+
+def test_neighbors_and_vector_db_dispatch(tmp_path, monkeypatch):
+    db = LocalVectorDB(tmp_path, dim=DIM)
+    db.upsert_messages(_messages(30))
+    monkeypatch.setattr(vector_db, "is_local_vector_db", lambda: True)
+    monkeypatch.setattr(vector_db, "_local_db", lambda: db)
+    monkeypatch.setattr(vector_db, "get_supabase_client", lambda: (_ for _ in ()).throw(AssertionError("supabase")))
+
+    # Chat c0 holds m0, m5, m10, ... (timestamps 1000, 1005, 1010, ...)
+    match = {"message": {"timestamp": 1010}, "workspace": "ws1", "chat_id": "c0"}
+    match_ws0 = {"message": {"timestamp": 1015}, "workspace": "ws0", "chat_id": "c0"}
+    vector_db.fetch_message_context([match, match_ws0], context_messages=1)
+    assert match["context"] == {"before": [], "after": [{"type": "user", "text": "message 25", "timestamp": 1025}]}
+    assert [m["timestamp"] for m in match_ws0["context"]["before"]] == [1000]
+
+    assert vector_db.get_message_count() == 30
+    assert vector_db.get_existing_message_ids(["m1", "x"]) == {"m1"}
@@ -0,0 +1,139 @@
+"""
+Unit tests for multi-query message search and context windows.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import vector_db
+from common.semantic_search import search_messages_multi
+
+
+def _row(query_index, chat_id, text, similarity):
+    return {"query_index": query_index, "text": text, "timestamp": 1, "workspace": "ws",
+            "chat_id": chat_id, "chat_type": "composer", "message_type": "user", "similarity": similarity}
+
+
+class _RPC:
+    def __init__(self, client, name, params):
+        self.client, self.name, self.params = client, name, params
+
+    def execute(self):
+        self.client.calls.append((self.name, self.params))
+        if self.name == "search_cursor_messages_multi":
+            if self.client.multi_missing:
+                raise Exception("PGRST202: function search_cursor_messages_multi does not exist")
+            return type("R", (), {"data": self.client.rows})()
+        index = self.params["query_embedding"][0]
+        return type("R", (), {"data": [r for r in self.client.rows if r["query_index"] == index]})()
+
+
+class FakeSupabase:
+    def __init__(self, rows, multi_missing=False):
+        self.rows, self.multi_missing, self.calls = rows, multi_missing, []
+
+    def rpc(self, name, params):
+        return _RPC(self, name, params)
+
+
+def _patch(monkeypatch, client):
+    embed_calls = []
+
+    def fake_batch_get_embeddings(texts, **kwargs):
+        embed_calls.append(list(texts))
+        return [[float(i), 0.0] for i in range(len(texts))]
+
+    monkeypatch.setattr(vector_db, "get_supabase_client", lambda: client)
+    monkeypatch.setattr(vector_db, "batch_get_embeddings", fake_batch_get_embeddings)
+    monkeypatch.setattr(vector_db, "get_embedding", lambda text: (_ for _ in ()).throw(AssertionError("per-query embed")))
+    return embed_calls
+
+
+ROWS = [
+    _row(0, "a", "shared", 0.6), _row(0, "b", "only q0", 0.5),
+    _row(1, "a", "shared", 0.8), _row(1, "a", "other", 0.4),
+]
+
+
+def test_one_embedding_call_and_one_rpc(monkeypatch):
+    client = FakeSupabase(ROWS)
+    embed_calls = _patch(monkeypatch, client)
+
+    results = search_messages_multi(["q0", "q1", "q2"], top_k=5, start_timestamp=0, end_timestamp=10)
+
+    assert embed_calls == [["q0", "q1", "q2"]]
+    assert [name for name, _ in client.calls] == ["search_cursor_messages_multi"]
+    assert [len(m) for m in results["per_query"]] == [2, 2, 0]
+    chat_a, chat_b = results["chats"]
+    assert (chat_a["chat_id"], chat_a["similarity"], chat_a["query_indices"]) == ("a", 0.8, [0, 1])
+    assert [m["message"]["text"] for m in chat_a["matches"]] == ["shared", "other"]
+    assert chat_b["chat_id"] == "b"
+
+
+def test_falls_back_to_single_rpcs_with_batched_embeddings(monkeypatch):
+    client = FakeSupabase(ROWS, multi_missing=True)
+    embed_calls = _patch(monkeypatch, client)
+
+    results = search_messages_multi(["q0", "q1"], top_k=5)
+
+    assert len(embed_calls) == 1
+    assert [name for name, _ in client.calls] == [
+        "search_cursor_messages_multi", "search_cursor_messages", "search_cursor_messages",
+    ]
+    assert [len(m) for m in results["per_query"]] == [2, 2]
+
+
+class _Table:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def in_(self, column, values):
+        self.rows = [r for r in self.rows if r[column] in values]
+        return self
+
+    def execute(self):
+        return type("R", (), {"data": self.rows})()
+
+
+class FakeMessagesDB:
+    def __init__(self, messages):
+        self.messages, self.requests = messages, []
+
+    def rpc(self, name, params):
+        self.requests.append(name)
+        raise Exception("PGRST202: function get_cursor_message_neighbors does not exist")
+
+    def table(self, name):
+        self.requests.append(name)
+        return _Table(self.messages)
+
+
+def test_fetch_message_context_fallback_slices_each_chat(monkeypatch):
+    messages = [
+        {"workspace": "ws", "chat_id": chat, "text": f"{chat}{t}", "timestamp": t, "message_type": "user"}
+        for chat in ("a", "b") for t in range(6)
+    ]
+    client = FakeMessagesDB(messages)
+    monkeypatch.setattr(vector_db, "get_supabase_client", lambda: client)
+    hits = [
+        {"workspace": "ws", "chat_id": "a", "message": {"text": "a3", "timestamp": 3}},
+        {"workspace": "ws", "chat_id": "b", "message": {"text": "b0", "timestamp": 0}},
+    ]
+
+    vector_db.fetch_message_context(hits, context_messages=2)
+
+    assert client.requests == ["get_cursor_message_neighbors", "cursor_messages"]
+    assert [m["text"] for m in hits[0]["context"]["before"]] == ["a1", "a2"]
+    assert [m["text"] for m in hits[0]["context"]["after"]] == ["a4", "a5"]
+    assert hits[1]["context"]["before"] == []
+    assert [m["text"] for m in hits[1]["context"]["after"]] == ["b1", "b2"]
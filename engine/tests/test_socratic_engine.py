@@ -0,0 +1,54 @@
+"""
+Unit tests for Socratic context aggregation.
+"""
+
+import sys
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from common import items_bank_supabase, socratic_engine
+
+
+def _library(n: int = 12) -> list[dict]:
+    now = datetime.now().isoformat()
+    # Two tight groups of near-identical embeddings
+    return [
+        {
+            "id": f"item-{i}",
+            "title": f"Agent workflow idea {i}" if i % 2 else f"Pricing experiment {i}",
+            "item_type": "idea",
+            "embedding": [1.0, 0.01 * i, 0.0] if i % 2 else [0.0, 0.01 * i, 1.0],
+            "last_seen": now,
+        }
+        for i in range(n)
+    ]
+
+
+def test_context_uses_one_library_snapshot(monkeypatch, tmp_path):
+    fetches = []
+
+    def fake_get_all_items(client):
+        fetches.append(client)
+        return _library()
+
+    monkeypatch.setattr(socratic_engine, "get_supabase_client", lambda: object())
+    monkeypatch.setattr(socratic_engine, "get_data_dir", lambda: tmp_path)
+    monkeypatch.setattr(items_bank_supabase, "get_all_items", fake_get_all_items)
+    monkeypatch.setattr(socratic_engine, "aggregate_unexplored", lambda client: [{"topic": "Hiring"}])
+    monkeypatch.setattr(
+        socratic_engine, "search_lenny_archive_batch",
+        lambda queries, top_k, min_similarity: [[] for _ in queries],
+    )
+
+    context = socratic_engine.aggregate_socratic_context()
+
+    assert len(fetches) == 1
+    assert [c["itemCount"] for c in context["patterns"]] == [6, 6]
+    assert context["libraryStats"]["totalItems"] == 12
+    assert context["unexplored"] == [{"topic": "Hiring"}]
+    assert context["expertMatches"] == []
+    assert context["counterIntuitive"] == {"saved": [], "dismissed": []}
+
@@ -270,17 +270,27 @@ export async function POST(request: NextRequest) {
       );
     }
 
+    // The Python engine API (in-process runtime) returns structured JSON with
+    // outputFile/content/stats - use those instead of scraping stdout
+    const engineResponse = parseEngineResponse(result.stdout);
+
     // Parse output to find generated file
     // v2: Matches ideas_output/ or insights_output/ paths
     // Example: /path/to/data/ideas_output/ideas_2025-12-18_to_2025-12-31.judge.md
     // Or relative: ideas_output/ideas_2025-12-18_to_2025-12-31.judge.md
-    const outputFileMatch = result.stdout.match(/(?:ideas_output|insights_output|use_cases_output)\/[\w_]+[\d-]+(?:_to_[\d-]+)?\.(?:judge\.md|judge-no-(?:idea|post)\.md|md)/);
-    const outputFile = outputFileMatch ? outputFileMatch[0] : undefined;
+    const outputFileMatch = engineResponse ? null : result.stdout.match(/(?:ideas_output|insights_output|use_cases_output)\/[\w_]+[\d-]+(?:_to_[\d-]+)?\.(?:judge\.md|judge-no-(?:idea|post)\.md|md)/);
+    const outputFile = engineResponse
+      ? engineResponse.outputFile ?? undefined
+      : (outputFileMatch ? outputFileMatch[0] : undefined);
 
     // Read the generated file content if available
     let content: string | undefined;
     let judgeContent: string | undefined;
-    if (outputFile) {
+    if (engineResponse) {
+      // Engine read the file before harmonization could remove it
+      content = engineResponse.content ?? undefined;
+      judgeContent = engineResponse.judgeContent ?? content;
+    } else if (outputFile) {
       // Output files are in data/ directory (e.g., data/ideas_output/ideas_2025-12-18_to_2025-12-31.judge.md)
       const fullPath = path.join(toolPath, '..', 'data', outputFile);
       logger.log(`[Generate] Looking for output file at: ${fullPath}`);
@@ -320,7 +330,7 @@ export async function POST(request: NextRequest) {
     }
 
     // Parse stats from output
-    const stats = parseStats(result.stdout);
+    const stats = engineResponse ? engineStats(engineResponse.stats) : parseStats(result.stdout);
 
     // Parse ranked items from content
     const items = content ? parseRankedItems(content, resolvedTool) : undefined;
@@ -473,6 +483,43 @@ async function runPythonScript(
   });
 }
 
+interface EngineGenerateResponse {
+  success: boolean;
+  outputFile?: string | null;
+  content?: string | null;
+  judgeContent?: string | null;
+  stats: Partial<GenerateResult["stats"]>;
+}
+
+function parseEngineResponse(stdout: string): EngineGenerateResponse | null {
+  // CLI output is progress text; an engine API response is a single JSON object
+  const trimmed = stdout.trim();
+  if (!trimmed.startsWith("{")) {
+    return null;
+  }
+  try {
+    const data = JSON.parse(trimmed);
+    return data && typeof data === "object" && data.stats ? (data as EngineGenerateResponse) : null;
+  } catch {
+    return null;
+  }
+}
+
+function engineStats(stats: Partial<GenerateResult["stats"]>): GenerateResult["stats"] {
+  const itemsGenerated = stats.itemsGenerated ?? 0;
+  const itemsAfterDedup = stats.itemsAfterDedup ?? itemsGenerated;
+  return {
+    daysProcessed: stats.daysProcessed ?? 0,
+    daysWithActivity: stats.daysWithActivity ?? stats.daysProcessed ?? 0,
+    daysWithOutput: stats.daysWithOutput ?? 0,
+    itemsGenerated,
+    itemsAfterDedup,
+    itemsReturned: stats.itemsReturned ?? itemsAfterDedup,
+    conversationsAnalyzed: stats.conversationsAnalyzed ?? 0,
+    harmonization: stats.harmonization,
+  };
+}
+
 function parseStats(stdout: string): GenerateResult["stats"] {
   // Parse progress markers from stdout (structured format, more reliable than regex)
   // Falls back to regex parsing for backward compatibility
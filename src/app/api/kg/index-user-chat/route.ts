@@ -13,6 +13,7 @@ import { existsSync } from "fs";
  * {
  *   withRelations?: boolean,    // Extract relations (default: true)
  *   withDecisions?: boolean,    // Extract decisions (default: true)
+ *   fusedExtraction?: boolean,  // One LLM call for entities/relations/decisions (default: false)
  *   workers?: number,           // Number of parallel workers (default: 4)
  *   dryRun?: boolean            // Dry run mode (default: false)
  * }
@@ -234,6 +235,7 @@ export async function POST(request: NextRequest) {
     const {
       withRelations = true,
       withDecisions = true,
+      fusedExtraction = false,
       workers = 4,
       dryRun = false,
       incremental: _incremental = true, // Default to incremental; Python script handles skip logic
@@ -291,6 +293,7 @@ export async function POST(request: NextRequest) {
     const args: string[] = [];
     if (withRelations) args.push("--with-relations");
     if (withDecisions) args.push("--with-decisions");
+    if (fusedExtraction) args.push("--fused-extraction");
     if (dryRun) args.push("--dry-run");
     args.push("--workers", workers.toString());
     args.push("--days-back", daysBack.toString());
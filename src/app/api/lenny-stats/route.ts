@@ -228,10 +228,14 @@ export async function GET(): Promise<NextResponse<LennyStats>> {
     const metadataContent = fs.readFileSync(metadataPath, "utf-8");
     const metadata = JSON.parse(metadataContent);
 
-    // Get embeddings file size
+    // Get embeddings file size - a sharded local index searches the assembled
+    // .npy matrix; any leftover .npz is not what's in use
+    const sizePath = metadata.sharded
+      ? path.join(localDataDir, "lenny_embeddings.npy")
+      : embeddingsPath;
     let embeddingsSizeMB: number | null = null;
-    if (fs.existsSync(embeddingsPath)) {
-      const stats = fs.statSync(embeddingsPath);
+    if (fs.existsSync(sizePath)) {
+      const stats = fs.statSync(sizePath);
       embeddingsSizeMB = Math.round((stats.size / (1024 * 1024)) * 10) / 10;
     }
 